@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import Organization, User
+from .models import DocumentSequence, Organization, User
 
 
 @admin.register(Organization)
@@ -18,3 +18,10 @@ class UserAdmin(BaseUserAdmin):
     fieldsets = BaseUserAdmin.fieldsets + (
         ('Organization', {'fields': ('organization', 'role', 'email_notifications')}),
     )
+
+
+@admin.register(DocumentSequence)
+class DocumentSequenceAdmin(admin.ModelAdmin):
+    list_display = ('prefix', 'scope', 'period', 'last_value', 'updated_at')
+    list_filter = ('prefix',)
+    search_fields = ('scope', 'prefix')
@@ -160,6 +160,42 @@ def paginated_response(
     return api_success(data=data, meta=pagination_meta)
 
 
+def cursor_paginated_response(
+    data: List[Any],
+    page_size: int,
+    next_cursor: Optional[str],
+    total: int,
+    total_is_estimate: bool = False,
+    extra_meta: Optional[Dict[str, Any]] = None
+) -> Response:
+    """
+    Keyset (cursor) paginated list response
+
+    meta includes:
+    {
+        "pagination": {
+            "page_size": 50,
+            "next_cursor": "...",      // null on the last page
+            "total": 300,
+            "total_is_estimate": false
+        }
+    }
+    """
+    pagination_meta = {
+        "pagination": {
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+            "total": total,
+            "total_is_estimate": total_is_estimate,
+        }
+    }
+
+    if extra_meta:
+        pagination_meta.update(extra_meta)
+
+    return api_success(data=data, meta=pagination_meta)
+
+
 # Common error codes
 class ErrorCodes:
     """Standard error codes"""
@@ -0,0 +1,293 @@
+"""
+API Benchmarks
+在合成資料（seed_dataset）上量測核心 endpoints 的延遲 / 查詢數 / 記憶體（run_benchmarks command）
+
+- SCALES：預設資料量（large ≈ 10k styles / 50k BOM items / 5k sample runs / 2k POs / 200k DraftBlocks）
+- 每個 scenario 透過 APIClient 走完整 middleware / DRF 流程：
+  - 延遲：warmup 後跑 N 次，回報 p50 / p95 / mean / max（ms）
+  - 查詢數：RequestMetricsMiddleware 記錄的每 request 查詢數（中位數 / 最大值）
+  - 記憶體：額外跑一次並以 tracemalloc 量測 peak（不計入延遲）
+- 報告為 JSON；compare_reports() 與 baseline 比較（延遲超過門檻、查詢數或記憶體增加視為退步）
+
+Scheduler 每次都先呼叫 bump_scheduler_version() 讓該組織的快取失效（量測重算路徑，不清空共用 cache）；progress dashboard 以非預設 days_ahead 即時計算
+（預設查詢讀快照）。
+
+用法：
+    python manage.py run_benchmarks --scale small --output bench.json
+    python manage.py run_benchmarks --scale small --baseline bench.json --fail-on-regression
+"""
+
+import math
+import platform
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import django
+from django.db import connection
+from django.utils import timezone
+
+DEFAULT_ITERATIONS = 20
+DEFAULT_WARMUP = 2
+DEFAULT_REGRESSION_THRESHOLD = 0.2   # 延遲增加 20% 視為退步
+
+COST_SHEET_STYLES = 20               # cost_sheet_create scenario 輪流使用的 styles 數
+
+SCALES = {
+    'tiny': dict(styles=20, bom_items_per_style=5, runs_per_style=2, blocks_per_style=10,
+                 sample_requests=5, purchase_orders=4),
+    'small': dict(styles=500, bom_items_per_style=5, runs_per_style=2, blocks_per_style=20,
+                  sample_requests=125, purchase_orders=100),
+    'medium': dict(styles=2000, bom_items_per_style=5, runs_per_style=2, blocks_per_style=20,
+                   sample_requests=500, purchase_orders=400),
+    'large': dict(styles=10000, bom_items_per_style=5, runs_per_style=2, blocks_per_style=20,
+                  sample_requests=2500, purchase_orders=2000),
+}
+
+
+@dataclass
+class BenchmarkContext:
+    organization: Any
+    user: Any
+    client: Any
+    production_order_ids: List[Any] = field(default_factory=list)
+    cost_sheet_inputs: List[Dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass
+class Scenario:
+    name: str
+    description: str
+    run: Callable[[BenchmarkContext, int], Any]                 # (context, iteration) → response
+    prepare: Optional[Callable[[BenchmarkContext], None]] = None
+    before_each: Optional[Callable[[BenchmarkContext], None]] = None
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    description: str
+    iterations: int
+    p50_ms: float
+    p95_ms: float
+    mean_ms: float
+    max_ms: float
+    queries: int                      # 中位數
+    max_queries: int
+    db_ms: float                      # 中位數
+    peak_memory_kb: float
+    errors: List[str] = field(default_factory=list)
+
+
+# ==================== Scenarios ====================
+
+def _get(path, **params):
+    def run(context, iteration):
+        return context.client.get(path, params)
+    return run
+
+
+def _invalidate_scheduler_cache(context):
+    # 只讓 scheduler 快取失效（版本號 +1），不清空共用的 cache
+    from apps.samples.services.scheduler_cache import bump_scheduler_version
+    bump_scheduler_version(context.organization.id)
+
+
+def _prepare_alerts(context):
+    from apps.samples.services.alerts import evaluate_alerts
+    evaluate_alerts(context.organization.id, notify=False)
+
+
+def _prepare_mrp(context):
+    from apps.orders.models import ProductionOrder
+    context.production_order_ids = list(
+        ProductionOrder.objects.filter(organization=context.organization)
+        .order_by('po_number').values_list('pk', flat=True)
+    )
+
+
+def _run_mrp(context, iteration):
+    order_id = context.production_order_ids[iteration % len(context.production_order_ids)]
+    return context.client.post(f'/api/v2/production-orders/{order_id}/calculate_mrp/', {}, format='json')
+
+
+def _prepare_cost_sheets(context):
+    from apps.costing.services.usage_scenario_service import UsageScenarioService
+    from apps.styles.models import Style
+
+    styles = Style.objects.filter(
+        organization=context.organization, current_revision__isnull=False,
+    ).select_related('current_revision').order_by('style_number')[:COST_SHEET_STYLES]
+    context.cost_sheet_inputs = [
+        {
+            'style_id': str(style.pk),
+            'usage_scenario_id': str(
+                UsageScenarioService.create_scenario(style.current_revision, 'sample_quote', {}, user=context.user).pk
+            ),
+        }
+        for style in styles
+    ]
+
+
+def _run_cost_sheet(context, iteration):
+    inputs = context.cost_sheet_inputs[iteration % len(context.cost_sheet_inputs)]
+    return context.client.post('/api/v2/cost-sheet-versions/', {
+        **inputs, 'costing_type': 'sample', 'labor_cost': 10, 'overhead_cost': 5, 'margin_pct': 30,
+    }, format='json')
+
+
+SCENARIOS = [
+    Scenario('styles_list', 'GET /styles/ (page 1, offset)', _get('/api/v2/styles/')),
+    Scenario('styles_list_cursor', 'GET /styles/?cursor=', _get('/api/v2/styles/', cursor='')),
+    Scenario('portfolio_kanban', 'GET /portfolio/kanban/', _get('/api/v2/portfolio/kanban/')),
+    Scenario('kanban_runs', 'GET /kanban/runs/', _get('/api/v2/kanban/runs/')),
+    Scenario('scheduler', 'GET /scheduler/ (cold cache)', _get('/api/v2/scheduler/'),
+             before_each=_invalidate_scheduler_cache),
+    Scenario('alerts', 'GET /alerts/', _get('/api/v2/alerts/'), prepare=_prepare_alerts),
+    Scenario('progress_dashboard', 'GET /progress-dashboard/ (live aggregates)',
+             _get('/api/v2/progress-dashboard/', days_ahead=30)),
+    Scenario('mrp', 'POST /production-orders/{id}/calculate_mrp/', _run_mrp, prepare=_prepare_mrp),
+    Scenario('cost_sheet_create', 'POST /cost-sheet-versions/', _run_cost_sheet, prepare=_prepare_cost_sheets),
+]
+
+
+# ==================== Runner ====================
+
+def _percentile(values: List[float], pct: float) -> float:
+    """nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def _call(scenario: Scenario, context: BenchmarkContext, iteration: int):
+    from .instrumentation import request_metrics
+
+    if scenario.before_each:
+        scenario.before_each(context)
+    start = time.perf_counter()
+    response = scenario.run(context, iteration)
+    elapsed = time.perf_counter() - start
+    error = None
+    if response.status_code >= 400:
+        error = f"#{iteration}: HTTP {response.status_code} {getattr(response, 'content', b'')[:200]!r}"
+    return elapsed, request_metrics(response), error
+
+
+def run_scenario(scenario: Scenario, context: BenchmarkContext,
+                 iterations: int = DEFAULT_ITERATIONS, warmup: int = DEFAULT_WARMUP) -> ScenarioResult:
+    if scenario.prepare:
+        scenario.prepare(context)
+
+    errors = []
+    for iteration in range(warmup):
+        _, _, error = _call(scenario, context, iteration)
+        if error:
+            errors.append(error)
+
+    timings, queries, db_times = [], [], []
+    for iteration in range(warmup, warmup + iterations):
+        elapsed, metrics, error = _call(scenario, context, iteration)
+        timings.append(elapsed * 1000)
+        queries.append(metrics.queries)
+        db_times.append(metrics.db_time * 1000)
+        if error:
+            errors.append(error)
+
+    # 記憶體另跑一次：tracemalloc 會拖慢執行，不與延遲一起量
+    tracemalloc.start()
+    try:
+        _call(scenario, context, warmup + iterations)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return ScenarioResult(
+        name=scenario.name,
+        description=scenario.description,
+        iterations=iterations,
+        p50_ms=round(_percentile(timings, 50), 2),
+        p95_ms=round(_percentile(timings, 95), 2),
+        mean_ms=round(statistics.mean(timings), 2),
+        max_ms=round(max(timings), 2),
+        queries=int(statistics.median_low(queries)),
+        max_queries=max(queries),
+        db_ms=round(statistics.median(db_times), 2),
+        peak_memory_kb=round(peak / 1024, 1),
+        errors=errors[:5],
+    )
+
+
+def run_benchmarks(context: BenchmarkContext, names: Optional[List[str]] = None,
+                   iterations: int = DEFAULT_ITERATIONS, warmup: int = DEFAULT_WARMUP,
+                   on_result: Optional[Callable[[ScenarioResult], None]] = None) -> List[ScenarioResult]:
+    """
+    Raises:
+        ValueError: 未知的 scenario 名稱
+    """
+    by_name = {scenario.name: scenario for scenario in SCENARIOS}
+    unknown = [name for name in names or () if name not in by_name]
+    if unknown:
+        raise ValueError(f"Unknown scenario: {', '.join(unknown)}")
+
+    results = []
+    for scenario in (by_name[name] for name in names) if names else SCENARIOS:
+        result = run_scenario(scenario, context, iterations, warmup)
+        results.append(result)
+        if on_result:
+            on_result(result)
+    return results
+
+
+def build_report(results: List[ScenarioResult], meta: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'meta': {
+            'database': connection.vendor,
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'created_at': timezone.now().isoformat(),
+            **meta,
+        },
+        'scenarios': {
+            result.name: {key: value for key, value in vars(result).items() if key != 'name'}
+            for result in results
+        },
+    }
+
+
+# ==================== Baseline comparison ====================
+
+@dataclass
+class Regression:
+    scenario: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change_pct(self) -> float:
+        if not self.baseline:
+            return math.inf if self.current else 0.0
+        return (self.current - self.baseline) / self.baseline * 100
+
+
+def compare_reports(current: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> List[Regression]:
+    """
+    與 baseline 比較（只比較兩邊都有的 scenarios）
+
+    - p50_ms / p95_ms：增加超過 threshold（比例）
+    - queries：任何增加（查詢數是確定的）
+    - peak_memory_kb：增加超過 threshold
+    """
+    regressions = []
+    for name, result in current.get('scenarios', {}).items():
+        base = baseline.get('scenarios', {}).get(name)
+        if base is None:
+            continue
+        for metric, tolerance in (('p50_ms', threshold), ('p95_ms', threshold),
+                                  ('queries', 0.0), ('peak_memory_kb', threshold)):
+            if metric in base and result[metric] > base[metric] * (1 + tolerance):
+                regressions.append(Regression(name, metric, base[metric], result[metric]))
+    return regressions
@@ -0,0 +1,79 @@
+"""
+Bulk Update Utilities
+單一 UPDATE 語句批量更新多筆資料（每筆不同的值）
+
+用法：
+    updated, missing = bulk_update_by_pk(
+        DraftBlock.objects.filter(page__revision=revision),   # 擁有權條件
+        {block_id: {'overlay_x': 10, 'overlay_y': 20}, ...},
+        updated_at=timezone.now(),                            # 所有列共用的值
+    )
+
+產生：
+    UPDATE ... SET overlay_x = CASE WHEN id=... THEN ... ELSE overlay_x END, ...
+    WHERE id IN (...) AND <queryset 條件>
+
+擁有權在同一個語句的 WHERE 驗證；不屬於 queryset 的 pk 不會被更新。
+"""
+
+from typing import Any, Dict, Hashable, List, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db.models import Case, F, Value, When
+
+
+def bulk_update_by_pk(
+    queryset,
+    values_by_pk: Dict[Hashable, Dict[str, Any]],
+    **common: Any,
+) -> Tuple[List[Hashable], List[Hashable]]:
+    """
+    Args:
+        queryset: 已套用擁有權條件的 queryset
+        values_by_pk: {pk: {field: value}}；各筆可只包含部分欄位（未提供的欄位保持原值）
+        **common: 所有列共用的欄位值（例如 updated_at）
+
+    Returns:
+        (updated pks, missing pks)
+        全部命中時只有 1 個查詢；有 pk 不在 queryset 時多 1 個查詢找出是哪些
+    """
+    model = queryset.model
+    pk_field = model._meta.pk
+    pk_name = pk_field.name
+
+    # 格式錯誤的 pk（例如非 UUID）直接視為 missing
+    invalid = []
+    valid_values = {}
+    for pk, values in values_by_pk.items():
+        try:
+            pk_field.to_python(pk)
+        except ValidationError:
+            invalid.append(pk)
+        else:
+            valid_values[pk] = values
+    values_by_pk = valid_values
+
+    if not values_by_pk:
+        return [], invalid
+
+    fields = sorted({name for values in values_by_pk.values() for name in values})
+
+    updates = dict(common)
+    for name in fields:
+        model_field = model._meta.get_field(name)
+        whens = [
+            When(**{pk_name: pk}, then=Value(values[name], output_field=model_field))
+            for pk, values in values_by_pk.items()
+            if name in values
+        ]
+        updates[name] = Case(*whens, default=F(name), output_field=model_field)
+
+    pks = list(values_by_pk)
+    count = queryset.filter(pk__in=pks).update(**updates)
+    if count == len(pks):
+        return pks, invalid
+
+    found = {str(pk) for pk in queryset.filter(pk__in=pks).values_list('pk', flat=True)}
+    updated = [pk for pk in pks if str(pk_field.to_python(pk)) in found]
+    missing = [pk for pk in pks if str(pk_field.to_python(pk)) not in found]
+    return updated, missing + invalid
@@ -0,0 +1,241 @@
+"""
+Shared CJK Font Registry
+所有 PDF 匯出器（xhtml2pdf / reportlab / Pillow）共用的中文字體登錄
+
+- 字體路徑只探測一次（lazy，第一次使用時）
+- reportlab 字體只註冊一次（process-wide）
+- Pillow ImageFont 依 (path, size) 快取，不再每次匯出重新載入
+
+字體搜尋順序：
+1. settings.PDF_FONT_PATHS（環境變數 PDF_FONT_PATHS，以 os.pathsep 分隔）
+2. settings.PDF_FONT_DIR 內的字體檔（部署時可放入 Noto/WQY 字體）
+3. 系統字體（Windows / Linux / macOS 常見路徑）
+4. reportlab 內建 CID 字體 STSong-Light（僅 reportlab 可用）
+"""
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+logger = logging.getLogger(__name__)
+
+# reportlab 內建的 CJK CID 字體（不需要 TTF 檔案）
+BUILTIN_CID_FONT = 'STSong-Light'
+
+# 重要：simsunb.ttf 是「宋體擴展B」，只包含罕用字，不要使用！
+# TTC 格式註冊到 reportlab 時使用 subfontIndex=0
+SYSTEM_FONTS_REGULAR: List[str] = [
+    "C:/Windows/Fonts/msyh.ttc",       # 微軟雅黑（最完整）
+    "C:/Windows/Fonts/msyh.ttf",       # 微軟雅黑 TTF
+    "C:/Windows/Fonts/simsun.ttc",     # 宋體
+    "C:/Windows/Fonts/simhei.ttf",     # 黑體
+    "C:/Windows/Fonts/kaiu.ttf",       # 標楷體
+    # Linux
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    "/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf",
+    # macOS
+    "/System/Library/Fonts/PingFang.ttc",
+]
+
+SYSTEM_FONTS_BOLD: List[str] = [
+    "C:/Windows/Fonts/msyhbd.ttc",     # 微軟雅黑粗體
+    "C:/Windows/Fonts/simhei.ttf",     # 黑體
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Bold.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Bold.ttc",
+]
+
+FONT_EXTENSIONS = ('.ttf', '.ttc', '.otf')
+
+
+class FontNotConfigured(ImproperlyConfigured):
+    """找不到可供 Pillow 使用的中文字體（reportlab 可回退到 CID 字體，Pillow 不行）"""
+
+
+def _missing_font_message() -> str:
+    font_dir = getattr(settings, 'PDF_FONT_DIR', None)
+    if not font_dir:
+        dir_state = "PDF_FONT_DIR is not set"
+    elif not os.path.isdir(font_dir):
+        dir_state = f"PDF_FONT_DIR {font_dir} does not exist"
+    else:
+        dir_state = f"PDF_FONT_DIR {font_dir} has no {'/'.join(FONT_EXTENSIONS)} files"
+    return (
+        f"No CJK font found for PDF export ({dir_state}, PDF_FONT_PATHS is "
+        f"{'set but missing' if _configured_paths() else 'empty'}, no known system font installed). "
+        "Install a CJK font (e.g. fonts-noto-cjk / fonts-wqy-microhei), copy one into PDF_FONT_DIR, "
+        "or point PDF_FONT_PATHS at a .ttf/.ttc/.otf file."
+    )
+
+
+def _configured_paths() -> List[str]:
+    """settings / 環境變數指定的字體路徑"""
+    paths = getattr(settings, 'PDF_FONT_PATHS', None) or []
+    if isinstance(paths, str):
+        paths = [p for p in paths.split(os.pathsep) if p]
+    return [str(p) for p in paths]
+
+
+def _bundled_paths(bold: bool) -> List[str]:
+    """PDF_FONT_DIR 內的字體檔（依檔名排序，粗體優先挑含 Bold 的檔案）"""
+    font_dir = getattr(settings, 'PDF_FONT_DIR', None)
+    if not font_dir or not os.path.isdir(font_dir):
+        return []
+
+    files = sorted(
+        str(p) for p in Path(font_dir).iterdir()
+        if p.suffix.lower() in FONT_EXTENSIONS
+    )
+    bold_files = [f for f in files if 'bold' in os.path.basename(f).lower()]
+    regular_files = [f for f in files if f not in bold_files]
+    return (bold_files + regular_files) if bold else (regular_files + bold_files)
+
+
+class FontRegistry:
+    """
+    Process-wide 字體登錄
+
+    使用 get_font_registry() 取得單例，不要直接建立。
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._paths: Dict[bool, Optional[str]] = {}
+        self._pil_fonts: Dict[Tuple[str, int], object] = {}
+        self._reportlab_fonts: Dict[bool, str] = {}
+
+    def font_path(self, bold: bool = False) -> Optional[str]:
+        """
+        取得中文 TTF/TTC 字體路徑（結果快取）
+
+        Args:
+            bold: 是否優先挑選粗體
+
+        Returns:
+            字體檔路徑，找不到時回傳 None
+        """
+        if bold in self._paths:
+            return self._paths[bold]
+
+        with self._lock:
+            if bold not in self._paths:
+                candidates = _configured_paths() + _bundled_paths(bold)
+                candidates += SYSTEM_FONTS_BOLD if bold else []
+                candidates += SYSTEM_FONTS_REGULAR
+
+                found = next((p for p in candidates if os.path.exists(p)), None)
+                if found:
+                    logger.info(f"Chinese font resolved (bold={bold}): {found}")
+                else:
+                    logger.error("No Chinese TTF font found!")
+                self._paths[bold] = found
+
+        return self._paths[bold]
+
+    def pil_font(self, size: int, bold: bool = False):
+        """
+        取得 Pillow ImageFont（依 path + size 快取）
+
+        Raises:
+            FontNotConfigured: 找不到任何中文字體，或字體檔無法載入
+        """
+        from PIL import ImageFont
+
+        path = self.font_path(bold=bold) or self.font_path(bold=False)
+        if not path:
+            raise FontNotConfigured(_missing_font_message())
+
+        key = (path, size)
+        font = self._pil_fonts.get(key)
+        if font is None:
+            with self._lock:
+                font = self._pil_fonts.get(key)
+                if font is None:
+                    try:
+                        font = ImageFont.truetype(path, size)
+                    except OSError as e:
+                        raise FontNotConfigured(f"Cannot load PDF font {path}: {e}") from e
+                    self._pil_fonts[key] = font
+        return font
+
+    def reportlab_font(self, bold: bool = False) -> str:
+        """
+        註冊並回傳 reportlab 字體名稱（每個 process 只註冊一次）
+
+        沒有 TTF 字體時回退到 reportlab 內建的 STSong-Light CID 字體。
+        """
+        if bold in self._reportlab_fonts:
+            return self._reportlab_fonts[bold]
+
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+
+        with self._lock:
+            if bold in self._reportlab_fonts:
+                return self._reportlab_fonts[bold]
+
+            font_name = None
+            path = self.font_path(bold=bold)
+            if path:
+                name = 'CJKFontBold' if bold else 'CJKFont'
+                try:
+                    if path.lower().endswith('.ttc'):
+                        pdfmetrics.registerFont(TTFont(name, path, subfontIndex=0))
+                    else:
+                        pdfmetrics.registerFont(TTFont(name, path))
+                    font_name = name
+                    logger.info(f"[PDF] Registered font: {name} from {path}")
+                except Exception as e:
+                    logger.warning(f"[PDF] Failed to register {path}: {e}")
+
+            if font_name is None:
+                font_name = self._register_builtin_cid_font()
+
+            self._reportlab_fonts[bold] = font_name
+
+        return font_name
+
+    @staticmethod
+    def _register_builtin_cid_font() -> str:
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+
+        try:
+            pdfmetrics.registerFont(UnicodeCIDFont(BUILTIN_CID_FONT))
+            return BUILTIN_CID_FONT
+        except Exception as e:
+            logger.warning(f"[PDF] Failed to register {BUILTIN_CID_FONT}: {e}")
+            return 'Helvetica'
+
+    def reset(self):
+        """清除快取（測試或修改 settings 後使用）"""
+        with self._lock:
+            self._paths.clear()
+            self._pil_fonts.clear()
+            self._reportlab_fonts.clear()
+
+
+_registry: Optional[FontRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_font_registry() -> FontRegistry:
+    """取得 process-wide FontRegistry 單例"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = FontRegistry()
+    return _registry
+
+
+def find_chinese_font(bold: bool = False) -> Optional[str]:
+    """查找中文字體路徑（Pillow / reportlab 共用）"""
+    return get_font_registry().font_path(bold=bold)
@@ -0,0 +1,294 @@
+"""
+Request Instrumentation
+每個 request 的 DB 查詢數 / DB 時間 / 重複查詢 / 外部 API 呼叫 + query budget
+
+- RequestMetricsMiddleware：以 connection.execute_wrapper 記錄本 request 的所有查詢
+  - 回應加上 Server-Timing header（瀏覽器 DevTools 的 Timing 分頁直接可見）
+  - 每個 request 一筆結構化 log（logger apps.core.instrumentation，
+    extra={'request_metrics': {...}}）；超過 budget 或有 N+1 時為 WARNING
+- 重複查詢以 fingerprint（參數 / 常數 / IN 清單正規化後的 SQL）計數，同一 fingerprint
+  出現多次通常就是 N+1
+- 外部呼叫（OpenAI、email）以 track_external() 包住，記入同一個 request
+- Budget：endpoint 宣告查詢上限；QUERY_BUDGET_STRICT=True（CI）時超過即 raise
+  QueryBudgetExceeded，否則只 log
+
+宣告方式：
+    class SampleRunViewSet(viewsets.ModelViewSet):
+        query_budget = 15                   # 所有 actions
+        query_budgets = {'list': 12}        # 個別 action 覆寫
+
+    @query_budget(10)
+    @api_view(['GET'])
+    def kanban_runs(request): ...
+
+測試：
+    response = client.get(url)
+    assert_within_budget(response)          # 使用 endpoint 宣告的 budget
+
+    with assert_max_queries(5):
+        build_kanban_data(org)
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# 同一 fingerprint 出現次數 >= 此值時視為 N+1（log WARNING）
+DUPLICATE_WARN_THRESHOLD = 5
+
+_current_metrics: ContextVar[Optional['RequestMetrics']] = ContextVar('request_metrics', default=None)
+
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r'\bIN \((?:(?:%s|\?), )*(?:%s|\?)\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(AssertionError):
+    """查詢數超過 endpoint 宣告的 budget（QUERY_BUDGET_STRICT / 測試）"""
+
+
+def fingerprint(sql: str) -> str:
+    """正規化 SQL：常數 → ?，IN (...) 清單合併，空白壓縮"""
+    sql = _LITERAL.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+@dataclass
+class RequestMetrics:
+    queries: int = 0
+    db_time: float = 0.0                                    # 秒
+    fingerprints: Counter = field(default_factory=Counter)
+    external_calls: List[Tuple[str, float]] = field(default_factory=list)
+    budget: Optional[int] = None
+    view: str = ''
+    started: float = field(default_factory=time.perf_counter)
+    total_time: Optional[float] = None
+
+    def record_query(self, sql: str, duration: float):
+        self.queries += 1
+        self.db_time += duration
+        self.fingerprints[fingerprint(sql)] += 1
+
+    def finish(self):
+        self.total_time = time.perf_counter() - self.started
+
+    @property
+    def duplicates(self) -> List[Tuple[str, int]]:
+        """[(fingerprint, count)]，只含出現多次者，次數多的在前"""
+        return [(sql, count) for sql, count in self.fingerprints.most_common() if count > 1]
+
+    @property
+    def external_time(self) -> float:
+        return sum(duration for _, duration in self.external_calls)
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.queries > self.budget
+
+    @property
+    def has_n_plus_one(self) -> bool:
+        return any(count >= DUPLICATE_WARN_THRESHOLD for _, count in self.duplicates)
+
+    def server_timing(self) -> str:
+        total = self.total_time if self.total_time is not None else time.perf_counter() - self.started
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+            f'ext;dur={self.external_time * 1000:.1f};desc="{len(self.external_calls)} calls"',
+            f'app;dur={total * 1000:.1f}',
+        ])
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'view': self.view,
+            'queries': self.queries,
+            'query_budget': self.budget,
+            'db_ms': round(self.db_time * 1000, 1),
+            'total_ms': round((self.total_time or 0.0) * 1000, 1),
+            'duplicate_queries': [{'sql': sql, 'count': count} for sql, count in self.duplicates[:5]],
+            'external_calls': [
+                {'name': name, 'ms': round(duration * 1000, 1)} for name, duration in self.external_calls
+            ],
+        }
+
+    def describe_failure(self, limit: int) -> str:
+        lines = [f"{self.view or 'block'}: {self.queries} queries > budget {limit}"]
+        for sql, count in self.duplicates[:5]:
+            lines.append(f"  {count}x {sql[:300]}")
+        return '\n'.join(lines)
+
+
+class _QueryRecorder:
+    def __init__(self, metrics: RequestMetrics):
+        self.metrics = metrics
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.metrics.record_query(sql, time.perf_counter() - start)
+
+
+@contextmanager
+def collect_metrics(metrics: Optional[RequestMetrics] = None):
+    """在區塊內記錄所有資料庫連線的查詢與 track_external() 呼叫"""
+    metrics = metrics or RequestMetrics()
+    token = _current_metrics.set(metrics)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(_QueryRecorder(metrics)))
+            yield metrics
+    finally:
+        _current_metrics.reset(token)
+        metrics.finish()
+
+
+@contextmanager
+def track_external(name: str):
+    """
+    記錄一次外部呼叫（OpenAI / email 等）的耗時；不在 request 內（Celery / shell）時不記錄
+
+    用法：
+        with track_external('openai'):
+            response = client.chat.completions.create(...)
+    """
+    metrics = _current_metrics.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if metrics is not None:
+            metrics.external_calls.append((name, time.perf_counter() - start))
+
+
+# ==================== Budgets ====================
+
+def query_budget(max_queries: int):
+    """function view 的 query budget（放在 @api_view 之上）"""
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+    return decorator
+
+
+def resolve_budget(view_func, method: str) -> Optional[int]:
+    """
+    view 宣告的 budget
+
+    DRF ViewSet：view_func.cls.query_budgets[action] > view_func.cls.query_budget；
+    function view：@query_budget 設定的 view_func.query_budget
+    """
+    budget = getattr(view_func, 'query_budget', None)
+    cls = getattr(view_func, 'cls', None)
+    if cls is None:
+        return budget
+    action = (getattr(view_func, 'actions', None) or {}).get(method.lower())
+    budgets = getattr(cls, 'query_budgets', None) or {}
+    if action in budgets:
+        return budgets[action]
+    return getattr(cls, 'query_budget', budget)
+
+
+def _view_name(view_func, method: str) -> str:
+    cls = getattr(view_func, 'cls', None)
+    action = (getattr(view_func, 'actions', None) or {}).get(method.lower())
+    if cls is not None:
+        # @api_view 的 WrappedAPIView 以原 function 命名
+        return f"{cls.__name__}.{action}" if action else cls.__name__
+    return getattr(view_func, '__qualname__', getattr(view_func, '__name__', repr(view_func)))
+
+
+class RequestMetricsMiddleware:
+    """記錄每個 request 的查詢 / 外部呼叫，輸出 Server-Timing header 與結構化 log"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with collect_metrics() as metrics:
+            request.request_metrics = metrics
+            response = self.get_response(request)
+
+        response['Server-Timing'] = metrics.server_timing()
+        self._log(request, response, metrics)
+
+        if metrics.over_budget and getattr(settings, 'QUERY_BUDGET_STRICT', False):
+            raise QueryBudgetExceeded(metrics.describe_failure(metrics.budget))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = getattr(request, 'request_metrics', None)
+        if metrics is not None:
+            metrics.view = _view_name(view_func, request.method)
+            metrics.budget = resolve_budget(view_func, request.method)
+        return None
+
+    def _log(self, request, response, metrics):
+        level = logging.WARNING if metrics.over_budget or metrics.has_n_plus_one else logging.DEBUG
+        if not logger.isEnabledFor(level):
+            return
+        logger.log(
+            level,
+            "%s %s %s view=%s queries=%d budget=%s db_ms=%.1f ext=%d total_ms=%.1f duplicates=%d",
+            request.method, request.path, response.status_code, metrics.view or '-',
+            metrics.queries, metrics.budget if metrics.budget is not None else '-',
+            metrics.db_time * 1000, len(metrics.external_calls), (metrics.total_time or 0.0) * 1000,
+            len(metrics.duplicates),
+            extra={'request_metrics': {
+                'method': request.method, 'path': request.path, 'status': response.status_code,
+                **metrics.as_dict(),
+            }},
+        )
+
+
+# ==================== Test helpers ====================
+
+def request_metrics(response) -> RequestMetrics:
+    """test client response 對應的 RequestMetrics"""
+    metrics = getattr(getattr(response, 'wsgi_request', None), 'request_metrics', None)
+    if metrics is None:
+        raise AssertionError("RequestMetricsMiddleware is not installed")
+    return metrics
+
+
+def assert_within_budget(response, max_queries: Optional[int] = None) -> RequestMetrics:
+    """
+    斷言 request 的查詢數不超過 budget（未指定 max_queries 時使用 endpoint 宣告的 budget）
+
+    Raises:
+        QueryBudgetExceeded: 超過 budget（訊息含重複查詢 fingerprint）
+        AssertionError: endpoint 未宣告 budget
+    """
+    metrics = request_metrics(response)
+    limit = max_queries if max_queries is not None else metrics.budget
+    if limit is None:
+        raise AssertionError(f"{metrics.view} declares no query budget")
+    if metrics.queries > limit:
+        raise QueryBudgetExceeded(metrics.describe_failure(limit))
+    return metrics
+
+
+@contextmanager
+def assert_max_queries(max_queries: int):
+    """
+    斷言區塊內的查詢數不超過 max_queries
+
+    Raises:
+        QueryBudgetExceeded: 超過上限（訊息含重複查詢 fingerprint）
+    """
+    with collect_metrics() as metrics:
+        yield metrics
+    if metrics.queries > max_queries:
+        raise QueryBudgetExceeded(metrics.describe_failure(max_queries))
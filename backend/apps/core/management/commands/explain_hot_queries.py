@@ -0,0 +1,82 @@
+"""EXPLAIN the hot endpoint queries and flag sequential scans"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from apps.core.models import Organization
+from apps.core.query_plans import DEFAULT_MIN_ROWS, HOT_QUERIES, explain_hot_queries
+from apps.core.seeding import seed_dataset
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Run EXPLAIN on hot endpoint queries and flag sequential scans (optionally on a seeded dataset)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organization', help='Organization UUID (default: first organization)')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='先在 transaction 內建立 N 個 styles 的合成資料，結束後 rollback')
+        parser.add_argument('--query', action='append', dest='queries',
+                            help=f"只檢查指定的 query（可重複）：{', '.join(q.name for q in HOT_QUERIES)}")
+        parser.add_argument('--min-rows', type=int, default=DEFAULT_MIN_ROWS,
+                            help='PostgreSQL：估計列數低於此值的 Seq Scan 不列出')
+        parser.add_argument('--show-plans', action='store_true', help='輸出完整 plan')
+        parser.add_argument('--fail-on-seq-scan', action='store_true', help='有 sequential scan 時以錯誤結束（CI 用）')
+
+    def handle(self, *args, **options):
+        if not options['seed']:
+            self._report(self._organization(options), options)
+            return
+
+        try:
+            with transaction.atomic():
+                organization = Organization.objects.create(name='explain_hot_queries seed')
+                counts = seed_dataset(organization, styles=options['seed'])
+                self.stdout.write(f"Seeded {', '.join(f'{label}={n}' for label, n in counts.items())}")
+                if connection.vendor == 'postgresql':
+                    with connection.cursor() as cursor:
+                        cursor.execute('ANALYZE')
+                self._report(organization, options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _organization(self, options):
+        if options['organization']:
+            organization = Organization.objects.filter(pk=options['organization']).first()
+            if organization is None:
+                raise CommandError(f"Organization {options['organization']} not found")
+            return organization
+        organization = Organization.objects.order_by('created_at').first()
+        if organization is None:
+            raise CommandError('No organization found (use --seed N)')
+        return organization
+
+    def _report(self, organization, options):
+        try:
+            reports = explain_hot_queries(organization, options['queries'], min_rows=options['min_rows'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        flagged = []
+        for report in reports:
+            if report.seq_scans:
+                flagged.append(report)
+                self.stdout.write(self.style.WARNING(
+                    f"⚠️  {report.name:<24} seq scan on {', '.join(report.seq_scans)}  ({report.description})"
+                ))
+            else:
+                self.stdout.write(f"✅ {report.name:<24} ({report.description})")
+            if options['show_plans']:
+                self.stdout.write(report.plan)
+
+        if not flagged:
+            self.stdout.write(self.style.SUCCESS(f'✅ {len(reports)} queries, no sequential scans'))
+            return
+        message = f'{len(flagged)} of {len(reports)} queries use sequential scans'
+        if options['fail_on_seq_scan']:
+            raise CommandError(message)
+        self.stdout.write(self.style.WARNING(f'⚠️  {message}'))
@@ -0,0 +1,157 @@
+"""Seed a synthetic dataset and benchmark the core API endpoints"""
+
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import override_settings
+
+from apps.core.benchmarks import (
+    DEFAULT_ITERATIONS, DEFAULT_REGRESSION_THRESHOLD, DEFAULT_WARMUP, SCALES, SCENARIOS,
+    BenchmarkContext, build_report, compare_reports, run_benchmarks,
+)
+from apps.core.models import Organization, User
+from apps.core.seeding import seed_dataset
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Seed a synthetic dataset and report p50/p95 latency, query counts and peak memory as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=list(SCALES), default='small', help='資料量 preset')
+        for option in ('styles', 'bom-items-per-style', 'runs-per-style', 'blocks-per-style',
+                       'sample-requests', 'purchase-orders'):
+            parser.add_argument(f'--{option}', type=int, help='覆寫 scale preset')
+        parser.add_argument('--random-seed', type=int, default=0)
+        parser.add_argument('--scenario', action='append', dest='scenarios',
+                            help=f"只跑指定的 scenario（可重複）：{', '.join(s.name for s in SCENARIOS)}")
+        parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS)
+        parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP)
+        parser.add_argument('--output', help='JSON 報告路徑（預設輸出到 stdout）')
+        parser.add_argument('--baseline', help='與先前的 JSON 報告比較')
+        parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                            help='延遲 / 記憶體增加超過此比例視為退步（預設 0.2）')
+        parser.add_argument('--fail-on-regression', action='store_true', help='有退步時以錯誤結束（CI 用）')
+        parser.add_argument('--keep', action='store_true', help='保留合成資料（預設結束後 rollback）')
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be >= 1')
+        baseline = self._load_baseline(options['baseline'])
+        volumes = dict(SCALES[options['scale']])
+        for key in volumes:
+            if options.get(key) is not None:
+                volumes[key] = options[key]
+
+        # 量測時關閉 DEBUG query log / strict budget / 每 request 的 metrics log
+        metrics_logger = logging.getLogger('apps.core.instrumentation')
+        previous_level = metrics_logger.level
+        metrics_logger.setLevel(logging.ERROR)
+        try:
+            with override_settings(DEBUG=False, QUERY_BUDGET_STRICT=False,
+                                   ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                report = self._run(volumes, options)
+        finally:
+            metrics_logger.setLevel(previous_level)
+
+        output = json.dumps(report, indent=2, default=str)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stdout.write(self.style.SUCCESS(f"✅ Report written to {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+        if baseline is not None:
+            self._compare(report, baseline, options)
+
+    def _load_baseline(self, path):
+        if not path:
+            return None
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Cannot read baseline {path}: {e}')
+
+    def _run(self, volumes, options):
+        from rest_framework.test import APIClient
+        from apps.styles.style_status import rebuild_style_statuses
+
+        report = None
+        try:
+            with transaction.atomic():
+                organization = Organization.objects.create(name='run_benchmarks seed')
+                user = User.objects.create_user(
+                    username=f'bench-{organization.pk.hex[:8]}', password=None, organization=organization,
+                )
+
+                start = time.perf_counter()
+                counts = seed_dataset(organization, random_seed=options['random_seed'], **volumes)
+                rebuild_style_statuses(organization)
+                if connection.vendor == 'postgresql':
+                    with connection.cursor() as cursor:
+                        cursor.execute('ANALYZE')
+                seed_seconds = time.perf_counter() - start
+                self.stderr.write(
+                    f"Seeded in {seed_seconds:.1f}s: {', '.join(f'{label}={n}' for label, n in counts.items())}"
+                )
+
+                client = APIClient()
+                client.force_authenticate(user=user)
+                context = BenchmarkContext(organization=organization, user=user, client=client)
+                try:
+                    results = run_benchmarks(
+                        context, options['scenarios'], options['iterations'], options['warmup'],
+                        on_result=self._print_result,
+                    )
+                except ValueError as e:
+                    raise CommandError(str(e))
+
+                report = build_report(results, {
+                    'scale': options['scale'],
+                    'volumes': volumes,
+                    'seed_counts': counts,
+                    'seed_seconds': round(seed_seconds, 2),
+                    'random_seed': options['random_seed'],
+                    'iterations': options['iterations'],
+                    'warmup': options['warmup'],
+                })
+                if not options['keep']:
+                    raise _Rollback
+        except _Rollback:
+            pass
+        return report
+
+    def _print_result(self, result):
+        line = (f"{result.name:<20} p50={result.p50_ms:>8.1f}ms  p95={result.p95_ms:>8.1f}ms  "
+                f"queries={result.queries:<4} peak={result.peak_memory_kb:>9.1f}KB")
+        if result.errors:
+            self.stderr.write(self.style.WARNING(f"⚠️  {line}  errors: {result.errors[0]}"))
+        else:
+            self.stderr.write(f"✅ {line}")
+
+    def _compare(self, report, baseline, options):
+        if baseline.get('meta', {}).get('volumes') != report['meta']['volumes'] or \
+                baseline.get('meta', {}).get('database') != report['meta']['database']:
+            self.stderr.write(self.style.WARNING('⚠️  Baseline was run with different volumes / database'))
+        regressions = compare_reports(report, baseline, options['threshold'])
+        if not regressions:
+            self.stderr.write(self.style.SUCCESS('✅ No regressions against baseline'))
+            return
+        for regression in regressions:
+            self.stderr.write(self.style.WARNING(
+                f"⚠️  {regression.scenario:<20} {regression.metric:<15} "
+                f"{regression.baseline} → {regression.current} ({regression.change_pct:+.0f}%)"
+            ))
+        message = f'{len(regressions)} regression(s) against baseline'
+        if options['fail_on_regression']:
+            raise CommandError(message)
+        self.stderr.write(self.style.WARNING(f'⚠️  {message}'))
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.8 on 2026-10-19 02:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0002_saas_ready_fields"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DocumentSequence",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "scope",
+                    models.CharField(
+                        blank=True,
+                        help_text="Organization UUID, or empty for global sequences",
+                        max_length=64,
+                    ),
+                ),
+                (
+                    "prefix",
+                    models.CharField(
+                        help_text="e.g., MWO, EST, ORD, PO", max_length=20
+                    ),
+                ),
+                (
+                    "period",
+                    models.CharField(
+                        blank=True,
+                        help_text="Reset period, e.g., '2410' (YYMM); empty = never resets",
+                        max_length=8,
+                    ),
+                ),
+                ("last_value", models.PositiveBigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Document Sequence",
+                "verbose_name_plural": "Document Sequences",
+                "db_table": "document_sequences",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="documentsequence",
+            constraint=models.UniqueConstraint(
+                fields=("scope", "prefix", "period"), name="unique_document_sequence"
+            ),
+        ),
+    ]
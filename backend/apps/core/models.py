@@ -181,3 +181,39 @@ class AuditLog(models.Model):
 
     def __str__(self):
         return f"[{self.action}] {self.model_name} by {self.user} at {self.created_at}"
+
+
+class DocumentSequence(models.Model):
+    """
+    文件編號計數器（apps.core.sequences 使用）
+
+    每個 (scope, prefix, period) 一列；配號時 select_for_update 鎖定該列，
+    與建立文件在同一個 transaction 內完成，rollback 時計數器一併回復（無跳號）。
+    """
+    scope = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="Organization UUID, or empty for global sequences"
+    )
+    prefix = models.CharField(max_length=20, help_text="e.g., MWO, EST, ORD, PO")
+    period = models.CharField(
+        max_length=8,
+        blank=True,
+        help_text="Reset period, e.g., '2410' (YYMM); empty = never resets"
+    )
+    last_value = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'document_sequences'
+        verbose_name = 'Document Sequence'
+        verbose_name_plural = 'Document Sequences'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['scope', 'prefix', 'period'],
+                name='unique_document_sequence',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.prefix}:{self.scope or '*'}:{self.period or '-'} = {self.last_value}"
@@ -0,0 +1,131 @@
+"""
+On-commit Coalescing
+同一 transaction 內的多次變更合併為一次 commit 後處理（read model / 快照重算）
+
+用法：
+    style_status_refresh = OnCommitCoalescer(
+        'style_status', _refresh_batch, task='apps.styles.tasks.refresh_style_statuses_task',
+    )
+    style_status_refresh.add('revision', [revision_id])    # signals / service hooks
+
+    with defer_on_commit():                                 # autocommit 逐筆 save 的迴圈
+        for block in blocks:
+            block.save()
+
+- 只使用 transaction.on_commit()，不讀取 Django 內部狀態：
+  每次 add() 都註冊 callback，第一個執行的 callback 取走整批，其餘為 no-op
+- transaction rollback 時 callback 被丟棄，殘留的 ids 併入下一次 flush（多重算一次，結果仍正確）
+- READ_MODEL_REFRESH_ASYNC 開啟時交給 Celery（countdown 內相同 key/id 只排一次）；
+  broker 不可用時改為同步執行
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+Batch = Dict[str, Set[str]]
+
+_local = threading.local()
+_coalescers: List['OnCommitCoalescer'] = []
+
+
+class OnCommitCoalescer:
+    """
+    Args:
+        name: 識別名稱（log / debounce cache key）
+        handler: handler({key: {id, ...}})，commit 後以整批呼叫
+        task: Celery task 路徑；task 內呼叫 coalescer.run(batch)
+    """
+
+    def __init__(self, name: str, handler: Callable[[Batch], None], task: Optional[str] = None):
+        self.name = name
+        self.handler = handler
+        self.task = task
+        self._local = threading.local()
+        _coalescers.append(self)
+
+    def add(self, key: str, ids: Iterable):
+        ids = {str(pk) for pk in ids if pk}
+        if not ids:
+            return
+        batch = getattr(self._local, 'batch', None)
+        if batch is None:
+            batch = self._local.batch = {}
+        batch.setdefault(key, set()).update(ids)
+
+        if not getattr(_local, 'deferred', 0):
+            # autocommit 模式下會立即執行
+            transaction.on_commit(self.flush)
+
+    def flush(self):
+        batch = getattr(self._local, 'batch', None)
+        self._local.batch = None
+        if not batch:
+            return
+        if self.task and getattr(settings, 'READ_MODEL_REFRESH_ASYNC', False):
+            self._dispatch(batch)
+        else:
+            self._handle(batch)
+
+    def run(self, batch: Dict[str, Iterable[str]]):
+        """Celery task 進入點：清除 debounce 標記後處理"""
+        batch = {key: set(ids) for key, ids in batch.items()}
+        cache.delete_many(self._flags(batch))
+        self._handle(batch)
+
+    def _handle(self, batch: Batch):
+        try:
+            self.handler(batch)
+        except Exception as e:
+            # read model 失敗不影響主流程；定期重算 / drift checker 會修正
+            logger.warning(f"{self.name} refresh failed: {e}")
+
+    def _flags(self, batch: Batch) -> List[str]:
+        return [f'on_commit:{self.name}:{key}:{pk}' for key, ids in batch.items() for pk in ids]
+
+    def _dispatch(self, batch: Batch):
+        countdown = getattr(settings, 'READ_MODEL_REFRESH_COUNTDOWN', 5)
+        scheduled = cache.get_many(self._flags(batch))
+        fresh = {
+            key: sorted(pk for pk in ids if f'on_commit:{self.name}:{key}:{pk}' not in scheduled)
+            for key, ids in batch.items()
+        }
+        fresh = {key: ids for key, ids in fresh.items() if ids}
+        if not fresh:
+            # countdown 內已排程的 task 會讀到這次的變更
+            return
+
+        flags = self._flags(fresh)
+        cache.set_many(dict.fromkeys(flags, 1), timeout=countdown + 60)
+        try:
+            import_string(self.task).apply_async(args=[fresh], countdown=countdown)
+        except Exception as e:
+            logger.warning(f"Failed to queue {self.name} refresh, running inline: {e}")
+            cache.delete_many(flags)
+            self._handle({key: set(ids) for key, ids in fresh.items()})
+
+
+@contextmanager
+def defer_on_commit():
+    """
+    區塊內暫停註冊 callback，離開時一次 flush（transaction 內則於 commit 後）
+
+    逐筆 save 的 autocommit 迴圈用來避免每一列都觸發一次重算。
+    """
+    _local.deferred = getattr(_local, 'deferred', 0) + 1
+    try:
+        yield
+    finally:
+        _local.deferred -= 1
+        if not _local.deferred:
+            for coalescer in _coalescers:
+                if getattr(coalescer._local, 'batch', None):
+                    transaction.on_commit(coalescer.flush)
@@ -0,0 +1,175 @@
+"""
+Keyset Pagination
+(created_at, id) 游標分頁 + planner 估計總數
+
+OFFSET 分頁在深頁數時要掃過前面所有列，count() 也要掃整個（含 annotations 的）查詢。
+Keyset 只讀「上一頁最後一筆之後」的列，深度與速度無關：
+
+    ORDER BY created_at DESC, id DESC
+    WHERE created_at < :ts OR (created_at = :ts AND id < :id)
+
+- 先在未 annotate 的 queryset 取本頁 (created_at, id)，再只對本頁 ids 跑 annotations /
+  select_related / prefetch（fetch_in_order）
+- estimated_count()：PostgreSQL 使用 EXPLAIN 的 planner 估計列數，小結果集才精確 count()
+
+用法：
+    ids, next_cursor = keyset_page_ids(base_qs, request.query_params.get('cursor'), 50)
+    items = fetch_in_order(annotated_qs, ids)
+
+    # DRF ViewSet
+    pagination_class = KeysetPagination    # ?cursor= 時 keyset，否則 page number
+"""
+
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+KEYSET_ORDERING = ('-created_at', '-pk')
+
+# planner 估計值低於此數時改用精確 count()（小結果集估計誤差大、count 也便宜）
+ESTIMATE_EXACT_THRESHOLD = 1000
+
+
+def encode_cursor(created_at: datetime, pk: Any) -> str:
+    raw = f"{created_at.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str, model) -> Tuple[datetime, Any]:
+    """
+    Raises:
+        ValueError: malformed cursor
+    """
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), model._meta.pk.to_python(pk)
+    except (ValueError, UnicodeDecodeError, binascii.Error, DjangoValidationError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def apply_keyset(queryset, cursor: Optional[str]):
+    """
+    依 (created_at DESC, id DESC) 排序並套用游標條件
+
+    Raises:
+        ValueError: malformed cursor
+    """
+    queryset = queryset.order_by(*KEYSET_ORDERING)
+    if not cursor:
+        return queryset
+    created_at, pk = decode_cursor(cursor, queryset.model)
+    return queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+
+
+def keyset_page_ids(queryset, cursor: Optional[str], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    本頁 ids（只讀 created_at / id 兩欄）
+
+    Returns:
+        (ids, next_cursor)；沒有下一頁時 next_cursor 為 None
+    """
+    keys = list(apply_keyset(queryset, cursor).values_list('created_at', 'pk')[:limit + 1])
+    has_more = len(keys) > limit
+    keys = keys[:limit]
+    next_cursor = encode_cursor(*keys[-1]) if has_more else None
+    return [pk for _, pk in keys], next_cursor
+
+
+def fetch_in_order(queryset, ids: List[Any]) -> List[Any]:
+    """以 pk__in 取出本頁資料（annotations 只算這些列），依 ids 順序回傳"""
+    if not ids:
+        return []
+    rows = {obj.pk: obj for obj in queryset.filter(pk__in=ids).order_by()}
+    return [rows[pk] for pk in ids if pk in rows]
+
+
+def estimated_count(queryset, exact_below: int = ESTIMATE_EXACT_THRESHOLD) -> Tuple[int, bool]:
+    """
+    總數估計
+
+    PostgreSQL：EXPLAIN (FORMAT JSON) 的 Plan Rows（依 planner 統計，不掃表）；
+    其他資料庫或估計值小於 exact_below 時使用精確 count()。
+
+    Returns:
+        (count, is_estimate)
+    """
+    queryset = queryset.order_by()
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count(), False
+
+    sql, params = queryset.values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    estimate = int(plan[0]['Plan']['Plan Rows'])
+
+    if estimate < exact_below:
+        return queryset.count(), False
+    return estimate, True
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    DRF pagination：帶 ?cursor= 時使用 keyset（第一頁傳空的 cursor=），否則沿用 page number
+
+    Keyset 模式固定以 (created_at DESC, id DESC) 排序，同時帶 ?ordering= 回傳 400；
+    response 的 count 為 estimated_count()，count_is_estimate 標示是否為估計值。
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    cursor_query_param = 'cursor'
+    ordering_query_param = api_settings.ORDERING_PARAM
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_keyset = self.cursor_query_param in request.query_params
+        if not self.use_keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        if request.query_params.get(self.ordering_query_param):
+            # OrderingFilter 的排序會被 keyset 覆寫，不靜默忽略
+            raise ValidationError({
+                self.ordering_query_param: 'ordering is not supported with cursor pagination',
+            })
+
+        self.request = request
+        cursor = request.query_params.get(self.cursor_query_param)
+        try:
+            ids, self.next_cursor = keyset_page_ids(queryset, cursor, self.get_page_size(request))
+        except ValueError:
+            raise ValidationError({self.cursor_query_param: 'Invalid cursor'})
+        self.count, self.count_is_estimate = estimated_count(queryset)
+        return fetch_in_order(queryset, ids)
+
+    def get_next_link(self):
+        if not self.use_keyset:
+            return super().get_next_link()
+        if not self.next_cursor:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        if not self.use_keyset:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('count_is_estimate', self.count_is_estimate),
+            ('next', self.get_next_link()),
+            ('next_cursor', self.next_cursor),
+            ('results', data),
+        ]))
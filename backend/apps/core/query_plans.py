@@ -0,0 +1,203 @@
+"""
+Hot Query Plans
+熱門 endpoint 查詢的 EXPLAIN 檢查（explain_hot_queries management command）
+
+HOT_QUERIES 與各 endpoint 實際產生的查詢相同（同樣的過濾 / 排序 / LIMIT），
+explain_hot_queries() 對每個查詢跑 EXPLAIN 並列出 sequential scan 的資料表：
+
+- PostgreSQL：EXPLAIN (FORMAT JSON)，Seq Scan 且估計列數 >= min_rows 才列出
+  （小表本來就該 seq scan）
+- SQLite：EXPLAIN QUERY PLAN，沒有 USING INDEX 的 SCAN <table>
+
+新增 hot query 時加到 HOT_QUERIES；索引調整後以 --seed 在合成資料上重新確認。
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+
+from django.db import connections
+from django.utils import timezone
+
+DEFAULT_MIN_ROWS = 1000
+PAGE = 50
+
+ACTIVE_RUN_STATUSES = ['draft', 'materials_planning', 'po_drafted', 'po_issued', 'mwo_drafted', 'mwo_issued', 'in_progress']
+CLOSED_PO_STATUSES = ['received', 'cancelled']
+
+
+@dataclass
+class HotQuery:
+    name: str
+    description: str
+    build: Callable[..., object]  # (organization, today) → QuerySet
+
+
+@dataclass
+class PlanReport:
+    name: str
+    description: str
+    plan: str
+    seq_scans: List[str] = field(default_factory=list)
+
+
+def _styles_page(org, today):
+    from apps.styles.services import filter_styles_queryset
+    from .pagination import apply_keyset
+    return apply_keyset(filter_styles_queryset(org, {}), None).values_list('created_at', 'pk')[:PAGE]
+
+
+def _styles_by_stage(org, today):
+    from apps.styles.services import filter_styles_queryset
+    return filter_styles_queryset(org, {'stage': 'parsing'}).values_list('pk', flat=True)[:PAGE]
+
+
+def _kanban_statuses(org, today):
+    from apps.styles.models import StyleStatus
+    return StyleStatus.objects.filter(organization=org, stage='parsing')
+
+
+def _kanban_runs(org, today):
+    from apps.samples.models import SampleRun
+    return SampleRun.objects.filter(
+        organization=org, status__in=ACTIVE_RUN_STATUSES,
+    ).order_by('target_due_date')[:PAGE]
+
+
+def _overdue_runs(org, today):
+    from apps.samples.models import SampleRun
+    return SampleRun.objects.filter(
+        organization=org, status__in=ACTIVE_RUN_STATUSES, target_due_date__lt=today,
+    ).order_by('target_due_date')[:PAGE]
+
+
+def _sample_runs_page(org, today):
+    from apps.samples.models import SampleRun
+    from .pagination import apply_keyset
+    return apply_keyset(SampleRun.objects.filter(organization=org), None).values_list('created_at', 'pk')[:PAGE]
+
+
+def _overdue_pos(org, today):
+    from apps.procurement.models import PurchaseOrder
+    return PurchaseOrder.objects.filter(
+        organization=org, expected_delivery__lt=today,
+    ).exclude(status__in=CLOSED_PO_STATUSES).order_by('expected_delivery')[:PAGE]
+
+
+def _pos_by_status(org, today):
+    from apps.procurement.models import PurchaseOrder
+    return PurchaseOrder.objects.filter(organization=org, status='sent').order_by('expected_delivery')[:PAGE]
+
+
+def _pos_page(org, today):
+    from apps.procurement.models import PurchaseOrder
+    from .pagination import apply_keyset
+    return apply_keyset(PurchaseOrder.objects.filter(organization=org), None).values_list('created_at', 'pk')[:PAGE]
+
+
+def _po_lines_due(org, today):
+    from apps.procurement.models import POLine
+    return POLine.objects.filter(
+        delivery_status='pending', expected_delivery__lte=today + timedelta(days=7),
+    ).order_by('expected_delivery')[:PAGE]
+
+
+def _production_orders_page(org, today):
+    from apps.orders.models import ProductionOrder
+    from .pagination import apply_keyset
+    return apply_keyset(ProductionOrder.objects.filter(organization=org), None).values_list('created_at', 'pk')[:PAGE]
+
+
+def _translation_queue(org, today):
+    from apps.parsing.models_blocks import DraftBlock, RevisionPage
+    page_id = RevisionPage.objects.values_list('pk', flat=True).first()
+    return DraftBlock.objects.filter(page_id=page_id, translation_status='pending').order_by()
+
+
+def _bom_verified(org, today):
+    from apps.styles.models import BOMItem, Style
+    revision_id = Style.objects.filter(organization=org).values_list('current_revision_id', flat=True).first()
+    return BOMItem.objects.filter(revision_id=revision_id, is_verified=True).order_by().values('pk')
+
+
+HOT_QUERIES = [
+    HotQuery('styles_page', 'GET /styles/?cursor= (keys)', _styles_page),
+    HotQuery('styles_by_stage', 'GET /styles/?stage=', _styles_by_stage),
+    HotQuery('kanban_statuses', 'GET /portfolio/kanban/?stage=', _kanban_statuses),
+    HotQuery('kanban_runs', 'GET /kanban/runs/', _kanban_runs),
+    HotQuery('overdue_runs', 'alerts / scheduler overdue runs', _overdue_runs),
+    HotQuery('sample_runs_page', 'GET /sample-runs/?cursor= (keys)', _sample_runs_page),
+    HotQuery('overdue_pos', 'GET /purchase-orders/overdue/', _overdue_pos),
+    HotQuery('pos_by_status', 'GET /purchase-orders/?status=', _pos_by_status),
+    HotQuery('pos_page', 'GET /purchase-orders/?cursor= (keys)', _pos_page),
+    HotQuery('po_lines_due', 'PO line delivery tracking', _po_lines_due),
+    HotQuery('production_orders_page', 'GET /production-orders/?cursor= (keys)', _production_orders_page),
+    HotQuery('translation_queue', 'translate page (pending blocks)', _translation_queue),
+    HotQuery('bom_verified', 'BOM verified count (submit gate)', _bom_verified),
+]
+
+
+# ==================== Plan analysis ====================
+
+_SQLITE_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)(.*)$')
+
+
+def _sqlite_seq_scans(plan: str) -> List[str]:
+    tables = []
+    for line in plan.splitlines():
+        match = _SQLITE_SCAN.search(line)
+        if not match:
+            continue
+        table, rest = match.groups()
+        if 'USING' in rest or table in ('CONSTANT', 'SUBQUERY'):
+            continue
+        tables.append(table)
+    return tables
+
+
+def _postgres_seq_scans(plan: str, min_rows: int) -> List[str]:
+    tables = []
+
+    def walk(node):
+        if node.get('Node Type') == 'Seq Scan' and node.get('Plan Rows', 0) >= min_rows:
+            tables.append(node.get('Relation Name', '?'))
+        for child in node.get('Plans', ()):
+            walk(child)
+
+    for entry in json.loads(plan):
+        walk(entry['Plan'])
+    return tables
+
+
+def explain_queryset(queryset, min_rows: int = DEFAULT_MIN_ROWS):
+    """
+    Returns:
+        (plan text, sequential scan tables)
+    """
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        plan = queryset.explain(format='json')
+        return plan, _postgres_seq_scans(plan, min_rows)
+    plan = queryset.explain()
+    return plan, _sqlite_seq_scans(plan) if vendor == 'sqlite' else []
+
+
+def explain_hot_queries(organization, names: Optional[List[str]] = None,
+                        min_rows: int = DEFAULT_MIN_ROWS) -> List[PlanReport]:
+    """
+    Raises:
+        ValueError: 未知的 query 名稱
+    """
+    by_name: Dict[str, HotQuery] = {query.name: query for query in HOT_QUERIES}
+    unknown = [name for name in names or () if name not in by_name]
+    if unknown:
+        raise ValueError(f"Unknown hot query: {', '.join(unknown)}")
+
+    today = timezone.localdate()
+    reports = []
+    for query in (by_name[name] for name in names) if names else HOT_QUERIES:
+        plan, seq_scans = explain_queryset(query.build(organization, today), min_rows)
+        reports.append(PlanReport(query.name, query.description, plan, seq_scans))
+    return reports
@@ -0,0 +1,199 @@
+"""
+Search
+索引化搜尋（styles / materials / sample runs）+ 統一搜尋 API
+
+- 條件：每個字詞都要命中任一欄位（AND of ORs），以 icontains 表示
+  - PostgreSQL：pg_trgm GIN 索引建在 UPPER(col::text) 上（各 app 的 search_indexes
+    migration），正是 icontains 產生的表達式，因此走索引而非全表掃描
+  - 少於 3 個字元的字詞 trigram 無法使用：統一搜尋只對主要欄位做前綴比對（istartswith）；
+    既有列表篩選（prefix_short_terms=False）維持所有欄位 icontains
+- 排序：PostgreSQL 用 similarity()；SQLite（開發 / 測試）用 exact / prefix / contains 權重
+- 結果以 values() 讀取，每種類型一個查詢（type-ahead 用）
+
+用法：
+    qs = qs.filter(search_q(('style_number', 'style_name'), request.query_params.get('search')))
+    results = run_search(organization, 'nulu tank', types=['style', 'material'], limit=10)
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.db import connections
+from django.db.models import Case, F, FloatField, Func, Q, Value, When
+from django.db.models.functions import Coalesce, Greatest
+
+MIN_TRIGRAM_LENGTH = 3
+MAX_TERMS = 5
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+class Similarity(Func):
+    """pg_trgm similarity(a, b)"""
+    function = 'SIMILARITY'
+    output_field = FloatField()
+
+
+def search_terms(query: Optional[str]) -> List[str]:
+    """空白分隔的字詞（去重、最多 MAX_TERMS 個）"""
+    terms = []
+    for term in (query or '').split():
+        if term.lower() not in (t.lower() for t in terms):
+            terms.append(term)
+    return terms[:MAX_TERMS]
+
+
+def search_q(fields: Sequence[str], query: Optional[str], prefix_short_terms: bool = False) -> Q:
+    """
+    搜尋條件（無字詞時為空 Q）
+
+    Args:
+        fields: 搜尋欄位；第一個為主要欄位
+        prefix_short_terms: 短字詞只比對主要欄位的前綴（type-ahead 用，走 prefix 索引）；
+            False 時短字詞同樣對所有欄位 icontains（既有列表篩選的行為）
+    """
+    condition = Q()
+    for term in search_terms(query):
+        if prefix_short_terms and len(term) < MIN_TRIGRAM_LENGTH:
+            condition &= Q(**{f'{fields[0]}__istartswith': term})
+            continue
+        term_condition = Q()
+        for field in fields:
+            term_condition |= Q(**{f'{field}__icontains': term})
+        condition &= term_condition
+    return condition
+
+
+def _greatest(expressions: List[Any]):
+    return expressions[0] if len(expressions) == 1 else Greatest(*expressions)
+
+
+def rank_expression(fields: Sequence[str], query: str, vendor: str):
+    """相關度（越大越相關）"""
+    if vendor == 'postgresql':
+        return _greatest([
+            Coalesce(Similarity(F(field), Value(query)), Value(0.0)) for field in fields
+        ])
+
+    # Fallback：各字詞取最佳欄位權重後加總
+    ranks = []
+    for term in search_terms(query):
+        ranks.append(_greatest([
+            Case(
+                When(**{f'{field}__iexact': term}, then=Value(1.0)),
+                When(**{f'{field}__istartswith': term}, then=Value(0.75)),
+                When(**{f'{field}__icontains': term}, then=Value(0.5)),
+                default=Value(0.0),
+                output_field=FloatField(),
+            )
+            for field in fields
+        ]))
+    total = ranks[0]
+    for rank in ranks[1:]:
+        total = total + rank
+    return total
+
+
+@dataclass(frozen=True)
+class SearchTarget:
+    fields: Tuple[str, ...]
+    queryset: Callable[[Any], Any]          # organization → queryset（已限定租戶）
+    values: Dict[str, str]                  # 回傳欄位名稱 → model 欄位路徑
+    order: Tuple[str, ...] = ()
+
+
+def _styles(organization):
+    from apps.styles.models import Style
+    return Style.objects.filter(organization=organization)
+
+
+def _materials(organization):
+    from apps.procurement.models import Material
+    return Material.objects.filter(organization=organization)
+
+
+def _runs(organization):
+    from apps.samples.models import SampleRun
+    return SampleRun.objects.filter(organization=organization)
+
+
+SEARCH_TARGETS = {
+    'style': SearchTarget(
+        fields=('style_number', 'style_name', 'customer', 'brand__name'),
+        queryset=_styles,
+        values={
+            'id': 'id', 'style_number': 'style_number', 'style_name': 'style_name',
+            'customer': 'customer', 'brand_name': 'brand__name',
+        },
+        order=('style_number',),
+    ),
+    'material': SearchTarget(
+        fields=('article_no', 'name', 'name_zh', 'supplier__name'),
+        queryset=_materials,
+        values={
+            'id': 'id', 'article_no': 'article_no', 'name': 'name', 'name_zh': 'name_zh',
+            'category': 'category', 'supplier_name': 'supplier__name',
+        },
+        order=('article_no',),
+    ),
+    'run': SearchTarget(
+        fields=(
+            'sample_request__revision__style__style_number',
+            'sample_request__revision__style__style_name',
+            'sample_request__brand_name',
+        ),
+        queryset=_runs,
+        values={
+            'id': 'id', 'run_no': 'run_no', 'run_type': 'run_type', 'status': 'status',
+            'style_id': 'sample_request__revision__style_id',
+            'style_number': 'sample_request__revision__style__style_number',
+            'brand_name': 'sample_request__brand_name',
+        },
+        order=('-created_at',),
+    ),
+}
+
+
+def search_target(target: SearchTarget, organization, query: str, limit: int = DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+    """單一類型的搜尋結果（依相關度排序）"""
+    condition = search_q(target.fields, query, prefix_short_terms=True)
+    if not condition:
+        return []
+
+    qs = target.queryset(organization)
+    vendor = connections[qs.db].vendor
+    # values() 的 expression 不能與欄位同名：同名欄位直接列出，其餘以 F() 改名
+    fields = [name for name, path in target.values.items() if name == path]
+    renamed = {name: F(path) for name, path in target.values.items() if name != path}
+    rows = (
+        qs.filter(condition)
+        .annotate(search_rank=rank_expression(target.fields, query, vendor))
+        .order_by('-search_rank', *target.order)
+        .values('search_rank', *fields, **renamed)
+    )
+
+    results = []
+    for row in rows[:limit]:
+        row['rank'] = round(row.pop('search_rank') or 0.0, 4)
+        results.append(row)
+    return results
+
+
+def run_search(organization, query: str, types: Optional[Iterable[str]] = None,
+               limit: int = DEFAULT_LIMIT) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    統一搜尋
+
+    Returns:
+        {'style': [...], 'material': [...], 'run': [...]}（只含請求的類型）
+
+    Raises:
+        ValueError: 未知的類型
+    """
+    types = list(types or SEARCH_TARGETS)
+    unknown = [t for t in types if t not in SEARCH_TARGETS]
+    if unknown:
+        raise ValueError(f"Unknown search type: {', '.join(unknown)}")
+
+    limit = max(1, min(limit, MAX_LIMIT))
+    return {t: search_target(SEARCH_TARGETS[t], organization, query, limit) for t in types}
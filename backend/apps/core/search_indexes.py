@@ -0,0 +1,50 @@
+"""
+Trigram search indexes (PostgreSQL only)
+各 app 的 search_indexes migration 共用
+
+GIN (pg_trgm) indexes on UPPER(col::text): the expression Django's icontains
+generates on PostgreSQL (UPPER(col::text) LIKE UPPER('%q%')), so existing
+icontains filters and apps.core.search use them.
+Prefix indexes (text_pattern_ops) back short-term istartswith matches.
+Skipped on SQLite (development / tests).
+
+用法（migration 需設定 atomic = False：CREATE INDEX CONCURRENTLY 不能在 transaction 內）：
+    operations = [
+        search_index_operation(
+            trigram=[("styles_style_number_trgm", "styles", "style_number")],
+            prefix=[("styles_style_number_prefix", "styles", "style_number")],
+        ),
+    ]
+"""
+
+from typing import Sequence, Tuple
+
+from django.db import migrations
+
+# (index name, table, column)
+IndexSpec = Tuple[str, str, str]
+
+
+def search_index_operation(trigram: Sequence[IndexSpec], prefix: Sequence[IndexSpec] = ()) -> migrations.RunPython:
+    def create_search_indexes(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for name, table, column in trigram:
+            schema_editor.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON {table} USING gin (UPPER({column}::text) gin_trgm_ops)"
+            )
+        for name, table, column in prefix:
+            schema_editor.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON {table} (UPPER({column}::text) text_pattern_ops)"
+            )
+
+    def drop_search_indexes(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for name, _, _ in [*trigram, *prefix]:
+            schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+    return migrations.RunPython(create_search_indexes, drop_search_indexes)
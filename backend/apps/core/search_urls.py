@@ -0,0 +1,10 @@
+"""
+Unified search URLs
+"""
+
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('', views.unified_search, name='unified_search'),
+]
@@ -0,0 +1,201 @@
+"""
+Synthetic Dataset Seeding
+以 bulk_create 建立大量測試資料（query plan 檢查 / 效能基準）
+
+- 只用 bulk_create / bulk_update：不觸發 signals（StyleStatus、data_version 等），速度與筆數成正比
+- 同一組 organization 可重複呼叫（style_number / po_number 以 prefix 區分）
+- 呼叫端通常在 transaction 內執行並於結束時 rollback（不留下資料）
+
+用法：
+    counts = seed_dataset(org, styles=1000)
+"""
+
+import random
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, Optional
+
+from django.utils import timezone
+
+BATCH_SIZE = 1000
+
+RUN_STATUSES = ['draft', 'materials_planning', 'po_issued', 'mwo_issued', 'in_progress', 'sample_done', 'accepted']
+PO_STATUSES = ['draft', 'sent', 'confirmed', 'in_production', 'shipped', 'received']
+DELIVERY_STATUSES = ['pending', 'shipped', 'partial', 'received', 'delayed']
+TRANSLATION_STATUSES = ['pending', 'done', 'done', 'failed']
+
+
+def seed_dataset(
+    organization,
+    styles: int = 100,
+    bom_items_per_style: int = 10,
+    runs_per_style: int = 2,
+    blocks_per_style: int = 20,
+    prefix: str = 'SEED',
+    random_seed: int = 0,
+    sample_requests: Optional[int] = None,
+    purchase_orders: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    建立 styles（含 current revision / BOM）、sample requests / runs、tech pack blocks、
+    suppliers / materials / POs / PO lines、production orders
+
+    Args:
+        sample_requests: 有 sample request 的 styles 數（預設全部；runs = sample_requests × runs_per_style）
+        purchase_orders: PO 數（預設 styles // 2）
+
+    Returns:
+        {model label: created count}
+    """
+    from apps.orders.models import ProductionOrder
+    from apps.parsing.models_blocks import DraftBlock, Revision, RevisionPage
+    from apps.procurement.models import Material, POLine, PurchaseOrder, Supplier
+    from apps.samples.models import SampleRequest, SampleRun
+    from apps.styles.models import BOMItem, Style, StyleRevision
+
+    rng = random.Random(random_seed)
+    today = timezone.localdate()
+
+    def due(spread=60):
+        return today + timedelta(days=rng.randint(-spread // 2, spread))
+
+    style_objs = Style.objects.bulk_create([
+        Style(
+            organization=organization,
+            style_number=f"{prefix}{i:06d}",
+            style_name=f"Seed Style {i} {rng.choice(['Tank', 'Legging', 'Jacket', 'Hoodie', 'Bra'])}",
+            customer=rng.choice(['Lulu', 'Alo', 'Vuori', '']),
+            target_due_date=due(),
+        )
+        for i in range(styles)
+    ], batch_size=BATCH_SIZE)
+
+    revisions = StyleRevision.objects.bulk_create([
+        StyleRevision(organization=organization, style=style, revision_label="Rev A")
+        for style in style_objs
+    ], batch_size=BATCH_SIZE)
+    for style, revision in zip(style_objs, revisions):
+        style.current_revision = revision
+    Style.objects.bulk_update(style_objs, ['current_revision'], batch_size=BATCH_SIZE)
+
+    bom_items = BOMItem.objects.bulk_create([
+        BOMItem(
+            revision=revision,
+            item_number=n + 1,
+            category=rng.choice(['fabric', 'trim', 'label', 'packaging']),
+            material_name=f"Material {rng.randint(1, 500)}",
+            consumption=Decimal('1.2500'),
+            unit_price=Decimal(rng.randint(50, 2000)) / 100,
+            is_verified=rng.random() < 0.8,
+        )
+        for revision in revisions
+        for n in range(bom_items_per_style)
+    ], batch_size=BATCH_SIZE)
+
+    requests = SampleRequest.objects.bulk_create([
+        SampleRequest(organization=organization, revision=revision, brand_name=rng.choice(['Lulu', 'Alo', 'Vuori']))
+        for revision in revisions[:sample_requests]
+    ], batch_size=BATCH_SIZE)
+    runs = SampleRun.objects.bulk_create([
+        SampleRun(
+            organization=organization,
+            sample_request=request,
+            revision=request.revision,
+            run_no=n + 1,
+            status=rng.choice(RUN_STATUSES),
+            target_due_date=due(),
+        )
+        for request in requests
+        for n in range(runs_per_style)
+    ], batch_size=BATCH_SIZE)
+
+    # Tech pack pages / blocks（每 style 一份 revision，每頁最多 10 blocks）
+    pages_per_style = -(-blocks_per_style // 10)
+    tech_packs = Revision.objects.bulk_create([
+        Revision(file=f"seed/{prefix}{i:06d}.pdf", filename=f"{prefix}{i:06d}.pdf", page_count=pages_per_style)
+        for i in range(styles if pages_per_style else 0)
+    ], batch_size=BATCH_SIZE)
+    pages = RevisionPage.objects.bulk_create([
+        RevisionPage(revision=tech_pack, page_number=n + 1, width=1700, height=2200)
+        for tech_pack in tech_packs
+        for n in range(pages_per_style)
+    ], batch_size=BATCH_SIZE)
+    blocks = DraftBlock.objects.bulk_create([
+        DraftBlock(
+            page=page,
+            block_type='callout',
+            bbox_x=rng.uniform(0, 1500), bbox_y=rng.uniform(0, 2000), bbox_width=120, bbox_height=30,
+            source_text=f"Callout {n}",
+            translated_text='',
+            translation_status=rng.choice(TRANSLATION_STATUSES),
+        )
+        for page in pages
+        for n in range(min(10, blocks_per_style))
+    ], batch_size=BATCH_SIZE)
+
+    # Procurement
+    suppliers = Supplier.objects.bulk_create([
+        Supplier(organization=organization, name=f"{prefix} Supplier {i}", supplier_type='fabric')
+        for i in range(max(1, styles // 50))
+    ], batch_size=BATCH_SIZE)
+    materials = Material.objects.bulk_create([
+        Material(
+            organization=organization, supplier=suppliers[i % len(suppliers)],
+            article_no=f"{prefix}-{i:06d}", name=f"Seed Material {i}", category='fabric',
+        )
+        for i in range(max(1, styles // 2))
+    ], batch_size=BATCH_SIZE)
+    pos = PurchaseOrder.objects.bulk_create([
+        PurchaseOrder(
+            organization=organization,
+            po_number=f"{prefix}-PO-{i:06d}",
+            supplier=suppliers[i % len(suppliers)],
+            status=rng.choice(PO_STATUSES),
+            po_date=today - timedelta(days=rng.randint(0, 60)),
+            expected_delivery=due(),
+        )
+        for i in range(max(1, styles // 2) if purchase_orders is None else purchase_orders)
+    ], batch_size=BATCH_SIZE)
+    po_lines = POLine.objects.bulk_create([
+        POLine(
+            purchase_order=po,
+            material_name=f"Seed Material {rng.randint(1, 500)}",
+            quantity=Decimal('100'), unit='YD', unit_price=Decimal('3.50'), line_total=Decimal('350.00'),
+            expected_delivery=po.expected_delivery,
+            delivery_status=rng.choice(DELIVERY_STATUSES),
+        )
+        for po in pos
+        for _ in range(4)
+    ], batch_size=BATCH_SIZE)
+
+    production_orders = ProductionOrder.objects.bulk_create([
+        ProductionOrder(
+            organization=organization,
+            po_number=f"{prefix}-CPO-{i:06d}",
+            order_number=f"{prefix}-ORD-{i:06d}",
+            customer=style.customer or 'Lulu',
+            style_revision=style.current_revision,
+            total_quantity=1000,
+            size_breakdown={'S': 300, 'M': 400, 'L': 300},
+            unit_price=Decimal('12.00'),
+            total_amount=Decimal('12000.00'),
+            order_date=today - timedelta(days=rng.randint(0, 60)),
+            delivery_date=due(120),
+        )
+        for i, style in enumerate(style_objs[::4])
+    ], batch_size=BATCH_SIZE)
+
+    return {
+        'styles.Style': len(style_objs),
+        'styles.StyleRevision': len(revisions),
+        'styles.BOMItem': len(bom_items),
+        'samples.SampleRequest': len(requests),
+        'samples.SampleRun': len(runs),
+        'parsing.RevisionPage': len(pages),
+        'parsing.DraftBlock': len(blocks),
+        'procurement.Supplier': len(suppliers),
+        'procurement.Material': len(materials),
+        'procurement.PurchaseOrder': len(pos),
+        'procurement.POLine': len(po_lines),
+        'orders.ProductionOrder': len(production_orders),
+    }
@@ -0,0 +1,156 @@
+"""
+Document Number Sequences
+文件編號配號（計數器表 + select_for_update）
+
+取代 Max() / count() 掃描：
+- 每次配號只鎖定 (scope, prefix, period) 一列並 UPDATE，與既有文件數量無關
+- 計數器列第一次建立時才呼叫 seed() 掃描既有最大號碼（相容舊資料）
+- 在呼叫端的 transaction 內配號時，rollback 會一併回復計數器（不跳號）；
+  併發配號在同一列上排隊，不會拿到相同號碼
+- 批次匯入以 SequenceBlock 一次預留 N 個號碼，結束時歸還未使用的部分
+
+用法：
+    seq = next_sequence('ORD', scope=org.id, period=current_period(), seed=...)
+
+    block = SequenceBlock('ORD', 500, scope=org.id, period=current_period())
+    block.reserve()
+    for row in rows:
+        number = block.next()
+    block.release()
+"""
+
+from typing import Callable, Dict, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import DocumentSequence
+
+Seed = Optional[Callable[[], int]]
+
+
+def current_period(now=None) -> str:
+    """YYMM（與既有編號格式一致）"""
+    return (now or timezone.now()).strftime('%y%m')
+
+
+def seed_from_max(queryset, field: str, startswith: str) -> int:
+    """
+    既有號碼中的最大序號（格式 PREFIX-...-NNNN，取最後一段）
+    只在計數器第一次建立時使用
+    """
+    last = queryset.filter(**{f'{field}__startswith': startswith}).aggregate(
+        last=Max(field)
+    )['last']
+    if not last:
+        return 0
+    try:
+        return int(last.split('-')[-1])
+    except (ValueError, IndexError):
+        return 0
+
+
+def _key(prefix: str, scope, period: str) -> Dict[str, str]:
+    return {'scope': str(scope) if scope else '', 'prefix': prefix, 'period': period or ''}
+
+
+def _lock_counter(key: Dict[str, str], seed: Seed) -> DocumentSequence:
+    counter = DocumentSequence.objects.select_for_update().filter(**key).first()
+    if counter is not None:
+        return counter
+
+    initial = int(seed() or 0) if seed else 0
+    try:
+        with transaction.atomic():
+            return DocumentSequence.objects.create(last_value=initial, **key)
+    except IntegrityError:
+        # 併發建立：等待並鎖定對方建立的列
+        return DocumentSequence.objects.select_for_update().get(**key)
+
+
+def allocate_sequence(
+    prefix: str,
+    count: int = 1,
+    scope=None,
+    period: str = '',
+    seed: Seed = None,
+) -> range:
+    """
+    配發 count 個連續序號
+
+    Args:
+        prefix: 編號種類（MWO / EST / ORD / PO ...）
+        scope: Organization UUID（None = 全域）
+        period: 重置週期（通常為 current_period()；'' = 不重置）
+        seed: 計數器不存在時回傳既有最大序號的函式
+
+    Returns:
+        range of allocated numbers
+    """
+    if count < 1:
+        raise ValueError("count must be >= 1")
+
+    key = _key(prefix, scope, period)
+    with transaction.atomic():
+        counter = _lock_counter(key, seed)
+        start = counter.last_value + 1
+        DocumentSequence.objects.filter(pk=counter.pk).update(
+            last_value=counter.last_value + count,
+            updated_at=timezone.now(),
+        )
+    return range(start, start + count)
+
+
+def next_sequence(prefix: str, scope=None, period: str = '', seed: Seed = None) -> int:
+    return allocate_sequence(prefix, 1, scope=scope, period=period, seed=seed)[0]
+
+
+class SequenceBlock:
+    """
+    預先配發的號碼區塊（批次匯入用）
+
+    用完時再配發一個同樣大小的區塊；release() 歸還最後一個區塊中未使用的號碼
+    （期間若有其他配號則不歸還，只會留下空號，不會重號）。
+    """
+
+    def __init__(self, prefix: str, size: int, scope=None, period: str = '', seed: Seed = None):
+        self.prefix = prefix
+        self.size = max(1, size)
+        self.scope = scope
+        self.period = period
+        self.seed = seed
+        self._numbers = range(0)
+        self._index = 0
+
+    def reserve(self):
+        """
+        預留下一個區塊
+
+        區塊記在記憶體中；若在之後會 rollback 的 transaction 內預留，計數器回復後
+        會再配出同樣的號碼。批次匯入（每列各自 transaction）應在迴圈之前先 reserve()。
+        """
+        self._numbers = allocate_sequence(
+            self.prefix, self.size, scope=self.scope, period=self.period, seed=self.seed
+        )
+        self._index = 0
+
+    def next(self) -> int:
+        if self._index >= len(self._numbers):
+            self.reserve()
+        number = self._numbers[self._index]
+        self._index += 1
+        return number
+
+    def release(self) -> int:
+        """Returns: 歸還的號碼數"""
+        unused = len(self._numbers) - self._index
+        if not unused:
+            return 0
+        returned = DocumentSequence.objects.filter(
+            **_key(self.prefix, self.scope, self.period),
+            last_value=self._numbers[-1],
+        ).update(last_value=self._numbers[-1] - unused, updated_at=timezone.now())
+        self._numbers = range(0)
+        self._index = 0
+        return unused if returned else 0
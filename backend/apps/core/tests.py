@@ -29,3 +29,502 @@ class UserModelTest(TestCase):
         self.assertEqual(user.username, "testuser")
         self.assertEqual(user.organization, org)
         self.assertEqual(user.role, "merchandiser")
+
+
+class FontRegistryTest(TestCase):
+    def test_reportlab_font_registered_once(self):
+        from .fonts import FontRegistry
+
+        registry = FontRegistry()
+        name = registry.reportlab_font()
+        self.assertTrue(name)
+        self.assertIs(registry.reportlab_font(), name)
+
+    def test_configured_path_takes_priority(self):
+        import tempfile
+        from django.test import override_settings
+        from .fonts import FontRegistry
+
+        with tempfile.NamedTemporaryFile(suffix='.ttf') as f:
+            with override_settings(PDF_FONT_PATHS=[f.name]):
+                self.assertEqual(FontRegistry().font_path(), f.name)
+
+
+    def test_pil_font_without_font_raises_configuration_error(self):
+        import tempfile
+        from unittest import mock
+        from django.test import override_settings
+        from .fonts import FontNotConfigured, FontRegistry
+
+        with tempfile.TemporaryDirectory() as font_dir, \
+                override_settings(PDF_FONT_PATHS=[], PDF_FONT_DIR=font_dir), \
+                mock.patch('apps.core.fonts.SYSTEM_FONTS_REGULAR', []), \
+                mock.patch('apps.core.fonts.SYSTEM_FONTS_BOLD', []):
+            with self.assertRaisesMessage(FontNotConfigured, f"PDF_FONT_DIR {font_dir} has no"):
+                FontRegistry().pil_font(14)
+
+    def test_pil_font_unreadable_file_raises_configuration_error(self):
+        import tempfile
+        from django.test import override_settings
+        from .fonts import FontNotConfigured, FontRegistry
+
+        with tempfile.NamedTemporaryFile(suffix='.ttf') as f, override_settings(PDF_FONT_PATHS=[f.name]):
+            with self.assertRaisesMessage(FontNotConfigured, f.name):
+                FontRegistry().pil_font(14)
+
+
+class BulkUpdateByPkTest(TestCase):
+    def setUp(self):
+        from apps.parsing.models_blocks import DraftBlock, Revision, RevisionPage
+
+        revision = Revision.objects.create(filename="tp.pdf", file="tp.pdf", page_count=1)
+        other = Revision.objects.create(filename="other.pdf", file="other.pdf", page_count=1)
+        page = RevisionPage.objects.create(revision=revision, page_number=1, width=600, height=800)
+        other_page = RevisionPage.objects.create(revision=other, page_number=1, width=600, height=800)
+
+        def block(p):
+            return DraftBlock.objects.create(
+                page=p, block_type="callout", bbox_x=0, bbox_y=0, bbox_width=10, bbox_height=10,
+                source_text="s", translated_text="t",
+            )
+
+        self.revision = revision
+        self.blocks = [block(page) for _ in range(3)]
+        self.foreign = block(other_page)
+
+    def test_single_statement_with_ownership(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from apps.parsing.models_blocks import DraftBlock
+        from .bulk import bulk_update_by_pk
+
+        values = {b.pk: {'overlay_x': float(i), 'overlay_y': 1.0} for i, b in enumerate(self.blocks)}
+        with CaptureQueriesContext(connection) as ctx:
+            updated, missing = bulk_update_by_pk(
+                DraftBlock.objects.filter(page__revision=self.revision), values,
+            )
+
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual((len(updated), missing), (3, []))
+        self.assertEqual(
+            sorted(DraftBlock.objects.filter(page__revision=self.revision).values_list('overlay_x', flat=True)),
+            [0.0, 1.0, 2.0],
+        )
+
+    def test_foreign_and_invalid_ids_are_missing(self):
+        from apps.parsing.models_blocks import DraftBlock
+        from .bulk import bulk_update_by_pk
+
+        updated, missing = bulk_update_by_pk(
+            DraftBlock.objects.filter(page__revision=self.revision),
+            {
+                self.blocks[0].pk: {'overlay_visible': False},
+                self.foreign.pk: {'overlay_visible': False},
+                'not-a-uuid': {'overlay_visible': False},
+            },
+        )
+
+        self.assertEqual(updated, [self.blocks[0].pk])
+        self.assertEqual(missing, [self.foreign.pk, 'not-a-uuid'])
+        self.foreign.refresh_from_db()
+        self.assertTrue(self.foreign.overlay_visible)
+
+
+class DocumentSequenceTest(TestCase):
+    def test_seed_used_once_then_counter(self):
+        from .sequences import next_sequence
+
+        calls = []
+
+        def seed():
+            calls.append(1)
+            return 41
+
+        self.assertEqual(next_sequence('ORD', scope='org-1', period='2410', seed=seed), 42)
+        self.assertEqual(next_sequence('ORD', scope='org-1', period='2410', seed=seed), 43)
+        self.assertEqual(len(calls), 1)
+        # 不同 scope / period 各自計數
+        self.assertEqual(next_sequence('ORD', scope='org-2', period='2410'), 1)
+        self.assertEqual(next_sequence('ORD', scope='org-1', period='2411'), 1)
+
+    def test_rollback_returns_number(self):
+        from django.db import transaction
+        from .sequences import next_sequence
+
+        self.assertEqual(next_sequence('MWO', period='2410'), 1)
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                self.assertEqual(next_sequence('MWO', period='2410'), 2)
+                raise RuntimeError("create failed")
+        self.assertEqual(next_sequence('MWO', period='2410'), 2)
+
+    def test_block_reserves_once_and_releases_unused(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .sequences import SequenceBlock, next_sequence
+
+        block = SequenceBlock('ORD', 500, period='2410')
+        block.reserve()
+        with CaptureQueriesContext(connection) as ctx:
+            numbers = [block.next() for _ in range(3)]
+        self.assertEqual(numbers, [1, 2, 3])
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+        self.assertEqual(block.release(), 497)
+        self.assertEqual(next_sequence('ORD', period='2410'), 4)
+
+
+class KeysetPaginationTest(TestCase):
+    def setUp(self):
+        from datetime import timedelta
+        from django.utils import timezone
+
+        # 7 個 organizations，created_at 兩兩相同（測試 id tiebreak）
+        base = timezone.now().replace(microsecond=0)
+        self.orgs = [Organization.objects.create(name=f"Org {i}") for i in range(7)]
+        for i, org in enumerate(self.orgs):
+            Organization.objects.filter(pk=org.pk).update(created_at=base - timedelta(minutes=i // 2))
+
+    def test_walks_all_rows_without_duplicates(self):
+        from .pagination import keyset_page_ids
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            ids, cursor = keyset_page_ids(Organization.objects.all(), cursor, 3)
+            seen.extend(ids)
+            pages += 1
+            if cursor is None:
+                break
+
+        expected = list(Organization.objects.order_by('-created_at', '-pk').values_list('pk', flat=True))
+        self.assertEqual(seen, expected)
+        self.assertEqual(pages, 3)
+
+    def test_fetch_in_order_and_count(self):
+        from .pagination import estimated_count, fetch_in_order
+
+        ids = [self.orgs[3].pk, self.orgs[0].pk]
+        self.assertEqual(fetch_in_order(Organization.objects.all(), ids), [self.orgs[3], self.orgs[0]])
+        # SQLite：精確 count
+        self.assertEqual(estimated_count(Organization.objects.all()), (7, False))
+
+    def test_invalid_cursor(self):
+        from .pagination import apply_keyset
+
+        with self.assertRaises(ValueError):
+            apply_keyset(Organization.objects.all(), 'not-a-cursor')
+
+
+class UnifiedSearchTest(TestCase):
+    def setUp(self):
+        from apps.procurement.models import Material, Supplier
+        from apps.styles.models import Style
+
+        self.org = Organization.objects.create(name="Search Org")
+        self.align = Style.objects.create(
+            organization=self.org, style_number="LW1ALN", style_name="Align Tank", customer="Lulu"
+        )
+        self.tank = Style.objects.create(
+            organization=self.org, style_number="TANK22", style_name="Racer Back", customer=""
+        )
+        Style.objects.create(
+            organization=Organization.objects.create(name="Other Org"),
+            style_number="TANK99", style_name="Other Tank",
+        )
+        supplier = Supplier.objects.create(organization=self.org, name="Eclat Textile", supplier_type="fabric")
+        self.material = Material.objects.create(
+            organization=self.org, article_no="NL-2201", name="Nulu Jersey", category="fabric", supplier=supplier,
+        )
+
+    def test_ranks_and_scopes_results(self):
+        from .search import run_search
+
+        results = run_search(self.org, "tank")
+
+        # prefix match on style_number ranks above a word inside style_name
+        self.assertEqual([row['style_number'] for row in results['style']], ["TANK22", "LW1ALN"])
+        self.assertEqual(results['material'], [])
+        self.assertEqual(results['run'], [])
+
+    def test_terms_and_short_prefix(self):
+        from .search import run_search
+
+        self.assertEqual(
+            [row['id'] for row in run_search(self.org, "align lulu", types=['style'])['style']],
+            [self.align.id],
+        )
+        # 少於 3 個字元：只比對主要欄位前綴
+        self.assertEqual([row['id'] for row in run_search(self.org, "LW")['style']], [self.align.id])
+        self.assertEqual(run_search(self.org, "nk")['style'], [])
+
+        materials = run_search(self.org, "eclat", types=['material'])['material']
+        self.assertEqual(materials[0]['article_no'], "NL-2201")
+        self.assertEqual(materials[0]['supplier_name'], "Eclat Textile")
+
+    def test_runs_match_style_fields(self):
+        from apps.samples.models import SampleRequest, SampleRun
+        from apps.styles.models import StyleRevision
+        from .search import run_search
+
+        revision = StyleRevision.objects.create(organization=self.org, style=self.align, revision_label="A")
+        request = SampleRequest.objects.create(organization=self.org, revision=revision, brand_name="Lululemon")
+        run = SampleRun.objects.create(organization=self.org, sample_request=request, run_no=1)
+
+        runs = run_search(self.org, "align", types=['run'])['run']
+        self.assertEqual([(row['id'], row['style_number']) for row in runs], [(run.id, "LW1ALN")])
+
+    def test_list_filters_keep_substring_match_for_short_terms(self):
+        from apps.samples.models import SampleRequest, SampleRun
+        from apps.styles.models import StyleRevision
+        from .search import SEARCH_TARGETS, search_q
+
+        revision = StyleRevision.objects.create(organization=self.org, style=self.align, revision_label="A")
+        request = SampleRequest.objects.create(organization=self.org, revision=revision, brand_name="Lululemon")
+        run = SampleRun.objects.create(organization=self.org, sample_request=request, run_no=1)
+
+        fields = SEARCH_TARGETS['run'].fields
+        # 品牌縮寫、款號中段的 2 字元片段（kanban / scheduler 篩選）
+        for term in ("LU", "1A"):
+            self.assertEqual(list(SampleRun.objects.filter(search_q(fields, term))), [run], term)
+            self.assertFalse(SampleRun.objects.filter(search_q(fields, term, prefix_short_terms=True)).exists())
+
+    def test_search_endpoint(self):
+        from rest_framework.test import APIClient
+
+        user = User.objects.create_user(username="searcher", password="testpass123", organization=self.org)
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        response = client.get('/api/v2/search/', {'q': 'jersey', 'types': 'material'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results']['material'][0]['name'], "Nulu Jersey")
+        self.assertEqual(client.get('/api/v2/search/', {'q': 'x', 'types': 'order'}).status_code, 400)
+
+
+class HotQueryPlanTest(TestCase):
+    def test_hot_queries_use_indexes_on_seeded_data(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from apps.styles.models import Style
+
+        out = StringIO()
+        call_command('explain_hot_queries', seed=30, fail_on_seq_scan=True, stdout=out)
+
+        self.assertIn('no sequential scans', out.getvalue())
+        # 合成資料已 rollback
+        self.assertFalse(Style.objects.exists())
+
+    def test_plan_parsers(self):
+        import json
+        from .query_plans import _postgres_seq_scans, _sqlite_seq_scans
+
+        sqlite_plan = "3 0 0 SCAN styles\n5 0 0 SEARCH bom_items USING INDEX bom_idx (revision_id=?)\n" \
+                      "7 0 0 SCAN po_lines USING INDEX po_idx"
+        self.assertEqual(_sqlite_seq_scans(sqlite_plan), ['styles'])
+
+        pg_plan = json.dumps([{'Plan': {
+            'Node Type': 'Nested Loop', 'Plan Rows': 10, 'Plans': [
+                {'Node Type': 'Seq Scan', 'Relation Name': 'sample_runs', 'Plan Rows': 5000},
+                {'Node Type': 'Seq Scan', 'Relation Name': 'suppliers', 'Plan Rows': 12},
+                {'Node Type': 'Index Scan', 'Relation Name': 'styles', 'Plan Rows': 1},
+            ],
+        }}])
+        self.assertEqual(_postgres_seq_scans(pg_plan, min_rows=1000), ['sample_runs'])
+
+
+class RequestInstrumentationTest(TestCase):
+    def setUp(self):
+        from rest_framework.test import APIClient
+
+        self.org = Organization.objects.create(name="Metrics Org")
+        user = User.objects.create_user(username="metrics", password="testpass123", organization=self.org)
+        self.client = APIClient()
+        self.client.force_authenticate(user=user)
+
+    def test_fingerprint_normalizes_literals_and_in_lists(self):
+        from .instrumentation import fingerprint
+
+        self.assertEqual(
+            fingerprint('SELECT * FROM "styles" WHERE id IN (%s, %s, %s) AND  name = \'x\' LIMIT 21'),
+            'SELECT * FROM "styles" WHERE id IN (...) AND name = ? LIMIT ?',
+        )
+
+    def test_collects_queries_duplicates_and_external_calls(self):
+        from .instrumentation import collect_metrics, track_external
+
+        with collect_metrics() as metrics:
+            for _ in range(3):
+                list(Organization.objects.filter(pk=self.org.pk))
+            with track_external('openai'):
+                pass
+        with track_external('openai'):  # 不在 collect_metrics 內：不記錄
+            pass
+
+        self.assertEqual(metrics.queries, 3)
+        self.assertEqual([count for _, count in metrics.duplicates], [3])
+        self.assertEqual([name for name, _ in metrics.external_calls], ['openai'])
+
+    def test_middleware_records_budget_and_server_timing(self):
+        from .instrumentation import QueryBudgetExceeded, assert_max_queries, assert_within_budget
+
+        response = self.client.get('/api/v2/sample-runs/')
+        metrics = assert_within_budget(response)
+        self.assertEqual(metrics.view, 'SampleRunViewSet.list')
+        self.assertEqual(metrics.budget, 10)
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", ext;dur=[\d.]+')
+
+        response = self.client.get('/api/v2/kanban/counts/')
+        self.assertEqual(assert_within_budget(response).view, 'kanban_counts')
+
+        with self.assertRaises(QueryBudgetExceeded):
+            assert_within_budget(response, max_queries=0)
+        with self.assertRaises(QueryBudgetExceeded):
+            with assert_max_queries(1):
+                Organization.objects.count()
+                Organization.objects.count()
+
+    def test_strict_mode_raises_over_budget(self):
+        from unittest import mock
+        from django.test import override_settings
+        from apps.samples.views import SampleRunViewSet
+        from .instrumentation import QueryBudgetExceeded
+
+        with override_settings(QUERY_BUDGET_STRICT=True), \
+                mock.patch.object(SampleRunViewSet, 'query_budgets', {'list': 0}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get('/api/v2/sample-runs/')
+
+
+class BenchmarkTest(TestCase):
+    def test_run_benchmarks_reports_every_scenario(self):
+        import json
+        import os
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command
+        from apps.styles.models import Style
+        from .benchmarks import SCENARIOS
+
+        from django.core.cache import cache
+
+        cache.set('benchmark:sentinel', 1)
+        self.addCleanup(cache.delete, 'benchmark:sentinel')
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bench.json')
+            call_command('run_benchmarks', scale='tiny', styles=8, iterations=2, warmup=0,
+                         output=path, stdout=StringIO(), stderr=StringIO())
+            with open(path) as f:
+                report = json.load(f)
+
+        self.assertEqual(report['meta']['seed_counts']['styles.Style'], 8)
+        self.assertEqual(list(report['scenarios']), [scenario.name for scenario in SCENARIOS])
+        for name, result in report['scenarios'].items():
+            self.assertEqual(result['errors'], [], name)
+            self.assertGreater(result['queries'], 0, name)
+            self.assertLessEqual(result['p50_ms'], result['p95_ms'], name)
+        # 合成資料已 rollback
+        self.assertFalse(Style.objects.exists())
+        # cold-cache 場景只讓 scheduler 版本號失效，不清空共用 cache
+        self.assertEqual(cache.get('benchmark:sentinel'), 1)
+
+    def test_compare_reports(self):
+        from .benchmarks import compare_reports
+
+        baseline = {'scenarios': {
+            'styles_list': {'p50_ms': 10.0, 'p95_ms': 20.0, 'queries': 4, 'peak_memory_kb': 100.0},
+            'alerts': {'p50_ms': 5.0, 'p95_ms': 6.0, 'queries': 2, 'peak_memory_kb': 50.0},
+        }}
+        current = {'scenarios': {
+            'styles_list': {'p50_ms': 11.0, 'p95_ms': 30.0, 'queries': 5, 'peak_memory_kb': 100.0},
+            'alerts': {'p50_ms': 4.0, 'p95_ms': 6.0, 'queries': 2, 'peak_memory_kb': 55.0},
+            'mrp': {'p50_ms': 99.0, 'p95_ms': 99.0, 'queries': 17, 'peak_memory_kb': 10.0},
+        }}
+
+        regressions = compare_reports(current, baseline, threshold=0.2)
+        self.assertEqual(
+            [(r.scenario, r.metric) for r in regressions],
+            [('styles_list', 'p95_ms'), ('styles_list', 'queries')],
+        )
+        self.assertEqual(regressions[0].change_pct, 50.0)
+
+
+class OnCommitCoalescerTest(TestCase):
+    def setUp(self):
+        from .on_commit import OnCommitCoalescer, _coalescers
+
+        self.batches = []
+        self.coalescer = OnCommitCoalescer(
+            'test', self.batches.append, task='apps.styles.tasks.refresh_style_statuses_task',
+        )
+        self.addCleanup(_coalescers.remove, self.coalescer)
+
+    def test_changes_in_one_transaction_flush_once(self):
+        from django.db import transaction
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.coalescer.add('style', [1, 2])
+                self.coalescer.add('style', [2, None])
+                self.coalescer.add('revision', [3])
+
+        self.assertEqual(self.batches, [{'style': {'1', '2'}, 'revision': {'3'}}])
+
+    def test_rolled_back_changes_fold_into_next_flush(self):
+        from django.db import transaction
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(ValueError), transaction.atomic():
+                self.coalescer.add('style', [1])
+                raise ValueError
+        self.assertEqual(self.batches, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.coalescer.add('style', [2])
+        self.assertEqual(self.batches, [{'style': {'1', '2'}}])
+
+    def test_defer_on_commit_flushes_once_on_exit(self):
+        from .on_commit import defer_on_commit
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with defer_on_commit():
+                for pk in range(1, 6):
+                    self.coalescer.add('style', [pk])
+        self.assertEqual(callbacks.count(self.coalescer.flush), 1)
+        self.assertEqual(self.batches, [{'style': {'1', '2', '3', '4', '5'}}])
+
+    def test_async_dispatch_is_debounced(self):
+        from unittest import mock
+        from django.core.cache import cache
+        from django.test import override_settings
+
+        self.addCleanup(cache.delete_many, [f'on_commit:test:style:{pk}' for pk in (1, 2, 3)])
+        with override_settings(READ_MODEL_REFRESH_ASYNC=True), \
+                mock.patch('apps.styles.tasks.refresh_style_statuses_task.apply_async') as apply_async:
+            for pks in ([1, 2], [2], [2, 3]):
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.coalescer.add('style', pks)
+
+            self.assertEqual([c.kwargs['args'] for c in apply_async.call_args_list],
+                             [[{'style': ['1', '2']}], [{'style': ['3']}]])
+            self.assertEqual(self.batches, [])
+
+            # task 執行後清除標記，之後的變更重新排程
+            self.coalescer.run({'style': ['1', '2']})
+            self.assertEqual(self.batches, [{'style': {'1', '2'}}])
+            with self.captureOnCommitCallbacks(execute=True):
+                self.coalescer.add('style', [1])
+            self.assertEqual(apply_async.call_count, 3)
+
+    def test_async_dispatch_falls_back_inline(self):
+        from unittest import mock
+        from django.core.cache import cache
+        from django.test import override_settings
+
+        self.addCleanup(cache.delete_many, [f'on_commit:test:style:{pk}' for pk in (1, 2, 3)])
+        with override_settings(READ_MODEL_REFRESH_ASYNC=True), mock.patch(
+            'apps.styles.tasks.refresh_style_statuses_task.apply_async', side_effect=OSError('Connection refused'),
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.coalescer.add('style', [1])
+
+        self.assertEqual(self.batches, [{'style': {'1'}}])
@@ -534,3 +534,40 @@ class OrganizationViewSet(viewsets.ModelViewSet):
         if user.organization:
             return Organization.objects.filter(id=user.organization.id)
         return Organization.objects.none()
+
+
+# =============================================================================
+# Search
+# =============================================================================
+
+@api_view(['GET'])
+def unified_search(request):
+    """
+    統一搜尋（styles / materials / sample runs），依相關度排序
+
+    GET /api/v2/search/?q=nulu tank&types=style,material&limit=10
+
+    Response:
+    {
+        "query": "nulu tank",
+        "results": {
+            "style": [{"id": "...", "style_number": "...", "rank": 0.82, ...}],
+            "material": [...]
+        }
+    }
+    """
+    from .search import DEFAULT_LIMIT, run_search
+
+    organization = getattr(request.user, 'organization', None)
+    if organization is None:
+        return Response({'error': 'Organization not found'}, status=status.HTTP_403_FORBIDDEN)
+
+    query = request.query_params.get('q', '').strip()
+    types = [t for t in request.query_params.get('types', '').split(',') if t] or None
+    try:
+        limit = int(request.query_params.get('limit', DEFAULT_LIMIT))
+        results = run_search(organization, query, types=types, limit=limit)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({'query': query, 'results': results})
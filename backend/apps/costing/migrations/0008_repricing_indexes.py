@@ -0,0 +1,18 @@
+# Generated by Django 4.2.8 on 2026-10-19 02:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("costing", "0007_alter_usagescenario_purpose"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="costlinev2",
+            index=models.Index(
+                fields=["source_bom_item_id"], name="cost_lines__source__6568bb_idx"
+            ),
+        ),
+    ]
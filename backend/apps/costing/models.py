@@ -692,16 +692,27 @@ class CostSheetVersion(models.Model):
         """可編輯條件：status = draft"""
         return self.status == 'draft'
 
-    def calculate_totals(self):
+    def calculate_totals(self, lines=None):
         """
         計算總額（類似舊版 CostSheet.calculate_totals）
+
+        lines: 已在記憶體中的 cost lines（bulk_create / bulk_update 後傳入，免重新查詢）
         """
+        if lines is None:
+            lines = self.cost_lines.all()
+
         # Material cost (sum of line costs)
         lines_total = sum(
-            (line.line_cost for line in self.cost_lines.all()),
+            (line.line_cost for line in lines),
             Decimal('0.00')
         )
-        self.material_cost = lines_total.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        self.apply_material_cost(lines_total)
+
+    def apply_material_cost(self, lines_total):
+        """
+        由 material 小計推導 total_cost / unit_price（repricing 以 DB 加總傳入，不載入 lines）
+        """
+        self.material_cost = Decimal(lines_total).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
 
         # Total COGS
         cogs = (
@@ -830,6 +841,9 @@ class CostLineV2(models.Model):
     class Meta:
         db_table = 'cost_lines_v2'
         ordering = ['sort_order', 'category', 'material_name']
+        indexes = [
+            models.Index(fields=['source_bom_item_id']),  # repricing：BOM item → cost lines
+        ]
         verbose_name = 'Cost Line (v2)'
         verbose_name_plural = 'Cost Lines (v2)'
 
@@ -5,10 +5,13 @@ Business logic layer for Phase 2-3
 
 from .usage_scenario_service import UsageScenarioService
 from .costing_service import CostingService, BOMNotReadyError, MissingUnitPriceError
+from .repricing_service import RepricingService, PriceChange
 
 __all__ = [
     'UsageScenarioService',
     'CostingService',
     'BOMNotReadyError',
     'MissingUnitPriceError',
+    'RepricingService',
+    'PriceChange',
 ]
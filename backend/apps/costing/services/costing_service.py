@@ -15,6 +15,15 @@ from apps.costing.models import (
 )
 from apps.styles.models import Style
 
+# refresh_snapshot 以 bulk_update 寫回的欄位
+REFRESHED_LINE_FIELDS = [
+    'consumption_snapshot',
+    'consumption_adjusted',
+    'unit_price_snapshot',
+    'unit_price_adjusted',
+    'line_cost',
+]
+
 
 # Custom Exception for BOM verification gate
 class BOMNotReadyError(PermissionError):
@@ -166,8 +175,8 @@ class CostingService:
 
         CostLineV2.objects.bulk_create(cost_lines)
 
-        # Calculate totals
-        cost_sheet.calculate_totals()
+        # Calculate totals (from in-memory lines)
+        cost_sheet.calculate_totals(cost_lines)
         cost_sheet.save()
 
         return cost_sheet
@@ -195,7 +204,7 @@ class CostingService:
             'cost_lines'
         ).select_related(
             'cost_sheet_group',
-            'usage_scenario'
+            'usage_scenario__revision'
         ).get(id=cost_sheet_id)
 
         overrides = overrides or {}
@@ -279,8 +288,8 @@ class CostingService:
 
         CostLineV2.objects.bulk_create(cost_lines)
 
-        # Calculate totals
-        cloned_sheet.calculate_totals()
+        # Calculate totals (from in-memory lines)
+        cloned_sheet.calculate_totals(cost_lines)
         cloned_sheet.save()
 
         return cloned_sheet
@@ -308,9 +317,7 @@ class CostingService:
         """
         from apps.styles.models import BOMItem
 
-        cost_sheet = CostSheetVersion.objects.prefetch_related(
-            'cost_lines'
-        ).select_related(
+        cost_sheet = CostSheetVersion.objects.select_related(
             'usage_scenario'
         ).get(id=cost_sheet_id)
 
@@ -318,20 +325,22 @@ class CostingService:
         if cost_sheet.status != 'draft':
             raise ValueError(f"Cannot refresh: CostSheetVersion is not in draft status (current: {cost_sheet.status})")
 
-        # Check for missing unit prices
+        # Load lines and their source BOM items in one query each
+        cost_lines = list(cost_sheet.cost_lines.all())
+        bom_items = BOMItem.objects.in_bulk(
+            {line.source_bom_item_id for line in cost_lines if line.source_bom_item_id}
+        )
+
+        # Check for missing unit prices (deleted BOM items are skipped)
         missing_price_items = []
-        for cost_line in cost_sheet.cost_lines.all():
-            if cost_line.source_bom_item_id:
-                try:
-                    bom_item = BOMItem.objects.get(id=cost_line.source_bom_item_id)
-                    if bom_item.unit_price is None or bom_item.unit_price == 0:
-                        missing_price_items.append({
-                            'item_number': bom_item.item_number,
-                            'material_name': bom_item.material_name,
-                            'supplier': bom_item.supplier or '-',
-                        })
-                except BOMItem.DoesNotExist:
-                    pass
+        for cost_line in cost_lines:
+            bom_item = bom_items.get(cost_line.source_bom_item_id)
+            if bom_item is not None and (bom_item.unit_price is None or bom_item.unit_price == 0):
+                missing_price_items.append({
+                    'item_number': bom_item.item_number,
+                    'material_name': bom_item.material_name,
+                    'supplier': bom_item.supplier or '-',
+                })
 
         if missing_price_items:
             raise MissingUnitPriceError(
@@ -339,41 +348,39 @@ class CostingService:
                 missing_price_items
             )
 
-        # Refresh each cost line from BOM
-        refreshed_count = 0
-        for cost_line in cost_sheet.cost_lines.all():
-            if cost_line.source_bom_item_id:
-                try:
-                    bom_item = BOMItem.objects.get(id=cost_line.source_bom_item_id)
-
-                    # Update snapshot values from BOM
-                    new_consumption = bom_item.current_consumption or cost_line.consumption_snapshot
-                    new_unit_price = bom_item.unit_price or cost_line.unit_price_snapshot
-
-                    # Only update if not manually adjusted
-                    if not cost_line.is_consumption_adjusted:
-                        cost_line.consumption_snapshot = new_consumption
-                        cost_line.consumption_adjusted = new_consumption
-
-                    if not cost_line.is_price_adjusted:
-                        cost_line.unit_price_snapshot = new_unit_price
-                        cost_line.unit_price_adjusted = new_unit_price
-
-                    # Recalculate line_cost
-                    cost_line.line_cost = CostLineV2.calculate_line_cost(
-                        cost_line.consumption_adjusted,
-                        cost_line.unit_price_adjusted
-                    )
-                    cost_line.save()
-                    refreshed_count += 1
-
-                except BOMItem.DoesNotExist:
-                    # BOM item was deleted, keep old values
-                    pass
+        # Refresh each cost line from BOM (in memory)
+        refreshed = []
+        for cost_line in cost_lines:
+            bom_item = bom_items.get(cost_line.source_bom_item_id)
+            if bom_item is None:
+                # No source / BOM item was deleted, keep old values
+                continue
+
+            # Update snapshot values from BOM
+            new_consumption = bom_item.current_consumption or cost_line.consumption_snapshot
+            new_unit_price = bom_item.unit_price or cost_line.unit_price_snapshot
+
+            # Only update if not manually adjusted
+            if not cost_line.is_consumption_adjusted:
+                cost_line.consumption_snapshot = new_consumption
+                cost_line.consumption_adjusted = new_consumption
 
-        # Recalculate totals
-        cost_sheet.change_reason = f'Refreshed from BOM ({refreshed_count} lines updated)'
-        cost_sheet.calculate_totals()
+            if not cost_line.is_price_adjusted:
+                cost_line.unit_price_snapshot = new_unit_price
+                cost_line.unit_price_adjusted = new_unit_price
+
+            # Recalculate line_cost
+            cost_line.line_cost = CostLineV2.calculate_line_cost(
+                cost_line.consumption_adjusted,
+                cost_line.unit_price_adjusted
+            )
+            refreshed.append(cost_line)
+
+        CostLineV2.objects.bulk_update(refreshed, REFRESHED_LINE_FIELDS)
+
+        # Recalculate totals (from in-memory lines)
+        cost_sheet.change_reason = f'Refreshed from BOM ({len(refreshed)} lines updated)'
+        cost_sheet.calculate_totals(cost_lines)
         cost_sheet.save()
 
         return cost_sheet
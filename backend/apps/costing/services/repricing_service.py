@@ -0,0 +1,437 @@
+"""
+RepricingService
+Mass repricing of draft cost sheets when material prices change
+
+- PriceChange 以 supplier_article_no 或 material_name 指定物料（可加 supplier 縮小範圍）；
+  同一 BOM item 兩種 key 都符合時 supplier_article_no 優先
+- 透過索引找出受影響的資料：
+  BOMItem (organization, supplier_article_no / material_name)
+  → UsageLine (bom_item) / CostLineV2 (source_bom_item_id)
+- Draft CostSheetVersion：未手動調價（is_price_adjusted=False）的 lines 改用新單價，
+  重算 line_cost 與 sheet totals（與 refresh_snapshot 相同，手動調整保留）
+- 非 draft（submitted / accepted / superseded / rejected）：不修改，只列入 flagged
+- 全部以集合操作完成：分批 IN 查詢 + 每批一個 CASE UPDATE（apps.core.bulk），
+  查詢數只隨 batch 數成長，與 cost sheets 數量無關
+- 寫入繞過 signals：同一 transaction 內 bump StyleRevision.data_version（source hash），
+  並排程 StyleStatus / 儀表板報價區塊重算
+
+用法：
+    report = RepricingService.reprice_materials(organization_id, [
+        {'supplier_article_no': 'N-1001', 'new_unit_price': '12.50'},
+        {'material_name': 'Nulu Fabric', 'supplier': 'Fabric Co', 'new_unit_price': '11.00'},
+    ], dry_run=True)
+"""
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from apps.core.bulk import bulk_update_by_pk
+from apps.costing.models import CostLineV2, CostSheetVersion, UsageLine
+from apps.styles.models import BOMItem
+
+BATCH_SIZE = 500
+
+TOTAL_FIELDS = ['material_cost', 'total_cost', 'unit_price']
+
+
+def _batches(items, size=BATCH_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+@dataclass(frozen=True)
+class PriceChange:
+    new_unit_price: Decimal
+    supplier_article_no: str = ''
+    material_name: str = ''
+    supplier: str = ''
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Raises:
+            ValueError: 缺少 supplier_article_no / material_name，或 new_unit_price 不合法
+        """
+        if not isinstance(data, dict):
+            raise ValueError('Each price change must be an object')
+        article_no = str(data.get('supplier_article_no') or '').strip()
+        material_name = str(data.get('material_name') or '').strip()
+        if not article_no and not material_name:
+            raise ValueError('Each price change needs supplier_article_no or material_name')
+
+        label = article_no or material_name
+        try:
+            price = Decimal(str(data['new_unit_price']))
+        except (KeyError, InvalidOperation):
+            raise ValueError(f'Invalid new_unit_price for {label}')
+        if not price.is_finite() or price <= 0:
+            raise ValueError(f'new_unit_price must be positive for {label}')
+
+        return cls(
+            new_unit_price=price.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP),
+            supplier_article_no=article_no,
+            # article no 已足以識別物料，material_name 只在沒有 article no 時作為 key
+            material_name='' if article_no else material_name,
+            supplier=str(data.get('supplier') or '').strip(),
+        )
+
+    @property
+    def key(self):
+        return (self.supplier_article_no, self.material_name, self.supplier.casefold())
+
+    def matches_supplier(self, supplier):
+        return not self.supplier or self.supplier.casefold() == (supplier or '').casefold()
+
+    def as_dict(self):
+        return {
+            'supplier_article_no': self.supplier_article_no,
+            'material_name': self.material_name,
+            'supplier': self.supplier,
+            'new_unit_price': str(self.new_unit_price),
+        }
+
+
+class RepricingService:
+    """
+    Service layer for mass repricing after supplier price changes
+    """
+
+    @staticmethod
+    def parse_changes(changes):
+        """
+        Raises:
+            ValueError: 空清單 / 格式錯誤 / 同一物料重複指定
+        """
+        if not isinstance(changes, (list, tuple)) or not changes:
+            raise ValueError('changes must be a non-empty list')
+
+        parsed = [
+            change if isinstance(change, PriceChange) else PriceChange.from_dict(change)
+            for change in changes
+        ]
+        duplicates = [key for key, count in Counter(change.key for change in parsed).items() if count > 1]
+        if duplicates:
+            raise ValueError(f"Duplicate price change for {', '.join(filter(None, duplicates[0][:2]))}")
+        return parsed
+
+    @staticmethod
+    def reprice_materials(organization_id, changes, dry_run=False):
+        """
+        Apply material price changes to BOM items and every affected draft cost sheet
+
+        Args:
+            organization_id: UUID of Organization (tenant scope)
+            changes: list of PriceChange or dicts
+                {supplier_article_no | material_name, new_unit_price, supplier (optional)}
+            dry_run: only compute the report, write nothing
+
+        Returns:
+            dict report (JSON-serializable; Decimal → str):
+                summary: counts of bom_items / usage_lines / cost_lines / cost_sheets / flagged
+                unmatched: price changes that matched no BOM item
+                styles: per style — materials (unit price before/after/delta),
+                        cost_sheets (material_cost / unit_price before/after/delta),
+                        flagged (non-draft versions left untouched)
+
+        Raises:
+            ValueError: invalid changes
+        """
+        changes = RepricingService.parse_changes(changes)
+
+        with transaction.atomic():
+            matched = _match_bom_items(organization_id, changes)
+            usage_counts = _count_usage_lines(matched)
+            line_updates, version_deltas, version_styles, flagged, kept_adjusted = _plan_cost_lines(matched)
+            versions = _plan_versions(version_deltas, lock=not dry_run)
+
+            # 鎖定時已非 draft 的 versions 不更新
+            line_updates = {
+                pk: planned for pk, planned in line_updates.items() if planned[0] in versions
+            }
+
+            if not dry_run:
+                line_updates = _write(organization_id, matched, line_updates, versions)
+
+            line_updates = {pk: values for pk, (_, values) in line_updates.items()}
+
+        return _build_report(
+            changes, matched, usage_counts, line_updates, versions, version_styles, flagged, kept_adjusted, dry_run,
+        )
+
+
+# ==================== Plan ====================
+
+MATCH_FIELDS = (
+    'id', 'material_name', 'supplier', 'supplier_article_no', 'unit_price',
+    'revision_id', 'revision__style_id', 'revision__style__style_number',
+)
+
+
+def _match_bom_items(organization_id, changes):
+    """
+    Returns:
+        {bom_item_id: (row, PriceChange)}；row 為 values() dict（含 style）
+    """
+    by_article, by_name = defaultdict(list), defaultdict(list)
+    for change in changes:
+        if change.supplier_article_no:
+            by_article[change.supplier_article_no].append(change)
+        else:
+            by_name[change.material_name].append(change)
+
+    articles, names = list(by_article), list(by_name)
+    rows = {}
+    for start in range(0, max(len(articles), len(names)), BATCH_SIZE):
+        condition = Q()
+        if articles[start:start + BATCH_SIZE]:
+            condition |= Q(supplier_article_no__in=articles[start:start + BATCH_SIZE])
+        if names[start:start + BATCH_SIZE]:
+            condition |= Q(material_name__in=names[start:start + BATCH_SIZE])
+        # organization 為 NULL 的舊 BOM items（尚未回填）以 style 的組織判斷；
+        # UNION 讓主要部分仍走 (organization, ...) 索引
+        scoped = BOMItem.objects.filter(condition, organization_id=organization_id)
+        legacy = BOMItem.objects.filter(
+            condition, organization__isnull=True, revision__style__organization_id=organization_id,
+        )
+        for row in scoped.order_by().values(*MATCH_FIELDS).union(legacy.order_by().values(*MATCH_FIELDS)):
+            rows[row['id']] = row
+
+    matched = {}
+    for bom_item_id, row in rows.items():
+        candidates = by_article.get(row['supplier_article_no'], []) + by_name.get(row['material_name'], [])
+        change = next((c for c in candidates if c.matches_supplier(row['supplier'])), None)
+        if change is not None:
+            matched[bom_item_id] = (row, change)
+    return matched
+
+
+def _count_usage_lines(matched):
+    counts = {}
+    for ids in _batches(matched):
+        counts.update(
+            UsageLine.objects.filter(bom_item_id__in=ids).order_by()
+            .values('bom_item_id').annotate(n=Count('id')).values_list('bom_item_id', 'n')
+        )
+    return counts
+
+
+def _plan_cost_lines(matched):
+    """
+    Returns:
+        line_updates: {line_id: (version_id, {unit_price_snapshot, unit_price_adjusted, line_cost})}
+        version_deltas: {version_id: line_cost 變化總和}（draft only）
+        version_styles: {version_id: style_id}
+        flagged: {version_id: {...}}（非 draft）
+        kept_adjusted: 手動調價而保留的 draft lines 數
+    """
+    line_updates = {}
+    version_deltas = defaultdict(Decimal)
+    version_styles = {}
+    flagged = {}
+    kept_adjusted = 0
+
+    for ids in _batches(matched):
+        lines = CostLineV2.objects.filter(source_bom_item_id__in=ids).order_by().values_list(
+            'id', 'cost_sheet_version_id', 'source_bom_item_id', 'consumption_adjusted',
+            'unit_price_adjusted', 'line_cost', 'is_price_adjusted',
+            'cost_sheet_version__status', 'cost_sheet_version__costing_type', 'cost_sheet_version__version_no',
+        )
+        for (line_id, version_id, bom_item_id, consumption, unit_price, line_cost, is_price_adjusted,
+             status, costing_type, version_no) in lines:
+            row, change = matched[bom_item_id]
+            if status != 'draft':
+                entry = flagged.setdefault(version_id, {
+                    'id': str(version_id),
+                    'style_id': row['revision__style_id'],
+                    'costing_type': costing_type,
+                    'version_no': version_no,
+                    'status': status,
+                    'lines': 0,
+                })
+                entry['lines'] += 1
+                continue
+            if is_price_adjusted:
+                kept_adjusted += 1
+                continue
+            if unit_price == change.new_unit_price:
+                continue
+
+            new_line_cost = CostLineV2.calculate_line_cost(consumption, change.new_unit_price)
+            line_updates[line_id] = (version_id, {
+                'unit_price_snapshot': change.new_unit_price,
+                'unit_price_adjusted': change.new_unit_price,
+                'line_cost': new_line_cost,
+            })
+            version_deltas[version_id] += new_line_cost - line_cost
+            version_styles[version_id] = row['revision__style_id']
+
+    return line_updates, version_deltas, version_styles, flagged, kept_adjusted
+
+
+def _plan_versions(version_deltas, lock):
+    """
+    以 DB 加總（更新前）+ 變化量重算 totals，不載入 lines
+
+    Returns:
+        {version_id: (version, material_cost_before, unit_price_before)}
+    """
+    planned = {}
+    for ids in _batches(version_deltas):
+        versions = CostSheetVersion.objects.filter(pk__in=ids, status='draft').order_by().only(
+            'id', 'cost_sheet_group_id', 'version_no', 'costing_type', 'status',
+            'labor_cost', 'overhead_cost', 'freight_cost',
+            'packing_cost', 'margin_pct', *TOTAL_FIELDS,
+        )
+        if lock:
+            versions = versions.select_for_update()
+        versions = list(versions)
+
+        sums = dict(
+            CostLineV2.objects.filter(cost_sheet_version_id__in=[v.pk for v in versions]).order_by()
+            .values('cost_sheet_version_id').annotate(total=Sum('line_cost'))
+            .values_list('cost_sheet_version_id', 'total')
+        )
+        for version in versions:
+            before = (version.material_cost, version.unit_price)
+            version.apply_material_cost((sums.get(version.pk) or Decimal('0.00')) + version_deltas[version.pk])
+            planned[version.pk] = (version, *before)
+    return planned
+
+
+# ==================== Write ====================
+
+def _write(organization_id, matched, line_updates, versions):
+    """
+    Args:
+        line_updates: {line_id: (version_id, values)}
+        versions: _plan_versions() 結果；規劃後有 line 被略過的 versions 會就地重算
+
+    Returns:
+        實際寫入的 line_updates
+    """
+    from apps.samples.services.dashboard_aggregates import schedule_section_refresh
+    from apps.styles.services import bump_revision_data_version
+    from apps.styles.style_status import schedule_style_status_refresh
+
+    # BOM items：同一新單價一個 UPDATE
+    ids_by_price = defaultdict(list)
+    for bom_item_id, (row, change) in matched.items():
+        if row['unit_price'] != change.new_unit_price:
+            ids_by_price[change.new_unit_price].append(bom_item_id)
+    for price, ids in ids_by_price.items():
+        for batch in _batches(ids):
+            BOMItem.objects.filter(pk__in=batch).update(unit_price=price)
+
+    # 手動調價在規劃後才發生的 lines 不覆寫
+    line_queryset = CostLineV2.objects.filter(is_price_adjusted=False)
+    written = set()
+    for batch in _batches(line_updates):
+        updated, _ = bulk_update_by_pk(line_queryset, {pk: line_updates[pk][1] for pk in batch})
+        written.update(updated)
+
+    # 被略過的 lines 其變化量已計入規劃的 totals：這些 versions 以寫入後的 lines 加總重算
+    stale = {version_id for pk, (version_id, _) in line_updates.items() if pk not in written}
+    for ids in _batches(stale):
+        sums = dict(
+            CostLineV2.objects.filter(cost_sheet_version_id__in=ids).order_by()
+            .values('cost_sheet_version_id').annotate(total=Sum('line_cost'))
+            .values_list('cost_sheet_version_id', 'total')
+        )
+        for version_id in ids:
+            versions[version_id][0].apply_material_cost(sums.get(version_id) or Decimal('0.00'))
+
+    version_queryset = CostSheetVersion.objects.filter(status='draft')
+    for batch in _batches(versions):
+        bulk_update_by_pk(version_queryset, {
+            pk: {name: getattr(versions[pk][0], name) for name in TOTAL_FIELDS} for pk in batch
+        })
+
+    # update() / bulk_update_by_pk 不觸發 signals：
+    # source hash（run 是否過期）、StyleStatus（costing unit_price）、儀表板報價區塊
+    bump_revision_data_version(
+        matched[bom_item_id][0]['revision_id'] for ids in ids_by_price.values() for bom_item_id in ids
+    )
+    if versions:
+        schedule_style_status_refresh(
+            'cost_sheet_group', {version.cost_sheet_group_id for version, _, _ in versions.values()},
+        )
+        schedule_section_refresh(organization_id, 'quotation')
+
+    return {pk: planned for pk, planned in line_updates.items() if pk in written}
+
+
+# ==================== Report ====================
+
+def _delta(before, after):
+    before = before if before is not None else Decimal('0.00')
+    return str(after - before)
+
+
+def _build_report(changes, matched, usage_counts, line_updates, versions, version_styles,
+                  flagged, kept_adjusted, dry_run):
+    styles = {}
+
+    def style_entry(style_id, style_number=None):
+        entry = styles.setdefault(style_id, {
+            'style_id': str(style_id),
+            'style_number': style_number,
+            'usage_lines': 0,
+            'materials': [],
+            'cost_sheets': [],
+            'flagged': [],
+        })
+        if style_number and not entry['style_number']:
+            entry['style_number'] = style_number
+        return entry
+
+    used = set()
+    for bom_item_id, (row, change) in matched.items():
+        used.add(change.key)
+        entry = style_entry(row['revision__style_id'], row['revision__style__style_number'])
+        entry['usage_lines'] += usage_counts.get(bom_item_id, 0)
+        entry['materials'].append({
+            'bom_item_id': str(bom_item_id),
+            'material_name': row['material_name'],
+            'supplier': row['supplier'],
+            'supplier_article_no': row['supplier_article_no'],
+            'unit_price_before': str(row['unit_price']) if row['unit_price'] is not None else None,
+            'unit_price_after': str(change.new_unit_price),
+            'delta': _delta(row['unit_price'], change.new_unit_price),
+        })
+
+    for version_id, (version, material_before, unit_price_before) in versions.items():
+        style_entry(version_styles[version_id])['cost_sheets'].append({
+            'id': str(version_id),
+            'costing_type': version.costing_type,
+            'version_no': version.version_no,
+            'material_cost_before': str(material_before),
+            'material_cost_after': str(version.material_cost),
+            'unit_price_before': str(unit_price_before),
+            'unit_price_after': str(version.unit_price),
+            'unit_price_delta': _delta(unit_price_before, version.unit_price),
+        })
+
+    for info in flagged.values():
+        info = dict(info)
+        style_entry(info.pop('style_id'))['flagged'].append(info)
+
+    return {
+        'dry_run': dry_run,
+        'summary': {
+            'changes': len(changes),
+            'bom_items': len(matched),
+            'usage_lines': sum(usage_counts.values()),
+            'cost_lines': len(line_updates),
+            'price_adjusted_lines': kept_adjusted,
+            'cost_sheets': len(versions),
+            'flagged_cost_sheets': len(flagged),
+            'styles': len(styles),
+        },
+        'unmatched': [change.as_dict() for change in changes if change.key not in used],
+        'styles': sorted(styles.values(), key=lambda entry: entry['style_number'] or ''),
+    }
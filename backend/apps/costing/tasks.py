@@ -0,0 +1,42 @@
+"""
+Costing Tasks
+Celery tasks for cost sheet repricing
+"""
+
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def reprice_materials_task(organization_id: str, changes: list, dry_run: bool = False) -> dict:
+    """
+    Async task: Apply supplier price changes to every affected draft cost sheet
+
+    Thousands of cost sheets are repriced set-wise in one job;
+    submitted / accepted versions are only flagged in the report.
+
+    Returns:
+        dict: {'status': 'success', 'report': {...}} | {'status': 'error', 'error': str}
+    """
+    from .services.repricing_service import RepricingService
+
+    try:
+        report = RepricingService.reprice_materials(organization_id, changes, dry_run=dry_run)
+        summary = report['summary']
+        logger.info(
+            f"Repriced {summary['cost_sheets']} cost sheets / {summary['bom_items']} BOM items "
+            f"({summary['flagged_cost_sheets']} flagged, dry_run={dry_run})"
+        )
+        return {
+            'status': 'success',
+            'report': report,
+        }
+    except Exception as e:
+        logger.exception(f"Repricing failed: {e}")
+        return {
+            'status': 'error',
+            'error': str(e),
+        }
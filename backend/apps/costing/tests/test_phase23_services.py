@@ -356,3 +356,79 @@ class TestCostingService:
         assert cloned.cloned_from == original
         assert cloned.status == 'draft'
         assert cloned.cost_lines.count() == original.cost_lines.count()
+
+    def test_refresh_snapshot_preserves_adjustments(self, style, revision, bom_items, user):
+        """Refresh 以 BOM 現值更新未調整的 lines，手動調整保留"""
+        scenario = UsageScenarioService.create_scenario(
+            revision=revision,
+            purpose='bulk_quote',
+            payload={},
+            user=user
+        )
+        cost_sheet = CostingService.create_cost_sheet(
+            style_id=style.id,
+            costing_type='sample',
+            usage_scenario_id=scenario.id,
+            payload={'margin_pct': Decimal('0.00')},
+            user=user
+        )
+        fabric_line = cost_sheet.cost_lines.get(source_bom_item_id=bom_items[0].id)
+        zipper_line = cost_sheet.cost_lines.get(source_bom_item_id=bom_items[1].id)
+        CostingService.update_cost_line(fabric_line.id, {'unit_price_adjusted': '9.00'}, user=user)
+
+        BOMItem.objects.filter(id__in=[item.id for item in bom_items]).update(unit_price=Decimal('20.00'))
+        refreshed = CostingService.refresh_snapshot(cost_sheet.id, user=user)
+
+        fabric_line.refresh_from_db()
+        zipper_line.refresh_from_db()
+        assert fabric_line.unit_price_adjusted == Decimal('9.00')
+        assert fabric_line.unit_price_snapshot == Decimal('10.00')
+        assert zipper_line.unit_price_snapshot == Decimal('20.00')
+        assert zipper_line.line_cost == CostLineV2.calculate_line_cost(
+            zipper_line.consumption_adjusted, Decimal('20.00')
+        )
+        assert refreshed.change_reason == 'Refreshed from BOM (2 lines updated)'
+        assert refreshed.material_cost == (fabric_line.line_cost + zipper_line.line_cost).quantize(Decimal('0.01'))
+        refreshed.refresh_from_db()
+        assert refreshed.total_cost == refreshed.material_cost
+
+    def test_refresh_and_clone_query_count_is_constant(self, style, revision, user):
+        """60 行的 cost sheet：refresh / clone 只需少量查詢（BOM 一次 in_bulk，lines 以 bulk 寫回）"""
+        from apps.core.instrumentation import assert_max_queries
+
+        BOMItem.objects.bulk_create([
+            BOMItem(
+                revision=revision,
+                item_number=n,
+                category='trim',
+                material_name=f'Trim {n}',
+                unit='pcs',
+                consumption=Decimal('1.0'),
+                unit_price=Decimal('1.00'),
+            )
+            for n in range(1, 61)
+        ])
+        scenario = UsageScenarioService.create_scenario(
+            revision=revision,
+            purpose='bulk_quote',
+            payload={},
+            user=user
+        )
+        cost_sheet = CostingService.create_cost_sheet(
+            style_id=style.id,
+            costing_type='sample',
+            usage_scenario_id=scenario.id,
+            payload={},
+            user=user
+        )
+        BOMItem.objects.filter(revision=revision).update(unit_price=Decimal('2.00'))
+
+        with assert_max_queries(8):
+            refreshed = CostingService.refresh_snapshot(cost_sheet.id, user=user)
+        assert refreshed.material_cost == Decimal('120.00')
+
+        # SQLite 的 bulk_create 依參數上限分 batch
+        with assert_max_queries(12):
+            cloned = CostingService.clone_cost_sheet(cost_sheet.id, user=user)
+        assert cloned.material_cost == Decimal('120.00')
+        assert cloned.cost_lines.count() == 60
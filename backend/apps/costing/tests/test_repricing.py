@@ -0,0 +1,261 @@
+"""
+Repricing Tests
+物料單價變更 → 批次重算 draft cost sheets，非 draft 只標記
+"""
+
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from apps.core.instrumentation import assert_max_queries
+from apps.core.models import Organization
+from apps.costing.models import CostLineV2, CostSheetVersion
+from apps.costing.services import CostingService, RepricingService, UsageScenarioService
+from apps.styles.models import BOMItem, Style, StyleRevision
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def org():
+    return Organization.objects.create(name='Repricing Org')
+
+
+@pytest.fixture
+def user(org):
+    return get_user_model().objects.create_user(username='repricer', password='testpass123', organization=org)
+
+
+def _style_with_sheet(org, user, style_number, **payload):
+    """Style + BOM（fabric N-1001 / zipper / lining）+ draft cost sheet"""
+    style = Style.objects.create(organization=org, style_number=style_number, style_name=style_number)
+    revision = StyleRevision.objects.create(style=style, revision_label='Rev A', status='draft')
+    for n, (category, name, supplier, article_no, price) in enumerate([
+        ('fabric', 'Nulu Fabric', 'Fabric Co', 'N-1001', '10.00'),
+        ('trim', 'Zipper', 'Trim Co', '', '2.00'),
+        ('fabric', 'Lining', 'Fabric Co', 'L-2002', '4.00'),
+    ], start=1):
+        BOMItem.objects.create(
+            organization=org, revision=revision, item_number=n, category=category, material_name=name,
+            supplier=supplier, supplier_article_no=article_no, unit='yards', consumption=Decimal('1.5'),
+            unit_price=Decimal(price),
+        )
+    scenario = UsageScenarioService.create_scenario(revision=revision, purpose='bulk_quote', payload={}, user=user)
+    cost_sheet = CostingService.create_cost_sheet(
+        style_id=style.id, costing_type='bulk', usage_scenario_id=scenario.id,
+        payload={'labor_cost': '5.00', 'margin_pct': '30.00', **payload}, user=user,
+    )
+    return style, cost_sheet
+
+
+def _line(cost_sheet, material_name):
+    return cost_sheet.cost_lines.get(material_name=material_name)
+
+
+CHANGES = [
+    {'supplier_article_no': 'N-1001', 'new_unit_price': '12.50'},
+    {'material_name': 'Zipper', 'supplier': 'trim co', 'new_unit_price': '3'},
+]
+
+
+def test_reprice_updates_drafts_and_flags_locked(org, user):
+    style, draft = _style_with_sheet(org, user, 'RP-001')
+    adjusted = CostingService.clone_cost_sheet(draft.id, user=user)
+    CostingService.update_cost_line(_line(adjusted, 'Nulu Fabric').id, {'unit_price_adjusted': '9.00'}, user=user)
+    submitted = CostingService.clone_cost_sheet(draft.id, user=user)
+    CostSheetVersion.objects.filter(pk=submitted.pk).update(status='submitted')
+    submitted_before = CostSheetVersion.objects.get(pk=submitted.pk)
+
+    other_org = Organization.objects.create(name='Other Org')
+    _, foreign = _style_with_sheet(other_org, user, 'RP-OTHER')
+
+    report = RepricingService.reprice_materials(org.id, CHANGES)
+
+    # BOM items（只限本 organization）
+    assert set(BOMItem.objects.filter(organization=org).values_list('material_name', 'unit_price')) == {
+        ('Nulu Fabric', Decimal('12.50')), ('Zipper', Decimal('3.00')), ('Lining', Decimal('4.00')),
+    }
+    assert _line(foreign, 'Nulu Fabric').unit_price_adjusted == Decimal('10.00')
+
+    # Draft：lines 與 totals 都重算，與 calculate_totals() 一致
+    fabric = _line(draft, 'Nulu Fabric')
+    assert fabric.unit_price_snapshot == fabric.unit_price_adjusted == Decimal('12.50')
+    assert fabric.line_cost == CostLineV2.calculate_line_cost(fabric.consumption_adjusted, Decimal('12.50'))
+    draft.refresh_from_db()
+    expected = CostSheetVersion.objects.get(pk=draft.pk)
+    expected.calculate_totals()
+    assert (draft.material_cost, draft.total_cost, draft.unit_price) == \
+        (expected.material_cost, expected.total_cost, expected.unit_price)
+
+    # 手動調價保留，其他 lines 仍更新
+    assert _line(adjusted, 'Nulu Fabric').unit_price_adjusted == Decimal('9.00')
+    assert _line(adjusted, 'Zipper').unit_price_adjusted == Decimal('3.00')
+
+    # 非 draft 不動，只標記
+    submitted.refresh_from_db()
+    assert submitted.unit_price == submitted_before.unit_price
+    assert _line(submitted, 'Nulu Fabric').unit_price_adjusted == Decimal('10.00')
+
+    assert report['summary'] == {
+        'changes': 2, 'bom_items': 2, 'usage_lines': 2, 'cost_lines': 3, 'price_adjusted_lines': 1,
+        'cost_sheets': 2, 'flagged_cost_sheets': 1, 'styles': 1,
+    }
+    assert report['unmatched'] == []
+    [entry] = report['styles']
+    assert entry['style_number'] == 'RP-001'
+    assert {(m['material_name'], m['unit_price_before'], m['unit_price_after'], m['delta'])
+            for m in entry['materials']} == {('Nulu Fabric', '10.00', '12.50', '2.50'), ('Zipper', '2.00', '3.00', '1.00')}
+    sheet = next(s for s in entry['cost_sheets'] if s['id'] == str(draft.pk))
+    assert sheet['unit_price_after'] == str(draft.unit_price)
+    assert Decimal(sheet['unit_price_delta']) == draft.unit_price - Decimal(sheet['unit_price_before']) > 0
+    assert entry['flagged'] == [{
+        'id': str(submitted.pk), 'costing_type': 'bulk', 'version_no': submitted.version_no,
+        'status': 'submitted', 'lines': 2,
+    }]
+
+
+def test_dry_run_writes_nothing(org, user):
+    _, draft = _style_with_sheet(org, user, 'RP-002')
+    unit_price = draft.unit_price
+
+    report = RepricingService.reprice_materials(
+        org.id, CHANGES + [{'supplier_article_no': 'X-404', 'new_unit_price': '1'}], dry_run=True,
+    )
+
+    draft.refresh_from_db()
+    assert draft.unit_price == unit_price
+    assert BOMItem.objects.get(organization=org, supplier_article_no='N-1001').unit_price == Decimal('10.00')
+    assert report['dry_run'] is True
+    assert report['summary']['cost_sheets'] == 1
+    assert Decimal(report['styles'][0]['cost_sheets'][0]['unit_price_after']) > unit_price
+    assert report['unmatched'] == [
+        {'supplier_article_no': 'X-404', 'material_name': '', 'supplier': '', 'new_unit_price': '1.00'},
+    ]
+
+
+def test_line_adjusted_after_planning_keeps_totals_consistent(org, user, monkeypatch):
+    from apps.costing.services import repricing_service
+
+    _, draft = _style_with_sheet(org, user, 'RP-RACE')
+    fabric = _line(draft, 'Nulu Fabric')
+    plan_versions = repricing_service._plan_versions
+
+    def plan_then_adjust(*args, **kwargs):
+        # 規劃完成後、寫入前，另一個請求手動調價
+        planned = plan_versions(*args, **kwargs)
+        CostingService.update_cost_line(fabric.id, {'unit_price_adjusted': '9.00'}, user=user)
+        return planned
+
+    monkeypatch.setattr(repricing_service, '_plan_versions', plan_then_adjust)
+    report = RepricingService.reprice_materials(org.id, CHANGES)
+
+    assert _line(draft, 'Nulu Fabric').unit_price_adjusted == Decimal('9.00')
+    assert _line(draft, 'Zipper').unit_price_adjusted == Decimal('3.00')
+    draft.refresh_from_db()
+    expected = CostSheetVersion.objects.get(pk=draft.pk)
+    expected.calculate_totals()
+    assert (draft.material_cost, draft.total_cost, draft.unit_price) == \
+        (expected.material_cost, expected.total_cost, expected.unit_price)
+    assert report['summary']['cost_lines'] == 1
+    assert report['styles'][0]['cost_sheets'][0]['unit_price_after'] == str(draft.unit_price)
+
+
+def test_legacy_bom_items_without_organization(org, user):
+    style, draft = _style_with_sheet(org, user, 'RP-LEGACY')
+    BOMItem.objects.filter(revision__style=style).update(organization=None)
+    other_org = Organization.objects.create(name='Other Org')
+    other, _ = _style_with_sheet(other_org, user, 'RP-LEGACY-OTHER')
+    BOMItem.objects.filter(revision__style=other).update(organization=None)
+
+    report = RepricingService.reprice_materials(org.id, CHANGES)
+
+    # organization 未回填的 BOM items 以 style 的組織判斷歸屬
+    assert report['summary']['bom_items'] == 2
+    assert BOMItem.objects.get(revision__style=style, supplier_article_no='N-1001').unit_price == Decimal('12.50')
+    assert BOMItem.objects.get(revision__style=other, supplier_article_no='N-1001').unit_price == Decimal('10.00')
+    assert _line(draft, 'Nulu Fabric').unit_price_adjusted == Decimal('12.50')
+
+
+def test_query_count_does_not_grow_with_cost_sheets(org, user):
+    counts = []
+    for n, sheets in enumerate((1, 12)):
+        organization = Organization.objects.create(name=f'Repricing Org {sheets}')
+        _, draft = _style_with_sheet(organization, user, f'RP-Q{n}')
+        for _ in range(sheets - 1):
+            CostingService.clone_cost_sheet(draft.id, user=user)
+        with assert_max_queries(12) as metrics:
+            report = RepricingService.reprice_materials(organization.id, CHANGES)
+        assert report['summary']['cost_sheets'] == sheets
+        counts.append(metrics.queries)
+
+    assert counts[1] == counts[0]
+
+
+@pytest.mark.parametrize('changes', [
+    [],
+    [{'new_unit_price': '1'}],
+    [{'supplier_article_no': 'N-1001', 'new_unit_price': 'abc'}],
+    [{'supplier_article_no': 'N-1001', 'new_unit_price': '0'}],
+    [{'supplier_article_no': 'N-1001', 'new_unit_price': '1'}, {'supplier_article_no': 'N-1001', 'new_unit_price': '2'}],
+])
+def test_invalid_changes(org, changes):
+    with pytest.raises(ValueError):
+        RepricingService.reprice_materials(org.id, changes)
+
+
+def test_reprice_endpoint(org, user):
+    _, draft = _style_with_sheet(org, user, 'RP-API')
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    response = client.post('/api/v2/cost-sheet-versions/reprice/', {'changes': CHANGES}, format='json')
+    assert response.status_code == 200
+    assert response.data['summary']['cost_sheets'] == 1
+    assert _line(draft, 'Nulu Fabric').unit_price_adjusted == Decimal('12.50')
+
+    response = client.post('/api/v2/cost-sheet-versions/reprice/', {'changes': []}, format='json')
+    assert response.status_code == 400
+
+
+def test_reprice_endpoint_parses_dry_run_strings(org, user):
+    _, draft = _style_with_sheet(org, user, 'RP-API-DRY')
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    response = client.post('/api/v2/cost-sheet-versions/reprice/', {'changes': CHANGES, 'dry_run': 'true'}, format='json')
+    assert response.status_code == 200
+    assert response.data['dry_run'] is True
+    assert _line(draft, 'Nulu Fabric').unit_price_adjusted == Decimal('10.00')
+
+    response = client.post('/api/v2/cost-sheet-versions/reprice/', {'changes': CHANGES, 'dry_run': 'false'}, format='json')
+    assert response.status_code == 200
+    assert response.data['dry_run'] is False
+    assert _line(draft, 'Nulu Fabric').unit_price_adjusted == Decimal('12.50')
+
+    response = client.post('/api/v2/cost-sheet-versions/reprice/', {'changes': CHANGES, 'dry_run': 'maybe'}, format='json')
+    assert response.status_code == 400
+
+
+def test_reprice_refreshes_source_hash_and_style_status(org, user, django_capture_on_commit_callbacks):
+    from apps.samples.services.auto_generation import _compute_source_hash, generate_source_hash
+    from apps.styles.models import StyleStatus
+    from apps.styles.style_status import check_style_status_drift, refresh_style_statuses
+
+    style, draft = _style_with_sheet(org, user, 'RP-HASH')
+    revision = style.revisions.get()
+    BOMItem.objects.filter(revision=revision).update(is_verified=True)
+    hash_before = generate_source_hash(revision)
+    refresh_style_statuses([style.id])
+
+    with django_capture_on_commit_callbacks(execute=True):
+        RepricingService.reprice_materials(org.id, CHANGES)
+
+    # update() 繞過 signals：data_version 已 bump，快取的 hash 不會回傳舊值
+    assert generate_source_hash(revision) == _compute_source_hash(revision) != hash_before
+
+    draft.refresh_from_db()
+    status = StyleStatus.objects.get(style=style)
+    assert status.costing['bulk']['unit_price'] == float(draft.unit_price)
+    assert check_style_status_drift(org) == []
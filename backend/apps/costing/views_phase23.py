@@ -5,7 +5,7 @@ P18: 統一報價架構 (Sample → Bulk)
 """
 
 from decimal import Decimal, ROUND_HALF_UP
-from rest_framework import viewsets, status
+from rest_framework import viewsets, status, serializers
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
@@ -228,6 +228,7 @@ class CostSheetVersionViewSet(viewsets.ModelViewSet):
     - PATCH /api/v2/cost-sheet-versions/{id}/ - Update summary
     - POST /api/v2/cost-sheet-versions/{id}/clone/ - Clone version
     - POST /api/v2/cost-sheet-versions/{id}/submit/ - Submit version
+    - POST /api/v2/cost-sheet-versions/reprice/ - Mass repricing after material price changes
     """
 
     queryset = CostSheetVersion.objects.select_related(
@@ -426,6 +427,61 @@ class CostSheetVersionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
+    def reprice(self, request):
+        """
+        Mass repricing after material price changes (current user's organization).
+        Draft versions are repriced; submitted / accepted versions are only flagged.
+
+        POST /api/v2/cost-sheet-versions/reprice/
+        {
+            "changes": [
+                {"supplier_article_no": "N-1001", "new_unit_price": "12.50"},
+                {"material_name": "Nulu Fabric", "supplier": "Fabric Co", "new_unit_price": "11.00"}
+            ],
+            "dry_run": false,   // optional, report only
+            "async": false      // optional, run as Celery job (returns task_id)
+        }
+
+        Returns:
+            Repricing report (per style unit price before/after), or 202 + task_id when async
+
+        Errors:
+            400: invalid changes / user without organization
+        """
+        from .services.repricing_service import RepricingService
+        from .tasks import reprice_materials_task
+
+        organization = getattr(request.user, 'organization', None)
+        if organization is None:
+            return Response(
+                {'error': 'User has no organization'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        changes = request.data.get('changes')
+        flag = serializers.BooleanField()
+        try:
+            RepricingService.parse_changes(changes)
+            # "false" / "0" 等字串需轉為 False，不能直接 bool()
+            dry_run = flag.to_internal_value(request.data.get('dry_run', False))
+            run_async = flag.to_internal_value(request.data.get('async', False))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except serializers.ValidationError as e:
+            return Response({'error': e.detail}, status=status.HTTP_400_BAD_REQUEST)
+
+        if run_async:
+            task = reprice_materials_task.delay(str(organization.pk), changes, dry_run=dry_run)
+            return Response({
+                'task_id': task.id,
+                'status': 'pending',
+                'changes': len(changes),
+            }, status=status.HTTP_202_ACCEPTED)
+
+        report = RepricingService.reprice_materials(organization.pk, changes, dry_run=dry_run)
+        return Response(report)
+
     @action(detail=True, methods=['get'], url_path='allowed-actions')
     def allowed_actions(self, request, pk=None):
         """
@@ -888,20 +944,16 @@ class CostSheetVersionViewSet(viewsets.ModelViewSet):
             if run:
                 approved_sample_run = run
 
-        # 6. 生成內部訂單號
-        from django.db.models import Max
-        last_po = ProductionOrder.objects.filter(
-            organization=organization,
-            order_number__startswith='PO-'
-        ).aggregate(Max('order_number'))
-        if last_po['order_number__max']:
-            try:
-                last_num = int(last_po['order_number__max'].split('-')[-1])
-                order_number = f"PO-{timezone.now().strftime('%y%m')}-{str(last_num + 1).zfill(4)}"
-            except ValueError:
-                order_number = f"PO-{timezone.now().strftime('%y%m')}-0001"
-        else:
-            order_number = f"PO-{timezone.now().strftime('%y%m')}-0001"
+        # 6. 生成內部訂單號（計數器不隨月份重置，與既有編號一致）
+        from apps.core.sequences import next_sequence, seed_from_max
+        seq = next_sequence(
+            'PRODUCTION_PO',
+            scope=organization.pk if organization is not None else None,
+            seed=lambda: seed_from_max(
+                ProductionOrder.objects.filter(organization=organization), 'order_number', 'PO-'
+            ),
+        )
+        order_number = f"PO-{timezone.now().strftime('%y%m')}-{str(seq).zfill(4)}"
 
         # 7. 計算總金額
         total_amount = cost_sheet.unit_price * total_quantity
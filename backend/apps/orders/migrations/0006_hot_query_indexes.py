@@ -0,0 +1,19 @@
+# Generated by Django 4.2.8 on 2026-10-19 02:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("orders", "0005_add_approved_sample_run"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="productionorder",
+            index=models.Index(
+                fields=["organization", "created_at"],
+                name="production__organiz_384d75_idx",
+            ),
+        ),
+    ]
@@ -229,6 +229,9 @@ class ProductionOrder(models.Model):
         verbose_name_plural = 'Production Orders'
         ordering = ['-created_at']
         unique_together = [['organization', 'order_number']]
+        indexes = [
+            models.Index(fields=['organization', 'created_at']),  # keyset 列表
+        ]
 
     objects = TenantManager()
 
@@ -256,6 +256,7 @@ class MRPService:
         Create a single purchase order with lines from requirements.
         """
         from apps.procurement.models import PurchaseOrder, POLine, Supplier, Material
+        from apps.procurement.services.numbering import generate_po_number
         from django.utils import timezone
 
         # Find or create supplier
@@ -268,14 +269,9 @@ class MRPService:
             }
         )
 
-        # Generate PO number
+        # Generate PO number (counter row lock, no count() scan)
         now = timezone.now()
-        yymm = now.strftime('%y%m')
-        count = PurchaseOrder.objects.filter(
-            organization=organization,
-            po_number__startswith=f'PO-{yymm}-'
-        ).count()
-        po_number = f'PO-{yymm}-{str(count + 1).zfill(4)}'
+        po_number = generate_po_number(organization, now)
 
         # Create PO
         po = PurchaseOrder.objects.create(
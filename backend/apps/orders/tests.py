@@ -1,2 +1,75 @@
 from django.test import TestCase
 from .models import SalesOrder, SalesOrderItem
+
+
+class OrderEndpointQueryBudgetTest(TestCase):
+    """orders endpoints 在宣告的 query budget 內，且 list 查詢數不隨筆數成長"""
+
+    def setUp(self):
+        from rest_framework.test import APIClient
+        from apps.core.models import Organization, User
+
+        self.org = Organization.objects.create(name="Budget Org")
+        user = User.objects.create_user(username="budget", password="testpass123", organization=self.org)
+        self.client = APIClient()
+        self.client.force_authenticate(user=user)
+
+    def _populate(self, styles, prefix):
+        from datetime import date
+        from decimal import Decimal
+        from apps.core.seeding import seed_dataset
+        from .models import ProductionOrder
+        from .services import MRPService
+
+        seed_dataset(self.org, styles=styles, bom_items_per_style=3, runs_per_style=0, blocks_per_style=0, prefix=prefix)
+        for order in ProductionOrder.objects.filter(po_number__startswith=prefix):
+            MRPService.calculate_requirements(production_order=order)
+            sales_order = SalesOrder.objects.create(
+                organization=self.org, order_number=f"SO-{order.po_number}", customer=order.customer,
+                order_date=date(2026, 1, 5), delivery_date=date(2026, 4, 1),
+            )
+            SalesOrderItem.objects.create(
+                sales_order=sales_order, style_revision=order.style_revision, total_quantity=100,
+                size_breakdown={'M': 100}, unit_price=Decimal('10.00'), total_amount=Decimal('1000.00'),
+            )
+
+    def _urls(self):
+        from .models import ProductionOrder
+
+        order = ProductionOrder.objects.filter(organization=self.org).order_by('po_number').first()
+        return [
+            '/api/v2/sales-orders/',
+            '/api/v2/order-items/',
+            '/api/v2/production-orders/',
+            '/api/v2/production-orders/?cursor=',
+            '/api/v2/production-orders/stats/',
+            '/api/v2/material-requirements/',
+            f'/api/v2/production-orders/{order.id}/',
+            f'/api/v2/material-requirements/{order.material_requirements.first().id}/',
+        ]
+
+    def test_endpoints_within_budget(self):
+        from apps.core.instrumentation import assert_within_budget
+
+        self._populate(8, 'QA')
+        for url in self._urls():
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            assert_within_budget(response)
+
+    def test_cursor_rejects_ordering(self):
+        self._populate(2, 'QA')
+        response = self.client.get('/api/v2/production-orders/?cursor=&ordering=po_number')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ordering', response.data)
+
+    def test_list_queries_do_not_grow_with_rows(self):
+        from apps.core.instrumentation import request_metrics
+
+        self._populate(4, 'QA')
+        urls = self._urls()
+        before = {url: request_metrics(self.client.get(url)).queries for url in urls}
+
+        self._populate(16, 'QB')
+        after = {url: request_metrics(self.client.get(url)).queries for url in urls}
+        self.assertEqual(after, before)
@@ -9,6 +9,7 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db import transaction
 
+from apps.core.pagination import KeysetPagination
 from .models import SalesOrder, SalesOrderItem, ProductionOrder, MaterialRequirement
 from .serializers import (
     SalesOrderSerializer,
@@ -25,13 +26,15 @@ from .services import MRPService
 
 
 class SalesOrderViewSet(viewsets.ModelViewSet):
-    queryset = SalesOrder.objects.all()
+    queryset = SalesOrder.objects.prefetch_related('items')
     serializer_class = SalesOrderSerializer
+    query_budgets = {'list': 5, 'retrieve': 5}
 
 
 class SalesOrderItemViewSet(viewsets.ModelViewSet):
     queryset = SalesOrderItem.objects.all()
     serializer_class = SalesOrderItemSerializer
+    query_budgets = {'list': 5, 'retrieve': 5}
 
 
 class ProductionOrderViewSet(viewsets.ModelViewSet):
@@ -60,6 +63,8 @@ class ProductionOrderViewSet(viewsets.ModelViewSet):
     search_fields = ['po_number', 'order_number', 'customer']
     ordering_fields = ['created_at', 'order_date', 'delivery_date', 'total_quantity']
     ordering = ['-created_at']
+    pagination_class = KeysetPagination
+    query_budgets = {'list': 6, 'retrieve': 5, 'stats': 6}
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -315,6 +320,12 @@ class ProductionOrderViewSet(viewsets.ModelViewSet):
             errors = []
             row_idx = 1
 
+            # 一次預留整份檔案的 order number，結束時歸還未使用的號碼
+            # （在各列 transaction 之外預留，單列 rollback 不影響區塊）
+            from apps.samples.services.auto_generation import get_sequence_block
+            order_numbers = get_sequence_block('ORD', ws.max_row - 1, organization=org)
+            order_numbers.reserve()
+
             for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
                 if not any(row):  # Skip empty rows
                     continue
@@ -419,11 +430,6 @@ class ProductionOrderViewSet(viewsets.ModelViewSet):
                         if color:
                             notes = f"Color: {color}\n{notes}" if notes else f"Color: {color}"
 
-                        # Generate order number
-                        from apps.samples.services.auto_generation import get_next_sequence
-                        seq = get_next_sequence('ORD')
-                        order_number = f"ORD-{datetime.now().strftime('%y%m')}-{seq:06d}"
-
                         # Check for duplicate PO number
                         if ProductionOrder.objects.filter(po_number=po_number).exists():
                             errors.append({
@@ -432,6 +438,10 @@ class ProductionOrderViewSet(viewsets.ModelViewSet):
                             })
                             continue
 
+                        # Generate order number (pre-allocated block, no MAX scan per row)
+                        seq = order_numbers.next()
+                        order_number = f"ORD-{datetime.now().strftime('%y%m')}-{seq:06d}"
+
                         # Create production order
                         order = ProductionOrder.objects.create(
                             organization=org,
@@ -468,6 +478,8 @@ class ProductionOrderViewSet(viewsets.ModelViewSet):
                         'error': str(e)
                     })
 
+            order_numbers.release()
+
             return Response({
                 'success': True,
                 'message': f'Imported {len(created_orders)} production order(s)',
@@ -499,6 +511,7 @@ class MaterialRequirementViewSet(viewsets.ModelViewSet):
     search_fields = ['material_name', 'material_name_zh', 'supplier']
     ordering_fields = ['category', 'material_name', 'total_requirement']
     ordering = ['category', 'material_name']
+    query_budgets = {'list': 5, 'retrieve': 5}
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -642,6 +655,7 @@ class MaterialRequirementViewSet(viewsets.ModelViewSet):
         """
         from django.utils import timezone
         from apps.procurement.models import PurchaseOrder, POLine, Supplier, Material
+        from apps.procurement.services.numbering import generate_po_number
         from apps.core.models import Organization
 
         requirement = self.get_object()
@@ -681,14 +695,9 @@ class MaterialRequirementViewSet(viewsets.ModelViewSet):
                     }
                 )
 
-                # Generate PO number
+                # Generate PO number (counter row lock, no count() scan)
                 now = timezone.now()
-                yymm = now.strftime('%y%m')
-                count = PurchaseOrder.objects.filter(
-                    organization=org,
-                    po_number__startswith=f'PO-{yymm}-'
-                ).count()
-                po_number = f'PO-{yymm}-{str(count + 1).zfill(4)}'
+                po_number = generate_po_number(org, now)
 
                 # Create PO
                 po = PurchaseOrder.objects.create(
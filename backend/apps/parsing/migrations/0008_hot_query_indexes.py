@@ -0,0 +1,19 @@
+# Generated by Django 4.2.8 on 2026-10-19 02:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("parsing", "0007_add_translation_status"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="draftblock",
+            index=models.Index(
+                fields=["page", "translation_status"],
+                name="draft_block_page_id_88c306_idx",
+            ),
+        ),
+    ]
@@ -248,6 +248,7 @@ class DraftBlock(models.Model):
         indexes = [
             models.Index(fields=['page', 'block_type']),
             models.Index(fields=['status']),
+            models.Index(fields=['page', 'translation_status']),  # 翻譯佇列 / 進度統計
         ]
 
     def __str__(self):
@@ -7,6 +7,7 @@ Uses GPT-4o Vision to intelligently extract BOM tables from PDF pages
 
 from openai import OpenAI
 from django.conf import settings
+from apps.core.instrumentation import track_external
 from decimal import Decimal, InvalidOperation
 from typing import List, Dict
 from apps.styles.models import StyleRevision, BOMItem
@@ -119,24 +120,25 @@ CRITICAL:
 """
 
     # 3. API 調用
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[{
-            "role": "user",
-            "content": [
-                {"type": "text", "text": prompt},
-                {
-                    "type": "image_url",
-                    "image_url": {
-                        "url": f"data:image/png;base64,{img_base64}",
-                        "detail": "high"
+    with track_external('openai'):
+        response = client.chat.completions.create(
+            model="gpt-4o",
+            messages=[{
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": prompt},
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": f"data:image/png;base64,{img_base64}",
+                            "detail": "high"
+                        }
                     }
-                }
-            ]
-        }],
-        max_tokens=4000,
-        temperature=0.1
-    )
+                ]
+            }],
+            max_tokens=4000,
+            temperature=0.1
+        )
 
     # 4. 解析回應
     result_text = response.choices[0].message.content
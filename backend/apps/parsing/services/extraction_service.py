@@ -111,6 +111,10 @@ def perform_extraction(doc: UploadedDocument, target_style_id: str = None) -> di
 
         logger.info(f"Created StyleRevision {style_revision.id} and TechPackRevision {tech_pack_revision.id} for Style {style.style_number}")
 
+        # Pre-render page images/tiles in the background for the review viewer
+        from apps.parsing.services.page_render_service import schedule_page_render
+        transaction.on_commit(lambda: schedule_page_render(tech_pack_revision.id))
+
         revision = style_revision
 
         # 2. Determine page types
@@ -5,6 +5,7 @@ Uses GPT-4o Vision to classify document content types and detect page numbers
 
 from openai import OpenAI
 from django.conf import settings
+from apps.core.instrumentation import track_external
 import pdfplumber
 import base64
 import io
@@ -221,12 +222,13 @@ Return ONLY a JSON array:
         })
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": content}],
-            max_tokens=2000,
-            temperature=0.1
-        )
+        with track_external('openai'):
+            response = client.chat.completions.create(
+                model="gpt-4o",
+                messages=[{"role": "user", "content": content}],
+                max_tokens=2000,
+                temperature=0.1
+            )
 
         # Parse response
         result_text = response.choices[0].message.content
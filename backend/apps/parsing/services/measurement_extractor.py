@@ -7,6 +7,7 @@ Uses GPT-4o Vision to extract measurement specifications from PDF tables
 
 from openai import OpenAI
 from django.conf import settings
+from apps.core.instrumentation import track_external
 from apps.styles.models import StyleRevision, Measurement
 import fitz  # PyMuPDF
 import base64
@@ -87,26 +88,27 @@ IMPORTANT:
 """
 
         # 3. API call
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": prompt},
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/png;base64,{img_base64}",
-                                "detail": "high"  # High detail for accurate table extraction
+        with track_external('openai'):
+            response = client.chat.completions.create(
+                model="gpt-4o",
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {"type": "text", "text": prompt},
+                            {
+                                "type": "image_url",
+                                "image_url": {
+                                    "url": f"data:image/png;base64,{img_base64}",
+                                    "detail": "high"  # High detail for accurate table extraction
+                                }
                             }
-                        }
-                    ]
-                }
-            ],
-            max_tokens=4000,
-            temperature=0.1
-        )
+                        ]
+                    }
+                ],
+                max_tokens=4000,
+                temperature=0.1
+            )
 
         # 4. Parse response
         result_text = response.choices[0].message.content
@@ -0,0 +1,343 @@
+"""
+Tech Pack Page Render Service
+PDF 頁面預先渲染（固定縮放等級 + 瓦片金字塔），存放在 object storage
+
+- 上傳/解析後由 Celery 背景渲染所有頁面，Review UI 不再同步 render
+- 任意 scale 會對齊到最近的固定等級，快取命中率穩定
+- 同一個 PDF 的渲染結果不會改變 → strong ETag + immutable cache headers
+
+Storage 結構（default_storage，production 為 R2）：
+    page_renders/{revision_id}/{render_version}/{level}/p{page}.{fmt}
+    page_renders/{revision_id}/{render_version}/{level}/p{page}/{row}_{col}.{fmt}
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+from io import BytesIO
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+logger = logging.getLogger(__name__)
+
+# 固定縮放等級（page_image 的 scale 參數範圍 0.5-3.0）
+ZOOM_LEVELS = (0.5, 1.0, 1.5, 2.0, 3.0)
+DEFAULT_SCALE = 1.5
+
+TILE_SIZE = 512
+
+# 渲染邏輯改變時遞增，讓舊的 storage 物件與 ETag 失效
+RENDER_VERSION = 1
+
+STORAGE_PREFIX = 'page_renders'
+
+# 「已渲染」標記的快取時間：storage 物件被清除後最多這麼久會重新檢查
+RENDERED_CACHE_TIMEOUT = 60 * 60
+
+CONTENT_TYPES = {
+    'webp': 'image/webp',
+    'png': 'image/png',
+}
+
+
+def get_render_format() -> str:
+    """輸出格式：settings.PAGE_RENDER_FORMAT，Pillow 不支援 WebP 時回退 PNG"""
+    fmt = getattr(settings, 'PAGE_RENDER_FORMAT', 'webp')
+    if fmt == 'webp':
+        from PIL import features
+        if not features.check('webp'):
+            return 'png'
+    return fmt if fmt in CONTENT_TYPES else 'png'
+
+
+def snap_scale(scale: float) -> float:
+    """將任意 scale 對齊到最近的固定縮放等級"""
+    return min(ZOOM_LEVELS, key=lambda level: (abs(level - scale), level))
+
+
+def _level_dir(revision_id, level: float) -> str:
+    return f"{STORAGE_PREFIX}/{revision_id}/v{RENDER_VERSION}/{level:g}"
+
+
+def page_image_name(revision_id, page_num: int, level: float, fmt: str) -> str:
+    return f"{_level_dir(revision_id, level)}/p{page_num}.{fmt}"
+
+
+def tile_name(revision_id, page_num: int, level: float, row: int, col: int, fmt: str) -> str:
+    return f"{_level_dir(revision_id, level)}/p{page_num}/{row}_{col}.{fmt}"
+
+
+def compute_etag(revision, page_num: int, level: float, fmt: str, tile: Optional[Tuple[int, int]] = None) -> str:
+    """
+    Strong ETag（不需讀取圖片內容）
+
+    Revision PDF 上傳後不可變，所以 (file, page, level, format, render version)
+    即可唯一決定輸出內容。
+    """
+    parts = [str(revision.id), revision.file.name, str(page_num), f"{level:g}", fmt, str(RENDER_VERSION)]
+    if tile is not None:
+        parts.append(f"{tile[0]}_{tile[1]}")
+    return '"' + hashlib.sha1(':'.join(parts).encode()).hexdigest() + '"'
+
+
+def tile_grid(width: int, height: int, level: float) -> Tuple[int, int]:
+    """回傳 (rows, cols)；width/height 為 PDF points"""
+    px_w = int(width * level)
+    px_h = int(height * level)
+    return (max(1, -(-px_h // TILE_SIZE)), max(1, -(-px_w // TILE_SIZE)))
+
+
+def tile_manifest(revision, page) -> Dict:
+    """
+    單頁的瓦片資訊（給前端 viewer 使用）
+
+    Args:
+        revision: Revision instance
+        page: RevisionPage instance
+    """
+    fmt = get_render_format()
+    levels = []
+    for level in ZOOM_LEVELS:
+        rows, cols = tile_grid(page.width, page.height, level)
+        levels.append({
+            'scale': level,
+            'width': int(page.width * level),
+            'height': int(page.height * level),
+            'rows': rows,
+            'cols': cols,
+        })
+    return {
+        'page_number': page.page_number,
+        'tile_size': TILE_SIZE,
+        'format': fmt,
+        'levels': levels,
+    }
+
+
+def _local_pdf_path(field_file) -> Tuple[str, Optional[str]]:
+    """取得本機路徑；R2/S3 時下載到暫存檔（呼叫端負責刪除）"""
+    try:
+        return field_file.path, None
+    except NotImplementedError:
+        ext = os.path.splitext(field_file.name)[1] or '.pdf'
+        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=ext)
+        field_file.seek(0)
+        tmp.write(field_file.read())
+        tmp.close()
+        return tmp.name, tmp.name
+
+
+def _encode(image, fmt: str) -> bytes:
+    buf = BytesIO()
+    if fmt == 'webp':
+        image.save(buf, format='WEBP', quality=85, method=4)
+    else:
+        image.save(buf, format='PNG', optimize=False)
+    return buf.getvalue()
+
+
+def _save(name: str, data: bytes, overwrite: bool = False):
+    """
+    寫入 storage，不先刪除（避免讀取端在 delete 與 save 之間拿到 404）
+
+    - 已存在且 overwrite=False：略過（同一 RENDER_VERSION 的輸出固定，內容相同）
+    - overwrite（force 重新渲染）：S3/R2 的 PUT 直接覆寫；本機檔案先寫暫存檔再 os.replace
+    """
+    if not default_storage.exists(name):
+        default_storage.save(name, ContentFile(data))
+        return
+    if not overwrite:
+        return
+    if getattr(default_storage, 'file_overwrite', False):
+        default_storage.save(name, ContentFile(data))
+        return
+
+    path = default_storage.path(name)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _render_page_level(pdf_doc, revision_id, page_num: int, level: float, fmt: str, with_tiles: bool,
+                       overwrite: bool = False) -> bytes:
+    import fitz  # PyMuPDF
+    from PIL import Image
+
+    page = pdf_doc.load_page(page_num - 1)
+    pix = page.get_pixmap(matrix=fitz.Matrix(level, level), alpha=False)
+    image = Image.frombytes('RGB', (pix.width, pix.height), pix.samples)
+
+    data = _encode(image, fmt)
+    _save(page_image_name(revision_id, page_num, level, fmt), data, overwrite)
+
+    if with_tiles:
+        # 反向寫入：0_0 最後寫入，作為整組瓦片完成的標記（見 is_rendered）
+        positions = [
+            (top, left)
+            for top in range(0, pix.height, TILE_SIZE)
+            for left in range(0, pix.width, TILE_SIZE)
+        ]
+        for top, left in reversed(positions):
+            tile = image.crop((left, top, min(left + TILE_SIZE, pix.width), min(top + TILE_SIZE, pix.height)))
+            _save(
+                tile_name(revision_id, page_num, level, top // TILE_SIZE, left // TILE_SIZE, fmt),
+                _encode(tile, fmt),
+                overwrite,
+            )
+
+    cache.set(_rendered_key(revision_id, page_num, level, fmt, tiles=False), True, RENDERED_CACHE_TIMEOUT)
+    if with_tiles:
+        cache.set(_rendered_key(revision_id, page_num, level, fmt, tiles=True), True, RENDERED_CACHE_TIMEOUT)
+    return data
+
+
+def _rendered_key(revision_id, page_num: int, level: float, fmt: str, tiles: bool) -> str:
+    suffix = ':tiles' if tiles else ''
+    return f"page_render:{revision_id}:v{RENDER_VERSION}:{page_num}:{level:g}:{fmt}{suffix}"
+
+
+def is_rendered(revision_id, page_num: int, level: float, fmt: str, tiles: bool = False) -> bool:
+    """
+    頁面（及瓦片）是否已渲染
+
+    先查 cache（有限 TTL），避免每次都對 R2 發 HEAD；瓦片以第一塊是否存在判斷。
+    """
+    key = _rendered_key(revision_id, page_num, level, fmt, tiles)
+    if cache.get(key):
+        return True
+    name = page_image_name(revision_id, page_num, level, fmt)
+    if tiles:
+        name = tile_name(revision_id, page_num, level, 0, 0, fmt)
+    if default_storage.exists(name):
+        cache.set(key, True, RENDERED_CACHE_TIMEOUT)
+        return True
+    return False
+
+
+def _forget_rendered(revision_id, page_num: int, level: float, fmt: str):
+    """storage 物件已不存在：清除標記，下次重新檢查 / 渲染"""
+    cache.delete_many([
+        _rendered_key(revision_id, page_num, level, fmt, tiles=False),
+        _rendered_key(revision_id, page_num, level, fmt, tiles=True),
+    ])
+
+
+def render_revision_pages(
+    revision,
+    levels: Optional[List[float]] = None,
+    pages: Optional[List[int]] = None,
+    with_tiles: bool = True,
+    force: bool = False,
+) -> Dict:
+    """
+    預先渲染 Revision 的所有頁面（背景任務使用）
+
+    PDF 只下載/開啟一次，依序渲染每頁的每個縮放等級。
+
+    Returns:
+        {'pages': int, 'rendered': int, 'skipped': int}
+    """
+    import fitz  # PyMuPDF
+
+    levels = list(levels or ZOOM_LEVELS)
+    fmt = get_render_format()
+    stats = {'pages': 0, 'rendered': 0, 'skipped': 0}
+
+    local_path, temp_file = _local_pdf_path(revision.file)
+    try:
+        pdf_doc = fitz.open(local_path)
+        try:
+            page_numbers = pages or range(1, pdf_doc.page_count + 1)
+            for page_num in page_numbers:
+                stats['pages'] += 1
+                for level in levels:
+                    if not force and is_rendered(revision.id, page_num, level, fmt, tiles=with_tiles):
+                        stats['skipped'] += 1
+                        continue
+                    _render_page_level(pdf_doc, revision.id, page_num, level, fmt, with_tiles, overwrite=force)
+                    stats['rendered'] += 1
+        finally:
+            pdf_doc.close()
+    finally:
+        if temp_file:
+            try:
+                os.unlink(temp_file)
+            except OSError:
+                pass
+
+    logger.info(f"Pre-rendered revision {revision.id}: {stats}")
+    return stats
+
+
+def get_page_image(revision, page_num: int, level: float) -> Tuple[bytes, str]:
+    """
+    讀取預先渲染的頁面；尚未渲染時同步渲染單一頁面/等級並存入 storage
+
+    Returns:
+        (image bytes, content type)
+    """
+    fmt = get_render_format()
+    name = page_image_name(revision.id, page_num, level, fmt)
+
+    if is_rendered(revision.id, page_num, level, fmt):
+        try:
+            with default_storage.open(name, 'rb') as f:
+                return f.read(), CONTENT_TYPES[fmt]
+        except OSError:
+            # 快取標記過期（物件已從 storage 刪除）→ 重新渲染
+            logger.warning(f"Pre-rendered page missing from storage: {name}")
+            _forget_rendered(revision.id, page_num, level, fmt)
+
+    import fitz  # PyMuPDF
+
+    local_path, temp_file = _local_pdf_path(revision.file)
+    try:
+        pdf_doc = fitz.open(local_path)
+        try:
+            # 瓦片交給背景任務，請求中只渲染整頁
+            data = _render_page_level(pdf_doc, revision.id, page_num, level, fmt, with_tiles=False)
+        finally:
+            pdf_doc.close()
+    finally:
+        if temp_file:
+            try:
+                os.unlink(temp_file)
+            except OSError:
+                pass
+
+    return data, CONTENT_TYPES[fmt]
+
+
+def get_page_tile(revision, page_num: int, level: float, row: int, col: int) -> Optional[Tuple[bytes, str]]:
+    """讀取瓦片；尚未渲染時回傳 None"""
+    fmt = get_render_format()
+    name = tile_name(revision.id, page_num, level, row, col, fmt)
+    if not default_storage.exists(name):
+        return None
+    try:
+        with default_storage.open(name, 'rb') as f:
+            return f.read(), CONTENT_TYPES[fmt]
+    except OSError:
+        _forget_rendered(revision.id, page_num, level, fmt)
+        return None
+
+
+def schedule_page_render(revision_id):
+    """派送背景預先渲染任務（broker 不可用時只記錄，不影響上傳流程）"""
+    from ..tasks._main import render_revision_pages_task
+
+    try:
+        render_revision_pages_task.delay(str(revision_id))
+    except Exception as e:
+        logger.warning(f"Failed to dispatch page render task for revision {revision_id}: {e}")
@@ -11,12 +11,13 @@ Tech Pack 雙語 PDF 匯出服務
 
 from django.http import HttpResponse
 import fitz  # PyMuPDF
-import os
 from pathlib import Path
 import logging
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 from io import BytesIO
-from typing import Literal, Optional, List, Tuple
+from typing import Literal, List, Tuple
+
+from apps.core.fonts import get_font_registry
 
 logger = logging.getLogger(__name__)
 
@@ -24,30 +25,6 @@ logger = logging.getLogger(__name__)
 ExportMode = Literal["side_by_side", "alternating", "overlay_offset", "overlay_background"]
 
 
-def find_chinese_font() -> Optional[str]:
-    """
-    查找可用的中文字體（Pillow 使用）
-    優先順序：微軟雅黑 > 黑體 > 宋體（避免 simsunb 字符不全）
-    """
-    font_paths = [
-        "C:/Windows/Fonts/msyh.ttc",      # 微軟雅黑（最完整）
-        "C:/Windows/Fonts/msyh.ttf",      # 微軟雅黑 TTF
-        "C:/Windows/Fonts/simhei.ttf",    # 黑體
-        "C:/Windows/Fonts/simsun.ttc",    # 宋體
-        # Linux 字體路徑
-        "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
-        "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
-    ]
-
-    for font_path in font_paths:
-        if os.path.exists(font_path):
-            logger.info(f"Found Chinese font for Pillow: {font_path}")
-            return font_path
-
-    logger.error("No Chinese TTF font found!")
-    return None
-
-
 class TechPackBilingualPDFExporter:
     """
     Export Tech Pack with bilingual translation
@@ -81,14 +58,11 @@ class TechPackBilingualPDFExporter:
         self.translation_color = translation_color
         self.separator_color = separator_color
 
-        # 加載字體
-        self.chinese_font_path = find_chinese_font()
-        if not self.chinese_font_path:
-            raise Exception("Chinese font not found.")
-
-        self.pil_font = ImageFont.truetype(self.chinese_font_path, self.font_size)
-        self.pil_font_small = ImageFont.truetype(self.chinese_font_path, max(12, self.font_size - 4))
-        self.pil_font_title = ImageFont.truetype(self.chinese_font_path, self.font_size + 4)
+        # 加載字體（FontRegistry 共用快取）
+        fonts = get_font_registry()
+        self.pil_font = fonts.pil_font(self.font_size)
+        self.pil_font_small = fonts.pil_font(max(12, self.font_size - 4))
+        self.pil_font_title = fonts.pil_font(self.font_size + 4)
 
         logger.info(f"TechPackBilingualPDFExporter initialized: mode={mode}, font_size={font_size}")
 
@@ -683,25 +657,23 @@ def export_techpack_from_run_snapshot(tech_pack_revision, run_pages) -> bytes:
     """
     使用 Run 的快照數據渲染 Tech Pack PDF
 
-    這個函數使用 RunTechPackBlock 的數據（包括用戶調整的 overlay 位置），
+    這個函數使用 Run 快照的數據（包括用戶調整的 overlay 位置），
     而不是直接使用 DraftBlock。這樣每個 Run 可以有獨立的翻譯和位置設定。
 
     Args:
         tech_pack_revision: 原始 TechPackRevision（用於獲取 PDF 文件）
-        run_pages: RunTechPackPage QuerySet（包含快照數據）
+        run_pages: samples.services.techpack_snapshot.resolve_run_techpack() 的結果
+                   （ResolvedPage 列表，blocks 已套用 overrides 並排序）
 
     Returns:
         bytes: PDF 文件的字節數據
     """
-    # 載入字體
-    chinese_font_path = find_chinese_font()
-    if not chinese_font_path:
-        raise Exception("Chinese font not found.")
-
+    # 載入字體（FontRegistry 共用快取）
+    fonts = get_font_registry()
     font_size = 20
-    pil_font = ImageFont.truetype(chinese_font_path, font_size)
-    pil_font_small = ImageFont.truetype(chinese_font_path, max(12, font_size - 4))
-    pil_font_title = ImageFont.truetype(chinese_font_path, font_size + 4)
+    pil_font = fonts.pil_font(font_size)
+    pil_font_small = fonts.pil_font(max(12, font_size - 4))
+    pil_font_title = fonts.pil_font(font_size + 4)
 
     translation_color = (0, 51, 153)  # 深藍色
 
@@ -729,10 +701,7 @@ def export_techpack_from_run_snapshot(tech_pack_revision, run_pages) -> bytes:
 
         # 獲取該頁的快照 blocks
         run_page = run_pages_dict.get(page_num)
-        if run_page:
-            blocks = run_page.blocks.all().order_by('bbox_y', 'bbox_x')
-        else:
-            blocks = []
+        blocks = run_page.blocks if run_page else []
 
         # 用於 fallback 的追蹤
         has_any_valid_overlay = False
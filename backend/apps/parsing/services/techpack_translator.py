@@ -5,6 +5,7 @@ TechPack Translator Service
 
 import logging
 from django.utils import timezone
+from apps.core.on_commit import defer_on_commit
 from apps.parsing.models_blocks import DraftBlock, Revision
 from apps.parsing.utils.translate import batch_translate
 
@@ -83,17 +84,18 @@ def translate_draft_blocks(revision_id: str, force: bool = False) -> dict:
         skipped_count = 0
         errors = []
 
-        for block in blocks:
-            try:
-                if block.source_text in translation_map:
-                    block.translated_text = translation_map[block.source_text]
-                    block.status = 'auto'
-                    block.save(update_fields=['translated_text', 'status', 'updated_at'])
-                    translated_count += 1
-                else:
-                    skipped_count += 1
-            except Exception as e:
-                errors.append(f"DraftBlock {block.id}: {str(e)}")
+        with defer_on_commit():
+            for block in blocks:
+                try:
+                    if block.source_text in translation_map:
+                        block.translated_text = translation_map[block.source_text]
+                        block.status = 'auto'
+                        block.save(update_fields=['translated_text', 'status', 'updated_at'])
+                        translated_count += 1
+                    else:
+                        skipped_count += 1
+                except Exception as e:
+                    errors.append(f"DraftBlock {block.id}: {str(e)}")
 
         logger.info(f"Translation completed: {translated_count} translated, {skipped_count} skipped")
 
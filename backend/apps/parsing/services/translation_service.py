@@ -13,7 +13,9 @@ from typing import List, Optional
 from django.db import transaction
 
 from apps.parsing.models_blocks import DraftBlock, RevisionPage, Revision as TechPackRevision
+from apps.core.on_commit import defer_on_commit
 from apps.parsing.utils.translate import batch_translate, machine_translate
+from apps.styles.style_status import schedule_style_status_refresh
 
 logger = logging.getLogger(__name__)
 
@@ -97,6 +99,8 @@ def translate_page(page: RevisionPage, force: bool = False) -> dict:
             translation_status='failed',
             translation_error=str(e)
         )
+        # queryset.update() 不觸發 signals
+        schedule_style_status_refresh('page', [page.id])
         return {'total': len(blocks), 'success': 0, 'failed': len(blocks)}
 
     # 更新翻譯結果
@@ -150,13 +154,14 @@ def translate_document(revision: TechPackRevision, mode: str = 'missing_only') -
 
     force = mode == 'all'
 
-    for page in pages:
-        stats = translate_page(page, force=force)
-        total_stats['total'] += stats['total']
-        total_stats['success'] += stats['success']
-        total_stats['failed'] += stats['failed']
-        if stats['total'] > 0:
-            total_stats['pages'] += 1
+    with defer_on_commit():
+        for page in pages:
+            stats = translate_page(page, force=force)
+            total_stats['total'] += stats['total']
+            total_stats['success'] += stats['success']
+            total_stats['failed'] += stats['failed']
+            if stats['total'] > 0:
+                total_stats['pages'] += 1
 
     logger.info(f"Document {revision.id} translation completed: {total_stats}")
 
@@ -190,49 +195,50 @@ def retry_failed_blocks(revision: TechPackRevision) -> dict:
     success_count = 0
     failed_count = 0
 
-    for page in pages_with_failed:
-        blocks = list(page.blocks.filter(
-            translation_status='failed',
-            translation_retry_count__lt=MAX_RETRY_COUNT
-        ))
-
-        if not blocks:
-            continue
-
-        # 增加重試次數
-        for b in blocks:
-            b.translation_retry_count += 1
-            b.save(update_fields=['translation_retry_count'])
-
-        # 批量翻譯
-        texts = [b.source_text for b in blocks]
-
-        try:
-            translations = batch_translate(texts)
-
-            for i, block in enumerate(blocks):
-                translation = translations[i] if i < len(translations) else ''
-
-                if translation:
-                    block.translated_text = translation
-                    block.translation_status = 'done'
-                    block.translation_error = None
-                    success_count += 1
-                else:
+    with defer_on_commit():
+        for page in pages_with_failed:
+            blocks = list(page.blocks.filter(
+                translation_status='failed',
+                translation_retry_count__lt=MAX_RETRY_COUNT
+            ))
+
+            if not blocks:
+                continue
+
+            # 增加重試次數
+            for b in blocks:
+                b.translation_retry_count += 1
+                b.save(update_fields=['translation_retry_count'])
+
+            # 批量翻譯
+            texts = [b.source_text for b in blocks]
+
+            try:
+                translations = batch_translate(texts)
+
+                for i, block in enumerate(blocks):
+                    translation = translations[i] if i < len(translations) else ''
+
+                    if translation:
+                        block.translated_text = translation
+                        block.translation_status = 'done'
+                        block.translation_error = None
+                        success_count += 1
+                    else:
+                        block.translation_status = 'failed'
+                        block.translation_error = 'Empty translation on retry'
+                        failed_count += 1
+
+                    block.save(update_fields=['translated_text', 'translation_status', 'translation_error', 'updated_at'])
+
+            except Exception as e:
+                logger.error(f"Retry batch translation failed: {e}")
+                for block in blocks:
                     block.translation_status = 'failed'
-                    block.translation_error = 'Empty translation on retry'
+                    block.translation_error = str(e)
+                    block.save(update_fields=['translation_status', 'translation_error', 'updated_at'])
                     failed_count += 1
 
-                block.save(update_fields=['translated_text', 'translation_status', 'translation_error', 'updated_at'])
-
-        except Exception as e:
-            logger.error(f"Retry batch translation failed: {e}")
-            for block in blocks:
-                block.translation_status = 'failed'
-                block.translation_error = str(e)
-                block.save(update_fields=['translation_status', 'translation_error', 'updated_at'])
-                failed_count += 1
-
     return {
         'total': total,
         'success': success_count,
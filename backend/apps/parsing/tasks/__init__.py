@@ -9,6 +9,7 @@ from ._main import (
     generate_stub_extraction_data,
     classify_document_task,
     extract_document_task,
+    render_revision_pages_task,
 )
 
 __all__ = [
@@ -16,4 +17,5 @@ __all__ = [
     'generate_stub_extraction_data',
     'classify_document_task',
     'extract_document_task',
+    'render_revision_pages_task',
 ]
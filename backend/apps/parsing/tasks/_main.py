@@ -689,4 +689,49 @@ def retry_failed_translations_task(self, revision_id: str) -> dict:
             'status': 'error',
             'revision_id': revision_id,
             'error': str(e)
-        }
\ No newline at end of file
+        }
+
+# =============================================================================
+# Page Pre-rendering (Tech Pack viewer tiles)
+# =============================================================================
+
+@shared_task(bind=True, max_retries=1, time_limit=1800, soft_time_limit=1700)
+def render_revision_pages_task(self, revision_id: str, force: bool = False) -> dict:
+    """
+    Async task: Pre-render all pages of a Tech Pack Revision
+
+    Renders each page at every fixed zoom level (plus tiles) into object
+    storage so the review UI never renders synchronously.
+
+    Returns:
+        dict: {'status': 'success' | 'error', 'revision_id': str, 'stats': dict | None}
+    """
+    import logging
+    from ..models_blocks import Revision
+    from ..services.page_render_service import render_revision_pages
+
+    logger = logging.getLogger(__name__)
+
+    try:
+        revision = Revision.objects.get(pk=revision_id)
+        stats = render_revision_pages(revision, force=force)
+        return {
+            'status': 'success',
+            'revision_id': revision_id,
+            'stats': stats,
+        }
+    except Revision.DoesNotExist:
+        return {
+            'status': 'error',
+            'revision_id': revision_id,
+            'error': f'Revision {revision_id} not found'
+        }
+    except Exception as e:
+        logger.error(f"[Async] Page render failed for {revision_id}: {str(e)}", exc_info=True)
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e)
+        return {
+            'status': 'error',
+            'revision_id': revision_id,
+            'error': str(e)
+        }
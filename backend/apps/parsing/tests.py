@@ -221,3 +221,152 @@ class TestSameOrgAllowed:
         # Verify style_id was passed through
         call_kwargs = mock_extract.call_args
         assert str(style_a.id) in str(call_kwargs)
+
+
+# ==================== Page pre-rendering ====================
+
+@pytest.fixture
+def render_storage(settings, tmp_path):
+    """本機 storage 放到 tmp_path，輸出固定為 PNG"""
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.PAGE_RENDER_FORMAT = "png"
+    return tmp_path
+
+
+@pytest.fixture
+def pdf_revision(render_storage):
+    import fitz
+    from django.core.files.base import ContentFile
+    from apps.parsing.models_blocks import Revision, RevisionPage
+
+    doc = fitz.open()
+    page = doc.new_page(width=600, height=400)
+    page.insert_text((72, 72), "Tech Pack page 1")
+    revision = Revision(filename="tp.pdf", page_count=1)
+    revision.file.save("tp.pdf", ContentFile(doc.tobytes()), save=False)
+    revision.save()
+    doc.close()
+    RevisionPage.objects.create(revision=revision, page_number=1, width=600, height=400)
+    return revision
+
+
+def _stored_files(root):
+    return sorted(p.relative_to(root).as_posix() for p in root.rglob("*") if p.is_file() and "page_renders" in p.parts)
+
+
+class TestPageRenderService:
+
+    def test_prerender_writes_levels_and_tiles_once(self, pdf_revision, render_storage):
+        from django.core.files.storage import default_storage
+        from apps.parsing.services.page_render_service import (
+            page_image_name, render_revision_pages, tile_name,
+        )
+
+        stats = render_revision_pages(pdf_revision, levels=[1.0, 2.0])
+        assert stats == {"pages": 1, "rendered": 2, "skipped": 0}
+        assert default_storage.exists(page_image_name(pdf_revision.id, 1, 2.0, "png"))
+        # 600×400 pt @2x = 1200×800 px → 2 rows × 3 cols
+        assert default_storage.exists(tile_name(pdf_revision.id, 1, 2.0, 1, 2, "png"))
+
+        assert render_revision_pages(pdf_revision, levels=[1.0, 2.0]) == {"pages": 1, "rendered": 0, "skipped": 2}
+
+    def test_force_rerender_overwrites_in_place(self, pdf_revision, render_storage):
+        from apps.parsing.services.page_render_service import render_revision_pages
+
+        render_revision_pages(pdf_revision, levels=[1.0])
+        files = _stored_files(render_storage)
+
+        stats = render_revision_pages(pdf_revision, levels=[1.0], force=True)
+
+        assert stats["rendered"] == 1
+        # 不產生 storage 的替代檔名，也不留下暫存檔
+        assert _stored_files(render_storage) == files
+
+    def test_page_image_rerenders_when_storage_object_is_gone(self, pdf_revision):
+        from django.core.files.storage import default_storage
+        from apps.parsing.services.page_render_service import get_page_image, page_image_name
+
+        data, content_type = get_page_image(pdf_revision, 1, 1.0)
+        assert content_type == "image/png" and data
+
+        # 快取仍標記為已渲染，但物件已被清除
+        default_storage.delete(page_image_name(pdf_revision.id, 1, 1.0, "png"))
+
+        assert get_page_image(pdf_revision, 1, 1.0) == (data, "image/png")
+        assert default_storage.exists(page_image_name(pdf_revision.id, 1, 1.0, "png"))
+
+    def test_rendered_flag_uses_finite_ttl(self, pdf_revision):
+        from apps.parsing.services import page_render_service
+
+        page_render_service.render_revision_pages(pdf_revision, levels=[1.0], with_tiles=False)
+        page_render_service.cache.clear()
+
+        with patch.object(page_render_service.cache, "set") as cache_set:
+            assert page_render_service.is_rendered(pdf_revision.id, 1, 1.0, "png")
+
+        timeout = cache_set.call_args.args[2]
+        assert timeout == page_render_service.RENDERED_CACHE_TIMEOUT and timeout > 0
+
+    def test_render_task(self, pdf_revision):
+        from apps.parsing.tasks._main import render_revision_pages_task
+
+        result = render_revision_pages_task.apply(args=[str(pdf_revision.id)]).get()
+        assert result["status"] == "success"
+        assert result["stats"]["rendered"] == 5
+
+        missing = render_revision_pages_task.apply(args=[str(uuid.uuid4())]).get()
+        assert missing["status"] == "error"
+
+
+class TestPageRenderEndpoints:
+
+    def test_page_image_etag(self, auth_client, pdf_revision):
+        url = f"/api/v2/revisions/{pdf_revision.id}/page-image/1/?scale=1.1"
+        response = auth_client.get(url)
+        assert response.status_code == 200
+        assert response["Content-Type"] == "image/png"
+        assert "immutable" in response["Cache-Control"]
+
+        cached = auth_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        assert cached.status_code == 304
+
+        assert auth_client.get(f"/api/v2/revisions/{pdf_revision.id}/page-image/2/").status_code == 400
+
+    def test_page_tiles_manifest(self, auth_client, pdf_revision):
+        response = auth_client.get(f"/api/v2/revisions/{pdf_revision.id}/page-tiles/1/")
+        assert response.status_code == 200
+        level = next(level for level in response.data["levels"] if level["scale"] == 2.0)
+        assert (level["rows"], level["cols"]) == (2, 3)
+
+        assert auth_client.get(f"/api/v2/revisions/{pdf_revision.id}/page-tiles/9/").status_code == 404
+
+    def test_page_tile(self, auth_client, pdf_revision):
+        from apps.parsing.services.page_render_service import render_revision_pages
+
+        url = f"/api/v2/revisions/{pdf_revision.id}/page-tiles/1/1.0/0/1/"
+        assert auth_client.get(url).status_code == 404
+
+        render_revision_pages(pdf_revision, levels=[1.0])
+        response = auth_client.get(url)
+        assert response.status_code == 200
+        assert response["Content-Type"] == "image/png"
+        assert auth_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code == 304
+
+    def test_page_tile_invalid_scale(self, auth_client, pdf_revision):
+        response = auth_client.get(f"/api/v2/revisions/{pdf_revision.id}/page-tiles/1/1.2.3/0/0/")
+        assert response.status_code == 400
+
+    @patch("apps.parsing.tasks._main.render_revision_pages_task.delay")
+    def test_prerender_pages(self, mock_delay, auth_client, pdf_revision):
+        mock_delay.return_value = MagicMock(id="task-1")
+
+        response = auth_client.post(f"/api/v2/revisions/{pdf_revision.id}/prerender-pages/", {"force": True}, format="json")
+
+        assert response.status_code == 202
+        assert response.data == {"task_id": "task-1", "status": "pending"}
+        mock_delay.assert_called_once_with(str(pdf_revision.id), force=True)
+
+    @patch("apps.parsing.tasks._main.render_revision_pages_task.delay", side_effect=ConnectionError("no broker"))
+    def test_prerender_pages_broker_down(self, mock_delay, auth_client, pdf_revision):
+        response = auth_client.post(f"/api/v2/revisions/{pdf_revision.id}/prerender-pages/")
+        assert response.status_code == 500
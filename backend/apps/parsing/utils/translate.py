@@ -12,6 +12,8 @@ import os
 from pathlib import Path
 from typing import Optional
 
+from apps.core.instrumentation import track_external
+
 
 # ============ Glossary Service ============
 
@@ -220,15 +222,16 @@ def machine_translate(text: str, use_glossary: bool = True) -> str:
             terms_str = "\n".join([f"- {t['english']} = {t['chinese']}" for t in relevant_terms])
             system_prompt += f"\n\nReference glossary (use these translations when applicable):\n{terms_str}"
 
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": text}
-            ],
-            temperature=0.3,  # 降低隨機性，提高一致性
-            max_tokens=200
-        )
+        with track_external('openai'):
+            response = client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": text}
+                ],
+                temperature=0.3,  # 降低隨機性，提高一致性
+                max_tokens=200
+            )
         return response.choices[0].message.content.strip()
     except Exception as e:
         # 翻譯失敗，回傳原文
@@ -316,15 +319,16 @@ Rules:
 - Preserve formatting
 - Return ONLY the JSON array"""
 
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=4000  # 增加 token 限制以支持批量
-        )
+        with track_external('openai'):
+            response = client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,
+                max_tokens=4000  # 增加 token 限制以支持批量
+            )
 
         # 解析回應
         result_text = response.choices[0].message.content.strip()
@@ -8,6 +8,7 @@ Vision LLM - Extract text from Tech Pack images (including annotations)
 import base64
 from openai import OpenAI
 from django.conf import settings
+from apps.core.instrumentation import track_external
 import pdfplumber
 import fitz  # PyMuPDF
 from typing import List, Dict
@@ -124,24 +125,25 @@ Types:
 
 Return ONLY JSON, no explanation. Extract everything you can read."""
 
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": prompt},
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/png;base64,{img_base64}",
-                            "detail": "high"  # 2026-01-10: 改用 high detail 提升準確度
+        with track_external('openai'):
+            response = client.chat.completions.create(
+                model="gpt-4o",
+                messages=[{
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": prompt},
+                        {
+                            "type": "image_url",
+                            "image_url": {
+                                "url": f"data:image/png;base64,{img_base64}",
+                                "detail": "high"  # 2026-01-10: 改用 high detail 提升準確度
+                            }
                         }
-                    }
-                ]
-            }],
-            max_tokens=4000,  # 增加 token 限制
-            temperature=0.1
-        )
+                    ]
+                }],
+                max_tokens=4000,  # 增加 token 限制
+                temperature=0.1
+            )
 
         result_text = response.choices[0].message.content
 
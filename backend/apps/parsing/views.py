@@ -3,6 +3,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 from django.core.files.storage import default_storage
+from django.utils import timezone
 from celery.result import AsyncResult
 from .models import ExtractionRun, DraftReviewItem, UploadedDocument
 from .models_blocks import Revision, RevisionPage, DraftBlock, DraftBlockHistory
@@ -20,6 +21,7 @@ from .serializers import (
 )
 from .services import classify_document
 from .tasks import classify_document_task, extract_document_task
+from apps.core.bulk import bulk_update_by_pk
 import os
 import logging
 
@@ -317,19 +319,20 @@ class RevisionViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=True, methods=["get"], url_path="page-image/(?P<page_num>[0-9]+)")
     def page_image(self, request, pk=None, page_num=None):
         """
-        Render a PDF page as a PNG image
+        Render a PDF page as an image (pre-rendered zoom levels)
 
         GET /api/v2/revisions/{id}/page-image/{page_num}/
 
         Query params:
-        - scale: Image scale factor (0.5-3.0, default 1.5)
+        - scale: Image scale factor (0.5-3.0, default 1.5)，對齊到最近的固定等級
 
         Returns:
-            PNG image (image/png)
+            WebP/PNG image with strong ETag; 304 when If-None-Match matches
         """
-        import fitz  # PyMuPDF
-        from django.http import HttpResponse
-        import io
+        from django.http import HttpResponse, HttpResponseNotModified
+        from .services.page_render_service import (
+            DEFAULT_SCALE, snap_scale, compute_etag, get_render_format, get_page_image,
+        )
 
         revision = self.get_object()
         page_num = int(page_num)
@@ -341,63 +344,21 @@ class RevisionViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Get scale parameter
-        scale = float(request.query_params.get('scale', 1.5))
-        scale = max(0.5, min(3.0, scale))  # Clamp to 0.5-3.0
-
         try:
-            import os as _os, tempfile as _tempfile
-
-            # Try Redis cache (gracefully skip if Redis unavailable)
-            img_data = None
-            cache_key = f"page_img:{pk}:{page_num}:{scale}"
-            try:
-                from django.core.cache import cache
-                img_data = cache.get(cache_key)
-            except Exception:
-                pass  # Redis not configured — render without cache
-
-            if img_data is None:
-                # Cache miss → download PDF from R2/local and render
-                def _get_local_path(f):
-                    try:
-                        return f.path, None
-                    except NotImplementedError:
-                        ext = _os.path.splitext(f.name)[1] or '.pdf'
-                        tmp = _tempfile.NamedTemporaryFile(delete=False, suffix=ext)
-                        f.seek(0)
-                        tmp.write(f.read())
-                        tmp.close()
-                        return tmp.name, tmp.name
-
-                local_path, temp_file = _get_local_path(revision.file)
-                try:
-                    pdf_doc = fitz.open(local_path)
-                    page = pdf_doc.load_page(page_num - 1)  # 0-indexed
-                    mat = fitz.Matrix(scale, scale)
-                    pix = page.get_pixmap(matrix=mat)
-                    img_data = pix.tobytes("png")
-                    pdf_doc.close()
-                finally:
-                    if temp_file:
-                        try:
-                            _os.unlink(temp_file)
-                        except OSError:
-                            pass
-
-                # Store in cache (skip if Redis unavailable)
-                try:
-                    from django.core.cache import cache
-                    cache.set(cache_key, img_data, timeout=86400)
-                except Exception:
-                    pass
-
-            # Return as image response with browser cache headers
-            response = HttpResponse(img_data, content_type="image/png")
-            response['Content-Disposition'] = f'inline; filename="page_{page_num}.png"'
-            response['Cache-Control'] = 'private, max-age=3600'
+            scale = float(request.query_params.get('scale', DEFAULT_SCALE))
+        except ValueError:
+            scale = DEFAULT_SCALE
+        level = snap_scale(scale)
+
+        fmt = get_render_format()
+        etag = compute_etag(revision, page_num, level, fmt)
+        if request.headers.get('If-None-Match') == etag:
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
             return response
 
+        try:
+            img_data, content_type = get_page_image(revision, page_num, level)
         except Exception as e:
             logger.error(f"Failed to render page {page_num} for revision {pk}: {str(e)}")
             return Response(
@@ -405,6 +366,110 @@ class RevisionViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+        response = HttpResponse(img_data, content_type=content_type)
+        response['Content-Disposition'] = f'inline; filename="page_{page_num}.{fmt}"'
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, max-age=31536000, immutable'
+        return response
+
+    @action(detail=True, methods=["get"], url_path="page-tiles/(?P<page_num>[0-9]+)")
+    def page_tiles(self, request, pk=None, page_num=None):
+        """
+        Tile pyramid manifest for a page
+
+        GET /api/v2/revisions/{id}/page-tiles/{page_num}/
+
+        Returns:
+            { "page_number", "tile_size", "format", "levels": [{scale, width, height, rows, cols}] }
+        """
+        from .services.page_render_service import tile_manifest
+
+        revision = self.get_object()
+        try:
+            page = revision.pages.get(page_number=int(page_num))
+        except RevisionPage.DoesNotExist:
+            return Response(
+                {"detail": f"Page {page_num} not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        return Response(tile_manifest(revision, page))
+
+    @action(
+        detail=True, methods=["get"],
+        url_path=r"page-tiles/(?P<page_num>[0-9]+)/(?P<level>[0-9.]+)/(?P<row>[0-9]+)/(?P<col>[0-9]+)",
+    )
+    def page_tile(self, request, pk=None, page_num=None, level=None, row=None, col=None):
+        """
+        Single pre-rendered tile
+
+        GET /api/v2/revisions/{id}/page-tiles/{page_num}/{scale}/{row}/{col}/
+
+        Returns:
+            WebP/PNG tile; 404 while background pre-rendering has not finished; 400 for an invalid scale
+        """
+        from django.http import HttpResponse, HttpResponseNotModified
+        from .services.page_render_service import (
+            snap_scale, compute_etag, get_render_format, get_page_tile,
+        )
+
+        revision = self.get_object()
+        page_num, row, col = int(page_num), int(row), int(col)
+        try:
+            level = snap_scale(float(level))
+        except ValueError:
+            return Response(
+                {"detail": f"Invalid scale: {level}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        fmt = get_render_format()
+        etag = compute_etag(revision, page_num, level, fmt, tile=(row, col))
+        if request.headers.get('If-None-Match') == etag:
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            return response
+
+        tile = get_page_tile(revision, page_num, level, row, col)
+        if tile is None:
+            return Response(
+                {"detail": "Tile not rendered yet"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        img_data, content_type = tile
+        response = HttpResponse(img_data, content_type=content_type)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, max-age=31536000, immutable'
+        return response
+
+    @action(detail=True, methods=["post"], url_path="prerender-pages")
+    def prerender_pages(self, request, pk=None):
+        """
+        Dispatch background pre-rendering of all pages
+
+        POST /api/v2/revisions/{id}/prerender-pages/
+        Body: { "force": false }
+        """
+        from .tasks._main import render_revision_pages_task
+
+        revision = self.get_object()
+        force = bool(request.data.get('force', False))
+
+        try:
+            task = render_revision_pages_task.delay(str(revision.id), force=force)
+        except Exception as e:
+            logger.error(f"Failed to dispatch page render task for {revision.id}: {str(e)}")
+            return Response(
+                {'error': f'Failed to dispatch task: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        return Response({
+            'task_id': task.id,
+            'status': 'pending',
+        }, status=status.HTTP_202_ACCEPTED)
+
     @action(detail=True, methods=["patch"], url_path="blocks/positions")
     def update_block_positions(self, request, pk=None):
         """
@@ -432,38 +497,29 @@ class RevisionViewSet(viewsets.ReadOnlyModelViewSet):
         serializer.is_valid(raise_exception=True)
 
         positions = serializer.validated_data['positions']
-        updated = 0
-        errors = []
 
-        # 獲取這個 revision 下的所有 block IDs
-        valid_block_ids = set(
-            str(b.id) for b in DraftBlock.objects.filter(page__revision=revision)
+        # 單一 UPDATE；擁有權（block 屬於這個 revision）在同一語句驗證
+        updated, missing = bulk_update_by_pk(
+            DraftBlock.objects.filter(page__revision=revision),
+            {str(pos.get('id')): _position_values(pos) for pos in positions},
+            updated_at=timezone.now(),
         )
 
-        for pos in positions:
-            block_id = str(pos.get('id'))
-
-            # 驗證 block 屬於這個 revision
-            if block_id not in valid_block_ids:
-                errors.append(f"Block {block_id} not found in this revision")
-                continue
-
-            try:
-                DraftBlock.objects.filter(id=block_id).update(
-                    overlay_x=pos.get('overlay_x'),
-                    overlay_y=pos.get('overlay_y'),
-                    overlay_visible=pos.get('overlay_visible', True)
-                )
-                updated += 1
-            except Exception as e:
-                errors.append(f"Failed to update block {block_id}: {str(e)}")
-
         return Response({
-            "updated": updated,
-            "errors": errors
+            "updated": len(updated),
+            "errors": [f"Block {block_id} not found in this revision" for block_id in missing]
         }, status=status.HTTP_200_OK)
 
 
+def _position_values(pos) -> dict:
+    """position payload → overlay 欄位"""
+    return {
+        'overlay_x': pos.get('overlay_x'),
+        'overlay_y': pos.get('overlay_y'),
+        'overlay_visible': pos.get('overlay_visible', True),
+    }
+
+
 class DraftBlockViewSet(viewsets.ModelViewSet):
     """
     DraftBlock ViewSet - 審稿編輯 API
@@ -533,10 +589,13 @@ class DraftBlockViewSet(viewsets.ModelViewSet):
         serializer = DraftBlockPositionSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        block.overlay_x = serializer.validated_data['overlay_x']
-        block.overlay_y = serializer.validated_data['overlay_y']
-        block.overlay_visible = serializer.validated_data.get('overlay_visible', True)
-        block.save(update_fields=['overlay_x', 'overlay_y', 'overlay_visible', 'updated_at'])
+        values = _position_values(serializer.validated_data)
+        now = timezone.now()
+        bulk_update_by_pk(DraftBlock.objects.filter(pk=block.pk), {block.pk: values}, updated_at=now)
+
+        for name, value in values.items():
+            setattr(block, name, value)
+        block.updated_at = now
 
         return Response(DraftBlockSerializer(block).data, status=status.HTTP_200_OK)
 
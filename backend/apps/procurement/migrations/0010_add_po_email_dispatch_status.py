@@ -0,0 +1,32 @@
+# Generated by Django 4.2.8 on 2026-10-19 01:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("procurement", "0009_add_po_production_shipped_status"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="purchaseorder",
+            name="email_error",
+            field=models.TextField(blank=True, help_text="最後一次發送錯誤"),
+        ),
+        migrations.AddField(
+            model_name="purchaseorder",
+            name="email_queued_at",
+            field=models.DateTimeField(blank=True, help_text="排入發送佇列時間", null=True),
+        ),
+        migrations.AddField(
+            model_name="purchaseorder",
+            name="email_status",
+            field=models.CharField(
+                blank=True,
+                choices=[("queued", "Queued"), ("sent", "Sent"), ("failed", "Failed")],
+                help_text="Email 發送狀態（背景發送）",
+                max_length=20,
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+"""
+Trigram search indexes (PostgreSQL only; see apps.core.search_indexes)
+"""
+
+from django.db import migrations
+
+from apps.core.search_indexes import search_index_operation
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("procurement", "0010_add_po_email_dispatch_status"),
+    ]
+
+    operations = [
+        search_index_operation(
+            trigram=[
+                ("materials_article_no_trgm", "materials", "article_no"),
+                ("materials_name_trgm", "materials", "name"),
+                ("materials_name_zh_trgm", "materials", "name_zh"),
+                ("suppliers_name_trgm", "suppliers", "name"),
+            ],
+        ),
+    ]
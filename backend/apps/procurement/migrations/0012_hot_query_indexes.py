@@ -0,0 +1,33 @@
+# Generated by Django 4.2.8 on 2026-10-19 02:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("procurement", "0011_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="poline",
+            index=models.Index(
+                fields=["delivery_status", "expected_delivery"],
+                name="po_lines_deliver_d698e7_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="purchaseorder",
+            index=models.Index(
+                fields=["organization", "status", "expected_delivery"],
+                name="purchase_or_organiz_bfd74e_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="purchaseorder",
+            index=models.Index(
+                fields=["organization", "created_at"],
+                name="purchase_or_organiz_c8e45b_idx",
+            ),
+        ),
+    ]
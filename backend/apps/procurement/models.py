@@ -277,6 +277,25 @@ class PurchaseOrder(models.Model):
         default=0,
         help_text='發送次數'
     )
+    email_status = models.CharField(
+        max_length=20,
+        choices=[
+            ('queued', 'Queued'),     # 已排入發送佇列
+            ('sent', 'Sent'),         # 發送成功
+            ('failed', 'Failed'),     # 重試用盡仍失敗
+        ],
+        blank=True,
+        help_text='Email 發送狀態（背景發送）'
+    )
+    email_error = models.TextField(
+        blank=True,
+        help_text='最後一次發送錯誤'
+    )
+    email_queued_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text='排入發送佇列時間'
+    )
 
     # Metadata
     notes = models.TextField(blank=True)
@@ -295,6 +314,10 @@ class PurchaseOrder(models.Model):
         ordering = ['-created_at']
         # SaaS-Ready: PO number unique within organization only
         unique_together = [['organization', 'po_number']]
+        indexes = [
+            models.Index(fields=['organization', 'status', 'expected_delivery']),  # overdue / 交期追蹤
+            models.Index(fields=['organization', 'created_at']),  # keyset 列表
+        ]
 
     # SaaS-Ready: Tenant-aware manager
     objects = TenantManager()
@@ -446,6 +469,9 @@ class POLine(models.Model):
         db_table = 'po_lines'
         verbose_name = 'PO Line'
         verbose_name_plural = 'PO Lines'
+        indexes = [
+            models.Index(fields=['delivery_status', 'expected_delivery']),  # 交期追蹤
+        ]
 
     def __str__(self):
         return f"{self.purchase_order.po_number} - {self.material_name}"
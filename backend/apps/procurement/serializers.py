@@ -117,7 +117,10 @@ class PurchaseOrderSerializer(serializers.ModelSerializer):
     class Meta:
         model = PurchaseOrder
         fields = '__all__'
-        read_only_fields = ['organization', 'status', 'total_amount', 'actual_delivery', 'created_by']
+        read_only_fields = [
+            'organization', 'status', 'total_amount', 'actual_delivery', 'created_by',
+            'email_status', 'email_error', 'email_queued_at',
+        ]
 
 
 class PurchaseOrderDetailSerializer(serializers.ModelSerializer):
@@ -141,4 +144,7 @@ class PurchaseOrderDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = PurchaseOrder
         fields = '__all__'
-        read_only_fields = ['organization', 'status', 'total_amount', 'actual_delivery', 'created_by']
+        read_only_fields = [
+            'organization', 'status', 'total_amount', 'actual_delivery', 'created_by',
+            'email_status', 'email_error', 'email_queued_at',
+        ]
@@ -1,16 +1,24 @@
 """
 P24: PO Email Service
 發送採購單給供應商
+
+- send_po_to_supplier: 同步發送單張 PO
+- queue_po_emails: 驗證後排入背景發送（send_po_emails_task），API 立即回應
+- dispatch_po_emails: 背景任務使用；依供應商分組，每組共用一個 SMTP 連線
 """
 
-from django.core.mail import EmailMessage
+from typing import Dict, Iterable, List
+
+from django.core.mail import EmailMessage, get_connection
 from django.template.loader import render_to_string
 from django.conf import settings
 from django.utils import timezone
 import logging
 
+from apps.core.instrumentation import track_external
+
 from ..models import PurchaseOrder
-from .po_pdf_export import export_po_pdf
+from .po_pdf_export import POPDFExporter, export_po_pdf, get_po_layout, group_by_supplier
 
 logger = logging.getLogger(__name__)
 
@@ -59,37 +67,13 @@ class POEmailService:
             # 生成 PDF
             pdf_bytes = export_po_pdf(po)
 
-            # 渲染 Email 內容
-            context = self._build_email_context(po)
-            subject = f"Purchase Order {po.po_number} - {po.supplier.name}"
-            html_content = render_to_string('emails/po_to_supplier.html', context)
-
-            # 建立 Email
-            email = EmailMessage(
-                subject=subject,
-                body=html_content,
-                from_email=self.from_email,
-                to=[recipient_email],
-            )
-            email.content_subtype = 'html'
-
-            # 附加 PDF
-            email.attach(
-                filename=f"{po.po_number}.pdf",
-                content=pdf_bytes,
-                mimetype='application/pdf'
-            )
-
-            # 發送
-            email.send(fail_silently=False)
+            # 建立並發送 Email
+            email = self.build_message(po, recipient_email, pdf_bytes)
+            with track_external('email'):
+                email.send(fail_silently=False)
 
             # 更新 PO 記錄
-            now = timezone.now()
-            po.sent_at = now
-            po.sent_to_email = recipient_email
-            po.sent_count += 1
-            po.status = 'sent'
-            po.save(update_fields=['sent_at', 'sent_to_email', 'sent_count', 'status', 'updated_at'])
+            now = self._mark_sent(po, recipient_email)
 
             logger.info(f"PO {po.po_number} sent to {recipient_email}")
 
@@ -109,6 +93,44 @@ class POEmailService:
                 'sent_at': None
             }
 
+    def build_message(self, po: PurchaseOrder, recipient_email: str, pdf_bytes: bytes, connection=None) -> EmailMessage:
+        """建立附帶 PDF 的 Email（connection 可由呼叫端共用）"""
+        context = self._build_email_context(po)
+        subject = f"Purchase Order {po.po_number} - {po.supplier.name}"
+        html_content = render_to_string('emails/po_to_supplier.html', context)
+
+        email = EmailMessage(
+            subject=subject,
+            body=html_content,
+            from_email=self.from_email,
+            to=[recipient_email],
+            connection=connection,
+        )
+        email.content_subtype = 'html'
+
+        # 附加 PDF
+        email.attach(
+            filename=f"{po.po_number}.pdf",
+            content=pdf_bytes,
+            mimetype='application/pdf'
+        )
+        return email
+
+    def _mark_sent(self, po: PurchaseOrder, recipient_email: str):
+        """更新 PO 發送記錄，回傳發送時間"""
+        now = timezone.now()
+        po.sent_at = now
+        po.sent_to_email = recipient_email
+        po.sent_count += 1
+        po.status = 'sent'
+        po.email_status = 'sent'
+        po.email_error = ''
+        po.save(update_fields=[
+            'sent_at', 'sent_to_email', 'sent_count', 'status',
+            'email_status', 'email_error', 'updated_at',
+        ])
+        return now
+
     def _validate_po(self, po: PurchaseOrder, custom_email: str = None) -> dict:
         """驗證 PO 是否可以發送"""
 
@@ -119,18 +141,20 @@ class POEmailService:
                 'error': f'PO status must be draft, ready, or sent. Current: {po.status}'
             }
 
-        # 檢查是否有 lines
-        if not po.lines.exists():
+        # 檢查是否有 lines（使用 prefetch 快取，批次驗證時不重複查詢）
+        lines = list(po.lines.all())
+        if not lines:
             return {
                 'valid': False,
                 'error': 'PO has no line items'
             }
 
         # 檢查是否所有 lines 都已確認
-        if not po.all_lines_confirmed:
+        confirmed_count = sum(1 for line in lines if line.is_confirmed)
+        if confirmed_count < len(lines):
             return {
                 'valid': False,
-                'error': f'Not all lines confirmed ({po.confirmed_lines_count}/{po.total_lines_count})'
+                'error': f'Not all lines confirmed ({confirmed_count}/{len(lines)})'
             }
 
         # 檢查收件人 Email
@@ -145,7 +169,7 @@ class POEmailService:
 
     def _build_email_context(self, po: PurchaseOrder) -> dict:
         """建立 Email 模板的 context"""
-        lines = po.lines.all().order_by('material_name')
+        lines = sorted(po.lines.all(), key=lambda line: line.material_name)
 
         return {
             'po': po,
@@ -171,3 +195,143 @@ def send_po_to_supplier(po: PurchaseOrder, custom_email: str = None) -> dict:
     """
     service = POEmailService()
     return service.send_po_to_supplier(po, custom_email)
+
+
+def queue_po_emails(pos: Iterable[PurchaseOrder], custom_email: str = None) -> dict:
+    """
+    驗證並排入背景發送（不等待 SMTP）
+
+    Args:
+        pos: PurchaseOrder 列表（建議已 prefetch lines）
+        custom_email: 自訂收件人（套用到所有 PO）
+
+    Broker 不可用（例如本機開發沒跑 Redis）時改為同步發送，
+    結果放在 'sent'，不會因為排程失敗而整批失敗。
+
+    Returns:
+        dict: {
+            'queued': [po_id, ...],
+            'sent': [po_id, ...],          # broker 不可用時同步發送成功
+            'errors': {po_number: error},
+            'task_id': str | None
+        }
+    """
+    from ..tasks import send_po_emails_task
+
+    service = POEmailService()
+    queued, errors = [], {}
+    for po in pos:
+        validation = service._validate_po(po, custom_email)
+        if validation['valid']:
+            queued.append(po)
+        else:
+            errors[po.po_number] = validation['error']
+
+    if not queued:
+        return {'queued': [], 'sent': [], 'errors': errors, 'task_id': None}
+
+    po_ids = [str(po.id) for po in queued]
+    PurchaseOrder.objects.filter(id__in=po_ids).update(
+        email_status='queued',
+        email_error='',
+        email_queued_at=timezone.now(),
+    )
+
+    try:
+        task = send_po_emails_task.delay(po_ids, custom_email=custom_email)
+    except Exception as e:
+        # Broker 不可用：改為同步發送
+        logger.warning(f"Failed to dispatch PO email task, sending synchronously: {e}")
+        result = dispatch_po_emails(po_ids, custom_email=custom_email)
+        failed = result['failed'] + result['retry']
+        errors.update(
+            PurchaseOrder.objects.filter(id__in=failed).values_list('po_number', 'email_error')
+        )
+        return {'queued': [], 'sent': result['sent'], 'errors': errors, 'task_id': None}
+
+    return {'queued': po_ids, 'sent': [], 'errors': errors, 'task_id': task.id}
+
+
+def dispatch_po_emails(po_ids: List[str], custom_email: str = None, final: bool = True) -> Dict[str, List[str]]:
+    """
+    發送多張 PO（背景任務使用）
+
+    - PDF 共用同一份 layout（樣式/字體只建立一次）
+    - 依供應商分組，每組開一個 SMTP 連線，組內所有 Email 共用
+    - 每張 PO 的結果記錄在 email_status / email_error
+
+    Args:
+        po_ids: PurchaseOrder UUID 列表
+        custom_email: 自訂收件人
+        final: 最後一次嘗試；False 時可重試的失敗維持 queued 狀態
+
+    Returns:
+        dict: {
+            'sent': [po_id, ...],
+            'retry': [po_id, ...],    # SMTP/連線錯誤，可重試
+            'failed': [po_id, ...]    # 驗證失敗或重試用盡
+        }
+    """
+    service = POEmailService()
+    result = {'sent': [], 'retry': [], 'failed': []}
+
+    pos = PurchaseOrder.objects.filter(id__in=po_ids).select_related(
+        'supplier'
+    ).prefetch_related('lines__material').order_by('supplier_id', 'po_number')
+
+    layout = get_po_layout()
+
+    def fail(po, error: str, retryable: bool):
+        retry = retryable and not final
+        PurchaseOrder.objects.filter(pk=po.pk).update(
+            email_status='queued' if retry else 'failed',
+            email_error=error,
+        )
+        result['retry' if retry else 'failed'].append(str(po.id))
+
+    for supplier_pos in group_by_supplier(pos).values():
+        # 驗證 + 產生 PDF
+        messages = []
+        for po in supplier_pos:
+            validation = service._validate_po(po, custom_email)
+            if not validation['valid']:
+                fail(po, validation['error'], retryable=False)
+                continue
+            recipient = custom_email or po.supplier.email
+            try:
+                pdf_bytes = POPDFExporter(po, layout=layout).generate()
+            except Exception as e:
+                logger.error(f"Failed to render PO {po.po_number}: {e}")
+                fail(po, f'Failed to render PDF: {e}', retryable=False)
+                continue
+            messages.append((po, recipient, pdf_bytes))
+
+        if not messages:
+            continue
+
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except Exception as e:
+            logger.warning(f"SMTP connection failed for supplier {supplier_pos[0].supplier_id}: {e}")
+            for po, _, _ in messages:
+                fail(po, f'Failed to connect to mail server: {e}', retryable=True)
+            continue
+
+        try:
+            for po, recipient, pdf_bytes in messages:
+                try:
+                    email = service.build_message(po, recipient, pdf_bytes, connection=connection)
+                    with track_external('email'):
+                        email.send(fail_silently=False)
+                except Exception as e:
+                    logger.error(f"Failed to send PO {po.po_number}: {e}")
+                    fail(po, f'Failed to send email: {e}', retryable=True)
+                    continue
+                service._mark_sent(po, recipient)
+                result['sent'].append(str(po.id))
+                logger.info(f"PO {po.po_number} sent to {recipient}")
+        finally:
+            connection.close()
+
+    return result
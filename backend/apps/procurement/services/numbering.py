@@ -0,0 +1,25 @@
+"""
+Purchase Order Numbering
+PO 編號：PO-YYMM-NNNN（組織內每月重新編號，apps.core.sequences 配號）
+"""
+
+from apps.core.sequences import current_period, next_sequence, seed_from_max
+
+
+def generate_po_number(organization, now=None) -> str:
+    """
+    在呼叫端的 transaction 內配號；PO 建立失敗 rollback 時號碼一併回收
+    """
+    from apps.procurement.models import PurchaseOrder
+
+    period = current_period(now)
+    prefix = f'PO-{period}-'
+    seq = next_sequence(
+        'PO',
+        scope=organization.pk if organization is not None else None,
+        period=period,
+        seed=lambda: seed_from_max(
+            PurchaseOrder.objects.filter(organization=organization), 'po_number', prefix
+        ),
+    )
+    return f'{prefix}{str(seq).zfill(4)}'
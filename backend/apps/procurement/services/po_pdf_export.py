@@ -1,73 +1,191 @@
 """
 Purchase Order PDF Export Service
 生成採購單 PDF
+
+- POPDFLayout: 字體、段落樣式、表格樣式只建立一次（process-wide 快取）
+- POPDFExporter: 單張 PO
+- POBatchRenderer: 多張 PO 共用同一份 layout；可輸出個別 PDF 或供應商合併 PDF
 """
 
 import io
+import threading
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from django.conf import settings
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import mm, inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+
+from apps.core.fonts import get_font_registry
+
+PRIMARY = colors.HexColor('#1e40af')
+MUTED = colors.HexColor('#64748b')
+BORDER = colors.HexColor('#e2e8f0')
+LIGHT_BG = colors.HexColor('#f8fafc')
+
+STATUS_DISPLAY = {
+    'draft': '草稿',
+    'sent': '已發送',
+    'confirmed': '已確認',
+    'partial_received': '部分收貨',
+    'received': '已收貨',
+    'cancelled': '已取消',
+}
+
+PAGE_MARGINS = dict(
+    rightMargin=15*mm,
+    leftMargin=15*mm,
+    topMargin=15*mm,
+    bottomMargin=15*mm,
+)
+
+
+class POPDFLayout:
+    """
+    採購單 PDF 的樣式集合
+
+    ParagraphStyle / TableStyle 都是不可變的設定物件，可以安全地在多份文件間共用。
+    使用 get_po_layout() 取得快取的實例。
+    """
+
+    def __init__(self, font: str):
+        self.font = font
+
+        # Paragraph styles
+        self.title = ParagraphStyle(
+            name='ChineseTitle', fontName=font, fontSize=18, leading=22,
+            alignment=1, spaceAfter=12,
+        )
+        self.normal = ParagraphStyle(name='ChineseNormal', fontName=font, fontSize=10, leading=14)
+        self.small = ParagraphStyle(name='ChineseSmall', fontName=font, fontSize=8, leading=10)
+        self.po_number = ParagraphStyle(
+            name='PONumber', fontName=font, fontSize=14, alignment=1, textColor=PRIMARY,
+        )
+        self.section_title = ParagraphStyle(
+            name='SectionTitle', fontName=font, fontSize=11, textColor=PRIMARY, spaceAfter=4,
+        )
+        self.notes_title = ParagraphStyle(name='NotesTitle', fontName=font, fontSize=9, textColor=MUTED)
+        self.notes_text = ParagraphStyle(name='NotesText', fontName=font, fontSize=9)
+        self.terms = ParagraphStyle(
+            name='Terms', fontName=font, fontSize=8, leading=12, textColor=MUTED,
+        )
+        self.timestamp = ParagraphStyle(
+            name='Timestamp', fontName='Helvetica', fontSize=7,
+            textColor=colors.HexColor('#94a3b8'), alignment=2,
+        )
+
+        # Table styles
+        self.po_info_table = TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), font),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('TEXTCOLOR', (0, 0), (0, -1), MUTED),
+            ('TEXTCOLOR', (2, 0), (2, -1), MUTED),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+            ('TOPPADDING', (0, 0), (-1, -1), 4),
+        ])
+        self.supplier_table = TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), font),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('TEXTCOLOR', (0, 0), (0, -1), MUTED),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+            ('TOPPADDING', (0, 0), (-1, -1), 3),
+            ('BOX', (0, 0), (-1, -1), 0.5, BORDER),
+            ('BACKGROUND', (0, 0), (-1, -1), LIGHT_BG),
+        ])
+        self.items_table = TableStyle([
+            # Font
+            ('FONTNAME', (0, 0), (-1, -1), font),
+            ('FONTSIZE', (0, 0), (-1, -1), 8),
+
+            # Header style
+            ('BACKGROUND', (0, 0), (-1, 0), PRIMARY),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('FONTSIZE', (0, 0), (-1, 0), 8),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, 0), 'MIDDLE'),
+
+            # Data rows
+            ('ALIGN', (0, 1), (0, -1), 'CENTER'),  # #
+            ('ALIGN', (1, 1), (1, -1), 'LEFT'),    # Material
+            ('ALIGN', (2, 1), (2, -1), 'CENTER'),  # Color
+            ('ALIGN', (3, 1), (-1, -1), 'RIGHT'),  # Numbers right-aligned
+            ('VALIGN', (0, 1), (-1, -1), 'MIDDLE'),
+
+            # Borders
+            ('BOX', (0, 0), (-1, -1), 1, PRIMARY),
+            ('LINEBELOW', (0, 0), (-1, 0), 1, PRIMARY),
+            ('LINEBELOW', (0, 1), (-1, -2), 0.5, BORDER),
+
+            # Alternating row colors
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, LIGHT_BG]),
+
+            # Padding
+            ('TOPPADDING', (0, 0), (-1, -1), 6),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+            ('LEFTPADDING', (0, 0), (-1, -1), 4),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+        ])
+        self.summary_table = TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), font),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('ALIGN', (2, 0), (2, -1), 'RIGHT'),
+            ('ALIGN', (3, 0), (3, -1), 'RIGHT'),
+            ('TEXTCOLOR', (2, 0), (2, -1), MUTED),
+            ('FONTSIZE', (2, -1), (3, -1), 12),  # Total amount larger
+            ('TEXTCOLOR', (3, -1), (3, -1), PRIMARY),
+            ('TOPPADDING', (0, 0), (-1, -1), 3),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+        ])
+        self.signature_table = TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), font),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('TEXTCOLOR', (0, 0), (0, -1), MUTED),
+            ('TEXTCOLOR', (2, 0), (2, -1), MUTED),
+            ('VALIGN', (0, 0), (-1, -1), 'BOTTOM'),
+            ('TOPPADDING', (0, 0), (-1, -1), 8),
+        ])
+
+
+_layout: Optional[POPDFLayout] = None
+_layout_lock = threading.Lock()
 
-# Try to register Chinese font
-try:
-    pdfmetrics.registerFont(TTFont('MSYaHei', 'C:/Windows/Fonts/msyh.ttc'))
-    CHINESE_FONT = 'MSYaHei'
-except:
-    CHINESE_FONT = 'Helvetica'
+
+def get_po_layout() -> POPDFLayout:
+    """取得快取的 POPDFLayout（字體註冊與樣式建立只做一次）"""
+    global _layout
+    if _layout is None:
+        with _layout_lock:
+            if _layout is None:
+                _layout = POPDFLayout(get_font_registry().reportlab_font())
+    return _layout
 
 
 class POPDFExporter:
     """採購單 PDF 匯出器"""
 
-    def __init__(self, purchase_order):
+    def __init__(self, purchase_order, layout: Optional[POPDFLayout] = None):
         self.po = purchase_order
+        self.layout = layout or get_po_layout()
         self.buffer = io.BytesIO()
-        self.styles = getSampleStyleSheet()
-        self._setup_styles()
-
-    def _setup_styles(self):
-        """設定樣式"""
-        self.styles.add(ParagraphStyle(
-            name='ChineseTitle',
-            fontName=CHINESE_FONT,
-            fontSize=18,
-            leading=22,
-            alignment=1,  # Center
-            spaceAfter=12,
-        ))
-        self.styles.add(ParagraphStyle(
-            name='ChineseNormal',
-            fontName=CHINESE_FONT,
-            fontSize=10,
-            leading=14,
-        ))
-        self.styles.add(ParagraphStyle(
-            name='ChineseSmall',
-            fontName=CHINESE_FONT,
-            fontSize=8,
-            leading=10,
-        ))
+        # lines 只讀取一次（可利用 prefetch_related('lines__material')）
+        self.lines = list(self.po.lines.all())
 
     def generate(self) -> bytes:
         """生成 PDF"""
-        doc = SimpleDocTemplate(
-            self.buffer,
-            pagesize=A4,
-            rightMargin=15*mm,
-            leftMargin=15*mm,
-            topMargin=15*mm,
-            bottomMargin=15*mm,
-        )
+        doc = SimpleDocTemplate(self.buffer, pagesize=A4, **PAGE_MARGINS)
+        doc.build(self.build_story())
+        self.buffer.seek(0)
+        return self.buffer.getvalue()
 
+    def build_story(self) -> list:
+        """建立單張 PO 的 flowables（供合併 PDF 使用）"""
         elements = []
 
         # Header
@@ -93,49 +211,19 @@ class POPDFExporter:
         # Terms & Signature
         elements.extend(self._build_footer())
 
-        doc.build(elements)
-        self.buffer.seek(0)
-        return self.buffer.getvalue()
+        return elements
 
     def _build_header(self):
         """建立標題"""
-        elements = []
-
-        # Company name and PO title
-        title = Paragraph(
-            f"<b>PURCHASE ORDER 採購單</b>",
-            self.styles['ChineseTitle']
-        )
-        elements.append(title)
-
-        # PO Number prominently displayed
-        po_num = Paragraph(
-            f"<b>{self.po.po_number}</b>",
-            ParagraphStyle(
-                name='PONumber',
-                fontName=CHINESE_FONT,
-                fontSize=14,
-                alignment=1,
-                textColor=colors.HexColor('#1e40af'),
-            )
-        )
-        elements.append(po_num)
-
-        return elements
+        return [
+            Paragraph("<b>PURCHASE ORDER 採購單</b>", self.layout.title),
+            Paragraph(f"<b>{self.po.po_number}</b>", self.layout.po_number),
+        ]
 
     def _build_po_info(self):
         """建立 PO 資訊區塊"""
-        elements = []
-
         po_type_display = "生產採購單" if self.po.po_type == 'production' else "詢價單"
-        status_display = {
-            'draft': '草稿',
-            'sent': '已發送',
-            'confirmed': '已確認',
-            'partial_received': '部分收貨',
-            'received': '已收貨',
-            'cancelled': '已取消',
-        }.get(self.po.status, self.po.status)
+        status_display = STATUS_DISPLAY.get(self.po.status, self.po.status)
 
         data = [
             ['PO 類型 / Type:', po_type_display, 'PO 日期 / Date:', self.po.po_date.strftime('%Y-%m-%d')],
@@ -143,36 +231,12 @@ class POPDFExporter:
         ]
 
         table = Table(data, colWidths=[35*mm, 50*mm, 40*mm, 50*mm])
-        table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (-1, -1), CHINESE_FONT),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#64748b')),
-            ('TEXTCOLOR', (2, 0), (2, -1), colors.HexColor('#64748b')),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-            ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ]))
-
-        elements.append(table)
-        return elements
+        table.setStyle(self.layout.po_info_table)
+        return [table]
 
     def _build_supplier_info(self):
         """建立供應商資訊區塊"""
-        elements = []
-
-        # Section title
-        title = Paragraph(
-            "<b>供應商資訊 / Supplier Information</b>",
-            ParagraphStyle(
-                name='SectionTitle',
-                fontName=CHINESE_FONT,
-                fontSize=11,
-                textColor=colors.HexColor('#1e40af'),
-                spaceAfter=4,
-            )
-        )
-        elements.append(title)
+        title = Paragraph("<b>供應商資訊 / Supplier Information</b>", self.layout.section_title)
 
         supplier = self.po.supplier
         supplier_info = [
@@ -185,51 +249,24 @@ class POPDFExporter:
         ]
 
         table = Table(supplier_info, colWidths=[40*mm, 135*mm])
-        table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (-1, -1), CHINESE_FONT),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#64748b')),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-            ('TOPPADDING', (0, 0), (-1, -1), 3),
-            ('BOX', (0, 0), (-1, -1), 0.5, colors.HexColor('#e2e8f0')),
-            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f8fafc')),
-        ]))
-
-        elements.append(table)
-        return elements
+        table.setStyle(self.layout.supplier_table)
+        return [title, table]
 
     def _build_items_table(self):
         """建立物料明細表"""
-        elements = []
-
-        # Section title
-        title = Paragraph(
-            "<b>採購明細 / Order Items</b>",
-            ParagraphStyle(
-                name='SectionTitle',
-                fontName=CHINESE_FONT,
-                fontSize=11,
-                textColor=colors.HexColor('#1e40af'),
-                spaceAfter=4,
-            )
-        )
-        elements.append(title)
+        title = Paragraph("<b>採購明細 / Order Items</b>", self.layout.section_title)
 
         # Table header
         header = ['#', '物料名稱\nMaterial', '顏色\nColor', '數量\nQty', '單位\nUnit', '單價\nPrice', '小計\nTotal']
 
         # Table data
         data = [header]
-        lines = self.po.lines.all()
-
-        for idx, line in enumerate(lines, 1):
+        for idx, line in enumerate(self.lines, 1):
             material_text = line.material_name
-            if hasattr(line, 'material') and line.material and line.material.name_zh:
+            if line.material_id and line.material.name_zh:
                 material_text = f"{line.material_name}\n{line.material.name_zh}"
 
-            row = [
+            data.append([
                 str(idx),
                 material_text,
                 line.color or '-',
@@ -237,78 +274,28 @@ class POPDFExporter:
                 line.unit,
                 f"${Decimal(line.unit_price):,.2f}",
                 f"${Decimal(line.line_total):,.2f}",
-            ]
-            data.append(row)
+            ])
 
         # Column widths
         col_widths = [10*mm, 55*mm, 25*mm, 25*mm, 15*mm, 25*mm, 30*mm]
 
         table = Table(data, colWidths=col_widths)
-        table.setStyle(TableStyle([
-            # Font
-            ('FONTNAME', (0, 0), (-1, -1), CHINESE_FONT),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-
-            # Header style
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e40af')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('FONTSIZE', (0, 0), (-1, 0), 8),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, 0), 'MIDDLE'),
-
-            # Data rows
-            ('ALIGN', (0, 1), (0, -1), 'CENTER'),  # #
-            ('ALIGN', (1, 1), (1, -1), 'LEFT'),    # Material
-            ('ALIGN', (2, 1), (2, -1), 'CENTER'),  # Color
-            ('ALIGN', (3, 1), (-1, -1), 'RIGHT'),  # Numbers right-aligned
-            ('VALIGN', (0, 1), (-1, -1), 'MIDDLE'),
-
-            # Borders
-            ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#1e40af')),
-            ('LINEBELOW', (0, 0), (-1, 0), 1, colors.HexColor('#1e40af')),
-            ('LINEBELOW', (0, 1), (-1, -2), 0.5, colors.HexColor('#e2e8f0')),
-
-            # Alternating row colors
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8fafc')]),
-
-            # Padding
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('LEFTPADDING', (0, 0), (-1, -1), 4),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-        ]))
-
-        elements.append(table)
-        return elements
+        table.setStyle(self.layout.items_table)
+        return [title, table]
 
     def _build_summary(self):
         """建立合計區塊"""
-        elements = []
-
-        lines_count = self.po.lines.count()
-        total_qty = sum(Decimal(line.quantity) for line in self.po.lines.all())
+        total_qty = sum(Decimal(line.quantity) for line in self.lines)
 
         summary_data = [
-            ['', '', '項目數 Items:', f'{lines_count}'],
+            ['', '', '項目數 Items:', f'{len(self.lines)}'],
             ['', '', '總數量 Total Qty:', f'{total_qty:,.2f}'],
             ['', '', '總金額 Total Amount:', f'${Decimal(self.po.total_amount):,.2f}'],
         ]
 
         table = Table(summary_data, colWidths=[60*mm, 45*mm, 40*mm, 40*mm])
-        table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (-1, -1), CHINESE_FONT),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('ALIGN', (2, 0), (2, -1), 'RIGHT'),
-            ('ALIGN', (3, 0), (3, -1), 'RIGHT'),
-            ('TEXTCOLOR', (2, 0), (2, -1), colors.HexColor('#64748b')),
-            ('FONTSIZE', (2, -1), (3, -1), 12),  # Total amount larger
-            ('TEXTCOLOR', (3, -1), (3, -1), colors.HexColor('#1e40af')),
-            ('TOPPADDING', (0, 0), (-1, -1), 3),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-        ]))
-
-        elements.append(table)
-        return elements
+        table.setStyle(self.layout.summary_table)
+        return [table]
 
     def _build_footer(self):
         """建立頁尾（條款與簽名）"""
@@ -316,18 +303,9 @@ class POPDFExporter:
 
         # Notes
         if self.po.notes:
-            notes_title = Paragraph(
-                "<b>備註 / Notes:</b>",
-                ParagraphStyle(name='NotesTitle', fontName=CHINESE_FONT, fontSize=9, textColor=colors.HexColor('#64748b'))
-            )
-            elements.append(notes_title)
+            elements.append(Paragraph("<b>備註 / Notes:</b>", self.layout.notes_title))
             elements.append(Spacer(1, 2*mm))
-
-            notes_text = Paragraph(
-                self.po.notes,
-                ParagraphStyle(name='NotesText', fontName=CHINESE_FONT, fontSize=9)
-            )
-            elements.append(notes_text)
+            elements.append(Paragraph(self.po.notes, self.layout.notes_text))
             elements.append(Spacer(1, 8*mm))
 
         # Terms
@@ -336,7 +314,7 @@ class POPDFExporter:
             "1. 請依據上述規格及數量準備物料<br/>"
             "2. 交貨時請附上送貨單及發票<br/>"
             "3. 如有任何問題請立即聯繫採購部門",
-            ParagraphStyle(name='Terms', fontName=CHINESE_FONT, fontSize=8, leading=12, textColor=colors.HexColor('#64748b'))
+            self.layout.terms
         )
         elements.append(terms)
         elements.append(Spacer(1, 15*mm))
@@ -349,29 +327,105 @@ class POPDFExporter:
         ]
 
         table = Table(sig_data, colWidths=[40*mm, 55*mm, 30*mm, 40*mm])
-        table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (-1, -1), CHINESE_FONT),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor('#64748b')),
-            ('TEXTCOLOR', (2, 0), (2, -1), colors.HexColor('#64748b')),
-            ('VALIGN', (0, 0), (-1, -1), 'BOTTOM'),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ]))
-
+        table.setStyle(self.layout.signature_table)
         elements.append(table)
 
         # Generated timestamp
         elements.append(Spacer(1, 10*mm))
-        timestamp = Paragraph(
+        elements.append(Paragraph(
             f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            ParagraphStyle(name='Timestamp', fontName='Helvetica', fontSize=7, textColor=colors.HexColor('#94a3b8'), alignment=2)
-        )
-        elements.append(timestamp)
+            self.layout.timestamp
+        ))
 
         return elements
 
 
+def group_by_supplier(purchase_orders: Iterable) -> Dict[str, List]:
+    """依供應商分組（保留原順序）"""
+    grouped: Dict[str, List] = {}
+    for po in purchase_orders:
+        grouped.setdefault(str(po.supplier_id), []).append(po)
+    return grouped
+
+
+class POBatchRenderer:
+    """
+    批次採購單 PDF 產生器
+
+    所有 PO 共用同一份 POPDFLayout；呼叫端應先
+    select_related('supplier').prefetch_related('lines__material')。
+
+    使用方式：
+        renderer = POBatchRenderer()
+        files = renderer.render_many(pos)              # {po_number: bytes}
+        combined = renderer.render_combined(pos)       # 單一 PDF，每張 PO 換頁
+        by_supplier = renderer.render_by_supplier(pos) # {supplier_id: bytes}
+    """
+
+    def __init__(self, layout: Optional[POPDFLayout] = None):
+        self.layout = layout or get_po_layout()
+
+    def render_many(self, purchase_orders: Iterable) -> Dict[str, bytes]:
+        """每張 PO 個別輸出 PDF"""
+        return {
+            po.po_number: POPDFExporter(po, layout=self.layout).generate()
+            for po in purchase_orders
+        }
+
+    def render_combined(self, purchase_orders: Iterable) -> bytes:
+        """多張 PO 合併成單一 PDF（每張 PO 從新頁開始）"""
+        story: List = []
+        for po in purchase_orders:
+            if story:
+                story.append(PageBreak())
+            story.extend(POPDFExporter(po, layout=self.layout).build_story())
+
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A4, **PAGE_MARGINS)
+        doc.build(story)
+        return buffer.getvalue()
+
+    def render_by_supplier(self, purchase_orders: Iterable) -> Dict[str, bytes]:
+        """依供應商分組，每個供應商輸出一份合併 PDF"""
+        return {
+            supplier_id: self.render_combined(pos)
+            for supplier_id, pos in group_by_supplier(purchase_orders).items()
+        }
+
+
 def export_po_pdf(purchase_order) -> bytes:
     """匯出採購單 PDF"""
     exporter = POPDFExporter(purchase_order)
     return exporter.generate()
+
+
+def export_po_batch(purchase_orders: Iterable, combined: bool = True) -> List[Tuple[str, bytes, List[str]]]:
+    """
+    批次匯出採購單 PDF
+
+    Args:
+        purchase_orders: PurchaseOrder 列表（建議已 prefetch lines__material 與 supplier）
+        combined: True = 每個供應商一份合併 PDF；False = 每張 PO 一份 PDF
+
+    Returns:
+        [(filename, pdf bytes, [po_number, ...]), ...]
+    """
+    renderer = POBatchRenderer()
+
+    if not combined:
+        return [
+            (f"{po_number}.pdf", pdf_bytes, [po_number])
+            for po_number, pdf_bytes in renderer.render_many(purchase_orders).items()
+        ]
+
+    today = datetime.now().strftime('%Y%m%d')
+    files = []
+    for pos in group_by_supplier(purchase_orders).values():
+        supplier = pos[0].supplier
+        code = supplier.supplier_code if supplier else 'NO-SUPPLIER'
+        files.append((
+            f"PO_{code}_{today}.pdf",
+            renderer.render_combined(pos),
+            [po.po_number for po in pos],
+        ))
+    return files
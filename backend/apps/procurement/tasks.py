@@ -0,0 +1,95 @@
+"""
+Procurement Tasks
+Celery tasks for purchase order documents
+"""
+
+import logging
+
+from celery import shared_task
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+BATCH_STORAGE_PREFIX = 'po_batches'
+
+
+@shared_task(bind=True)
+def render_po_batch_task(self, po_ids: list, combined: bool = True, organization_id: str = None) -> dict:
+    """
+    Async task: Render many PO PDFs in one job (month-end runs)
+
+    Styles and fonts are built once and shared across every document;
+    combined=True produces one multi-PO PDF per supplier.
+    Files are written to default_storage (R2 in production).
+
+    Returns:
+        dict: {'status': 'success' | 'error', 'organization_id': str | None,
+               'files': [{'name', 'path', 'url', 'po_numbers'}]}
+    """
+    from .models import PurchaseOrder
+    from .services.po_pdf_export import export_po_batch
+
+    try:
+        pos = PurchaseOrder.objects.filter(id__in=po_ids)
+        if organization_id:
+            pos = pos.filter(organization_id=organization_id)
+        pos = pos.select_related('supplier').prefetch_related('lines__material').order_by('supplier_id', 'po_number')
+
+        batch_dir = f"{BATCH_STORAGE_PREFIX}/{timezone.now():%Y%m%d_%H%M%S}_{self.request.id or 'sync'}"
+        files = []
+        for filename, pdf_bytes, po_numbers in export_po_batch(pos, combined=combined):
+            path = default_storage.save(f"{batch_dir}/{filename}", ContentFile(pdf_bytes))
+            files.append({
+                'name': filename,
+                'path': path,
+                'url': default_storage.url(path),
+                'po_numbers': po_numbers,
+            })
+
+        logger.info(f"Rendered PO batch: {len(files)} files from {len(po_ids)} POs")
+        return {
+            'status': 'success',
+            'organization_id': organization_id,
+            'files': files,
+        }
+    except Exception as e:
+        logger.exception(f"PO batch render failed: {e}")
+        return {
+            'status': 'error',
+            'error': str(e),
+        }
+
+
+@shared_task(bind=True, max_retries=4)
+def send_po_emails_task(self, po_ids: list, custom_email: str = None) -> dict:
+    """
+    Async task: Send PO emails to suppliers
+
+    POs are grouped by supplier and each group reuses one SMTP connection.
+    SMTP/connection failures are retried with exponential backoff
+    (60s, 120s, 240s, 480s) for the failed POs only; per-PO results are
+    recorded on PurchaseOrder.email_status / email_error.
+
+    Returns:
+        dict: {'status': 'success' | 'partial', 'sent': [...], 'failed': [...], 'retry': []}
+    """
+    from .services.email_service import dispatch_po_emails
+
+    final = self.request.retries >= self.max_retries
+    result = dispatch_po_emails(po_ids, custom_email=custom_email, final=final)
+
+    if result['retry']:
+        countdown = 60 * (2 ** self.request.retries)
+        logger.info(f"Retrying {len(result['retry'])} PO emails in {countdown}s")
+        raise self.retry(
+            args=[result['retry']],
+            kwargs={'custom_email': custom_email},
+            countdown=countdown,
+        )
+
+    return {
+        'status': 'success' if not result['failed'] else 'partial',
+        **result,
+    }
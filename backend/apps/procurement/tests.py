@@ -1,2 +1,208 @@
-from django.test import TestCase
+import tempfile
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.core import mail
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.core.models import Organization
 from .models import Supplier, PurchaseOrder, POLine
+from .services.email_service import dispatch_po_emails
+from .services.po_pdf_export import POBatchRenderer, export_po_batch, get_po_layout
+
+
+class POFixtureMixin:
+    def setUp(self):
+        self.org = Organization.objects.create(name="Test Org")
+        self.suppliers = [
+            Supplier.objects.create(
+                organization=self.org, name=f"Supplier {i}", supplier_code=f"S{i}", supplier_type='fabric',
+                email=f"s{i}@example.com",
+            )
+            for i in range(2)
+        ]
+        self.pos = []
+        for i, supplier in enumerate([self.suppliers[0], self.suppliers[0], self.suppliers[1]]):
+            po = PurchaseOrder.objects.create(
+                organization=self.org,
+                po_number=f"PO-{i}",
+                supplier=supplier,
+                po_date=date(2026, 1, 31),
+                expected_delivery=date(2026, 2, 28),
+                total_amount=Decimal('100.00'),
+            )
+            POLine.objects.create(
+                purchase_order=po,
+                material_name="Cotton",
+                quantity=Decimal('10'),
+                unit='M',
+                unit_price=Decimal('10.00'),
+                line_total=Decimal('100.00'),
+                is_confirmed=True,
+            )
+            self.pos.append(po)
+
+
+class POBatchRenderTest(POFixtureMixin, TestCase):
+    def test_layout_is_shared(self):
+        self.assertIs(POBatchRenderer().layout, get_po_layout())
+
+    def test_combined_groups_by_supplier(self):
+        files = export_po_batch(self.pos, combined=True)
+
+        self.assertEqual(sorted(po_numbers for _, _, po_numbers in files), [['PO-0', 'PO-1'], ['PO-2']])
+        self.assertTrue(files[0][1].startswith(b'%PDF'))
+
+    def test_render_many(self):
+        files = POBatchRenderer().render_many(self.pos)
+        self.assertEqual(set(files), {'PO-0', 'PO-1', 'PO-2'})
+
+    def test_batch_export_endpoint_returns_supplier_pdf(self):
+        response = APIClient().post(
+            '/api/v2/purchase-orders/batch-export-pdf/',
+            {'supplier': str(self.suppliers[0].id)},
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+
+    def test_async_batch_export_result(self):
+        from .tasks import render_po_batch_task
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            with mock.patch('apps.procurement.tasks.render_po_batch_task.delay') as delay:
+                delay.return_value.id = 'task-1'
+                response = APIClient().post(
+                    '/api/v2/purchase-orders/batch-export-pdf/',
+                    {'po_ids': [str(po.id) for po in self.pos], 'async': True},
+                    format='json',
+                )
+            self.assertEqual(response.status_code, 202)
+            po_ids, kwargs = delay.call_args.args[0], delay.call_args.kwargs
+            self.assertEqual(kwargs, {'combined': True, 'organization_id': None})
+
+            task_result = render_po_batch_task.apply(args=[po_ids], kwargs=kwargs).get()
+            with mock.patch('celery.result.AsyncResult') as async_result:
+                async_result.return_value.ready.return_value = True
+                async_result.return_value.successful.return_value = True
+                async_result.return_value.result = task_result
+
+                response = APIClient().get('/api/v2/purchase-orders/batch-export-pdf/task-1/')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.data['status'], 'success')
+                self.assertEqual(sorted(f['po_numbers'] for f in response.data['files']), [['PO-0', 'PO-1'], ['PO-2']])
+
+                download = APIClient().get(response.data['files'][0]['download_url'])
+                self.assertEqual(download.status_code, 200)
+                self.assertTrue(download.content.startswith(b'%PDF'))
+
+                missing = APIClient().get('/api/v2/purchase-orders/batch-export-pdf/task-1/?file=other.pdf')
+                self.assertEqual(missing.status_code, 404)
+
+    def test_batch_export_result_requires_matching_organization(self):
+        from django.contrib.auth import get_user_model
+
+        other_org = Organization.objects.create(name="Other Org")
+        users = {
+            'same': get_user_model().objects.create_user(username="same", password="x", organization=self.org),
+            'other': get_user_model().objects.create_user(username="other", password="x", organization=other_org),
+            'none': get_user_model().objects.create_user(username="none", password="x"),
+        }
+        with mock.patch('celery.result.AsyncResult') as async_result:
+            async_result.return_value.ready.return_value = True
+            async_result.return_value.successful.return_value = True
+            async_result.return_value.result = {
+                'status': 'success', 'organization_id': str(self.org.id), 'files': [],
+            }
+            for name, expected in [('same', 200), ('other', 404), ('none', 404)]:
+                client = APIClient()
+                client.force_authenticate(user=users[name])
+                response = client.get('/api/v2/purchase-orders/batch-export-pdf/task-3/')
+                self.assertEqual(response.status_code, expected, name)
+
+    def test_batch_export_result_pending(self):
+        with mock.patch('celery.result.AsyncResult') as async_result:
+            async_result.return_value.ready.return_value = False
+            async_result.return_value.status = 'PENDING'
+            response = APIClient().get('/api/v2/purchase-orders/batch-export-pdf/task-2/')
+
+        self.assertEqual(response.data, {'task_id': 'task-2', 'status': 'pending'})
+
+
+class POEmailDispatchTest(POFixtureMixin, TestCase):
+    def test_dispatch_reuses_one_connection_per_supplier(self):
+        with mock.patch(
+            'apps.procurement.services.email_service.get_connection',
+            wraps=mail.get_connection,
+        ) as get_connection:
+            result = dispatch_po_emails([str(po.id) for po in self.pos])
+
+        self.assertEqual(get_connection.call_count, 2)
+        self.assertEqual(len(result['sent']), 3)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(
+            sorted(message.attachments[0][0] for message in mail.outbox),
+            ['PO-0.pdf', 'PO-1.pdf', 'PO-2.pdf'],
+        )
+
+        po = PurchaseOrder.objects.get(pk=self.pos[0].pk)
+        self.assertEqual((po.status, po.email_status, po.sent_count), ('sent', 'sent', 1))
+
+    def test_connection_failure_is_retryable(self):
+        connection = mock.Mock()
+        connection.open.side_effect = OSError("connection refused")
+        with mock.patch('apps.procurement.services.email_service.get_connection', return_value=connection):
+            result = dispatch_po_emails([str(self.pos[0].id)], final=False)
+
+        self.assertEqual(result['retry'], [str(self.pos[0].id)])
+        po = PurchaseOrder.objects.get(pk=self.pos[0].pk)
+        self.assertEqual(po.email_status, 'queued')
+        self.assertIn('connection refused', po.email_error)
+
+    def test_send_action_queues_and_returns_immediately(self):
+        with mock.patch('apps.procurement.tasks.send_po_emails_task.delay') as delay:
+            delay.return_value.id = 'task-1'
+            response = APIClient().post(f'/api/v2/purchase-orders/{self.pos[0].id}/send/', {}, format='json')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'queued')
+        delay.assert_called_once_with([str(self.pos[0].id)], custom_email=None)
+        self.assertEqual(PurchaseOrder.objects.get(pk=self.pos[0].pk).email_status, 'queued')
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_send_falls_back_to_sync_when_broker_is_down(self):
+        with mock.patch(
+            'apps.procurement.tasks.send_po_emails_task.delay',
+            side_effect=OSError("Connection refused"),
+        ):
+            response = APIClient().post(f'/api/v2/purchase-orders/{self.pos[0].id}/send/', {}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'sent')
+        self.assertEqual(response.data['sent_to'], 's0@example.com')
+        self.assertEqual(len(mail.outbox), 1)
+        po = PurchaseOrder.objects.get(pk=self.pos[0].pk)
+        self.assertEqual((po.status, po.email_status, po.sent_count), ('sent', 'sent', 1))
+
+    def test_send_batch_query_count_does_not_grow_with_pos(self):
+        with mock.patch('apps.procurement.tasks.send_po_emails_task.delay') as delay:
+            delay.return_value.id = 'task-1'
+            with CaptureQueriesContext(connection) as one:
+                APIClient().post(
+                    '/api/v2/purchase-orders/send-batch/', {'po_ids': [str(self.pos[0].id)]}, format='json',
+                )
+            with CaptureQueriesContext(connection) as three:
+                response = APIClient().post(
+                    '/api/v2/purchase-orders/send-batch/',
+                    {'po_ids': [str(po.id) for po in self.pos]},
+                    format='json',
+                )
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(len(response.data['queued']), 3)
+        self.assertEqual(len(three), len(one))
@@ -1,3 +1,5 @@
+from urllib.parse import urlencode
+
 from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -5,6 +7,7 @@ from django_filters.rest_framework import DjangoFilterBackend
 from django.utils import timezone
 from django.db.models import Sum, Count
 from django.http import HttpResponse
+from apps.core.pagination import KeysetPagination
 from .models import Supplier, Material, PurchaseOrder, POLine
 from .services.po_pdf_export import export_po_pdf
 from .serializers import (
@@ -47,6 +50,7 @@ class MaterialViewSet(viewsets.ModelViewSet):
 class PurchaseOrderViewSet(viewsets.ModelViewSet):
     queryset = PurchaseOrder.objects.select_related('supplier').prefetch_related('lines').all()
     serializer_class = PurchaseOrderSerializer
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['status', 'po_type', 'supplier']
     search_fields = ['po_number', 'supplier__name']
@@ -68,10 +72,16 @@ class PurchaseOrderViewSet(viewsets.ModelViewSet):
         """
         發送 PO 給供應商（附帶 PDF）
 
+        預設排入背景發送並立即回應（status = queued），
+        發送結果記錄在 PO 的 email_status / email_error。
+
         Request body (optional):
-            { "email": "custom@email.com" }  // 可自訂收件人
+            {
+                "email": "custom@email.com",  // 可自訂收件人
+                "sync": false                  // true = 同步發送（等待 SMTP）
+            }
         """
-        from .services.email_service import send_po_to_supplier
+        from .services.email_service import send_po_to_supplier, queue_po_emails
 
         po = self.get_object()
 
@@ -85,7 +95,32 @@ class PurchaseOrderViewSet(viewsets.ModelViewSet):
         # 取得自訂 email（可選）
         custom_email = request.data.get('email')
 
-        # 發送 Email
+        if not request.data.get('sync', False):
+            result = queue_po_emails([po], custom_email)
+            if result['queued']:
+                return Response({
+                    'status': 'queued',
+                    'message': 'PO email queued for delivery',
+                    'sent_to': custom_email or po.supplier.email,
+                    'task_id': result['task_id'],
+                    'sent_count': po.sent_count,
+                }, status=status.HTTP_202_ACCEPTED)
+            if result['sent']:
+                # Broker 不可用，已同步發送
+                po.refresh_from_db()
+                return Response({
+                    'status': 'sent',
+                    'message': f'PO sent successfully to {po.sent_to_email}',
+                    'sent_to': po.sent_to_email,
+                    'sent_at': po.sent_at.isoformat() if po.sent_at else None,
+                    'sent_count': po.sent_count,
+                })
+            return Response(
+                {'error': result['errors'].get(po.po_number, 'Failed to queue email')},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # 同步發送 Email
         result = send_po_to_supplier(po, custom_email)
 
         if result['success']:
@@ -102,6 +137,47 @@ class PurchaseOrderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+    # Bulk send POs to suppliers (month-end runs)
+    @action(detail=False, methods=['post'], url_path='send-batch')
+    def send_batch(self, request):
+        """
+        批次排入 PO Email 發送（依供應商分組，共用 SMTP 連線）
+
+        Request body:
+            {
+                "po_ids": [uuid, ...],   // 或
+                "supplier": uuid,        // 該供應商所有 draft/ready 的 PO
+                "email": "custom@email.com"  // 可選
+            }
+
+        Returns:
+            { "task_id": str, "queued": [po_id, ...], "sent": [po_id, ...], "errors": {po_number: error} }
+        """
+        from .services.email_service import queue_po_emails
+
+        po_ids = request.data.get('po_ids') or []
+        supplier_id = request.data.get('supplier')
+        if not po_ids and not supplier_id:
+            return Response(
+                {'error': 'po_ids or supplier is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        qs = self.get_queryset()
+        if po_ids:
+            qs = qs.filter(id__in=po_ids)
+        if supplier_id:
+            qs = qs.filter(supplier_id=supplier_id, status__in=['draft', 'ready'])
+
+        result = queue_po_emails(qs.prefetch_related('lines'), request.data.get('email'))
+        if result['queued']:
+            response_status = status.HTTP_202_ACCEPTED
+        elif result['sent']:
+            response_status = status.HTTP_200_OK
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response(result, status=response_status)
+
     # P23: List all overdue POs
     @action(detail=False, methods=['get'])
     def overdue(self, request):
@@ -249,6 +325,166 @@ class PurchaseOrderViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    # Batch export PO PDFs (month-end runs)
+    @action(detail=False, methods=['post'], url_path='batch-export-pdf')
+    def batch_export_pdf(self, request):
+        """
+        批次匯出採購單 PDF（共用樣式/字體，一次渲染多張 PO）
+
+        POST /api/v2/purchase-orders/batch-export-pdf/
+        Body: {
+            "po_ids": [uuid, ...],     // 或
+            "supplier": uuid,          // 該供應商所有可匯出的 PO
+            "status": "ready",         // 搭配 supplier 使用（可選）
+            "combined": true,          // true = 每個供應商一份合併 PDF
+            "async": false
+        }
+
+        Returns:
+            Sync: PDF（單一檔案）或 ZIP
+            Async: { "task_id": str, "status": "pending", "po_count": int }
+                   → GET batch-export-pdf/{task_id}/ 取得結果
+
+        只匯出所有 Line 已確認的 PO，其餘列在 skipped。
+        """
+        from .services.po_pdf_export import export_po_batch
+        from .tasks import render_po_batch_task
+
+        po_ids = request.data.get('po_ids') or []
+        supplier_id = request.data.get('supplier')
+        combined = request.data.get('combined', True)
+        use_async = request.data.get('async', False)
+
+        if not po_ids and not supplier_id:
+            return Response(
+                {'error': 'po_ids or supplier is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        organization_id = getattr(request.user, 'organization_id', None)
+
+        qs = self.get_queryset().prefetch_related('lines__material')
+        if organization_id:
+            qs = qs.filter(organization_id=organization_id)
+        if po_ids:
+            qs = qs.filter(id__in=po_ids)
+        if supplier_id:
+            qs = qs.filter(supplier_id=supplier_id)
+            if request.data.get('status'):
+                qs = qs.filter(status=request.data['status'])
+        qs = qs.order_by('supplier_id', 'po_number')
+
+        # all_lines_confirmed 會重新查詢，這裡直接用 prefetch 的 lines 判斷
+        exportable, skipped = [], []
+        for po in qs:
+            lines = po.lines.all()
+            if lines and all(line.is_confirmed for line in lines):
+                exportable.append(po)
+            else:
+                skipped.append(po.po_number)
+
+        if not exportable:
+            return Response(
+                {'error': 'No exportable POs (all lines must be confirmed)', 'skipped': skipped},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if use_async:
+            task = render_po_batch_task.delay(
+                [str(po.id) for po in exportable],
+                combined=combined,
+                organization_id=str(organization_id) if organization_id else None,
+            )
+            return Response({
+                'task_id': task.id,
+                'status': 'pending',
+                'po_count': len(exportable),
+                'skipped': skipped,
+            }, status=status.HTTP_202_ACCEPTED)
+
+        try:
+            files = export_po_batch(exportable, combined=combined)
+        except Exception as e:
+            return Response(
+                {'error': f'Failed to generate PDF: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        if len(files) == 1:
+            filename, pdf_bytes, _ = files[0]
+            response = HttpResponse(pdf_bytes, content_type='application/pdf')
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
+            return response
+
+        import zipfile
+        from io import BytesIO
+
+        zip_buffer = BytesIO()
+        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for filename, pdf_bytes, _ in files:
+                zf.writestr(filename, pdf_bytes)
+
+        response = HttpResponse(zip_buffer.getvalue(), content_type='application/zip')
+        response['Content-Disposition'] = (
+            f'attachment; filename="PO_batch_{timezone.now():%Y%m%d_%H%M%S}.zip"'
+        )
+        return response
+
+    @action(detail=False, methods=['get'], url_path=r'batch-export-pdf/(?P<task_id>[^/.]+)')
+    def batch_export_result(self, request, task_id=None):
+        """
+        非同步批次匯出的結果
+
+        GET /api/v2/purchase-orders/batch-export-pdf/{task_id}/
+        GET /api/v2/purchase-orders/batch-export-pdf/{task_id}/?file=<name>   下載單一 PDF
+
+        Returns:
+            { "task_id", "status": "pending" | "started" | "retry" | "success" | "error",
+              "files": [{ "name", "po_numbers", "download_url" }], "error" }
+        """
+        from celery.result import AsyncResult
+        from django.core.files.storage import default_storage
+
+        result = AsyncResult(task_id)
+        if not result.ready():
+            return Response({'task_id': task_id, 'status': result.status.lower()})
+
+        data = result.result if result.successful() else None
+        if not isinstance(data, dict):
+            return Response({'task_id': task_id, 'status': 'error', 'error': str(result.result)})
+
+        # 其他 organization（或沒有 organization 的使用者）視為不存在
+        organization_id = getattr(request.user, 'organization_id', None)
+        if data.get('organization_id') and data['organization_id'] != str(organization_id or ''):
+            return Response({'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        if data.get('status') != 'success':
+            return Response({'task_id': task_id, 'status': 'error', 'error': data.get('error', '')})
+
+        files = data.get('files', [])
+        filename = request.query_params.get('file')
+        if filename:
+            entry = next((f for f in files if f['name'] == filename), None)
+            if entry is None or not default_storage.exists(entry['path']):
+                return Response({'error': f'File {filename} not found'}, status=status.HTTP_404_NOT_FOUND)
+            with default_storage.open(entry['path'], 'rb') as f:
+                response = HttpResponse(f.read(), content_type='application/pdf')
+            response['Content-Disposition'] = f'attachment; filename="{entry["name"]}"'
+            return response
+
+        return Response({
+            'task_id': task_id,
+            'status': 'success',
+            'files': [
+                {
+                    'name': f['name'],
+                    'po_numbers': f['po_numbers'],
+                    'download_url': request.build_absolute_uri(f"?{urlencode({'file': f['name']})}"),
+                }
+                for f in files
+            ],
+        })
+
     # Confirm all lines at once
     @action(detail=True, methods=['post'], url_path='confirm-all-lines')
     def confirm_all_lines(self, request, pk=None):
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SamplesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.samples'
+
+    def ready(self):
+        from .signals import connect_dashboard_signals
+        connect_dashboard_signals()
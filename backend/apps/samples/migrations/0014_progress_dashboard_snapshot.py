@@ -0,0 +1,57 @@
+# Generated by Django 4.2.8 on 2026-10-19 01:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0002_saas_ready_fields"),
+        ("samples", "0013_track_progress_timestamps_and_log"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProgressDashboardSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("key", models.CharField(max_length=64, unique=True)),
+                (
+                    "sections",
+                    models.JSONField(
+                        default=dict,
+                        help_text='{"sample": {"by_status": {...}, "overdue": 0, ...}, "procurement": {...}, ...}',
+                    ),
+                ),
+                ("computed_at", models.DateTimeField()),
+                (
+                    "as_of_date",
+                    models.DateField(
+                        help_text="Date used for overdue / due-soon counts"
+                    ),
+                ),
+                (
+                    "organization",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="progress_dashboard_snapshots",
+                        to="core.organization",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "progress_dashboard_snapshots",
+            },
+        ),
+    ]
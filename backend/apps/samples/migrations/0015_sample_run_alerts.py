@@ -0,0 +1,97 @@
+# Generated by Django 4.2.8 on 2026-10-19 02:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0002_saas_ready_fields"),
+        ("samples", "0014_progress_dashboard_snapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Alert",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "alert_type",
+                    models.CharField(
+                        choices=[
+                            ("overdue", "Overdue"),
+                            ("due_soon", "Due Soon"),
+                            ("stale", "Stale"),
+                        ],
+                        max_length=16,
+                    ),
+                ),
+                (
+                    "severity",
+                    models.CharField(
+                        choices=[
+                            ("high", "High"),
+                            ("medium", "Medium"),
+                            ("low", "Low"),
+                        ],
+                        max_length=8,
+                    ),
+                ),
+                ("severity_rank", models.PositiveSmallIntegerField(default=0)),
+                ("run_no", models.IntegerField()),
+                ("run_status", models.CharField(max_length=24)),
+                ("sample_request_id", models.UUIDField()),
+                ("style_number", models.CharField(blank=True, max_length=100)),
+                ("reference_date", models.DateField()),
+                ("first_seen_at", models.DateTimeField()),
+                ("last_seen_at", models.DateTimeField()),
+                ("resolved_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "organization",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sample_alerts",
+                        to="core.organization",
+                    ),
+                ),
+                (
+                    "sample_run",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="alerts",
+                        to="samples.samplerun",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "sample_run_alerts",
+                "ordering": ["severity_rank", "reference_date", "id"],
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("resolved_at__isnull", True)),
+                        fields=[
+                            "organization",
+                            "severity_rank",
+                            "reference_date",
+                            "id",
+                        ],
+                        name="alert_active_org_order_idx",
+                    ),
+                    models.Index(
+                        fields=["organization", "-resolved_at"],
+                        name="alert_org_resolved_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="alert",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("resolved_at__isnull", True)),
+                fields=("sample_run", "alert_type"),
+                name="unique_active_alert_per_run_type",
+            ),
+        ),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 4.2.8 on 2026-10-19 02:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("parsing", "0007_add_translation_status"),
+        ("samples", "0015_sample_run_alerts"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TechPackBlockSet",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("content_hash", models.CharField(max_length=64, unique=True)),
+                ("pages", models.JSONField(default=list)),
+                ("page_count", models.IntegerField(default=0)),
+                ("block_count", models.IntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "source_revision",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="TechPackRevision this block set was captured from",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="run_block_sets",
+                        to="parsing.revision",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "techpack_block_sets",
+            },
+        ),
+        migrations.CreateModel(
+            name="RunTechPackBlockOverride",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "block_id",
+                    models.UUIDField(
+                        help_text="TechPackBlockSet block id（原始 DraftBlock ID）"
+                    ),
+                ),
+                ("changes", models.JSONField(default=dict)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "run",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="techpack_overrides",
+                        to="samples.samplerun",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "run_techpack_block_overrides",
+            },
+        ),
+        migrations.AddField(
+            model_name="samplerun",
+            name="techpack_block_set",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Immutable Tech Pack block set shared by runs with identical content",
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="sample_runs",
+                to="samples.techpackblockset",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="runtechpackblockoverride",
+            constraint=models.UniqueConstraint(
+                fields=("run", "block_id"), name="unique_run_block_override"
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.8 on 2026-10-19 02:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("samples", "0016_techpack_block_sets"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="samplerun",
+            name="source_data_version",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="StyleRevision.data_version at snapshot time (O(1) staleness check)",
+                null=True,
+            ),
+        ),
+    ]
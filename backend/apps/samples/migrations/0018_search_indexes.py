@@ -0,0 +1,24 @@
+"""
+Trigram search indexes (PostgreSQL only; see apps.core.search_indexes)
+"""
+
+from django.db import migrations
+
+from apps.core.search_indexes import search_index_operation
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("samples", "0017_run_source_data_version"),
+    ]
+
+    operations = [
+        search_index_operation(
+            trigram=[
+                ("sample_requests_brand_name_trgm", "sample_requests", "brand_name"),
+            ],
+        ),
+    ]
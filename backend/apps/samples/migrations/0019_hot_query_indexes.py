@@ -0,0 +1,26 @@
+# Generated by Django 4.2.8 on 2026-10-19 02:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("samples", "0018_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="samplerun",
+            index=models.Index(
+                fields=["organization", "status", "target_due_date"],
+                name="sample_runs_organiz_830bab_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="samplerun",
+            index=models.Index(
+                fields=["organization", "created_at"],
+                name="sample_runs_organiz_23f030_idx",
+            ),
+        ),
+    ]
@@ -461,6 +461,11 @@ class SampleRun(models.Model):
         blank=True,
         help_text="SHA256 hash of snapshotted BOM + Operations"
     )
+    source_data_version = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="StyleRevision.data_version at snapshot time (O(1) staleness check)"
+    )
     snapshotted_at = models.DateTimeField(
         null=True,
         blank=True,
@@ -511,6 +516,16 @@ class SampleRun(models.Model):
         help_text="Generated costing version from actuals"
     )
 
+    # Tech Pack 快照（copy-on-write：共用不可變 block set + per-run overrides）
+    techpack_block_set = models.ForeignKey(
+        'samples.TechPackBlockSet',
+        null=True,
+        blank=True,
+        on_delete=models.PROTECT,
+        related_name='sample_runs',
+        help_text="Immutable Tech Pack block set shared by runs with identical content"
+    )
+
     # Metadata
     created_by = models.ForeignKey(
         'core.User',
@@ -536,6 +551,8 @@ class SampleRun(models.Model):
         indexes = [
             models.Index(fields=['sample_request', 'status']),
             models.Index(fields=['status', 'target_due_date']),
+            models.Index(fields=['organization', 'status', 'target_due_date']),  # kanban / scheduler / alerts
+            models.Index(fields=['organization', 'created_at']),  # keyset 列表
         ]
 
     # SaaS-Ready: Tenant-aware manager
@@ -1328,6 +1345,78 @@ class RunTechPackBlock(models.Model):
         return f"{self.block_type} - {self.source_text[:30]}..."
 
 
+class TechPackBlockSet(models.Model):
+    """
+    不可變的 Tech Pack 翻譯快照（content-addressed）
+
+    設計原則：
+    - 內容相同的快照只存一份（content_hash = pages/blocks 的 SHA-256）
+    - 多個 Run 共用同一個 block set，建立 Run 時不再複製 blocks
+    - Run 的修改存在 RunTechPackBlockOverride（copy-on-write）
+
+    pages 結構：
+    [{"page_number", "width", "height", "source_page_id",
+      "blocks": [{"id", "block_type", "source_text", "translated_text",
+                  "bbox_x", "bbox_y", "bbox_width", "bbox_height",
+                  "overlay_x", "overlay_y", "overlay_visible"}]}]
+    block id = 原始 DraftBlock ID
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    content_hash = models.CharField(max_length=64, unique=True)
+
+    # 來源追溯
+    source_revision = models.ForeignKey(
+        'parsing.Revision',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='run_block_sets',
+        help_text="TechPackRevision this block set was captured from"
+    )
+
+    pages = models.JSONField(default=list)
+    page_count = models.IntegerField(default=0)
+    block_count = models.IntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'techpack_block_sets'
+
+    def __str__(self):
+        return f"BlockSet {self.content_hash[:12]} ({self.page_count} pages, {self.block_count} blocks)"
+
+
+class RunTechPackBlockOverride(models.Model):
+    """
+    Run 對共用 block set 的修改（只存有改過的 block）
+
+    changes 只包含被覆寫的欄位：translated_text / overlay_x / overlay_y / overlay_visible
+    （值可為 null，表示明確清除，例如 overlay_x = null → 使用 bbox 位置）
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    run = models.ForeignKey(
+        SampleRun,
+        on_delete=models.CASCADE,
+        related_name='techpack_overrides'
+    )
+    block_id = models.UUIDField(help_text="TechPackBlockSet block id（原始 DraftBlock ID）")
+    changes = models.JSONField(default=dict)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'run_techpack_block_overrides'
+        constraints = [
+            models.UniqueConstraint(fields=['run', 'block_id'], name='unique_run_block_override'),
+        ]
+
+    def __str__(self):
+        return f"Run {self.run_id} - Block {self.block_id}"
+
+
 class SampleAttachment(models.Model):
     """
     Attachments / Photos for Sample Requests or Physical Samples
@@ -1422,3 +1511,130 @@ class SampleRunTransitionLog(models.Model):
 
     def __str__(self):
         return f"{self.from_status} → {self.to_status} ({self.action})"
+
+
+class ProgressDashboardSnapshot(models.Model):
+    """
+    P18: 進度儀表板彙總快照（每個組織一列）
+
+    由 services/dashboard_aggregates.py 維護：
+    - 狀態轉換後重算受影響的區塊
+    - Celery beat 定期全量重算
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    # str(organization_id)；無組織（開發模式）為 'all'
+    key = models.CharField(max_length=64, unique=True)
+    organization = models.ForeignKey(
+        'core.Organization',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='progress_dashboard_snapshots'
+    )
+
+    sections = models.JSONField(
+        default=dict,
+        help_text='{"sample": {"by_status": {...}, "overdue": 0, ...}, "procurement": {...}, ...}'
+    )
+    computed_at = models.DateTimeField()
+    as_of_date = models.DateField(help_text="Date used for overdue / due-soon counts")
+
+    class Meta:
+        db_table = 'progress_dashboard_snapshots'
+
+    def __str__(self):
+        return f"Dashboard snapshot {self.key} @ {self.computed_at}"
+
+
+class AlertType:
+    """P1: 樣衣輪次提醒類型"""
+    OVERDUE = 'overdue'
+    DUE_SOON = 'due_soon'
+    STALE = 'stale'
+
+    CHOICES = [
+        (OVERDUE, 'Overdue'),
+        (DUE_SOON, 'Due Soon'),
+        (STALE, 'Stale'),
+    ]
+
+
+class AlertSeverity:
+    HIGH = 'high'
+    MEDIUM = 'medium'
+    LOW = 'low'
+
+    CHOICES = [
+        (HIGH, 'High'),
+        (MEDIUM, 'Medium'),
+        (LOW, 'Low'),
+    ]
+
+    # 排序用（數字小 = 優先）
+    RANK = {HIGH: 0, MEDIUM: 1, LOW: 2}
+
+
+class Alert(models.Model):
+    """
+    P1: 預先計算的 SampleRun 提醒
+
+    由 Celery beat（services/alerts.py evaluate_alerts）定期評估規則並 upsert：
+    - 新觸發 → 建立（first_seen_at）並推送 assistant Notification
+    - 持續觸發 → 更新 last_seen_at
+    - 不再觸發 → resolved_at
+
+    使用整數主鍵：assistant Notification 的 GenericForeignKey object_id 為整數。
+    """
+    id = models.BigAutoField(primary_key=True)
+
+    organization = models.ForeignKey(
+        'core.Organization',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='sample_alerts'
+    )
+    sample_run = models.ForeignKey(
+        SampleRun,
+        on_delete=models.CASCADE,
+        related_name='alerts'
+    )
+
+    alert_type = models.CharField(max_length=16, choices=AlertType.CHOICES)
+    severity = models.CharField(max_length=8, choices=AlertSeverity.CHOICES)
+    severity_rank = models.PositiveSmallIntegerField(default=0)
+
+    # 反正規化（讀取時不需 join）
+    run_no = models.IntegerField()
+    run_status = models.CharField(max_length=24)
+    sample_request_id = models.UUIDField()
+    style_number = models.CharField(max_length=100, blank=True)
+    # overdue / due_soon: target_due_date；stale: run 建立日期
+    reference_date = models.DateField()
+
+    first_seen_at = models.DateTimeField()
+    last_seen_at = models.DateTimeField()
+    resolved_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'sample_run_alerts'
+        ordering = ['severity_rank', 'reference_date', 'id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['sample_run', 'alert_type'],
+                condition=models.Q(resolved_at__isnull=True),
+                name='unique_active_alert_per_run_type',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['organization', 'severity_rank', 'reference_date', 'id'],
+                condition=models.Q(resolved_at__isnull=True),
+                name='alert_active_org_order_idx',
+            ),
+            models.Index(fields=['organization', '-resolved_at'], name='alert_org_resolved_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_alert_type_display()} - Run #{self.run_no} ({self.style_number})"
@@ -269,18 +269,24 @@ class SampleRunSerializer(serializers.ModelSerializer):
     # Display fields
     run_type_display = serializers.CharField(source='get_run_type_display', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
+    source_stale = serializers.SerializerMethodField()
 
     class Meta:
         model = SampleRun
         fields = "__all__"
         read_only_fields = ("id", "created_at", "updated_at", "status_updated_at")
 
+    def get_source_stale(self, obj):
+        """快照後來源 revision 的 BOM / 工序已變更（需要重新產生）"""
+        from .services.auto_generation import is_run_source_stale
+        return is_run_source_stale(obj)
+
 
 # ==================== Tech Pack Snapshot Serializers ====================
 
 class RunTechPackBlockSerializer(serializers.ModelSerializer):
     """
-    Run 的翻譯快照 Block
+    Run 的翻譯快照 Block（RunTechPackBlock 或 techpack_snapshot.ResolvedBlock）
 
     用途：
     - GET /api/v2/sample-runs/{id}/techpack-snapshot/
@@ -320,23 +326,22 @@ class RunTechPackBlockSerializer(serializers.ModelSerializer):
         }
 
 
-class RunTechPackBlockPatchSerializer(serializers.ModelSerializer):
+class RunTechPackBlockPatchSerializer(serializers.Serializer):
     """
     PATCH 專用 - 更新翻譯和位置
+
+    只驗證輸入；寫入由 techpack_snapshot.update_run_techpack_blocks 處理
+    （共用 block set 時存為 override）
     """
-    class Meta:
-        model = RunTechPackBlock
-        fields = [
-            "translated_text",
-            "overlay_x",
-            "overlay_y",
-            "overlay_visible",
-        ]
+    translated_text = serializers.CharField(required=False, allow_blank=True)
+    overlay_x = serializers.FloatField(required=False, allow_null=True)
+    overlay_y = serializers.FloatField(required=False, allow_null=True)
+    overlay_visible = serializers.BooleanField(required=False)
 
 
 class RunTechPackPageSerializer(serializers.ModelSerializer):
     """
-    Run 的 Tech Pack 頁面快照
+    Run 的 Tech Pack 頁面快照（RunTechPackPage 或 techpack_snapshot.ResolvedPage）
     """
     blocks = RunTechPackBlockSerializer(many=True, read_only=True)
 
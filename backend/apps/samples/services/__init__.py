@@ -8,6 +8,7 @@ from .transitions import (
 from .auto_generation import (
     create_with_initial_run,
     generate_source_hash,
+    is_run_source_stale,
     validate_revision_for_request,
 )
 
@@ -27,6 +28,7 @@ __all__ = [
     # Auto-generation (P0-1)
     'create_with_initial_run',
     'generate_source_hash',
+    'is_run_source_stale',
     'validate_revision_for_request',
     # Snapshot services
     'ensure_guidance_usage',
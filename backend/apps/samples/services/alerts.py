@@ -0,0 +1,253 @@
+"""
+P1: SampleRun Alert Evaluation
+提醒規則評估（Celery beat 定期執行）→ Alert 表
+
+規則（門檻可由 settings 調整）：
+- overdue:  target_due_date < today                          → high
+- due_soon: today <= target_due_date <= today + N 天          → medium（ALERT_DUE_SOON_DAYS, 預設 3）
+- stale:    draft 且建立超過 N 天                              → low（ALERT_STALE_DAYS, 預設 7）
+
+讀取端（/api/v2/alerts/）只查 Alert 表，不再即時計算。
+"""
+
+import base64
+import binascii
+import logging
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import Alert, AlertSeverity, AlertType, SampleRun, SampleRunStatus
+
+logger = logging.getLogger(__name__)
+
+SEVERITY_BY_TYPE = {
+    AlertType.OVERDUE: AlertSeverity.HIGH,
+    AlertType.DUE_SOON: AlertSeverity.MEDIUM,
+    AlertType.STALE: AlertSeverity.LOW,
+}
+
+NOTIFICATION_TYPE_BY_SEVERITY = {
+    AlertSeverity.HIGH: 'alert',
+    AlertSeverity.MEDIUM: 'warning',
+    AlertSeverity.LOW: 'reminder',
+}
+
+# 不產生提醒的狀態
+CLOSED_STATUSES = [SampleRunStatus.CANCELLED, SampleRunStatus.ACCEPTED]
+
+
+def get_thresholds() -> Tuple[int, int]:
+    """(due_soon_days, stale_days)"""
+    return (
+        getattr(settings, 'ALERT_DUE_SOON_DAYS', 3),
+        getattr(settings, 'ALERT_STALE_DAYS', 7),
+    )
+
+
+def _classify(row: Dict, today: date, due_soon_cutoff: date, stale_cutoff) -> List[Tuple[str, date]]:
+    """回傳 [(alert_type, reference_date), ...]"""
+    fired = []
+    due = row['target_due_date']
+    if due is not None:
+        if due < today:
+            fired.append((AlertType.OVERDUE, due))
+        elif due <= due_soon_cutoff:
+            fired.append((AlertType.DUE_SOON, due))
+    if row['status'] == SampleRunStatus.DRAFT and row['created_at'] < stale_cutoff:
+        fired.append((AlertType.STALE, timezone.localtime(row['created_at']).date()))
+    return fired
+
+
+def evaluate_alerts(organization_id=None, notify: bool = True) -> Dict[str, int]:
+    """
+    評估單一組織的提醒規則並 upsert Alert 表
+
+    Args:
+        organization_id: Organization UUID（None = 未指定組織的 runs）
+        notify: 新提醒是否推送 assistant Notification
+
+    Returns:
+        {'created': int, 'updated': int, 'resolved': int}
+    """
+    now = timezone.now()
+    today = timezone.localdate(now)
+    due_soon_days, stale_days = get_thresholds()
+    due_soon_cutoff = today + timedelta(days=due_soon_days)
+    stale_cutoff = now - timedelta(days=stale_days)
+
+    # 單一查詢取得所有候選 runs（values projection，不建立 model instance）
+    candidates = SampleRun.objects.filter(
+        organization_id=organization_id
+    ).exclude(
+        status__in=CLOSED_STATUSES
+    ).filter(
+        Q(target_due_date__lte=due_soon_cutoff) |
+        Q(status=SampleRunStatus.DRAFT, created_at__lt=stale_cutoff)
+    ).values(
+        'id', 'run_no', 'status', 'target_due_date', 'created_at',
+        'sample_request_id', 'sample_request__revision__style__style_number',
+    )
+
+    firing = {}
+    for row in candidates:
+        for alert_type, reference_date in _classify(row, today, due_soon_cutoff, stale_cutoff):
+            firing[(row['id'], alert_type)] = (row, reference_date)
+
+    with transaction.atomic():
+        active = {
+            (alert.sample_run_id, alert.alert_type): alert
+            for alert in Alert.objects.select_for_update().filter(
+                organization_id=organization_id, resolved_at__isnull=True
+            )
+        }
+
+        to_create, to_update = [], []
+        for key, (row, reference_date) in firing.items():
+            alert = active.get(key)
+            if alert is None:
+                severity = SEVERITY_BY_TYPE[key[1]]
+                to_create.append(Alert(
+                    organization_id=organization_id,
+                    sample_run_id=row['id'],
+                    alert_type=key[1],
+                    severity=severity,
+                    severity_rank=AlertSeverity.RANK[severity],
+                    run_no=row['run_no'],
+                    run_status=row['status'],
+                    sample_request_id=row['sample_request_id'],
+                    style_number=row['sample_request__revision__style__style_number'] or '',
+                    reference_date=reference_date,
+                    first_seen_at=now,
+                    last_seen_at=now,
+                ))
+            else:
+                alert.run_status = row['status']
+                alert.reference_date = reference_date
+                alert.last_seen_at = now
+                to_update.append(alert)
+
+        resolved_ids = [alert.id for key, alert in active.items() if key not in firing]
+
+        created = Alert.objects.bulk_create(to_create)
+        Alert.objects.bulk_update(to_update, ['run_status', 'reference_date', 'last_seen_at'], batch_size=500)
+        if resolved_ids:
+            Alert.objects.filter(id__in=resolved_ids).update(resolved_at=now)
+
+        if notify and created:
+            transaction.on_commit(lambda: _notify([a.id for a in created]))
+
+    return {'created': len(created), 'updated': len(to_update), 'resolved': len(resolved_ids)}
+
+
+def evaluate_all_alerts() -> Dict[str, int]:
+    """所有組織（含未指定組織的 runs）"""
+    organization_ids = SampleRun.objects.exclude(
+        status__in=CLOSED_STATUSES
+    ).order_by().values_list('organization_id', flat=True).distinct()
+    # 已無 runs 的組織仍可能有未解除的提醒
+    organization_ids = set(organization_ids) | set(
+        Alert.objects.filter(resolved_at__isnull=True).order_by().values_list('organization_id', flat=True).distinct()
+    )
+
+    totals = {'organizations': 0, 'created': 0, 'updated': 0, 'resolved': 0}
+    for organization_id in organization_ids:
+        stats = evaluate_alerts(organization_id)
+        totals['organizations'] += 1
+        for key, value in stats.items():
+            totals[key] += value
+    return totals
+
+
+def _notify(alert_ids: List[int]):
+    """新提醒推送到 assistant NotificationService"""
+    from apps.assistant.services.task_service import NotificationService
+
+    today = timezone.localdate()
+    for alert in Alert.objects.filter(id__in=alert_ids):
+        content = format_alert(alert, today)
+        try:
+            NotificationService.create_notification(
+                title=content['title'],
+                message=content['message'],
+                notification_type=NOTIFICATION_TYPE_BY_SEVERITY[alert.severity],
+                related_object=alert,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to create notification for alert {alert.id}: {e}")
+
+
+# ========================================
+# Read side
+# ========================================
+
+def format_alert(alert: Alert, today: Optional[date] = None) -> Dict:
+    """Alert → API dict（天數於讀取時計算，不需重新評估）"""
+    today = today or timezone.localdate()
+    style_label = alert.style_number or 'Unknown'
+    data = {
+        'id': str(alert.id),
+        'type': alert.alert_type,
+        'severity': alert.severity,
+        'run_id': str(alert.sample_run_id),
+        'request_id': str(alert.sample_request_id),
+        'style_number': alert.style_number or None,
+        'status': alert.run_status,
+        'first_seen_at': alert.first_seen_at.isoformat(),
+        'resolved_at': alert.resolved_at.isoformat() if alert.resolved_at else None,
+    }
+
+    if alert.alert_type == AlertType.OVERDUE:
+        days_overdue = (today - alert.reference_date).days
+        data.update({
+            'title': f"Overdue: {style_label}",
+            'message': f"Run #{alert.run_no} was due on {alert.reference_date.strftime('%b %d, %Y')} ({days_overdue} days ago)",
+            'days_overdue': days_overdue,
+            'target_due_date': alert.reference_date.isoformat(),
+        })
+    elif alert.alert_type == AlertType.DUE_SOON:
+        days_until = (alert.reference_date - today).days
+        data.update({
+            'title': f"Due Soon: {style_label}",
+            'message': f"Run #{alert.run_no} is due in {days_until} day{'s' if days_until != 1 else ''}",
+            'days_until_due': days_until,
+            'target_due_date': alert.reference_date.isoformat(),
+        })
+    else:
+        days_stale = (today - alert.reference_date).days
+        data.update({
+            'title': f"Stale: {style_label}",
+            'message': f"Run #{alert.run_no} has been in draft for {days_stale} days",
+            'days_stale': days_stale,
+            'created_at': alert.reference_date.isoformat(),
+        })
+    return data
+
+
+def encode_alert_cursor(alert: Alert) -> str:
+    raw = f"{alert.severity_rank}|{alert.reference_date.isoformat()}|{alert.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def apply_alert_cursor(queryset, cursor: str):
+    """
+    Keyset pagination on (severity_rank, reference_date, id)
+
+    Raises:
+        ValueError: malformed cursor
+    """
+    try:
+        rank, ref, alert_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        rank, ref, alert_id = int(rank), date.fromisoformat(ref), int(alert_id)
+    except (ValueError, UnicodeDecodeError, binascii.Error) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    return queryset.filter(
+        Q(severity_rank__gt=rank) |
+        Q(severity_rank=rank, reference_date__gt=ref) |
+        Q(severity_rank=rank, reference_date=ref, id__gt=alert_id)
+    )
@@ -24,6 +24,7 @@ from typing import Dict, Any, Optional, Tuple
 import hashlib
 import json
 
+from apps.core.sequences import SequenceBlock, current_period, next_sequence, seed_from_max
 from apps.styles.models import StyleRevision, BOMItem, ConstructionStep
 from apps.costing.models import (
     UsageScenario,
@@ -37,8 +38,6 @@ from ..models import (
     SampleRun,
     RunBOMLine,
     RunOperation,
-    RunTechPackPage,
-    RunTechPackBlock,
     SampleMWO,
     SampleCostEstimate,
     SampleRequestType,
@@ -49,46 +48,40 @@ from ..models import (
 
 # ==================== Source Hash Generation ====================
 
-def generate_source_hash(revision: StyleRevision) -> str:
-    """
-    生成來源資料 hash，用於追溯
-
-    Args:
-        revision: StyleRevision instance
-
-    Returns:
-        SHA256 hash string (64 chars)
-    """
+def _compute_source_hash(revision: StyleRevision) -> str:
+    """完整讀取 verified BOM + construction steps 計算 hash"""
     # Get verified BOM items
     bom_items = BOMItem.objects.filter(
         revision=revision,
         is_verified=True
-    ).order_by('item_number')
+    ).order_by('item_number').values_list(
+        'material_name', 'consumption', 'unit', 'supplier', 'unit_price'
+    )
 
     # Get verified construction steps
     construction_steps = ConstructionStep.objects.filter(
         revision=revision,
         is_verified=True
-    ).order_by('step_number')
+    ).order_by('step_number').values_list('step_number', 'description')
 
     payload = {
         'revision_id': str(revision.id),
         'bom': [
             {
-                'material': item.material_name,
-                'consumption': str(item.consumption or 0),
-                'uom': item.unit or '',
-                'supplier': item.supplier or '',
-                'unit_price': str(item.unit_price or 0),
+                'material': material_name,
+                'consumption': str(consumption or 0),
+                'uom': unit or '',
+                'supplier': supplier or '',
+                'unit_price': str(unit_price or 0),
             }
-            for item in bom_items
+            for material_name, consumption, unit, supplier, unit_price in bom_items
         ],
         'ops': [
             {
-                'step_no': step.step_number,
-                'desc': step.description or '',
+                'step_no': step_number,
+                'desc': description or '',
             }
-            for step in construction_steps
+            for step_number, description in construction_steps
         ],
     }
 
@@ -96,41 +89,109 @@ def generate_source_hash(revision: StyleRevision) -> str:
     return hashlib.sha256(json_str.encode()).hexdigest()
 
 
-# ==================== Document Number Generation ====================
+def get_source_state(revision: StyleRevision) -> Tuple[str, int]:
+    """
+    (source_hash, data_version)
 
-def get_next_sequence(prefix: str) -> int:
+    StyleRevision.source_hash 是 data_version 當時計算的快取；版本號相同時
+    直接回傳（1 個查詢），否則重新計算並以條件 UPDATE 寫回
+    （計算期間資料又變更時不寫入，下次再算）。
     """
-    Get next sequence number for document numbering.
-    Simple implementation - in production, use Redis or DB sequence.
+    state = StyleRevision.objects.filter(pk=revision.pk).values(
+        'data_version', 'source_hash', 'source_hash_version'
+    ).first()
+    if state is None:
+        return _compute_source_hash(revision), 0
+
+    version = state['data_version']
+    if state['source_hash'] and state['source_hash_version'] == version:
+        return state['source_hash'], version
+
+    source_hash = _compute_source_hash(revision)
+    StyleRevision.objects.filter(pk=revision.pk, data_version=version).update(
+        source_hash=source_hash,
+        source_hash_version=version,
+    )
+    return source_hash, version
+
+
+def generate_source_hash(revision: StyleRevision) -> str:
     """
-    from django.db.models import Max
+    生成來源資料 hash，用於追溯
+
+    Args:
+        revision: StyleRevision instance
+
+    Returns:
+        SHA256 hash string (64 chars)
+    """
+    return get_source_state(revision)[0]
+
+
+def is_run_source_stale(run: SampleRun) -> bool:
+    """
+    Run 快照後來源 revision 的 BOM / 工序是否已變更
+
+    版本號相同時 O(1)；不同時（例如只改了未驗證的資料）再比對 hash。
+    queryset 已 annotate source_revision_data_version 時不再查詢版本號。
+    """
+    if not run.source_revision_id:
+        return False
+    current_version = getattr(run, 'source_revision_data_version', None)
+    if current_version is None:
+        current_version = StyleRevision.objects.filter(
+            pk=run.source_revision_id
+        ).values_list('data_version', flat=True).first()
+    if current_version is None:
+        return False
+    if run.source_data_version is not None and run.source_data_version == current_version:
+        return False
+    source_hash, _ = get_source_state(StyleRevision(pk=run.source_revision_id))
+    return source_hash != run.source_hash
 
+
+# ==================== Document Number Generation ====================
+
+def _sequence_args(prefix: str, organization=None) -> Dict[str, Any]:
+    """prefix → apps.core.sequences 參數（計數器第一次建立時才掃描既有號碼）"""
+    period = current_period()
     if prefix == 'mwo':
-        last = SampleMWO.objects.filter(
-            mwo_no__startswith=f"MWO-{timezone.now().strftime('%y%m')}"
-        ).aggregate(Max('mwo_no'))['mwo_no__max']
-    elif prefix == 'estimate':
-        last = SampleCostEstimate.objects.filter(
-            snapshot_hash__startswith=f"EST-{timezone.now().strftime('%y%m')}"
-        ).count()
-        return last + 1
-    elif prefix == 'ORD':
-        # Production Order sequence
+        return {
+            'prefix': 'MWO',
+            'period': period,
+            'seed': lambda: seed_from_max(SampleMWO.objects.all(), 'mwo_no', f"MWO-{period}-"),
+        }
+    if prefix == 'estimate':
+        # estimate 編號未另外保存，沒有可掃描的既有號碼
+        return {'prefix': 'EST', 'period': period}
+    if prefix == 'ORD':
+        # Production Order sequence（order_number 在組織內唯一）
         from apps.orders.models import ProductionOrder
-        last = ProductionOrder.objects.filter(
-            order_number__startswith=f"ORD-{timezone.now().strftime('%y%m')}"
-        ).aggregate(Max('order_number'))['order_number__max']
-    else:
-        return 1
+        orders = ProductionOrder.objects.all()
+        if organization is not None:
+            orders = orders.filter(organization=organization)
+        return {
+            'prefix': 'ORD',
+            'scope': organization.pk if organization is not None else None,
+            'period': period,
+            'seed': lambda: seed_from_max(orders, 'order_number', f"ORD-{period}-"),
+        }
+    raise ValueError(f"Unknown sequence prefix: {prefix}")
 
-    if last:
-        try:
-            # Extract number from format: PREFIX-YYMM-XXXXXX
-            seq = int(last.split('-')[-1])
-            return seq + 1
-        except (ValueError, IndexError):
-            pass
-    return 1
+
+def get_next_sequence(prefix: str, organization=None) -> int:
+    """
+    Get next sequence number for document numbering.
+    計數器表 + select_for_update 配號，併發建立不會重號
+    """
+    args = _sequence_args(prefix, organization)
+    return next_sequence(args.pop('prefix'), **args)
+
+
+def get_sequence_block(prefix: str, size: int, organization=None) -> SequenceBlock:
+    """批次匯入：一次預留 size 個號碼（用完 release()）"""
+    args = _sequence_args(prefix, organization)
+    return SequenceBlock(args.pop('prefix'), size, **args)
 
 
 def generate_mwo_no() -> str:
@@ -182,6 +243,10 @@ def validate_revision_for_request(revision: StyleRevision, threshold: float = 0.
 
 # ==================== Snapshot Functions ====================
 
+# 快照以 bulk_create 分批寫入（每批筆數）
+SNAPSHOT_BATCH_SIZE = 500
+
+
 def snapshot_bom_to_run(revision: StyleRevision, run: SampleRun) -> int:
     """
     Snapshot verified BOM items to RunBOMLine.
@@ -193,21 +258,20 @@ def snapshot_bom_to_run(revision: StyleRevision, run: SampleRun) -> int:
     Returns:
         Number of lines created
     """
-    bom_items = BOMItem.objects.filter(
+    bom_items = list(BOMItem.objects.filter(
         revision=revision,
         is_verified=True
-    ).order_by('item_number')
+    ).order_by('item_number'))
 
     # Fallback: 若尚未驗證，改用已確認翻譯的項目
-    if not bom_items.exists():
-        bom_items = BOMItem.objects.filter(
+    if not bom_items:
+        bom_items = list(BOMItem.objects.filter(
             revision=revision,
             translation_status='confirmed'
-        ).order_by('item_number')
+        ).order_by('item_number'))
 
-    created = 0
-    for idx, item in enumerate(bom_items, start=1):
-        RunBOMLine.objects.create(
+    lines = [
+        RunBOMLine(
             run=run,
             line_no=idx,
             material_name=item.material_name or '',
@@ -224,9 +288,11 @@ def snapshot_bom_to_run(revision: StyleRevision, run: SampleRun) -> int:
             leadtime_days=item.leadtime_days or 0,
             source_bom_item_id=item.id,
         )
-        created += 1
+        for idx, item in enumerate(bom_items, start=1)
+    ]
+    RunBOMLine.objects.bulk_create(lines, batch_size=SNAPSHOT_BATCH_SIZE)
 
-    return created
+    return len(lines)
 
 
 def snapshot_operations_to_run(revision: StyleRevision, run: SampleRun) -> int:
@@ -240,22 +306,21 @@ def snapshot_operations_to_run(revision: StyleRevision, run: SampleRun) -> int:
     Returns:
         Number of operations created
     """
-    steps = ConstructionStep.objects.filter(
+    steps = list(ConstructionStep.objects.filter(
         revision=revision,
         is_verified=True,
         translation_status='confirmed'
-    ).order_by('step_number')
+    ).order_by('step_number'))
 
     # Fallback: 無驗證工序時，允許使用已確認翻譯的工序
-    if not steps.exists():
-        steps = ConstructionStep.objects.filter(
+    if not steps:
+        steps = list(ConstructionStep.objects.filter(
             revision=revision,
             translation_status='confirmed'
-        ).order_by('step_number')
+        ).order_by('step_number'))
 
-    created = 0
-    for step in steps:
-        RunOperation.objects.create(
+    operations = [
+        RunOperation(
             run=run,
             step_no=step.step_number,
             step_name='',  # ConstructionStep doesn't have step_name field
@@ -268,27 +333,30 @@ def snapshot_operations_to_run(revision: StyleRevision, run: SampleRun) -> int:
             special_requirements='',  # ConstructionStep doesn't have special_requirements field
             source_construction_id=step.id,
         )
-        created += 1
+        for step in steps
+    ]
+    RunOperation.objects.bulk_create(operations, batch_size=SNAPSHOT_BATCH_SIZE)
 
-    return created
+    return len(operations)
 
 
 def snapshot_techpack_to_run(revision: StyleRevision, run: SampleRun) -> Dict[str, int]:
     """
     Snapshot Tech Pack translations to Run.
 
-    複製 TechPackRevision 的 DraftBlocks 到 RunTechPackPage/Block。
-    這樣每個 Run 有自己的翻譯快照，MWO 導出時使用。
+    Copy-on-write：擷取 TechPackRevision 的 DraftBlocks 為不可變的 TechPackBlockSet
+    （內容相同則共用既有的一份），Run 只記錄 FK；之後的修改存為 per-run overrides。
+    MWO 導出時透過 techpack_snapshot.resolve_run_techpack() 讀取。
 
     Args:
         revision: StyleRevision (用於找到對應的 TechPackRevision)
         run: Target SampleRun
 
     Returns:
-        Dict with pages_created, blocks_created counts
+        Dict with pages_created, blocks_created counts（快照中的頁數 / block 數）
     """
-    from apps.parsing.models_blocks import Revision as TechPackRevision, RevisionPage, DraftBlock
     from apps.parsing.models import UploadedDocument
+    from .techpack_snapshot import capture_block_set
 
     result = {
         'pages_created': 0,
@@ -310,40 +378,13 @@ def snapshot_techpack_to_run(revision: StyleRevision, run: SampleRun) -> Dict[st
     except Exception:
         return result
 
-    # 2. 複製頁面和 Blocks
-    pages = RevisionPage.objects.filter(
-        revision=tech_pack_revision
-    ).prefetch_related('blocks').order_by('page_number')
-
-    for page in pages:
-        # 創建 RunTechPackPage
-        run_page = RunTechPackPage.objects.create(
-            run=run,
-            page_number=page.page_number,
-            width=page.width,
-            height=page.height,
-            source_page_id=page.id,
-        )
-        result['pages_created'] += 1
-
-        # 複製該頁的所有 Blocks
-        for block in page.blocks.all():
-            RunTechPackBlock.objects.create(
-                run_page=run_page,
-                block_type=block.block_type,
-                source_text=block.source_text,
-                translated_text=block.edited_text or block.translated_text or '',
-                bbox_x=block.bbox_x,
-                bbox_y=block.bbox_y,
-                bbox_width=block.bbox_width,
-                bbox_height=block.bbox_height,
-                overlay_x=block.overlay_x,
-                overlay_y=block.overlay_y,
-                overlay_visible=block.overlay_visible,
-                source_block_id=block.id,
-            )
-            result['blocks_created'] += 1
+    # 2. 取得（或建立）共用的 block set
+    block_set = capture_block_set(tech_pack_revision)
+    run.techpack_block_set = block_set
+    run.save(update_fields=['techpack_block_set'])
 
+    result['pages_created'] = block_set.page_count
+    result['blocks_created'] = block_set.block_count
     return result
 
 
@@ -395,7 +436,7 @@ def create_with_initial_run(
         validate_revision_for_request(revision)
 
     # 3. Generate source hash
-    source_hash = generate_source_hash(revision)
+    source_hash, source_data_version = get_source_state(revision)
 
     # 4. Map request_type to run_type
     request_type = payload.get('request_type', SampleRequestType.PROTO)
@@ -434,6 +475,7 @@ def create_with_initial_run(
             'source_revision_id': revision.id,
             'source_revision_label': revision.revision_label,
             'source_hash': source_hash,
+            'source_data_version': source_data_version,
             'snapshotted_at': timezone.now(),
             'created_by': user,
         }
@@ -801,7 +843,7 @@ def generate_documents_for_request(
     revision = sample_request.revision
 
     # 1. Generate source hash
-    source_hash = generate_source_hash(revision)
+    source_hash, source_data_version = get_source_state(revision)
 
     # 2. Map request_type to run_type
     request_type = sample_request.request_type
@@ -824,6 +866,7 @@ def generate_documents_for_request(
         source_revision_id=revision.id,
         source_revision_label=revision.revision_label,
         source_hash=source_hash,
+        source_data_version=source_data_version,
         snapshotted_at=timezone.now(),
         created_by=user,
     )
@@ -1027,7 +1070,7 @@ def create_next_run_for_request(
         target_due_date = sample_request.due_date
 
     # 6. 生成 source hash
-    source_hash = generate_source_hash(revision)
+    source_hash, source_data_version = get_source_state(revision)
 
     # 7. 創建新的 SampleRun
     run = SampleRun.objects.create(
@@ -1040,6 +1083,7 @@ def create_next_run_for_request(
         source_revision_id=revision.id,
         source_revision_label=revision.revision_label,
         source_hash=source_hash,
+        source_data_version=source_data_version,
         snapshotted_at=timezone.now(),
         notes=notes,
         created_by=user,
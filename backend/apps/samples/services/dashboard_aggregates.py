@@ -0,0 +1,294 @@
+"""
+P18: Progress Dashboard Aggregates
+進度儀表板彙總（per-organization 快照）
+
+- 每個區塊以 GROUP BY status + 條件式 COUNT 計算（每區塊 1-2 個查詢）
+- 結果存在 ProgressDashboardSnapshot（每個組織一列），讀取為單一查詢
+- 狀態轉換時由 signals 只重算受影響的區塊（transaction commit 後合併執行，
+  READ_MODEL_REFRESH_ASYNC 開啟時交給 Celery）
+- Celery beat 定期全量重算（逾期/即將到期依日期變化）
+
+只快取預設查詢（無 style_id、days_ahead = DEFAULT_DAYS_AHEAD）；
+其他參數即時計算（同樣使用 grouped queries）。
+"""
+
+import logging
+from datetime import timedelta
+from typing import Dict, Iterable
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from apps.core.on_commit import OnCommitCoalescer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DAYS_AHEAD = 14
+
+SECTIONS = ('sample', 'quotation', 'procurement', 'production', 'material')
+
+# 無組織（開發模式匿名使用者）時的快照 key
+ALL_ORGS_KEY = 'all'
+
+
+def _snapshot_key(organization_id) -> str:
+    return str(organization_id) if organization_id else ALL_ORGS_KEY
+
+
+def _status_counts(queryset, field: str = 'status') -> Dict[str, int]:
+    """單一 GROUP BY 查詢取得各狀態數量"""
+    return {
+        row[field]: row['n']
+        for row in queryset.order_by().values(field).annotate(n=Count('id'))
+        if row['n']
+    }
+
+
+# ========================================
+# Section computations
+# ========================================
+
+def _compute_sample(organization_id, style_id, today, days_ahead) -> Dict:
+    from ..models import SampleRun, SampleRunStatus
+
+    runs = SampleRun.objects.exclude(status=SampleRunStatus.CANCELLED)
+    if organization_id:
+        runs = runs.filter(organization_id=organization_id)
+    if style_id:
+        runs = runs.filter(sample_request__revision__style_id=style_id)
+
+    open_runs = ~Q(status__in=['accepted', 'sample_done'])
+    flags = runs.aggregate(
+        overdue=Count('id', filter=Q(target_due_date__lt=today) & open_runs),
+        due_soon=Count('id', filter=Q(
+            target_due_date__gte=today,
+            target_due_date__lte=today + timedelta(days=days_ahead),
+        ) & open_runs),
+    )
+    return {'by_status': _status_counts(runs), **flags}
+
+
+def _compute_quotation(organization_id, style_id, today, days_ahead) -> Dict:
+    from apps.costing.models import CostSheetVersion
+
+    cost_sheets = CostSheetVersion.objects.all()
+    if organization_id:
+        cost_sheets = cost_sheets.filter(cost_sheet_group__style__organization_id=organization_id)
+    if style_id:
+        cost_sheets = cost_sheets.filter(cost_sheet_group__style_id=style_id)
+
+    return {
+        'by_status': _status_counts(cost_sheets),
+        'by_type': _status_counts(cost_sheets, field='costing_type'),
+    }
+
+
+def _compute_procurement(organization_id, style_id, today, days_ahead) -> Dict:
+    from apps.procurement.models import PurchaseOrder, POLine
+
+    purchase_orders = PurchaseOrder.objects.all()
+    lines = POLine.objects.all()
+    if organization_id:
+        purchase_orders = purchase_orders.filter(organization_id=organization_id)
+        lines = lines.filter(purchase_order__organization_id=organization_id)
+
+    flags = lines.aggregate(
+        overdue_deliveries=Count('id', filter=Q(
+            delivery_status__in=['pending', 'shipped', 'partial'],
+            expected_delivery__lt=today,
+        )),
+        due_soon_deliveries=Count('id', filter=Q(
+            delivery_status__in=['pending', 'shipped'],
+            expected_delivery__gte=today,
+            expected_delivery__lte=today + timedelta(days=days_ahead),
+        )),
+    )
+    return {'by_status': _status_counts(purchase_orders), **flags}
+
+
+def _compute_production(organization_id, style_id, today, days_ahead) -> Dict:
+    from apps.orders.models import ProductionOrder
+
+    production_orders = ProductionOrder.objects.all()
+    if organization_id:
+        production_orders = production_orders.filter(organization_id=organization_id)
+    if style_id:
+        production_orders = production_orders.filter(style_revision__style_id=style_id)
+
+    flags = production_orders.aggregate(
+        overdue=Count('id', filter=Q(delivery_date__lt=today) & ~Q(status__in=['completed', 'cancelled'])),
+    )
+    return {'by_status': _status_counts(production_orders), **flags}
+
+
+def _compute_material(organization_id, style_id, today, days_ahead) -> Dict:
+    from apps.orders.models import MaterialRequirement
+
+    material_reqs = MaterialRequirement.objects.all()
+    if organization_id:
+        material_reqs = material_reqs.filter(production_order__organization_id=organization_id)
+    if style_id:
+        material_reqs = material_reqs.filter(production_order__style_revision__style_id=style_id)
+
+    return {'by_status': _status_counts(material_reqs)}
+
+
+SECTION_BUILDERS = {
+    'sample': _compute_sample,
+    'quotation': _compute_quotation,
+    'procurement': _compute_procurement,
+    'production': _compute_production,
+    'material': _compute_material,
+}
+
+
+def compute_sections(
+    organization_id=None,
+    sections: Iterable[str] = SECTIONS,
+    style_id=None,
+    days_ahead: int = DEFAULT_DAYS_AHEAD,
+) -> Dict[str, Dict]:
+    """
+    計算儀表板區塊（原始數量，不含 label/color）
+
+    Returns:
+        {section: {'by_status': {status: count}, ...flags}}
+    """
+    today = timezone.now().date()
+    return {
+        section: SECTION_BUILDERS[section](organization_id, style_id, today, days_ahead)
+        for section in sections
+    }
+
+
+# ========================================
+# Snapshot read / refresh
+# ========================================
+
+def refresh_snapshot(organization_id=None, sections: Iterable[str] = SECTIONS):
+    """
+    重算指定區塊並寫入快照
+
+    全量重算時同時更新 as_of_date；部分重算保留其他區塊。
+    """
+    from ..models import ProgressDashboardSnapshot
+
+    sections = [s for s in sections if s in SECTION_BUILDERS]
+    data = compute_sections(organization_id, sections)
+    now = timezone.now()
+    key = _snapshot_key(organization_id)
+
+    if set(sections) == set(SECTIONS):
+        snapshot, _ = ProgressDashboardSnapshot.objects.update_or_create(
+            key=key,
+            defaults={
+                'organization_id': organization_id,
+                'sections': data,
+                'computed_at': now,
+                'as_of_date': now.date(),
+            },
+        )
+        return snapshot
+
+    with transaction.atomic():
+        snapshot = ProgressDashboardSnapshot.objects.select_for_update().filter(key=key).first()
+        if snapshot is None:
+            # 尚無快照：第一次讀取時再全量建立
+            return None
+        snapshot.sections = {**snapshot.sections, **data}
+        snapshot.computed_at = now
+        snapshot.save(update_fields=['sections', 'computed_at'])
+
+    return snapshot
+
+
+def get_dashboard_sections(organization_id=None, style_id=None, days_ahead: int = DEFAULT_DAYS_AHEAD):
+    """
+    讀取儀表板區塊
+
+    預設查詢從快照讀取（快照不存在或日期已過時重建）；其他參數即時計算。
+
+    Returns:
+        (sections dict, computed_at datetime)
+    """
+    from ..models import ProgressDashboardSnapshot
+
+    if style_id or days_ahead != DEFAULT_DAYS_AHEAD:
+        return compute_sections(organization_id, style_id=style_id, days_ahead=days_ahead), timezone.now()
+
+    snapshot = ProgressDashboardSnapshot.objects.filter(key=_snapshot_key(organization_id)).first()
+    if snapshot is None or snapshot.as_of_date != timezone.now().date():
+        snapshot = refresh_snapshot(organization_id)
+    return snapshot.sections, snapshot.computed_at
+
+
+def refresh_all_snapshots() -> int:
+    """全量重算所有已存在的快照（periodic job）"""
+    from ..models import ProgressDashboardSnapshot
+
+    count = 0
+    for organization_id in ProgressDashboardSnapshot.objects.values_list('organization_id', flat=True):
+        refresh_snapshot(organization_id)
+        count += 1
+    return count
+
+
+# ========================================
+# Incremental refresh (signals)
+# ========================================
+
+# 以上層物件排程時，commit 後每種物件一個查詢找出組織
+ORGANIZATION_LOOKUPS = {
+    'cost_sheet_group': ('costing.CostSheetGroup', 'style__organization_id'),
+    'purchase_order': ('procurement.PurchaseOrder', 'organization_id'),
+    'production_order': ('orders.ProductionOrder', 'organization_id'),
+}
+
+
+def schedule_section_refresh(organization_id, section: str):
+    """
+    排程區塊重算（同一 transaction 內的多次變更合併為一次）
+
+    同時更新該組織與 ALL_ORGS 快照；尚未建立的快照不重算。
+    """
+    dashboard_refresh.add(section, [organization_id, ALL_ORGS_KEY])
+
+
+def schedule_section_refresh_for(parent: str, parent_id, section: str):
+    """
+    同 schedule_section_refresh，組織由上層物件（ORGANIZATION_LOOKUPS）於 flush 時批次查出
+    """
+    dashboard_refresh.add(section, [ALL_ORGS_KEY])
+    dashboard_refresh.add(f'{section}:{parent}', [parent_id])
+
+
+def _refresh_pending(pending: Dict[str, set]):
+    from django.apps import apps
+    from ..models import ProgressDashboardSnapshot
+
+    sections_by_key: Dict[str, set] = {}
+    for key, ids in pending.items():
+        section, _, parent = key.partition(':')
+        if parent:
+            model, field = ORGANIZATION_LOOKUPS[parent]
+            ids = {
+                str(organization_id)
+                for organization_id in apps.get_model(model).objects.filter(pk__in=ids).values_list(field, flat=True)
+                if organization_id
+            }
+        for snapshot_key in ids:
+            sections_by_key.setdefault(snapshot_key, set()).add(section)
+
+    existing = ProgressDashboardSnapshot.objects.filter(key__in=sections_by_key).values_list('key', flat=True)
+    for snapshot_key in existing:
+        organization_id = None if snapshot_key == ALL_ORGS_KEY else snapshot_key
+        try:
+            refresh_snapshot(organization_id, sections_by_key[snapshot_key])
+        except Exception as e:
+            logger.warning(f"Dashboard snapshot refresh failed for {snapshot_key}: {e}")
+
+
+dashboard_refresh = OnCommitCoalescer(
+    'progress_dashboard', _refresh_pending, task='apps.samples.tasks.refresh_dashboard_sections_task',
+)
@@ -5,12 +5,16 @@ Exports MWO, Estimate, and T2 PO to Excel format using openpyxl.
 """
 
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 from openpyxl.utils import get_column_letter
-from django.http import HttpResponse
+from django.http import HttpResponse, FileResponse
 import json
+import tempfile
 from decimal import Decimal
 
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
 
 class ExcelExporter:
     """Base class for Excel export with common styling utilities"""
@@ -32,9 +36,7 @@ class ExcelExporter:
     @staticmethod
     def create_response(workbook, filename):
         """Create HTTP response with Excel file"""
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
+        response = HttpResponse(content_type=XLSX_CONTENT_TYPE)
         response['Content-Disposition'] = f'attachment; filename="{filename}"'
         workbook.save(response)
         return response
@@ -532,3 +534,221 @@ class T2POExcelExporter(ExcelExporter):
         ws.cell(row=total_row, column=9, value=self.format_decimal(total_amount))
         ws.cell(row=total_row, column=9).font = self.LABEL_FONT
         ws.cell(row=total_row, column=9).border = self.THIN_BORDER
+
+
+# ==================== Streaming (write-only) Export ====================
+
+class StreamingSheet:
+    """
+    Write-only worksheet wrapper with running-max column widths
+
+    openpyxl 在寫入第一列時就輸出 <cols>，所以欄寬必須在第一列前決定。
+    前 sample_rows 列先暫存並累計每欄最大長度，之後設定欄寬並逐列寫出，
+    其餘資料列直接串流，不再保留在記憶體中。
+    """
+
+    def __init__(self, ws, sample_rows=200, max_width=80):
+        self.ws = ws
+        self.sample_rows = sample_rows
+        self.max_width = max_width
+        self.widths = {}
+        self._buffer = []
+        self._flushed = False
+
+    def _track(self, values):
+        for idx, value in enumerate(values, 1):
+            length = len(str(value if value is not None else ''))
+            if length > self.widths.get(idx, 0):
+                self.widths[idx] = length
+
+    def _cell(self, value, font=None, fill=None, border=None, alignment=None):
+        cell = WriteOnlyCell(self.ws, value=value)
+        if font is not None:
+            cell.font = font
+        if fill is not None:
+            cell.fill = fill
+        if border is not None:
+            cell.border = border
+        if alignment is not None:
+            cell.alignment = alignment
+        return cell
+
+    def append(self, values, **style):
+        """Append a data row (style kwargs: font, fill, border, alignment)"""
+        values = list(values)
+        self._track(values)
+        row = [self._cell(v, **style) for v in values] if style else values
+
+        if self._flushed:
+            self.ws.append(row)
+            return
+
+        self._buffer.append(row)
+        if len(self._buffer) >= self.sample_rows:
+            self.flush()
+
+    def append_header(self, headers):
+        """Append a header row using ExcelExporter header style"""
+        self.append(
+            headers,
+            font=ExcelExporter.HEADER_FONT,
+            fill=ExcelExporter.HEADER_FILL,
+            border=ExcelExporter.THIN_BORDER,
+            alignment=Alignment(horizontal='center', vertical='center'),
+        )
+
+    def flush(self):
+        """Fix column widths from the running max and write buffered rows"""
+        if self._flushed:
+            return
+        for idx, length in self.widths.items():
+            self.ws.column_dimensions[get_column_letter(idx)].width = min(length + 2, self.max_width)
+        for row in self._buffer:
+            self.ws.append(row)
+        self._buffer = []
+        self._flushed = True
+
+
+class StreamingExcelExporter(ExcelExporter):
+    """
+    Base class for large exports using openpyxl write-only mode
+
+    資料列寫入暫存檔而非記憶體中的 cell 物件，適合大量 BOM/Spec/批次匯出。
+    """
+
+    WIDTH_SAMPLE_ROWS = 200
+
+    def __init__(self):
+        self.workbook = Workbook(write_only=True)
+        self.sheets = []
+
+    def add_sheet(self, title):
+        sheet = StreamingSheet(
+            self.workbook.create_sheet(title),
+            sample_rows=self.WIDTH_SAMPLE_ROWS,
+        )
+        self.sheets.append(sheet)
+        return sheet
+
+    def create_streaming_response(self, filename):
+        """Save workbook to a spooled temp file and stream it to the client"""
+        for sheet in self.sheets:
+            sheet.flush()
+
+        tmp = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+        self.workbook.save(tmp)
+        tmp.seek(0)
+
+        response = FileResponse(tmp, content_type=XLSX_CONTENT_TYPE)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class DateRangeExcelExporter(StreamingExcelExporter):
+    """
+    Export every SampleRun / T2 PO created in a date range to one workbook
+
+    Sheets:
+    - Sample Runs: one row per run
+    - T2 POs: one row per PO
+    - T2 PO Lines: one row per PO line
+    """
+
+    CHUNK_SIZE = 500
+
+    RUN_HEADERS = [
+        'Style', 'Style Name', 'Revision', 'Run No', 'Run Type', 'Status',
+        'Quantity', 'Target Due', 'Created',
+    ]
+    PO_HEADERS = [
+        'PO Number', 'Version', 'Style', 'Run No', 'Supplier', 'Status',
+        'Delivery Date', 'Total Amount', 'Currency', 'Created',
+    ]
+    LINE_HEADERS = [
+        'PO Number', 'Line', 'Material', 'Supplier Article No', 'UOM',
+        'Consumption / pc', 'Wastage %', 'Quantity', 'Unit Price', 'Line Total',
+    ]
+
+    def export(self, organization, start_date, end_date, include=('runs', 'pos')):
+        from apps.samples.models import SampleRun, T2POForSample, T2POLineForSample
+
+        if 'runs' in include:
+            runs = SampleRun.objects.filter(
+                created_at__date__gte=start_date,
+                created_at__date__lte=end_date,
+            )
+            if organization is not None:
+                runs = runs.filter(organization=organization)
+            self._write_runs(runs)
+
+        if 'pos' in include:
+            pos = T2POForSample.objects.filter(
+                created_at__date__gte=start_date,
+                created_at__date__lte=end_date,
+            )
+            lines = T2POLineForSample.objects.filter(t2po__in=pos)
+            if organization is not None:
+                pos = pos.filter(organization=organization)
+                lines = lines.filter(t2po__organization=organization)
+            self._write_pos(pos)
+            self._write_po_lines(lines)
+
+        filename = f"Export_{start_date:%Y%m%d}_{end_date:%Y%m%d}.xlsx"
+        return self.create_streaming_response(filename)
+
+    def _write_runs(self, runs):
+        sheet = self.add_sheet("Sample Runs")
+        sheet.append_header(self.RUN_HEADERS)
+
+        rows = runs.order_by('created_at', 'id').values_list(
+            'sample_request__revision__style__style_number',
+            'sample_request__revision__style__style_name',
+            'sample_request__revision__revision_label',
+            'run_no', 'run_type', 'status', 'quantity',
+            'target_due_date', 'created_at',
+        )
+        for (style_number, style_name, revision_label, run_no, run_type,
+             run_status, quantity, target_due, created) in rows.iterator(chunk_size=self.CHUNK_SIZE):
+            sheet.append([
+                style_number or '', style_name or '', revision_label or '',
+                run_no, run_type, run_status, quantity,
+                target_due.strftime('%Y-%m-%d') if target_due else '',
+                created.strftime('%Y-%m-%d %H:%M') if created else '',
+            ])
+
+    def _write_pos(self, pos):
+        sheet = self.add_sheet("T2 POs")
+        sheet.append_header(self.PO_HEADERS)
+
+        rows = pos.order_by('created_at', 'id').values_list(
+            'po_no', 'version_no',
+            'sample_run__sample_request__revision__style__style_number',
+            'sample_run__run_no', 'supplier_name', 'status',
+            'delivery_date', 'total_amount', 'currency', 'created_at',
+        )
+        for (po_no, version_no, style_number, run_no, supplier, po_status,
+             delivery, total, currency, created) in rows.iterator(chunk_size=self.CHUNK_SIZE):
+            sheet.append([
+                po_no, f"v{version_no}", style_number or '', run_no, supplier, po_status,
+                delivery.strftime('%Y-%m-%d') if delivery else '',
+                self.format_decimal(total), currency,
+                created.strftime('%Y-%m-%d %H:%M') if created else '',
+            ])
+
+    def _write_po_lines(self, lines):
+        sheet = self.add_sheet("T2 PO Lines")
+        sheet.append_header(self.LINE_HEADERS)
+
+        rows = lines.order_by('t2po__created_at', 't2po_id', 'line_no').values_list(
+            't2po__po_no', 'line_no', 'material_name', 'supplier_article_no', 'uom',
+            'consumption_per_piece', 'wastage_pct', 'quantity_requested',
+            'unit_price', 'line_total',
+        )
+        for (po_no, line_no, material, article_no, uom, consumption, wastage,
+             quantity, unit_price, line_total) in rows.iterator(chunk_size=self.CHUNK_SIZE):
+            sheet.append([
+                po_no, line_no, material, article_no or '', uom,
+                self.format_decimal(consumption), self.format_decimal(wastage),
+                self.format_decimal(quantity), self.format_decimal(unit_price),
+                self.format_decimal(line_total),
+            ])
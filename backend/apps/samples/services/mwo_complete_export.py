@@ -17,35 +17,13 @@ from django.http import HttpResponse
 from django.utils import timezone
 from io import BytesIO
 import fitz  # PyMuPDF
-from PIL import Image, ImageDraw, ImageFont
-import os
+from PIL import Image, ImageDraw
 import logging
-from typing import Optional, List, Tuple
+from typing import List, Tuple
 
-logger = logging.getLogger(__name__)
-
-
-def find_chinese_font(bold: bool = False) -> Optional[str]:
-    """查找中文字體"""
-    if bold:
-        font_paths = [
-            "C:/Windows/Fonts/msyhbd.ttc",   # 微軟雅黑粗體
-            "C:/Windows/Fonts/simhei.ttf",   # 黑體
-            "C:/Windows/Fonts/msyh.ttc",     # 微軟雅黑
-        ]
-    else:
-        font_paths = [
-            "C:/Windows/Fonts/msyh.ttc",     # 微軟雅黑
-            "C:/Windows/Fonts/simsun.ttc",   # 宋體
-            "C:/Windows/Fonts/simhei.ttf",   # 黑體
-            # Linux
-            "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
-        ]
+from apps.core.fonts import get_font_registry
 
-    for path in font_paths:
-        if os.path.exists(path):
-            return path
-    return None
+logger = logging.getLogger(__name__)
 
 
 class MWOCompletePDFExporter:
@@ -79,19 +57,14 @@ class MWOCompletePDFExporter:
         self.mwo = self._get_mwo()
         self.style_revision = sample_run.revision or sample_run.sample_request.revision
 
-        # 載入字體
-        font_path = find_chinese_font(bold=False)
-        font_path_bold = find_chinese_font(bold=True) or font_path
-
-        if not font_path:
-            raise Exception("找不到中文字體！請確認 Windows 字體資料夾。")
-
-        self.font_title = ImageFont.truetype(font_path_bold, 36)
-        self.font_subtitle = ImageFont.truetype(font_path_bold, 24)
-        self.font_header = ImageFont.truetype(font_path_bold, 18)
-        self.font_normal = ImageFont.truetype(font_path, 14)
-        self.font_small = ImageFont.truetype(font_path, 12)
-        self.font_chinese = ImageFont.truetype(font_path, 14)
+        # 載入字體（FontRegistry 共用快取，粗體缺少時回退到一般字體）
+        fonts = get_font_registry()
+        self.font_title = fonts.pil_font(36, bold=True)
+        self.font_subtitle = fonts.pil_font(24, bold=True)
+        self.font_header = fonts.pil_font(18, bold=True)
+        self.font_normal = fonts.pil_font(14)
+        self.font_small = fonts.pil_font(12)
+        self.font_chinese = fonts.pil_font(14)
 
         logger.info(f"MWOCompletePDFExporter initialized for Run: {sample_run.id}")
 
@@ -216,7 +189,7 @@ class MWOCompletePDFExporter:
     def _create_techpack_pages(self) -> List[bytes]:
         """創建 Tech Pack 雙語頁面
 
-        優先使用 Run 的快照資料 (RunTechPackPage/Block)：
+        優先使用 Run 的快照資料（block set + overrides，或舊的 RunTechPackPage/Block）：
         1. 先檢查 Run 是否有 Tech Pack 快照
         2. 如果有快照，使用快照數據渲染
         3. 如果沒有快照，fallback 到原始 TechPackRevision
@@ -225,15 +198,13 @@ class MWOCompletePDFExporter:
 
         try:
             # ⭐ 優先使用 Run 的 Tech Pack 快照
-            from apps.samples.models import RunTechPackPage, RunTechPackBlock
+            from apps.samples.services.techpack_snapshot import resolve_run_techpack
 
-            run_pages = RunTechPackPage.objects.filter(
-                run=self.sample_run
-            ).prefetch_related('blocks').order_by('page_number')
+            run_pages = resolve_run_techpack(self.sample_run)
 
-            if run_pages.exists():
+            if run_pages:
                 # 使用快照數據渲染
-                logger.info(f"Using Run Tech Pack snapshot: {run_pages.count()} pages")
+                logger.info(f"Using Run Tech Pack snapshot: {len(run_pages)} pages")
                 pages = self._render_techpack_from_snapshot(run_pages)
                 return pages
 
@@ -285,7 +256,7 @@ class MWOCompletePDFExporter:
         """使用 Run 的快照數據渲染 Tech Pack 頁面
 
         Args:
-            run_pages: RunTechPackPage QuerySet
+            run_pages: resolve_run_techpack() 的 ResolvedPage 列表
 
         Returns:
             List of page image bytes
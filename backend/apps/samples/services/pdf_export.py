@@ -9,11 +9,15 @@ P3: PDF Export Service
 - 推薦字體優先級：SimSun > MSYaHei > KaiU
 """
 
-from django.template.loader import render_to_string
+from django.conf import settings
+from django.template.loader import get_template
 from django.http import HttpResponse
 from django.utils import timezone
+from functools import lru_cache
 from io import BytesIO
-import os
+import threading
+
+from apps.core.fonts import get_font_registry
 
 # 雙引擎支援：優先使用 WeasyPrint，回退到 xhtml2pdf
 try:
@@ -24,6 +28,51 @@ except (ImportError, OSError):
     from xhtml2pdf import pisa
     PDF_ENGINE = 'xhtml2pdf'
 
+# base.html 的 font-family 名稱，對應到 FontRegistry 註冊的 reportlab 字體
+XHTML2PDF_FONT_ALIASES = ('simsun', 'msyahei', 'kaiu', 'microsoft yahei', 'simhei')
+
+_xhtml2pdf_fonts_ready = False
+_xhtml2pdf_fonts_lock = threading.Lock()
+
+
+def ensure_xhtml2pdf_fonts():
+    """
+    為 xhtml2pdf 註冊中文字體（每個 process 只執行一次）
+
+    xhtml2pdf 只認得 DEFAULT_FONT 內的字體名稱，單純 pdfmetrics.registerFont
+    不會生效，所以把模板使用的 font-family 別名指向已註冊的字體。
+    """
+    global _xhtml2pdf_fonts_ready
+    if _xhtml2pdf_fonts_ready:
+        return
+
+    with _xhtml2pdf_fonts_lock:
+        if _xhtml2pdf_fonts_ready:
+            return
+
+        import xhtml2pdf.default
+
+        font_name = get_font_registry().reportlab_font()
+        for alias in XHTML2PDF_FONT_ALIASES:
+            xhtml2pdf.default.DEFAULT_FONT[alias] = font_name
+        _xhtml2pdf_fonts_ready = True
+
+
+@lru_cache(maxsize=None)
+def _get_cached_template(template_name):
+    return get_template(template_name)
+
+
+def get_pdf_template(template_name):
+    """
+    取得編譯後的 PDF 模板
+
+    DEBUG 模式下每次重新載入，方便修改模板；其餘情況快取在 process 內。
+    """
+    if settings.DEBUG:
+        return get_template(template_name)
+    return _get_cached_template(template_name)
+
 
 class PDFExporter:
     """Base class for PDF export using HTML templates"""
@@ -62,8 +111,8 @@ class PDFExporter:
         # 添加當前時間到 context
         context['now'] = timezone.now()
 
-        # 渲染 HTML
-        html_string = render_to_string(template_name, context)
+        # 渲染 HTML（編譯後的模板快取）
+        html_string = get_pdf_template(template_name).render(context)
 
         # 根據可用引擎生成 PDF
         if PDF_ENGINE == 'weasyprint':
@@ -72,43 +121,14 @@ class PDFExporter:
         else:  # xhtml2pdf
             result = BytesIO()
 
-            # 為 xhtml2pdf 註冊中文字體
             def link_callback(uri, rel):
                 """處理 xhtml2pdf 的資源載入"""
                 if uri.startswith('file:///'):
                     return uri[8:]  # 去掉 file:/// 前綴
                 return uri
 
-            # 註冊中文字體（手動方式）
-            from reportlab.pdfbase import pdfmetrics
-            from reportlab.pdfbase.ttfonts import TTFont
-
-            # 正確的字體列表（包含常用漢字的字體）
-            # 重要：simsunb.ttf 是「宋體擴展B」，只包含罕用字，不要使用！
-            # 正確的宋體是 simsun.ttc（TTC 格式，需要 subfontIndex）
-            chinese_fonts = [
-                # TTC 格式需要 subfontIndex 參數
-                ('SimSun', 'C:/Windows/Fonts/simsun.ttc', 0),       # 宋體（推薦）
-                ('MSYaHei', 'C:/Windows/Fonts/msyh.ttc', 0),        # 微軟雅黑
-                ('MSYaHeiBold', 'C:/Windows/Fonts/msyhbd.ttc', 0),  # 微軟雅黑粗體
-                # TTF 格式不需要 subfontIndex
-                ('KaiU', 'C:/Windows/Fonts/kaiu.ttf', None),        # 標楷體
-            ]
-
-            registered_font = None
-            for font_name, font_path, subfont_index in chinese_fonts:
-                if os.path.exists(font_path):
-                    try:
-                        if subfont_index is not None:
-                            pdfmetrics.registerFont(TTFont(font_name, font_path, subfontIndex=subfont_index))
-                        else:
-                            pdfmetrics.registerFont(TTFont(font_name, font_path))
-                        registered_font = font_name
-                        print(f"[PDF] Registered font: {font_name} from {font_path}")
-                        break
-                    except Exception as e:
-                        print(f"[PDF] Failed to register {font_name}: {e}")
-                        continue
+            # 中文字體只在第一次匯出時註冊（process-wide）
+            ensure_xhtml2pdf_fonts()
 
             pisa_status = pisa.CreatePDF(
                 html_string,
@@ -3,10 +3,14 @@ Phase 3 Refactor: SampleRun State Machine
 狀態轉換邏輯（樣衣先做 → 回填實際用量/工時 → 才報價）
 """
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable
+from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.db import connections, transaction
+from django.db.models import Exists, OuterRef, Subquery
 from django.utils import timezone
 
 from ..models import SampleRun, SampleRunStatus, SampleRunTransitionLog
@@ -387,12 +391,445 @@ class BatchTransitionResult:
     errors: list   # List of error details
 
 
+# 有副作用（生成 T2PO/MWO/Costing 等）的動作；其餘動作只改狀態
+SIDE_EFFECT_ACTIONS = frozenset([
+    'start_materials_planning',
+    'generate_t2po',
+    'issue_t2po',
+    'generate_mwo',
+    'issue_mwo',
+    'record_actuals',
+    'generate_sample_costing',
+])
+
+CONFLICT_ERROR = 'Run status changed concurrently; transition not applied'
+ABORTED_ERROR = 'Not applied: another run in this all-or-nothing batch failed'
+
+
+def _prerequisite_annotations() -> Dict[str, Any]:
+    """批量前置條件檢查用的 annotations（對應 PREREQUISITES 中的 validators）"""
+    from apps.costing.models import UsageLine
+    from ..models import SampleActuals, SampleMWO, T2POForSample
+
+    return {
+        'has_guidance_lines': Exists(UsageLine.objects.filter(usage_scenario_id=OuterRef('guidance_usage_id'))),
+        'has_actual_lines': Exists(UsageLine.objects.filter(usage_scenario_id=OuterRef('actual_usage_id'))),
+        'has_actuals': Exists(SampleActuals.objects.filter(sample_run_id=OuterRef('pk'))),
+        'latest_t2po_status': Subquery(
+            T2POForSample.objects.filter(sample_run_id=OuterRef('pk'), is_latest=True).values('status')[:1]
+        ),
+        'latest_mwo_status': Subquery(
+            SampleMWO.objects.filter(sample_run_id=OuterRef('pk'), is_latest=True).values('status')[:1]
+        ),
+    }
+
+
+def _check_materials_planning(run) -> Optional[str]:
+    if not run.guidance_usage_id:
+        return "guidance_usage must exist before generating T2PO"
+    if not run.has_guidance_lines:
+        return "guidance_usage must have usage lines"
+    return None
+
+
+def _check_po_drafted(run) -> Optional[str]:
+    if run.latest_t2po_status is None:
+        return "No T2PO found"
+    if run.latest_t2po_status != 'draft':
+        return f"Latest T2PO must be 'draft' to issue, got '{run.latest_t2po_status}'"
+    return None
+
+
+def _check_po_issued(run) -> Optional[str]:
+    if run.latest_mwo_status is None:
+        return "MWO must be generated before transition"
+    return None
+
+
+def _check_mwo_drafted(run) -> Optional[str]:
+    if run.latest_mwo_status is None:
+        return "No MWO found"
+    if run.latest_mwo_status != 'draft':
+        return f"Latest MWO must be 'draft' to issue, got '{run.latest_mwo_status}'"
+    return None
+
+
+def _check_sample_done(run) -> Optional[str]:
+    if not run.has_actuals:
+        return "SampleActuals must exist"
+    if not run.guidance_usage_id:
+        return "guidance_usage must exist to create actual_usage"
+    return None
+
+
+def _check_actuals_recorded(run) -> Optional[str]:
+    if not run.actual_usage_id:
+        return "actual_usage must exist"
+    if not run.has_actual_lines:
+        return "actual_usage must have usage lines"
+    if not run.has_actuals:
+        return "SampleActuals must exist with cost data"
+    return None
+
+
+# action → (所需 annotations, checker)；與 PREREQUISITES 一一對應
+BATCH_PREREQUISITES = {
+    'generate_t2po': (('has_guidance_lines',), _check_materials_planning),
+    'issue_t2po': (('latest_t2po_status',), _check_po_drafted),
+    'generate_mwo': (('latest_mwo_status',), _check_po_issued),
+    'issue_mwo': (('latest_mwo_status',), _check_mwo_drafted),
+    'record_actuals': (('has_actuals',), _check_sample_done),
+    'generate_sample_costing': (('has_actual_lines', 'has_actuals'), _check_actuals_recorded),
+}
+
+
+def load_runs_for_batch(run_ids: list[str], organization=None, actions: Optional[Iterable[str]] = None) -> list:
+    """
+    單一查詢取得 runs，並 annotate 前置條件所需欄位
+
+    Args:
+        actions: 本批次可能執行的動作（None = 全部）
+    """
+    queryset = SampleRun.objects.filter(id__in=run_ids)
+    if organization is not None:
+        queryset = queryset.filter(organization=organization)
+
+    if actions is None:
+        actions = BATCH_PREREQUISITES.keys()
+    needed = set()
+    for action in actions:
+        needed.update(BATCH_PREREQUISITES.get(action, ((), None))[0])
+    if needed:
+        annotations = _prerequisite_annotations()
+        queryset = queryset.annotate(**{name: annotations[name] for name in needed})
+
+    return list(queryset)
+
+
+def _validate_for_batch(run: SampleRun, action: str) -> Optional[str]:
+    """回傳錯誤訊息（None = 可轉換）"""
+    if action == 'cancel':
+        if run.status not in CANCEL_ALLOWED_FROM:
+            return f"Cannot cancel from status '{run.status}'"
+        return None
+
+    if not can_transition(run, action):
+        return (
+            f"Action '{action}' not allowed from status '{run.status}'. "
+            f"Allowed actions: {get_allowed_actions(run)}"
+        )
+
+    prerequisite = BATCH_PREREQUISITES.get(action)
+    if prerequisite:
+        return prerequisite[1](run)
+    return None
+
+
+def _side_effect_worker(func, run: SampleRun, action: str) -> Dict[str, Any]:
+    try:
+        return func(run, action)
+    finally:
+        # worker thread 使用獨立連線，結束時關閉
+        connections.close_all()
+
+
+def _run_side_effects(items: list, func, stop_on_error: bool = False) -> Dict[Any, Any]:
+    """
+    執行副作用（bounded worker pool）
+
+    在 transaction 內（all-or-nothing、測試）或 SQLite 時改為逐筆執行：
+    worker thread 的連線看不到未 commit 的資料，也無法一起 rollback。
+
+    Args:
+        func: func(run, action) -> meta dict
+
+    Returns:
+        {run.id: meta dict 或 Exception}
+    """
+    work = [(run, action) for run, action in items if action in SIDE_EFFECT_ACTIONS]
+    outcomes = {}
+    if not work:
+        return outcomes
+
+    workers = getattr(settings, 'SAMPLE_RUN_BATCH_WORKERS', 4)
+    connection = transaction.get_connection()
+    parallel = (
+        workers > 1 and len(work) > 1
+        and not connection.in_atomic_block
+        and connection.vendor != 'sqlite'
+    )
+
+    if not parallel:
+        for run, action in work:
+            try:
+                outcomes[run.id] = func(run, action)
+            except (ValidationError, ValueError) as e:
+                outcomes[run.id] = e
+                if stop_on_error:
+                    break
+        return outcomes
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(work))) as pool:
+        futures = {
+            pool.submit(_side_effect_worker, func, run, action): run
+            for run, action in work
+        }
+        for future in as_completed(futures):
+            run = futures[future]
+            try:
+                outcomes[run.id] = future.result()
+            except (ValidationError, ValueError) as e:
+                outcomes[run.id] = e
+    return outcomes
+
+
+def _apply_status_updates(items: list, actor: Optional[Any], payload: Dict[str, Any], now: datetime) -> set:
+    """
+    Set-based 狀態更新：每個來源狀態一個 UPDATE ... WHERE status=old，
+    transition logs 以 bulk_create 寫入
+
+    Args:
+        items: [(run, action, new_status), ...]
+
+    Returns:
+        實際套用的 run ids（被併發修改的 run 不會套用）
+    """
+    from apps.styles.style_status import schedule_style_status_refresh
+    from .dashboard_aggregates import schedule_section_refresh
+    from .scheduler_cache import schedule_version_bump
+
+    fields = ['status', 'status_updated_at', 'status_timestamps']
+    if payload.get('notes'):
+        fields.append('notes')
+
+    groups: Dict[str, list] = {}
+    for run, action, new_status in items:
+        groups.setdefault(run.status, []).append((run, action, new_status))
+
+    applied = set()
+    logs = []
+    for old_status, group in groups.items():
+        for run, action, new_status in group:
+            run.status = new_status
+            run.status_updated_at = now
+            timestamps = run.status_timestamps or {}
+            timestamps[new_status] = now.isoformat()
+            run.status_timestamps = timestamps
+            if payload.get('notes'):
+                run.notes = (run.notes or '') + f"\n[{now.isoformat()}] {action}: {payload['notes']}"
+
+        runs = [run for run, _, _ in group]
+        # bulk_update 沿用 queryset 的 WHERE，等同 UPDATE ... WHERE status=old AND id IN (...)
+        updated = SampleRun.objects.filter(status=old_status).bulk_update(runs, fields)
+        if updated == len(runs):
+            group_applied = {run.id for run in runs}
+        else:
+            group_applied = set(SampleRun.objects.filter(
+                id__in=[run.id for run in runs], status_updated_at=now,
+            ).values_list('id', flat=True))
+
+        for run, action, new_status in group:
+            if run.id not in group_applied:
+                run.status = old_status
+                continue
+            applied.add(run.id)
+            logs.append(SampleRunTransitionLog(
+                sample_run=run,
+                from_status=old_status,
+                to_status=new_status,
+                action=action,
+                actor=actor if actor and hasattr(actor, 'pk') else None,
+                note=payload.get('notes', '') or payload.get('reason', ''),
+            ))
+
+    SampleRunTransitionLog.objects.bulk_create(logs)
+
+    # bulk_update 不觸發 post_save signals，手動排程快取更新
+    for organization_id in {run.organization_id for run, _, _ in items if run.id in applied}:
+        schedule_section_refresh(organization_id, 'sample')
+        schedule_version_bump(organization_id)
+    schedule_style_status_refresh('sample_run', applied)
+
+    return applied
+
+
+class _BatchAborted(Exception):
+    def __init__(self, failures: Dict[Any, str]):
+        super().__init__('batch aborted')
+        self.failures = failures
+
+
+class _RunConflict(ValueError):
+    def __init__(self):
+        super().__init__(CONFLICT_ERROR)
+
+
+def execute_batch_transitions(
+    runs: list,
+    actions: Dict[Any, Optional[str]],
+    actor: Optional[Any] = None,
+    payload: Optional[Dict[str, Any]] = None,
+    all_or_nothing: bool = False,
+) -> list[Dict[str, Any]]:
+    """
+    Set-based transition engine
+
+    1. 先驗證全部 runs（前置條件以 load_runs_for_batch 的 annotations 檢查，不逐筆查詢）
+    2. 副作用（T2PO/MWO 生成等）在 bounded worker pool 執行；
+       partial 模式下每個 run 的副作用與狀態寫入在同一個 transaction（衝突時副作用一併 rollback）
+    3. 狀態以 UPDATE ... WHERE status=old 套用，transition logs 以 bulk_create 寫入
+
+    Args:
+        runs: load_runs_for_batch() 取得的 runs
+        actions: {run.id: action}；action 為 None 表示無可用動作（終態）
+        all_or_nothing: 任一 run 失敗則全部不套用（副作用一併 rollback）
+
+    Returns:
+        每個 run 一筆結果：
+        {'run_id', 'old_status', 'new_status', 'action', 'success': True, 'meta'}
+        或 {'run_id', 'status', 'action', 'success': False, 'error'}
+    """
+    if payload is None:
+        payload = {}
+
+    failures: Dict[Any, str] = {}
+    valid = []
+    for run in runs:
+        action = actions.get(run.id)
+        if action is None:
+            failures[run.id] = f'No available action for status "{run.status}" (terminal state)'
+            continue
+        error = _validate_for_batch(run, action)
+        if error:
+            failures[run.id] = error
+        else:
+            valid.append((run, action))
+
+    old_statuses = {run.id: run.status for run in runs}
+    metas: Dict[Any, Dict[str, Any]] = {}
+    applied: set = set()
+    now = timezone.now()
+
+    def new_status_for(run, action):
+        if action == 'cancel':
+            return SampleRunStatus.CANCELLED
+        return STATE_TRANSITIONS[run.status][action]
+
+    if all_or_nothing:
+        if not failures:
+            try:
+                with transaction.atomic():
+                    side_effects = _run_side_effects(
+                        valid, lambda run, action: execute_action_side_effects(run, action, payload),
+                        stop_on_error=True,
+                    )
+                    errors = {rid: str(e) for rid, e in side_effects.items() if isinstance(e, Exception)}
+                    if errors:
+                        raise _BatchAborted(errors)
+                    metas = side_effects
+                    applied = _apply_status_updates(
+                        [(run, action, new_status_for(run, action)) for run, action in valid],
+                        actor, payload, now,
+                    )
+                    if len(applied) < len(valid):
+                        raise _BatchAborted({run.id: CONFLICT_ERROR for run, _ in valid if run.id not in applied})
+            except _BatchAborted as e:
+                failures.update(e.failures)
+                metas, applied = {}, set()
+                for run in runs:
+                    run.status = old_statuses[run.id]
+        if failures:
+            for run in runs:
+                failures.setdefault(run.id, ABORTED_ERROR)
+    else:
+        def transition_with_side_effects(run, action):
+            with transaction.atomic():
+                meta = execute_action_side_effects(run, action, payload)
+                if not _apply_status_updates([(run, action, new_status_for(run, action))], actor, payload, now):
+                    raise _RunConflict()
+            return meta
+
+        side_effects = _run_side_effects(valid, transition_with_side_effects)
+        for run_id, outcome in side_effects.items():
+            if isinstance(outcome, Exception):
+                failures[run_id] = str(outcome)
+            else:
+                metas[run_id] = outcome
+                applied.add(run_id)
+
+        # 只改狀態的動作：set-based 一次套用
+        pending = [
+            (run, action, new_status_for(run, action))
+            for run, action in valid if run.id not in side_effects
+        ]
+        if pending:
+            with transaction.atomic():
+                status_applied = _apply_status_updates(pending, actor, payload, now)
+            applied |= status_applied
+            for run, _, _ in pending:
+                if run.id not in status_applied:
+                    failures[run.id] = CONFLICT_ERROR
+
+    outcomes = []
+    for run in runs:
+        action = actions.get(run.id)
+        if run.id in applied:
+            outcomes.append({
+                'run_id': str(run.id),
+                'old_status': old_statuses[run.id],
+                'new_status': run.status,
+                'action': action,
+                'success': True,
+                'meta': metas.get(run.id, {}),
+            })
+        else:
+            outcomes.append({
+                'run_id': str(run.id),
+                'status': old_statuses[run.id],
+                'action': action,
+                'success': False,
+                'error': failures[run.id],
+            })
+    return outcomes
+
+
+def _aborted_outcomes(runs: list, actions: Dict[Any, Optional[str]]) -> list[Dict[str, Any]]:
+    """all-or-nothing 批次有 run 找不到時：全部不執行"""
+    return [
+        {'run_id': str(run.id), 'status': run.status, 'action': actions.get(run.id), 'success': False,
+         'error': ABORTED_ERROR}
+        for run in runs
+    ]
+
+
+def _build_batch_result(run_ids: list[str], runs: list, outcomes: list) -> BatchTransitionResult:
+    """組合 BatchTransitionResult（含找不到的 runs）"""
+    found_ids = {str(run.id) for run in runs}
+    errors = [
+        {'run_id': missing_id, 'error': 'Run not found or access denied'}
+        for missing_id in run_ids if missing_id not in found_ids
+    ]
+    errors += [
+        {key: outcome[key] for key in ('run_id', 'status', 'action', 'error')}
+        for outcome in outcomes if not outcome['success']
+    ]
+    succeeded = sum(1 for outcome in outcomes if outcome['success'])
+    return BatchTransitionResult(
+        total=len(run_ids),
+        succeeded=succeeded,
+        failed=len(run_ids) - succeeded,
+        results=outcomes,
+        errors=errors,
+    )
+
+
 def batch_transition_sample_runs(
     run_ids: list[str],
     action: str,
     actor: Optional[Any] = None,
     payload: Optional[Dict[str, Any]] = None,
     organization=None,
+    all_or_nothing: bool = False,
 ) -> BatchTransitionResult:
     """
     Execute state transition on multiple SampleRuns.
@@ -403,39 +840,19 @@ def batch_transition_sample_runs(
         actor: User performing the action
         payload: Additional data (reason, notes, etc.)
         organization: Organization for tenant filtering (SaaS)
+        all_or_nothing: Apply to all runs or none of them
 
     Returns:
         BatchTransitionResult with success/failure details
 
     Notes:
-        - Processes each run independently (partial success allowed)
+        - Set-based: constant query count for status-only actions
+        - Partial success allowed unless all_or_nothing
         - All runs must be in the same status for consistency
         - Returns detailed results for each run
     """
-    if payload is None:
-        payload = {}
-
-    results = []
-    errors = []
-    succeeded = 0
-    failed = 0
-
-    # Fetch all runs with tenant filter
-    queryset = SampleRun.objects.filter(id__in=run_ids)
-    if organization is not None:
-        queryset = queryset.filter(organization=organization)
-
-    runs = list(queryset)
-
-    # Check if all runs were found
-    found_ids = {str(run.id) for run in runs}
-    missing_ids = set(run_ids) - found_ids
-    for missing_id in missing_ids:
-        failed += 1
-        errors.append({
-            'run_id': missing_id,
-            'error': 'Run not found or access denied',
-        })
+    run_ids = [str(run_id) for run_id in run_ids]
+    runs = load_runs_for_batch(run_ids, organization, actions=[action])
 
     # Validate: all runs should be in the same status for batch operation
     if runs:
@@ -451,42 +868,18 @@ def batch_transition_sample_runs(
                 }],
             )
 
-    # Process each run
-    for run in runs:
-        try:
-            result = transition_sample_run(
-                sample_run=run,
-                action=action,
-                actor=actor,
-                payload=payload,
-            )
-            succeeded += 1
-            results.append({
-                'run_id': str(run.id),
-                'old_status': result.old_status,
-                'new_status': result.new_status,
-                'action': result.action,
-                'success': True,
-            })
-        except (ValidationError, ValueError) as e:
-            failed += 1
-            errors.append({
-                'run_id': str(run.id),
-                'error': str(e),
-            })
-            results.append({
-                'run_id': str(run.id),
-                'success': False,
-                'error': str(e),
-            })
+    actions = {run.id: action for run in runs}
+    if all_or_nothing and len(runs) != len(set(run_ids)):
+        return _build_batch_result(run_ids, runs, _aborted_outcomes(runs, actions))
 
-    return BatchTransitionResult(
-        total=len(run_ids),
-        succeeded=succeeded,
-        failed=failed,
-        results=results,
-        errors=errors,
+    outcomes = execute_batch_transitions(
+        runs,
+        actions,
+        actor=actor,
+        payload=payload,
+        all_or_nothing=all_or_nothing,
     )
+    return _build_batch_result(run_ids, runs, outcomes)
 
 
 # ==================== P2: Smart Batch Transition (Mixed Status) ====================
@@ -504,6 +897,7 @@ def batch_transition_smart(
     run_ids: list[str],
     organization=None,
     actor: Optional[Any] = None,
+    all_or_nothing: bool = False,
 ) -> BatchTransitionResult:
     """
     智能批量轉換：自動按狀態分組，每組執行對應的下一步動作。
@@ -517,102 +911,26 @@ def batch_transition_smart(
         run_ids: List of SampleRun UUIDs
         organization: Organization for tenant filtering (SaaS)
         actor: User performing the action
+        all_or_nothing: Apply to all runs or none of them
 
     Returns:
         BatchTransitionResult with grouped results
     """
-    from collections import defaultdict
-
-    results = []
-    errors = []
-    succeeded = 0
-    failed = 0
-
-    # Fetch all runs with tenant filter
-    queryset = SampleRun.objects.filter(id__in=run_ids)
-    if organization is not None:
-        queryset = queryset.filter(organization=organization)
-
-    runs = list(queryset)
-
-    # Check missing runs
-    found_ids = {str(run.id) for run in runs}
-    missing_ids = set(run_ids) - found_ids
-    for missing_id in missing_ids:
-        failed += 1
-        errors.append({
-            'run_id': missing_id,
-            'error': 'Run not found or access denied',
-        })
-
-    # Group runs by status
-    grouped: Dict[str, list] = defaultdict(list)
-    for run in runs:
-        grouped[run.status].append(run)
-
-    # Process each status group
-    for status, status_runs in grouped.items():
-        action = get_default_action_for_status(status)
-
-        if not action:
-            # 終態，無法轉換
-            for run in status_runs:
-                failed += 1
-                error_msg = f'No available action for status "{status}" (terminal state)'
-                errors.append({
-                    'run_id': str(run.id),
-                    'status': status,
-                    'error': error_msg,
-                })
-                results.append({
-                    'run_id': str(run.id),
-                    'status': status,
-                    'action': None,
-                    'success': False,
-                    'error': error_msg,
-                })
-            continue
-
-        # 執行該組的轉換
-        for run in status_runs:
-            try:
-                result = transition_sample_run(
-                    sample_run=run,
-                    action=action,
-                    actor=actor,
-                    payload={},
-                )
-                succeeded += 1
-                results.append({
-                    'run_id': str(run.id),
-                    'old_status': result.old_status,
-                    'new_status': result.new_status,
-                    'action': result.action,
-                    'success': True,
-                })
-            except (ValidationError, ValueError) as e:
-                failed += 1
-                errors.append({
-                    'run_id': str(run.id),
-                    'status': status,
-                    'action': action,
-                    'error': str(e),
-                })
-                results.append({
-                    'run_id': str(run.id),
-                    'status': status,
-                    'action': action,
-                    'success': False,
-                    'error': str(e),
-                })
-
-    return BatchTransitionResult(
-        total=len(run_ids),
-        succeeded=succeeded,
-        failed=failed,
-        results=results,
-        errors=errors,
+    run_ids = [str(run_id) for run_id in run_ids]
+    runs = load_runs_for_batch(run_ids, organization)
+
+    actions = {run.id: get_default_action_for_status(run.status) for run in runs}
+    if all_or_nothing and len(runs) != len(set(run_ids)):
+        return _build_batch_result(run_ids, runs, _aborted_outcomes(runs, actions))
+
+    outcomes = execute_batch_transitions(
+        runs,
+        actions,
+        actor=actor,
+        payload={},
+        all_or_nothing=all_or_nothing,
     )
+    return _build_batch_result(run_ids, runs, outcomes)
 
 
 # ==================== P3: Status Rollback ====================
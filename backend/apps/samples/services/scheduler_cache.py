@@ -0,0 +1,88 @@
+"""
+P9: Scheduler/Gantt response cache
+排程甘特圖回應快取（per-organization version counter）
+
+- SampleRun 日期/狀態變更時 bump 組織版本號（commit 後）
+- 回應以 (org, filters, page, version, today) 為 key 存在 Django cache
+- 同一組 key 產生 ETag，前端重新整理時以 If-None-Match 取得 304
+
+版本號存在 cache（production 為 Redis）；版本號被清除時以時間戳重新初始化，
+避免回到舊版本號而命中過期的回應。
+"""
+
+import hashlib
+import json
+import time
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# 無組織（開發模式匿名使用者）
+ALL_ORGS_KEY = 'all'
+
+
+def _org_key(organization_id) -> str:
+    return str(organization_id) if organization_id else ALL_ORGS_KEY
+
+
+def _version_key(organization_id) -> str:
+    return f'scheduler:version:{_org_key(organization_id)}'
+
+
+def _initial_version() -> int:
+    return int(time.time() * 1000)
+
+
+def get_cache_timeout() -> int:
+    return getattr(settings, 'SCHEDULER_CACHE_TIMEOUT', 10 * 60)
+
+
+def get_scheduler_version(organization_id) -> int:
+    key = _version_key(organization_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_scheduler_version(organization_id):
+    """組織與 ALL_ORGS 版本號 +1"""
+    for org in {organization_id, None}:
+        key = _version_key(org)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # key 不存在
+            cache.set(key, _initial_version(), timeout=None)
+
+
+def schedule_version_bump(organization_id):
+    """transaction commit 後才 bump，避免併發讀取以舊資料寫入新版本"""
+    transaction.on_commit(lambda: bump_scheduler_version(organization_id))
+
+
+def build_cache_key(organization_id, params: Dict, version: int, today) -> str:
+    """
+    Args:
+        params: 已正規化的查詢參數（view, start/end date, search, status, page, page_size）
+    """
+    payload = json.dumps(
+        {'org': _org_key(organization_id), 'v': version, 'today': today.isoformat(), **params},
+        sort_keys=True, default=str,
+    )
+    return 'scheduler:data:' + hashlib.sha1(payload.encode()).hexdigest()
+
+
+def etag_for(cache_key: str) -> str:
+    return '"' + cache_key.rsplit(':', 1)[-1] + '"'
+
+
+def get_cached_response(cache_key: str) -> Optional[Dict]:
+    return cache.get(cache_key)
+
+
+def set_cached_response(cache_key: str, data: Dict):
+    cache.set(cache_key, data, timeout=get_cache_timeout())
@@ -0,0 +1,272 @@
+"""
+Run Tech Pack Snapshot (copy-on-write)
+Run 的 Tech Pack 翻譯快照
+
+- 建立 Run 時擷取 TechPackRevision 的 pages/blocks，以內容 hash 找到或建立
+  不可變的 TechPackBlockSet；內容相同的 Run 共用同一份，不再逐筆複製
+- Run 對 block 的修改（翻譯、位置、顯示）存成 RunTechPackBlockOverride
+- 讀取端（techpack-snapshot API、MWO 匯出）一律透過 resolve_run_techpack()，
+  舊的實體快照（RunTechPackPage/Block）仍可讀寫
+"""
+
+import hashlib
+import json
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.utils import timezone
+
+from apps.core.bulk import bulk_update_by_pk
+
+from ..models import (
+    RunTechPackBlock,
+    RunTechPackBlockOverride,
+    RunTechPackPage,
+    SampleRun,
+    TechPackBlockSet,
+)
+
+# 可由 Run 覆寫的欄位
+OVERRIDABLE_FIELDS = ('translated_text', 'overlay_x', 'overlay_y', 'overlay_visible')
+
+BLOCK_FIELDS = (
+    'block_type', 'source_text', 'translated_text',
+    'bbox_x', 'bbox_y', 'bbox_width', 'bbox_height',
+    'overlay_x', 'overlay_y', 'overlay_visible',
+)
+
+STREAM_CHUNK_SIZE = 500
+
+
+@dataclass
+class ResolvedBlock:
+    """與 RunTechPackBlock 相同屬性（serializer / PDF 匯出可直接使用）"""
+    id: Any
+    block_type: str
+    source_text: str
+    translated_text: str
+    bbox_x: float
+    bbox_y: float
+    bbox_width: float
+    bbox_height: float
+    overlay_x: Optional[float]
+    overlay_y: Optional[float]
+    overlay_visible: bool
+    source_block_id: Any
+
+
+@dataclass
+class ResolvedPage:
+    """與 RunTechPackPage 相同屬性；blocks 依 (bbox_y, bbox_x) 排序"""
+    id: Any
+    page_number: int
+    width: int
+    height: int
+    source_page_id: Any
+    blocks: List[ResolvedBlock] = field(default_factory=list)
+
+
+# ==================== Capture ====================
+
+def capture_block_set(tech_pack_revision) -> TechPackBlockSet:
+    """
+    擷取 TechPackRevision 的翻譯快照，回傳（可能已存在的）TechPackBlockSet
+
+    Blocks 以 values() iterator 串流讀取；內容未變時只有讀取、沒有寫入。
+    """
+    from apps.parsing.models_blocks import DraftBlock, RevisionPage
+
+    pages = {
+        page['id']: {
+            'page_number': page['page_number'],
+            'width': page['width'],
+            'height': page['height'],
+            'source_page_id': page['id'],
+            'blocks': [],
+        }
+        for page in RevisionPage.objects.filter(
+            revision=tech_pack_revision
+        ).order_by('page_number').values('id', 'page_number', 'width', 'height')
+    }
+
+    source_blocks = DraftBlock.objects.filter(
+        page__revision=tech_pack_revision
+    ).order_by('page__page_number', 'bbox_y', 'bbox_x', 'id').values(
+        'id', 'page_id', 'block_type', 'source_text', 'translated_text', 'edited_text',
+        'bbox_x', 'bbox_y', 'bbox_width', 'bbox_height',
+        'overlay_x', 'overlay_y', 'overlay_visible',
+    ).iterator(chunk_size=STREAM_CHUNK_SIZE)
+
+    block_count = 0
+    for block in source_blocks:
+        pages[block['page_id']]['blocks'].append({
+            'id': str(block['id']),
+            'block_type': block['block_type'],
+            'source_text': block['source_text'],
+            'translated_text': block['edited_text'] or block['translated_text'] or '',
+            'bbox_x': block['bbox_x'],
+            'bbox_y': block['bbox_y'],
+            'bbox_width': block['bbox_width'],
+            'bbox_height': block['bbox_height'],
+            'overlay_x': block['overlay_x'],
+            'overlay_y': block['overlay_y'],
+            'overlay_visible': block['overlay_visible'],
+        })
+        block_count += 1
+
+    page_list = list(pages.values())
+    content_hash = hashlib.sha256(
+        json.dumps(page_list, sort_keys=True, ensure_ascii=False, default=str).encode()
+    ).hexdigest()
+
+    block_set, _ = TechPackBlockSet.objects.get_or_create(
+        content_hash=content_hash,
+        defaults={
+            'source_revision': tech_pack_revision,
+            'pages': page_list,
+            'page_count': len(page_list),
+            'block_count': block_count,
+        },
+    )
+    return block_set
+
+
+# ==================== Resolve ====================
+
+def _resolve_block(data: Dict[str, Any], changes: Optional[Dict[str, Any]]) -> ResolvedBlock:
+    values = {name: data.get(name) for name in BLOCK_FIELDS}
+    if changes:
+        values.update({k: v for k, v in changes.items() if k in OVERRIDABLE_FIELDS})
+    return ResolvedBlock(id=data['id'], source_block_id=data['id'], **values)
+
+
+def resolve_run_techpack(run: SampleRun) -> List[ResolvedPage]:
+    """
+    Run 的 Tech Pack 快照（block set + overrides，或舊的實體快照）
+
+    Returns:
+        依 page_number 排序的 ResolvedPage 列表（無快照時為空）
+    """
+    if run.techpack_block_set_id:
+        block_set = run.techpack_block_set
+        overrides = dict(
+            RunTechPackBlockOverride.objects.filter(run=run).values_list('block_id', 'changes')
+        )
+        overrides = {str(block_id): changes for block_id, changes in overrides.items()}
+
+        resolved = []
+        for page in block_set.pages:
+            blocks = [_resolve_block(block, overrides.get(block['id'])) for block in page['blocks']]
+            resolved.append(ResolvedPage(
+                id=uuid.uuid5(block_set.id, str(page['page_number'])),
+                page_number=page['page_number'],
+                width=page['width'],
+                height=page['height'],
+                source_page_id=page['source_page_id'],
+                blocks=sorted(blocks, key=lambda b: (b.bbox_y, b.bbox_x)),
+            ))
+        return resolved
+
+    # Legacy: 實體快照
+    resolved = []
+    for page in RunTechPackPage.objects.filter(run=run).prefetch_related('blocks').order_by('page_number'):
+        resolved.append(ResolvedPage(
+            id=page.id,
+            page_number=page.page_number,
+            width=page.width,
+            height=page.height,
+            source_page_id=page.source_page_id,
+            blocks=[
+                ResolvedBlock(
+                    id=block.id,
+                    source_block_id=block.source_block_id,
+                    **{name: getattr(block, name) for name in BLOCK_FIELDS},
+                )
+                for block in page.blocks.all()
+            ],
+        ))
+    return resolved
+
+
+def run_techpack_page_count(run: SampleRun) -> int:
+    if run.techpack_block_set_id:
+        return TechPackBlockSet.objects.filter(
+            pk=run.techpack_block_set_id
+        ).values_list('page_count', flat=True).first() or 0
+    return RunTechPackPage.objects.filter(run=run).count()
+
+
+# ==================== Update (copy-on-write) ====================
+
+def update_run_techpack_blocks(
+    run: SampleRun,
+    changes_by_block: Iterable[Tuple[str, Dict[str, Any]]],
+) -> Tuple[List[str], List[str]]:
+    """
+    更新 Run 的 blocks，查詢數與 block 數量無關
+
+    - block set：block id 由 block set 驗證，overrides 以一次讀取 + 一次 upsert 寫入
+    - 舊的實體快照：core.bulk.bulk_update_by_pk 單一 UPDATE（擁有權在同一語句驗證）
+
+    Args:
+        changes_by_block: [(block_id, {field: value}), ...]，只接受 OVERRIDABLE_FIELDS
+
+    Returns:
+        (updated block ids, errors)
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for block_id, changes in changes_by_block:
+        merged.setdefault(str(block_id), {}).update(
+            {k: v for k, v in changes.items() if k in OVERRIDABLE_FIELDS}
+        )
+
+    if not run.techpack_block_set_id:
+        # 沒有可更新欄位的 block 也要驗證擁有權（同一語句，只更新 updated_at）
+        updated, missing = bulk_update_by_pk(
+            RunTechPackBlock.objects.filter(run_page__run=run),
+            merged,
+            updated_at=timezone.now(),
+        )
+        return updated, [f"Block {block_id} not found in this run" for block_id in missing]
+
+    valid_ids = {
+        block['id']
+        for page in run.techpack_block_set.pages
+        for block in page['blocks']
+    }
+    errors = [f"Block {block_id} not found in this run" for block_id in merged if block_id not in valid_ids]
+    merged = {block_id: changes for block_id, changes in merged.items() if block_id in valid_ids}
+    updated = list(merged)
+    # 沒有可更新欄位的 block 不需寫入
+    merged = {block_id: changes for block_id, changes in merged.items() if changes}
+    if not merged:
+        return updated, errors
+
+    existing = dict(
+        RunTechPackBlockOverride.objects.filter(
+            run=run, block_id__in=list(merged)
+        ).values_list('block_id', 'changes')
+    )
+    existing = {str(block_id): changes for block_id, changes in existing.items()}
+    RunTechPackBlockOverride.objects.bulk_create(
+        [
+            RunTechPackBlockOverride(
+                run=run, block_id=block_id, changes={**existing.get(block_id, {}), **changes},
+            )
+            for block_id, changes in merged.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['run', 'block_id'],
+        update_fields=['changes', 'updated_at'],
+    )
+    return updated, errors
+
+
+def get_run_techpack_block(run: SampleRun, block_id: str) -> Optional[ResolvedBlock]:
+    """單一 block（已套用 overrides）；不存在時回傳 None"""
+    for page in resolve_run_techpack(run):
+        for block in page.blocks:
+            if str(block.id) == str(block_id):
+                return block
+    return None
@@ -0,0 +1,67 @@
+"""
+P18: Progress Dashboard snapshot refresh signals
+狀態/交期變更時重算儀表板對應區塊（commit 後合併執行）
+P9: SampleRun 變更時 bump Scheduler 快取版本號
+"""
+
+from django.db.models.signals import post_delete, post_save
+
+from .services.dashboard_aggregates import schedule_section_refresh, schedule_section_refresh_for
+from .services.scheduler_cache import schedule_version_bump
+
+
+def _touches(update_fields, fields) -> bool:
+    """save(update_fields=...) 未涉及彙總欄位時略過"""
+    return update_fields is None or bool(set(update_fields) & fields)
+
+
+def _sample_run_changed(sender, instance, update_fields=None, **kwargs):
+    if _touches(update_fields, {'status', 'target_due_date'}):
+        schedule_section_refresh(instance.organization_id, 'sample')
+        # P9: Scheduler/Gantt 快取失效
+        schedule_version_bump(instance.organization_id)
+
+
+def _cost_sheet_version_changed(sender, instance, update_fields=None, **kwargs):
+    if _touches(update_fields, {'status', 'costing_type'}):
+        schedule_section_refresh_for('cost_sheet_group', instance.cost_sheet_group_id, 'quotation')
+
+
+def _purchase_order_changed(sender, instance, update_fields=None, **kwargs):
+    if _touches(update_fields, {'status'}):
+        schedule_section_refresh(instance.organization_id, 'procurement')
+
+
+def _po_line_changed(sender, instance, update_fields=None, **kwargs):
+    if _touches(update_fields, {'delivery_status', 'expected_delivery'}):
+        schedule_section_refresh_for('purchase_order', instance.purchase_order_id, 'procurement')
+
+
+def _production_order_changed(sender, instance, update_fields=None, **kwargs):
+    if _touches(update_fields, {'status', 'delivery_date'}):
+        schedule_section_refresh(instance.organization_id, 'production')
+
+
+def _material_requirement_changed(sender, instance, update_fields=None, **kwargs):
+    if _touches(update_fields, {'status'}):
+        schedule_section_refresh_for('production_order', instance.production_order_id, 'material')
+
+
+def connect_dashboard_signals():
+    from apps.costing.models import CostSheetVersion
+    from apps.orders.models import MaterialRequirement, ProductionOrder
+    from apps.procurement.models import POLine, PurchaseOrder
+    from .models import SampleRun
+
+    handlers = [
+        (SampleRun, _sample_run_changed),
+        (CostSheetVersion, _cost_sheet_version_changed),
+        (PurchaseOrder, _purchase_order_changed),
+        (POLine, _po_line_changed),
+        (ProductionOrder, _production_order_changed),
+        (MaterialRequirement, _material_requirement_changed),
+    ]
+    for model, handler in handlers:
+        uid = f'progress_dashboard_{model.__name__}'
+        post_save.connect(handler, sender=model, dispatch_uid=uid)
+        post_delete.connect(handler, sender=model, dispatch_uid=f'{uid}_delete')
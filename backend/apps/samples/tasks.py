@@ -0,0 +1,68 @@
+"""
+Samples Tasks
+Celery tasks for sample progress tracking
+"""
+
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def refresh_progress_dashboards_task() -> dict:
+    """
+    Periodic task: Recompute every progress dashboard snapshot
+
+    Overdue / due-soon counts depend on today's date, so snapshots are
+    fully recomputed on a schedule (CELERY_BEAT_SCHEDULE) in addition to
+    the per-section refresh triggered by state transitions.
+
+    Returns:
+        dict: {'status': 'success', 'refreshed': int}
+    """
+    from .services.dashboard_aggregates import refresh_all_snapshots
+
+    refreshed = refresh_all_snapshots()
+    logger.info(f"Refreshed {refreshed} progress dashboard snapshots")
+    return {'status': 'success', 'refreshed': refreshed}
+
+
+@shared_task
+def refresh_dashboard_sections_task(pending: dict) -> dict:
+    """
+    Recompute the dashboard sections touched by a coalesced batch of changes
+
+    Queued on commit by schedule_section_refresh() when
+    READ_MODEL_REFRESH_ASYNC is on; changes to the same organization and
+    section within the countdown are folded into one run.
+
+    Args:
+        pending: {section or 'section:parent': [id, ...]}
+
+    Returns:
+        dict: {'status': 'success'}
+    """
+    from .services.dashboard_aggregates import dashboard_refresh
+
+    dashboard_refresh.run(pending)
+    return {'status': 'success'}
+
+
+@shared_task
+def evaluate_alerts_task() -> dict:
+    """
+    Periodic task: Evaluate SampleRun alert rules for every organization
+
+    Upserts the Alert table (first seen / last seen / resolved) and pushes
+    newly raised alerts to the assistant NotificationService.
+
+    Returns:
+        dict: {'status': 'success', 'organizations': int, 'created': int, 'updated': int, 'resolved': int}
+    """
+    from .services.alerts import evaluate_all_alerts
+
+    totals = evaluate_all_alerts()
+    logger.info(f"Evaluated alerts: {totals}")
+    return {'status': 'success', **totals}
@@ -0,0 +1,110 @@
+"""
+Alert Table Tests
+Periodic evaluation (upsert / resolve) + read API
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.assistant.models import Notification
+from apps.core.models import Organization
+from apps.styles.models import Style, StyleRevision
+from apps.samples.models import Alert, AlertType, SampleRequest, SampleRun, SampleRunStatus
+from apps.samples.services.alerts import evaluate_alerts
+
+pytestmark = pytest.mark.django_db
+
+URL = '/api/v2/alerts/'
+
+
+@pytest.fixture
+def org():
+    return Organization.objects.create(name="Test Org")
+
+
+@pytest.fixture
+def client(org):
+    user = get_user_model().objects.create_user(username="alerts", password="testpass123", organization=org)
+    api_client = APIClient()
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def sample_request(org):
+    style = Style.objects.create(organization=org, style_number="AL001", style_name="Alert Style")
+    revision = StyleRevision.objects.create(style=style, revision_label="A")
+    return SampleRequest.objects.create(organization=org, revision=revision)
+
+
+def _run(org, sample_request, run_no, **kwargs):
+    return SampleRun.objects.create(organization=org, sample_request=sample_request, run_no=run_no, **kwargs)
+
+
+def test_evaluate_creates_updates_and_resolves(org, sample_request):
+    today = timezone.localdate()
+    overdue = _run(org, sample_request, 1, target_due_date=today - timedelta(days=2),
+                   status=SampleRunStatus.IN_PROGRESS)
+    _run(org, sample_request, 2, target_due_date=today + timedelta(days=1),
+         status=SampleRunStatus.IN_PROGRESS)
+    _run(org, sample_request, 3, target_due_date=today + timedelta(days=30),
+         status=SampleRunStatus.IN_PROGRESS)
+
+    assert evaluate_alerts(org.id, notify=False) == {'created': 2, 'updated': 0, 'resolved': 0}
+    assert set(Alert.objects.values_list('alert_type', flat=True)) == {AlertType.OVERDUE, AlertType.DUE_SOON}
+
+    # Re-evaluation only refreshes last_seen_at
+    assert evaluate_alerts(org.id, notify=False) == {'created': 0, 'updated': 2, 'resolved': 0}
+
+    SampleRun.objects.filter(pk=overdue.pk).update(status=SampleRunStatus.ACCEPTED)
+    assert evaluate_alerts(org.id, notify=False) == {'created': 0, 'updated': 1, 'resolved': 1}
+
+    resolved = Alert.objects.get(sample_run=overdue)
+    assert resolved.resolved_at is not None
+
+
+def test_stale_draft_alert(org, sample_request):
+    run = _run(org, sample_request, 1)
+    SampleRun.objects.filter(pk=run.pk).update(created_at=timezone.now() - timedelta(days=10))
+
+    evaluate_alerts(org.id, notify=False)
+
+    alert = Alert.objects.get(sample_run=run)
+    assert alert.alert_type == AlertType.STALE
+    assert alert.severity == 'low'
+
+
+def test_new_alerts_push_notifications_on_commit(org, sample_request, django_capture_on_commit_callbacks):
+    _run(org, sample_request, 1, target_due_date=timezone.localdate() - timedelta(days=1))
+
+    with django_capture_on_commit_callbacks(execute=True):
+        evaluate_alerts(org.id)
+
+    notification = Notification.objects.get()
+    assert notification.title == "Overdue: AL001"
+    assert notification.notification_type == 'alert'
+
+
+def test_api_reads_table_with_cursor_pagination(client, org, sample_request):
+    today = timezone.localdate()
+    for i in range(3):
+        _run(org, sample_request, i + 1, target_due_date=today - timedelta(days=i + 1),
+             status=SampleRunStatus.IN_PROGRESS)
+    _run(org, sample_request, 4, target_due_date=today + timedelta(days=2),
+         status=SampleRunStatus.IN_PROGRESS)
+    evaluate_alerts(org.id, notify=False)
+
+    first = client.get(URL, {'limit': 2})
+    assert first.status_code == 200
+    assert first.data['summary'] == {'overdue': 3, 'due_soon': 1, 'stale': 0, 'total': 4}
+    assert [a['days_overdue'] for a in first.data['alerts']] == [3, 2]
+
+    second = client.get(URL, {'limit': 2, 'cursor': first.data['meta']['next_cursor']})
+    assert [a['type'] for a in second.data['alerts']] == ['overdue', 'due_soon']
+    assert second.data['meta']['next_cursor'] is None
+
+    assert client.get(URL, {'cursor': '!!!'}).status_code == 400
@@ -0,0 +1,140 @@
+"""
+Set-based Batch Transition Tests
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.core.models import Organization
+from apps.styles.models import Style, StyleRevision
+from apps.samples.models import SampleRequest, SampleRun, SampleRunStatus, SampleRunTransitionLog
+from apps.samples.services.run_transitions import batch_transition_sample_runs, batch_transition_smart
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def org():
+    return Organization.objects.create(name="Test Org")
+
+
+@pytest.fixture
+def sample_request(org):
+    style = Style.objects.create(organization=org, style_number="BT001", style_name="Batch Style")
+    revision = StyleRevision.objects.create(style=style, revision_label="A")
+    return SampleRequest.objects.create(organization=org, revision=revision)
+
+
+def _runs(org, sample_request, count, status, start=1):
+    return [
+        SampleRun.objects.create(organization=org, sample_request=sample_request, run_no=start + i, status=status)
+        for i in range(count)
+    ]
+
+
+def _transition_queries(org, runs, action):
+    with CaptureQueriesContext(connection) as ctx:
+        result = batch_transition_sample_runs([str(r.id) for r in runs], action, organization=org)
+    assert result.succeeded == len(runs)
+    return len(ctx.captured_queries)
+
+
+def test_query_count_is_constant(org, sample_request):
+    small = _runs(org, sample_request, 5, SampleRunStatus.IN_PROGRESS)
+    large = _runs(org, sample_request, 100, SampleRunStatus.IN_PROGRESS, start=10)
+
+    assert _transition_queries(org, small, 'mark_sample_done') == _transition_queries(org, large, 'mark_sample_done')
+
+
+def test_status_timestamps_and_logs(org, sample_request):
+    runs = _runs(org, sample_request, 3, SampleRunStatus.IN_PROGRESS)
+
+    result = batch_transition_sample_runs(
+        [str(r.id) for r in runs], 'mark_sample_done', organization=org, payload={'notes': 'batch'},
+    )
+
+    assert result.failed == 0
+    for run in SampleRun.objects.filter(id__in=[r.id for r in runs]):
+        assert run.status == SampleRunStatus.SAMPLE_DONE
+        assert SampleRunStatus.SAMPLE_DONE in run.status_timestamps
+        assert 'mark_sample_done: batch' in run.notes
+    assert SampleRunTransitionLog.objects.filter(action='mark_sample_done').count() == 3
+
+
+def test_prerequisites_checked_up_front(org, sample_request):
+    runs = _runs(org, sample_request, 2, SampleRunStatus.MATERIALS_PLANNING)
+
+    result = batch_transition_sample_runs([str(r.id) for r in runs], 'generate_t2po', organization=org)
+
+    assert result.failed == 2
+    assert {e['error'] for e in result.errors} == {"guidance_usage must exist before generating T2PO"}
+    assert not SampleRunTransitionLog.objects.exists()
+
+
+def test_smart_partial_success(org, sample_request):
+    in_progress = _runs(org, sample_request, 2, SampleRunStatus.IN_PROGRESS)
+    accepted = _runs(org, sample_request, 1, SampleRunStatus.ACCEPTED, start=5)
+
+    result = batch_transition_smart([str(r.id) for r in in_progress + accepted], organization=org)
+
+    assert (result.succeeded, result.failed) == (2, 1)
+    assert result.errors[0]['run_id'] == str(accepted[0].id)
+    assert SampleRun.objects.filter(status=SampleRunStatus.SAMPLE_DONE).count() == 2
+
+
+def test_smart_all_or_nothing(org, sample_request):
+    in_progress = _runs(org, sample_request, 2, SampleRunStatus.IN_PROGRESS)
+    accepted = _runs(org, sample_request, 1, SampleRunStatus.ACCEPTED, start=5)
+    missing = '00000000-0000-0000-0000-000000000000'
+
+    result = batch_transition_smart(
+        [str(r.id) for r in in_progress + accepted] + [missing], organization=org, all_or_nothing=True,
+    )
+
+    assert (result.succeeded, result.failed) == (0, 4)
+    assert SampleRun.objects.filter(status=SampleRunStatus.IN_PROGRESS).count() == 2
+    assert not SampleRunTransitionLog.objects.exists()
+
+
+def test_all_or_nothing_rejects_missing_runs(org, sample_request):
+    [run] = _runs(org, sample_request, 1, SampleRunStatus.IN_PROGRESS)
+    other_org = Organization.objects.create(name="Other Org")
+    [foreign] = _runs(other_org, sample_request, 1, SampleRunStatus.IN_PROGRESS, start=5)
+
+    for stray in ('00000000-0000-0000-0000-000000000000', str(foreign.id)):
+        result = batch_transition_sample_runs(
+            [str(run.id), stray], 'mark_sample_done', organization=org, all_or_nothing=True,
+        )
+        assert (result.succeeded, result.failed) == (0, 2)
+
+    assert SampleRun.objects.get(pk=run.pk).status == SampleRunStatus.IN_PROGRESS
+    assert not SampleRunTransitionLog.objects.exists()
+
+
+def test_side_effects_roll_back_with_conflicting_status_write(org, sample_request):
+    from unittest import mock
+    from apps.samples.services.run_transitions import CONFLICT_ERROR
+
+    runs = _runs(org, sample_request, 2, SampleRunStatus.DRAFT)
+
+    def side_effects(run, action, payload):
+        # 產生文件後，另一個 request 搶先改了狀態
+        Style.objects.create(organization=org, style_number=f"DOC-{run.run_no}", style_name="Generated")
+        if run.run_no == 1:
+            SampleRun.objects.filter(pk=run.pk).update(status=SampleRunStatus.CANCELLED)
+        return {'generated': run.run_no}
+
+    with mock.patch('apps.samples.services.run_transitions.execute_action_side_effects', side_effects):
+        result = batch_transition_sample_runs([str(r.id) for r in runs], 'start_materials_planning', organization=org)
+
+    assert (result.succeeded, result.failed) == (1, 1)
+    assert result.errors == [{
+        'run_id': str(runs[0].id), 'status': SampleRunStatus.DRAFT, 'action': 'start_materials_planning',
+        'error': CONFLICT_ERROR,
+    }]
+    # 衝突的 run：副作用與狀態一併 rollback，不留下孤兒文件
+    assert list(Style.objects.filter(style_name="Generated").values_list('style_number', flat=True)) == ['DOC-2']
+    assert SampleRun.objects.get(pk=runs[0].pk).status == SampleRunStatus.DRAFT
+    assert SampleRun.objects.get(pk=runs[1].pk).status == SampleRunStatus.MATERIALS_PLANNING
+    assert SampleRunTransitionLog.objects.count() == 1
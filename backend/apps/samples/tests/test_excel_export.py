@@ -0,0 +1,59 @@
+"""
+Streaming Excel Export Tests
+"""
+
+from io import BytesIO
+
+import pytest
+from openpyxl import Workbook, load_workbook
+from rest_framework.test import APIClient
+
+from apps.core.models import Organization
+from apps.styles.models import Style, StyleRevision
+from apps.samples.models import SampleRequest, SampleRun
+from apps.samples.services.excel_export import StreamingSheet
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def sample_run():
+    org = Organization.objects.create(name="Test Org")
+    style = Style.objects.create(organization=org, style_number="TEST001", style_name="Test Style")
+    revision = StyleRevision.objects.create(style=style, revision_label="A")
+    request = SampleRequest.objects.create(organization=org, revision=revision)
+    return SampleRun.objects.create(organization=org, sample_request=request, run_no=1)
+
+
+def test_streaming_sheet_width_uses_running_max():
+    wb = Workbook(write_only=True)
+    sheet = StreamingSheet(wb.create_sheet("Test"), sample_rows=2)
+    sheet.append_header(["A", "B"])
+    sheet.append(["x" * 10, "y"])
+    sheet.append(["z", "w"])  # after flush: streamed directly
+
+    assert sheet.ws.column_dimensions["A"].width == 12
+    assert sheet.ws.column_dimensions["B"].width == 3
+
+    # write-only workbook 未儲存時 openpyxl 的暫存檔會在 GC 時拋出警告
+    sheet.flush()
+    output = BytesIO()
+    wb.save(output)
+    assert list(load_workbook(output)["Test"].values) == [("A", "B"), ("x" * 10, "y"), ("z", "w")]
+
+
+def test_export_range_streams_workbook(sample_run):
+    client = APIClient()
+    response = client.get('/api/v2/sample-runs/export-range/?start=2000-01-01&end=2100-01-01')
+
+    assert response.status_code == 200
+    wb = load_workbook(BytesIO(b''.join(response.streaming_content)))
+    assert wb.sheetnames == ["Sample Runs", "T2 POs", "T2 PO Lines"]
+    rows = list(wb["Sample Runs"].values)
+    assert rows[1][0] == "TEST001"
+
+
+def test_export_range_requires_dates():
+    client = APIClient()
+    response = client.get('/api/v2/sample-runs/export-range/?start=2026-01-01')
+    assert response.status_code == 400
@@ -0,0 +1,95 @@
+"""
+Kanban Runs API Tests
+Per-lane windowed query + cursor pagination
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.core.models import Organization
+from apps.styles.models import Style, StyleRevision
+from apps.samples.models import SampleRequest, SampleRun, SampleRunStatus
+
+pytestmark = pytest.mark.django_db
+
+URL = '/api/v2/kanban/runs/'
+
+
+@pytest.fixture
+def org():
+    return Organization.objects.create(name="Test Org")
+
+
+@pytest.fixture
+def client(org):
+    user = get_user_model().objects.create_user(username="kanban", password="testpass123", organization=org)
+    api_client = APIClient()
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def runs(org):
+    style = Style.objects.create(organization=org, style_number="KB001", style_name="Kanban Style")
+    revision = StyleRevision.objects.create(style=style, revision_label="A")
+    request = SampleRequest.objects.create(organization=org, revision=revision)
+
+    created = []
+    for i in range(5):
+        created.append(SampleRun.objects.create(
+            organization=org, sample_request=request, run_no=i + 1, status=SampleRunStatus.DRAFT,
+        ))
+    created.append(SampleRun.objects.create(
+        organization=org, sample_request=request, run_no=6, status=SampleRunStatus.IN_PROGRESS,
+    ))
+    SampleRun.objects.filter(pk=created[-1].pk).update(
+        status_updated_at=timezone.now() - timedelta(days=3, hours=1)
+    )
+    return created
+
+
+def test_limit_is_enforced_per_lane(client, runs):
+    response = client.get(URL, {'limit': 2})
+
+    assert response.status_code == 200
+    statuses = [run['status'] for run in response.data['runs']]
+    assert statuses.count('draft') == 2
+    assert statuses.count('in_progress') == 1
+
+    lanes = response.data['meta']['lanes']
+    assert lanes['draft']['total'] == 5
+    assert lanes['draft']['next_cursor']
+    assert lanes['in_progress']['next_cursor'] is None
+
+
+def test_days_in_status_and_card_fields(client, runs):
+    response = client.get(URL, {'status': 'in_progress'})
+
+    card = response.data['runs'][0]
+    assert card['days_in_status'] == 3
+    assert card['status_label'] == 'In Progress'
+    assert card['style']['style_number'] == 'KB001'
+    assert card['revision']['revision_label'] == 'A'
+
+
+def test_lane_cursor_loads_remaining_cards(client, runs):
+    first = client.get(URL, {'limit': 2})
+    seen = [run['id'] for run in first.data['runs'] if run['status'] == 'draft']
+
+    cursor = first.data['meta']['lanes']['draft']['next_cursor']
+    while cursor:
+        page = client.get(URL, {'limit': 2, 'cursor': cursor})
+        assert {run['status'] for run in page.data['runs']} == {'draft'}
+        seen += [run['id'] for run in page.data['runs']]
+        cursor = page.data['meta']['lanes']['draft']['next_cursor']
+
+    assert sorted(seen) == sorted(str(run.id) for run in runs[:5])
+
+
+def test_invalid_cursor_returns_400(client, runs):
+    response = client.get(URL, {'cursor': '!!!'})
+    assert response.status_code == 400
@@ -0,0 +1,119 @@
+"""
+Progress Dashboard Snapshot Tests
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.core.models import Organization
+from apps.styles.models import Style, StyleRevision
+from apps.samples.models import ProgressDashboardSnapshot, SampleRequest, SampleRun, SampleRunStatus
+from apps.samples.services.dashboard_aggregates import compute_sections, refresh_snapshot
+
+pytestmark = pytest.mark.django_db
+
+URL = '/api/v2/progress-dashboard/'
+
+
+@pytest.fixture
+def org():
+    return Organization.objects.create(name="Test Org")
+
+
+@pytest.fixture
+def client(org):
+    user = get_user_model().objects.create_user(username="dashboard", password="testpass123", organization=org)
+    api_client = APIClient()
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def sample_request(org):
+    style = Style.objects.create(organization=org, style_number="PD001", style_name="Dashboard Style")
+    revision = StyleRevision.objects.create(style=style, revision_label="A")
+    return SampleRequest.objects.create(organization=org, revision=revision)
+
+
+def test_compute_sections_groups_counts(org, sample_request):
+    yesterday = timezone.now().date() - timedelta(days=1)
+    SampleRun.objects.create(organization=org, sample_request=sample_request, run_no=1, target_due_date=yesterday)
+    SampleRun.objects.create(organization=org, sample_request=sample_request, run_no=2, status=SampleRunStatus.IN_PROGRESS)
+    SampleRun.objects.create(organization=org, sample_request=sample_request, run_no=3, status=SampleRunStatus.CANCELLED)
+
+    sample = compute_sections(org.id, ['sample'])['sample']
+
+    assert sample['by_status'] == {'draft': 1, 'in_progress': 1}
+    assert sample['overdue'] == 1
+    assert sample['due_soon'] == 0
+
+
+def test_dashboard_reads_snapshot_in_constant_queries(client, org, sample_request):
+    SampleRun.objects.create(organization=org, sample_request=sample_request, run_no=1)
+
+    first = client.get(URL)
+    assert first.status_code == 200
+    assert first.data['summary']['total_samples'] == 1
+    assert ProgressDashboardSnapshot.objects.filter(organization=org).exists()
+
+    with CaptureQueriesContext(connection) as ctx:
+        second = client.get(URL)
+    assert second.data == first.data
+    # auth user/org + snapshot read only
+    assert len(ctx.captured_queries) <= 3
+
+
+def test_transition_refreshes_only_affected_section(org, sample_request):
+    run = SampleRun.objects.create(organization=org, sample_request=sample_request, run_no=1)
+    refresh_snapshot(org.id)
+
+    run.status = SampleRunStatus.IN_PROGRESS
+    run.save(update_fields=['status'])
+    # TestCase transaction never commits; flush manually
+    refresh_snapshot(org.id, ['sample'])
+
+    snapshot = ProgressDashboardSnapshot.objects.get(organization=org)
+    assert snapshot.sections['sample']['by_status'] == {'in_progress': 1}
+    assert set(snapshot.sections) == {'sample', 'quotation', 'procurement', 'production', 'material'}
+
+
+def test_signal_schedules_refresh_on_commit(org, sample_request, django_capture_on_commit_callbacks):
+    refresh_snapshot(org.id)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        SampleRun.objects.create(organization=org, sample_request=sample_request, run_no=1)
+
+    snapshot = ProgressDashboardSnapshot.objects.get(organization=org)
+    assert snapshot.sections['sample']['by_status'] == {'draft': 1}
+
+
+def test_parent_lookup_runs_once_per_batch(org, django_capture_on_commit_callbacks):
+    from decimal import Decimal
+    from apps.procurement.models import POLine, PurchaseOrder, Supplier
+
+    supplier = Supplier.objects.create(organization=org, name='Supplier', supplier_code='S1', supplier_type='fabric')
+    po = PurchaseOrder.objects.create(
+        organization=org, po_number='PO-D1', supplier=supplier, po_date=timezone.now().date(),
+        expected_delivery=timezone.now().date() + timedelta(days=3),
+    )
+    refresh_snapshot(org.id)
+
+    with CaptureQueriesContext(connection) as ctx, django_capture_on_commit_callbacks(execute=True):
+        for n in range(3):
+            POLine.objects.create(
+                purchase_order=po, material_name=f'Fabric {n}', quantity=Decimal('1'), unit='M',
+                unit_price=Decimal('1'), line_total=Decimal('1'), expected_delivery=po.expected_delivery,
+            )
+
+    snapshot = ProgressDashboardSnapshot.objects.get(organization=org)
+    assert snapshot.sections['procurement']['due_soon_deliveries'] == 3
+    # PurchaseOrder → organization 只在 flush 時查一次；不存在的 ALL_ORGS 快照不重算
+    org_lookups = [q for q in ctx.captured_queries if q['sql'].startswith('SELECT "purchase_orders"."organization_id"')]
+    assert len(org_lookups) == 1
+    assert not ProgressDashboardSnapshot.objects.filter(key='all').exists()
@@ -0,0 +1,131 @@
+"""
+Query Budget Tests
+每個 samples endpoint 的查詢數不超過宣告的 budget，且不隨資料筆數成長（N+1）
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.core.instrumentation import assert_within_budget, request_metrics
+from apps.core.models import Organization
+from apps.core.seeding import seed_dataset
+from apps.samples.models import (
+    Sample, SampleActuals, SampleAttachment, SampleCostEstimate, SampleMWO,
+    SampleRun, T2POForSample, T2POLineForSample,
+)
+
+pytestmark = pytest.mark.django_db
+
+LIST_URLS = [
+    '/api/v2/sample-requests/',
+    '/api/v2/sample-runs/',
+    '/api/v2/sample-runs/?cursor=',
+    '/api/v2/sample-actuals/',
+    '/api/v2/sample-attachments/',
+    '/api/v2/sample-cost-estimates/',
+    '/api/v2/t2pos-for-sample/',
+    '/api/v2/t2po-lines-for-sample/',
+    '/api/v2/sample-mwos/',
+    '/api/v2/samples/',
+    '/api/v2/kanban/counts/',
+    '/api/v2/kanban/runs/',
+    '/api/v2/alerts/',
+    '/api/v2/scheduler/',
+    '/api/v2/progress-dashboard/',
+]
+
+
+@pytest.fixture
+def org():
+    return Organization.objects.create(name="Budget Org")
+
+
+@pytest.fixture
+def user(org):
+    return get_user_model().objects.create_user(username="budget", password="testpass123", organization=org)
+
+
+@pytest.fixture
+def client(user):
+    api_client = APIClient()
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+def _populate(org, user, styles, prefix):
+    """seed_dataset + 每個 run 的 actuals / estimate / T2PO / MWO / sample / attachment"""
+    seed_dataset(org, styles=styles, bom_items_per_style=3, runs_per_style=2, blocks_per_style=0, prefix=prefix)
+    due = timezone.localdate() + timedelta(days=14)
+    runs = SampleRun.objects.filter(organization=org, sample_request__revision__style__style_number__startswith=prefix)
+    for n, run in enumerate(runs.select_related('sample_request')):
+        request = run.sample_request
+        SampleActuals.objects.create(sample_run=run, labor_minutes=30, recorded_by=user)
+        estimate = SampleCostEstimate.objects.create(
+            sample_request=request, estimate_version=run.run_no, status='draft', estimated_total=Decimal('100.00'),
+        )
+        t2po = T2POForSample.objects.create(
+            sample_run=run, sample_request=request, estimate=estimate, version_no=1, is_latest=True,
+            po_no=f"{prefix}-T2PO-{n}", supplier_name="Mill", delivery_date=due, source_revision_id=run.revision_id,
+        )
+        for line_no in (1, 2):
+            T2POLineForSample.objects.create(
+                t2po=t2po, line_no=line_no, material_name=f"Fabric {line_no}",
+                quantity_requested=Decimal('2'), unit_price=Decimal('3.50'), line_total=Decimal('7.00'),
+            )
+        mwo = SampleMWO.objects.create(
+            sample_run=run, sample_request=request, estimate=estimate, version_no=1, is_latest=True,
+            mwo_no=f"{prefix}-MWO-{n}", factory_name="Factory", due_date=due,
+            source_revision_id=run.revision_id, snapshot_hash='0' * 64,
+        )
+        sample = Sample.objects.create(sample_request=request, sample_mwo=mwo)
+        SampleAttachment.objects.create(sample_request=request, sample=sample, file_url=f"/media/{n}.jpg")
+
+
+def test_list_endpoints_within_budget(org, user, client):
+    _populate(org, user, styles=4, prefix='QB')
+
+    for url in LIST_URLS:
+        response = client.get(url)
+        assert response.status_code == 200, url
+        assert_within_budget(response)
+        assert 'db;dur=' in response['Server-Timing']
+
+
+def test_detail_endpoints_within_budget(org, user, client):
+    _populate(org, user, styles=2, prefix='QB')
+    run = SampleRun.objects.filter(organization=org).first()
+    request = run.sample_request
+
+    for url in [
+        f'/api/v2/sample-requests/{request.id}/',
+        f'/api/v2/sample-requests/{request.id}/runs-summary/',
+        f'/api/v2/sample-requests/{request.id}/allowed-actions/',
+        f'/api/v2/sample-runs/{run.id}/',
+        f'/api/v2/sample-runs/{run.id}/allowed-actions/',
+        f'/api/v2/sample-runs/{run.id}/transition-logs/',
+        f'/api/v2/sample-actuals/{run.actuals.id}/',
+        f'/api/v2/t2pos-for-sample/{T2POForSample.objects.filter(sample_run=run).get().id}/',
+        f'/api/v2/sample-mwos/{SampleMWO.objects.filter(sample_run=run).get().id}/',
+    ]:
+        response = client.get(url)
+        assert response.status_code == 200, url
+        assert_within_budget(response)
+
+
+def test_list_queries_do_not_grow_with_rows():
+    # 各用一個 organization：快取 / dashboard 快照都是 per-organization，兩邊都是 cold path
+    counts = []
+    for styles in (2, 6):
+        org = Organization.objects.create(name=f"Budget Org {styles}")
+        user = get_user_model().objects.create_user(username=f"budget{styles}", password="testpass123", organization=org)
+        _populate(org, user, styles=styles, prefix=f'QB{styles}')
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+        counts.append({url: request_metrics(api_client.get(url)).queries for url in LIST_URLS})
+
+    assert counts[1] == counts[0]
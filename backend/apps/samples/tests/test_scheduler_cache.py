@@ -0,0 +1,72 @@
+"""
+Scheduler API Cache Tests
+Per-organization version counter + ETag / If-None-Match
+"""
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from apps.core.models import Organization
+from apps.styles.models import Style, StyleRevision
+from apps.samples.models import SampleRequest, SampleRun, SampleRunStatus
+
+pytestmark = pytest.mark.django_db
+
+URL = '/api/v2/scheduler/'
+
+
+@pytest.fixture
+def org():
+    return Organization.objects.create(name="Test Org")
+
+
+@pytest.fixture
+def client(org):
+    user = get_user_model().objects.create_user(username="scheduler", password="testpass123", organization=org)
+    api_client = APIClient()
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def run(org):
+    style = Style.objects.create(organization=org, style_number="SC001", style_name="Scheduler Style")
+    revision = StyleRevision.objects.create(style=style, revision_label="A")
+    request = SampleRequest.objects.create(organization=org, revision=revision)
+    return SampleRun.objects.create(organization=org, sample_request=request, run_no=1)
+
+
+def test_if_none_match_returns_304(client, run):
+    first = client.get(URL)
+    assert first.status_code == 200
+    assert first.data['styles'][0]['style_number'] == 'SC001'
+    etag = first['ETag']
+
+    with CaptureQueriesContext(connection) as ctx:
+        second = client.get(URL, HTTP_IF_NONE_MATCH=etag)
+    assert second.status_code == 304
+    assert second['ETag'] == etag
+    # auth user/org only — no SampleRun queries
+    assert not any('sample_runs' in q['sql'] for q in ctx.captured_queries)
+
+
+def test_filters_and_page_change_etag(client, run):
+    base = client.get(URL)['ETag']
+    assert client.get(URL, {'view': 'run'})['ETag'] != base
+    assert client.get(URL, {'page': 2})['ETag'] != base
+
+
+def test_status_change_bumps_version(client, run, django_capture_on_commit_callbacks):
+    first = client.get(URL)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        run.status = SampleRunStatus.IN_PROGRESS
+        run.save(update_fields=['status'])
+
+    second = client.get(URL, HTTP_IF_NONE_MATCH=first['ETag'])
+    assert second.status_code == 200
+    assert second['ETag'] != first['ETag']
+    assert second.data['styles'][0]['runs'][0]['status'] == 'in_progress'
@@ -0,0 +1,51 @@
+"""
+Run Snapshot Tests
+BOM / operations snapshots are written with bulk_create
+"""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.core.models import Organization
+from apps.styles.models import BOMItem, Style, StyleRevision
+from apps.samples.models import SampleRequest, SampleRun
+from apps.samples.services.auto_generation import snapshot_bom_to_run
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def org():
+    return Organization.objects.create(name="Test Org")
+
+
+@pytest.fixture
+def revision(org):
+    style = Style.objects.create(organization=org, style_number="SN001", style_name="Snapshot Style")
+    return StyleRevision.objects.create(style=style, revision_label="A")
+
+
+@pytest.fixture
+def run(org, revision):
+    request = SampleRequest.objects.create(organization=org, revision=revision)
+    return SampleRun.objects.create(organization=org, sample_request=request, run_no=1)
+
+
+def test_bom_snapshot_is_one_insert(revision, run):
+    for n in range(5):
+        BOMItem.objects.create(revision=revision, item_number=n + 1, material_name=f"M{n}", is_verified=True)
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert snapshot_bom_to_run(revision, run) == 5
+    assert sum(1 for q in ctx.captured_queries if q['sql'].startswith('INSERT')) == 1
+
+
+def test_bom_snapshot_falls_back_to_confirmed_items(revision, run):
+    for n in range(3):
+        BOMItem.objects.create(
+            revision=revision, item_number=n + 1, material_name=f"M{n}", translation_status='confirmed',
+        )
+
+    assert snapshot_bom_to_run(revision, run) == 3
+    assert list(run.bom_lines.order_by('line_no').values_list('material_name', flat=True)) == ['M0', 'M1', 'M2']
@@ -0,0 +1,116 @@
+"""
+Revision data version / cached source hash tests
+"""
+
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.core.models import Organization
+from apps.styles.models import BOMItem, ConstructionStep, Style, StyleRevision
+from apps.samples.models import SampleRun
+from apps.samples.services.auto_generation import (
+    _compute_source_hash,
+    create_with_initial_run,
+    generate_source_hash,
+    is_run_source_stale,
+)
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def revision():
+    org = Organization.objects.create(name="Test Org")
+    style = Style.objects.create(organization=org, style_number="SH001", style_name="Hash Style")
+    return StyleRevision.objects.create(organization=org, style=style, revision_label="A")
+
+
+@pytest.fixture
+def bom_item(revision):
+    return BOMItem.objects.create(
+        revision=revision, item_number=1, category="fabric", material_name="Nulu",
+        consumption=Decimal("1.2500"), unit="yards", is_verified=True,
+    )
+
+
+def _data_version(revision):
+    revision.refresh_from_db(fields=['data_version'])
+    return revision.data_version
+
+
+def test_bom_and_construction_changes_bump_data_version(revision, bom_item):
+    assert _data_version(revision) == 1
+
+    step = ConstructionStep.objects.create(revision=revision, step_number=1, description="Sew", is_verified=True)
+    assert _data_version(revision) == 2
+
+    bom_item.consumption = Decimal("1.5000")
+    bom_item.save()
+    step.delete()
+    assert _data_version(revision) == 4
+
+
+def test_translation_only_save_does_not_bump(revision, bom_item):
+    version = _data_version(revision)
+
+    bom_item.material_name_zh = "面料"
+    bom_item.save(update_fields=['material_name_zh', 'translated_at', 'translated_by'])
+
+    assert _data_version(revision) == version
+
+
+def test_source_hash_cached_until_data_changes(revision, bom_item):
+    first = generate_source_hash(revision)
+    assert first == _compute_source_hash(revision)
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert generate_source_hash(revision) == first
+    assert len(ctx.captured_queries) == 1
+
+    bom_item.unit_price = Decimal("3.20")
+    bom_item.save()
+
+    second = generate_source_hash(revision)
+    assert second != first
+    assert second == _compute_source_hash(revision)
+
+
+def test_run_staleness_uses_data_version(revision, bom_item):
+    _, run, _ = create_with_initial_run(revision.id, {}, user=None)
+    run = SampleRun.objects.get(pk=run.id)
+    assert run.source_data_version == _data_version(revision)
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert not is_run_source_stale(run)
+    assert len(ctx.captured_queries) == 1
+
+    # 未驗證資料變更：版本號不同但 hash 相同
+    BOMItem.objects.create(revision=revision, item_number=2, category="trim", material_name="Zip")
+    assert not is_run_source_stale(run)
+
+    bom_item.consumption = Decimal("2.0000")
+    bom_item.save()
+    assert is_run_source_stale(run)
+
+
+def test_run_detail_reports_source_stale(revision, bom_item):
+    from django.contrib.auth import get_user_model
+    from rest_framework.test import APIClient
+
+    _, run, _ = create_with_initial_run(revision.id, {}, user=None)
+    SampleRun.objects.filter(pk=run.pk).update(organization=revision.organization)
+    client = APIClient()
+    client.force_authenticate(user=get_user_model().objects.create_user(
+        username="stale", password="testpass123", organization=revision.organization,
+    ))
+
+    response = client.get(f'/api/v2/sample-runs/{run.id}/')
+    assert response.status_code == 200
+    assert response.data['source_stale'] is False
+
+    bom_item.consumption = Decimal("2.0000")
+    bom_item.save()
+    assert client.get(f'/api/v2/sample-runs/{run.id}/').data['source_stale'] is True
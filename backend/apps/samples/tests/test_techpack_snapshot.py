@@ -0,0 +1,184 @@
+"""
+Copy-on-write Tech Pack Snapshot Tests
+Runs share an immutable block set; edits are stored as per-run overrides
+"""
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from apps.core.models import Organization
+from apps.parsing.models import UploadedDocument
+from apps.parsing.models_blocks import DraftBlock, Revision as TechPackRevision, RevisionPage
+from apps.styles.models import Style, StyleRevision
+from apps.samples.models import (
+    RunTechPackBlock,
+    RunTechPackBlockOverride,
+    RunTechPackPage,
+    SampleRequest,
+    SampleRun,
+    TechPackBlockSet,
+)
+from apps.samples.services.auto_generation import snapshot_techpack_to_run
+from apps.samples.services.techpack_snapshot import resolve_run_techpack
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def org():
+    return Organization.objects.create(name="Test Org")
+
+
+@pytest.fixture
+def client(org):
+    user = get_user_model().objects.create_user(username="techpack", password="testpass123", organization=org)
+    api_client = APIClient()
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def revision(org):
+    style = Style.objects.create(organization=org, style_number="TP001", style_name="Tech Pack Style")
+    revision = StyleRevision.objects.create(style=style, revision_label="A")
+
+    tech_pack = TechPackRevision.objects.create(filename="tp.pdf", file="tp.pdf", page_count=2)
+    for page_number in (1, 2):
+        page = RevisionPage.objects.create(revision=tech_pack, page_number=page_number, width=600, height=800)
+        for i in range(3):
+            DraftBlock.objects.create(
+                page=page, block_type="callout",
+                bbox_x=10, bbox_y=i * 10, bbox_width=100, bbox_height=10,
+                source_text=f"p{page_number} b{i}", translated_text=f"譯 {page_number}-{i}",
+            )
+    UploadedDocument.objects.create(
+        organization=org, file="tp.pdf", filename="tp.pdf", file_type="pdf", file_size=1,
+        style_revision=revision, tech_pack_revision=tech_pack,
+    )
+    return revision
+
+
+@pytest.fixture
+def runs(org, revision):
+    request = SampleRequest.objects.create(organization=org, revision=revision)
+    created = []
+    for run_no in (1, 2):
+        run = SampleRun.objects.create(organization=org, sample_request=request, run_no=run_no)
+        snapshot_techpack_to_run(revision, run)
+        created.append(run)
+    return created
+
+
+def test_runs_share_one_block_set(runs):
+    assert TechPackBlockSet.objects.count() == 1
+    assert runs[0].techpack_block_set_id == runs[1].techpack_block_set_id
+    assert not RunTechPackPage.objects.exists()
+    assert not RunTechPackBlock.objects.exists()
+
+    pages = resolve_run_techpack(runs[0])
+    assert [p.page_number for p in pages] == [1, 2]
+    assert [b.source_text for b in pages[0].blocks] == ["p1 b0", "p1 b1", "p1 b2"]
+
+
+def test_block_set_changes_when_source_changes(revision, runs):
+    DraftBlock.objects.filter(source_text="p1 b0").update(edited_text="改")
+    third = SampleRun.objects.create(organization=runs[0].organization, sample_request=runs[0].sample_request, run_no=3)
+
+    snapshot_techpack_to_run(revision, third)
+
+    assert TechPackBlockSet.objects.count() == 2
+    assert resolve_run_techpack(third)[0].blocks[0].translated_text == "改"
+    assert resolve_run_techpack(runs[0])[0].blocks[0].translated_text == "譯 1-0"
+
+
+def test_patch_block_writes_override_for_that_run_only(client, runs):
+    block_id = resolve_run_techpack(runs[0])[0].blocks[0].id
+
+    response = client.patch(
+        f'/api/v2/sample-runs/{runs[0].id}/techpack-blocks/{block_id}/',
+        {'translated_text': '新翻譯', 'overlay_x': 42},
+        format='json',
+    )
+
+    assert response.status_code == 200
+    assert response.data['translated_text'] == '新翻譯'
+    assert response.data['overlay']['x'] == 42
+    assert RunTechPackBlockOverride.objects.count() == 1
+    assert resolve_run_techpack(runs[1])[0].blocks[0].translated_text == "譯 1-0"
+
+
+def test_batch_positions_and_snapshot_read(client, runs):
+    blocks = resolve_run_techpack(runs[0])[1].blocks
+
+    response = client.patch(
+        f'/api/v2/sample-runs/{runs[0].id}/techpack-blocks-batch/',
+        {'positions': [
+            {'id': blocks[0].id, 'overlay_x': 1, 'overlay_y': 2, 'overlay_visible': False},
+            {'id': blocks[1].id, 'overlay_x': 3, 'overlay_y': 4},
+            {'id': '00000000-0000-0000-0000-000000000000', 'overlay_x': 5},
+        ]},
+        format='json',
+    )
+    assert response.data['updated'] == 2
+    assert len(response.data['errors']) == 1
+
+    snapshot = client.get(f'/api/v2/sample-runs/{runs[0].id}/techpack-snapshot/')
+    assert snapshot.data['total_blocks'] == 6
+    first = snapshot.data['pages'][1]['blocks'][0]
+    assert first['overlay'] == {'x': 1, 'y': 2, 'visible': False}
+
+
+def test_legacy_physical_snapshot_still_resolves(org, revision):
+    request = SampleRequest.objects.create(organization=org, revision=revision)
+    run = SampleRun.objects.create(organization=org, sample_request=request, run_no=9)
+    page = RunTechPackPage.objects.create(run=run, page_number=1, width=600, height=800)
+    block = RunTechPackBlock.objects.create(run_page=page, source_text="legacy", translated_text="舊")
+
+    pages = resolve_run_techpack(run)
+
+    assert pages[0].blocks[0].id == block.id
+    assert pages[0].blocks[0].translated_text == "舊"
+
+
+def test_legacy_batch_update_is_single_statement(org, revision):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from apps.samples.services.techpack_snapshot import update_run_techpack_blocks
+
+    request = SampleRequest.objects.create(organization=org, revision=revision)
+    run = SampleRun.objects.create(organization=org, sample_request=request, run_no=9)
+    page = RunTechPackPage.objects.create(run=run, page_number=1, width=600, height=800)
+    blocks = [
+        RunTechPackBlock.objects.create(run_page=page, source_text=f"b{i}", translated_text="t")
+        for i in range(20)
+    ]
+
+    with CaptureQueriesContext(connection) as ctx:
+        updated, errors = update_run_techpack_blocks(
+            run, [(b.id, {'overlay_x': 5.0, 'overlay_y': 6.0}) for b in blocks],
+        )
+
+    assert (len(updated), errors) == (20, [])
+    assert len(ctx.captured_queries) == 1
+    assert set(RunTechPackBlock.objects.values_list('overlay_x', flat=True)) == {5.0}
+
+
+def test_blocks_without_writable_fields_are_still_validated(org, revision, runs):
+    from apps.samples.services.techpack_snapshot import update_run_techpack_blocks
+
+    request = SampleRequest.objects.create(organization=org, revision=revision)
+    legacy_run = SampleRun.objects.create(organization=org, sample_request=request, run_no=9)
+    page = RunTechPackPage.objects.create(run=legacy_run, page_number=1, width=600, height=800)
+    block = RunTechPackBlock.objects.create(run_page=page, source_text="legacy", translated_text="舊")
+    foreign = str(resolve_run_techpack(runs[0])[0].blocks[0].id)
+    made_up = '00000000-0000-0000-0000-000000000000'
+
+    for run, own, other in ((legacy_run, str(block.id), foreign), (runs[0], foreign, str(block.id))):
+        updated, errors = update_run_techpack_blocks(
+            run, [(own, {'source_text': 'ignored'}), (other, {}), (made_up, {'bbox_x': 1})],
+        )
+        assert [str(pk) for pk in updated] == [own]
+        assert errors == [f"Block {other} not found in this run", f"Block {made_up} not found in this run"]
+
+    assert not RunTechPackBlockOverride.objects.exists()
@@ -28,6 +28,7 @@ from .views import (
     get_alerts,
     # P3: Batch Export
     batch_export,
+    export_range,
     # P9: Scheduler/Gantt
     scheduler_data,
     # P18: Progress Dashboard
@@ -111,6 +112,7 @@ urlpatterns = [
     path('sample-runs/batch-transition/', batch_transition, name='batch-transition'),
     path('sample-runs/batch-transition-smart/', batch_transition_smart, name='batch-transition-smart'),
     path('sample-runs/batch-export/', batch_export, name='batch-export'),
+    path('sample-runs/export-range/', export_range, name='export-range'),
     path('alerts/', get_alerts, name='alerts'),
     path('scheduler/', scheduler_data, name='scheduler'),
     path('progress-dashboard/', progress_dashboard, name='progress-dashboard'),
@@ -4,20 +4,33 @@ Day 3 MVP API + SampleRun (Phase 3 Refactor)
 P0-2: Kanban View API
 """
 
+import base64
+import binascii
+
 from rest_framework import status, viewsets, filters
 from rest_framework.decorators import action, api_view, permission_classes as perm_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.exceptions import PermissionDenied
 from django.core.exceptions import ValidationError as DjangoValidationError
-from django.db.models import Count, Q, Case, When, Value, IntegerField
+from django.db.models import (
+    Count, Q, Case, When, Value, IntegerField, F, Window, ExpressionWrapper, DurationField,
+    OuterRef, Subquery,
+)
+from django.db.models.functions import Now, RowNumber
 from django.utils import timezone
+from django.utils.http import parse_etags
 from datetime import datetime, timedelta
 
+from apps.core.instrumentation import query_budget
+from apps.core.pagination import KeysetPagination
+from apps.core.search import SEARCH_TARGETS, search_q
+from apps.styles.models import StyleRevision
 from .models import (
     SampleRequest,
     SampleRun,
     SampleRunStatus,
+    SampleRunType,
     SampleActuals,
     SampleAttachment,
     SampleCostEstimate,
@@ -59,6 +72,7 @@ from .services.excel_export import (
     MWOExcelExporter,
     EstimateExcelExporter,
     T2POExcelExporter,
+    DateRangeExcelExporter,
 )
 from .services.pdf_export import (
     MWOPDFExporter,
@@ -68,6 +82,13 @@ from .services.pdf_export import (
 from .services.mwo_complete_export import export_mwo_complete
 from .services.batch_export import batch_export_sample_runs
 from .services.auto_generation import create_with_initial_run, create_next_run_for_request
+from .services.scheduler_cache import (
+    build_cache_key,
+    etag_for,
+    get_cached_response,
+    get_scheduler_version,
+    set_cached_response,
+)
 
 
 def _get_user_organization(request):
@@ -99,6 +120,7 @@ class SampleRequestViewSet(viewsets.ModelViewSet):
     """
     serializer_class = SampleRequestSerializer
     permission_classes = [AllowAny]  # TODO: Change to IsAuthenticated in production
+    query_budgets = {'list': 10, 'retrieve': 10, 'runs_summary': 10, 'allowed_actions': 8}
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = [
         'revision__style__style_number',
@@ -472,6 +494,8 @@ class SampleRunViewSet(viewsets.ModelViewSet):
     """
     serializer_class = SampleRunSerializer
     permission_classes = [AllowAny]  # TODO: Change to IsAuthenticated in production
+    pagination_class = KeysetPagination
+    query_budgets = {'list': 10, 'retrieve': 8, 'allowed_actions': 8, 'transition_logs': 6}
 
     def get_serializer_class(self):
         """Use lightweight serializer for list view"""
@@ -517,6 +541,12 @@ class SampleRunViewSet(viewsets.ModelViewSet):
         if sample_request_id:
             queryset = queryset.filter(sample_request_id=sample_request_id)
 
+        if self.action != 'list':
+            # SampleRunSerializer.source_stale：版本號隨 run 一起讀出，不另外查詢
+            queryset = queryset.annotate(source_revision_data_version=Subquery(
+                StyleRevision.objects.filter(pk=OuterRef('source_revision_id')).values('data_version')[:1]
+            ))
+
         return queryset
 
     def _handle_transition(self, request, pk, action_name):
@@ -1015,7 +1045,7 @@ class SampleRunViewSet(viewsets.ModelViewSet):
         """
         from apps.styles.models import BOMItem, Measurement
         from apps.parsing.models import UploadedDocument
-        from .models import RunTechPackPage
+        from .services.techpack_snapshot import run_techpack_page_count
 
         run = self.get_object()
         revision = run.revision or (run.sample_request.revision if run.sample_request else None)
@@ -1025,7 +1055,7 @@ class SampleRunViewSet(viewsets.ModelViewSet):
         # 1. Tech Pack 檢查
         techpack_pages = 0
         if run:
-            techpack_pages = RunTechPackPage.objects.filter(run=run).count()
+            techpack_pages = run_techpack_page_count(run)
 
         if techpack_pages == 0 and revision:
             # Fallback: 檢查 TechPackRevision
@@ -1174,22 +1204,19 @@ class SampleRunViewSet(viewsets.ModelViewSet):
             "total_blocks": 50
         }
         """
-        from .models import RunTechPackPage, RunTechPackBlock
         from .serializers import RunTechPackPageSerializer
+        from .services.techpack_snapshot import resolve_run_techpack
 
         run = self.get_object()
 
-        # 獲取快照頁面
-        pages = RunTechPackPage.objects.filter(run=run).prefetch_related('blocks')
-
-        # 計算總 block 數
-        total_blocks = RunTechPackBlock.objects.filter(run_page__run=run).count()
+        # 共用 block set + 本 Run 的 overrides（或舊的實體快照）
+        pages = resolve_run_techpack(run)
 
         return Response({
             "run_id": str(run.id),
             "run_no": run.run_no,
             "pages": RunTechPackPageSerializer(pages, many=True).data,
-            "total_blocks": total_blocks,
+            "total_blocks": sum(len(page.blocks) for page in pages),
         }, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=["patch"], url_path="techpack-blocks/(?P<block_id>[^/.]+)")
@@ -1207,31 +1234,25 @@ class SampleRunViewSet(viewsets.ModelViewSet):
             "overlay_visible": true
         }
         """
-        from .models import RunTechPackBlock
         from .serializers import RunTechPackBlockPatchSerializer, RunTechPackBlockSerializer
+        from .services.techpack_snapshot import get_run_techpack_block, update_run_techpack_blocks
 
         run = self.get_object()
 
-        # 獲取 block（確保屬於這個 run）
-        try:
-            block = RunTechPackBlock.objects.get(
-                id=block_id,
-                run_page__run=run
-            )
-        except RunTechPackBlock.DoesNotExist:
+        serializer = RunTechPackBlockPatchSerializer(data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+
+        # 確保 block 屬於這個 run；共用 block set 時寫入 override（copy-on-write）
+        updated, _ = update_run_techpack_blocks(run, [(block_id, serializer.validated_data)])
+        if not updated:
             return Response(
                 {'detail': f'Block {block_id} not found in this run'},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # 更新 block
-        serializer = RunTechPackBlockPatchSerializer(block, data=request.data, partial=True)
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
-
         # 返回更新後的完整 block
         return Response(
-            RunTechPackBlockSerializer(block).data,
+            RunTechPackBlockSerializer(get_run_techpack_block(run, block_id)).data,
             status=status.HTTP_200_OK
         )
 
@@ -1256,7 +1277,7 @@ class SampleRunViewSet(viewsets.ModelViewSet):
             "errors": []
         }
         """
-        from .models import RunTechPackBlock
+        from .services.techpack_snapshot import update_run_techpack_blocks
 
         run = self.get_object()
 
@@ -1267,33 +1288,17 @@ class SampleRunViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # 獲取這個 run 下的所有 block IDs
-        valid_block_ids = set(
-            str(b.id) for b in RunTechPackBlock.objects.filter(run_page__run=run)
-        )
-
-        updated = 0
-        errors = []
-
-        for pos in positions:
-            block_id = str(pos.get('id'))
-
-            if block_id not in valid_block_ids:
-                errors.append(f"Block {block_id} not found in this run")
-                continue
-
-            try:
-                RunTechPackBlock.objects.filter(id=block_id).update(
-                    overlay_x=pos.get('overlay_x'),
-                    overlay_y=pos.get('overlay_y'),
-                    overlay_visible=pos.get('overlay_visible', True)
-                )
-                updated += 1
-            except Exception as e:
-                errors.append(f"Failed to update block {block_id}: {str(e)}")
+        updated, errors = update_run_techpack_blocks(run, [
+            (pos.get('id'), {
+                'overlay_x': pos.get('overlay_x'),
+                'overlay_y': pos.get('overlay_y'),
+                'overlay_visible': pos.get('overlay_visible', True),
+            })
+            for pos in positions
+        ])
 
         return Response({
-            "updated": updated,
+            "updated": len(updated),
             "errors": errors
         }, status=status.HTTP_200_OK)
 
@@ -1321,6 +1326,7 @@ class SampleActualsViewSet(viewsets.ModelViewSet):
     queryset = SampleActuals.objects.all().select_related('sample_run').order_by('-created_at')
     serializer_class = SampleActualsSerializer
     permission_classes = [AllowAny]  # TODO: Change to IsAuthenticated in production
+    query_budgets = {'list': 5, 'retrieve': 5}
 
     def get_queryset(self):
         """Filter by sample_run if provided"""
@@ -1350,6 +1356,7 @@ class SampleAttachmentViewSet(viewsets.ModelViewSet):
     queryset = SampleAttachment.objects.all().order_by('-uploaded_at')
     serializer_class = SampleAttachmentSerializer
     permission_classes = [AllowAny]  # TODO: Change to IsAuthenticated in production
+    query_budgets = {'list': 5, 'retrieve': 5}
 
     def perform_create(self, serializer):
         """Auto-set uploaded_by to current user"""
@@ -1369,6 +1376,7 @@ class SampleCostEstimateViewSet(viewsets.ModelViewSet):
     )
     serializer_class = SampleCostEstimateSerializer
     permission_classes = [AllowAny]  # TODO: Change to IsAuthenticated in production
+    query_budgets = {'list': 5, 'retrieve': 5}
 
     def get_queryset(self):
         """Filter by sample_request if provided"""
@@ -1395,6 +1403,7 @@ class T2POForSampleViewSet(viewsets.ModelViewSet):
     ).prefetch_related('lines').order_by('-created_at')
     serializer_class = T2POForSampleSerializer
     permission_classes = [AllowAny]  # TODO: Change to IsAuthenticated in production
+    query_budgets = {'list': 5, 'retrieve': 5}
 
     def get_queryset(self):
         """Filter by sample_request if provided"""
@@ -1414,6 +1423,7 @@ class T2POLineForSampleViewSet(viewsets.ModelViewSet):
     queryset = T2POLineForSample.objects.all().select_related('t2po').order_by('t2po', 'line_no')
     serializer_class = T2POLineForSampleSerializer
     permission_classes = [AllowAny]  # TODO: Change to IsAuthenticated in production
+    query_budgets = {'list': 5, 'retrieve': 5}
 
     def get_queryset(self):
         """Filter by t2po if provided"""
@@ -1436,6 +1446,7 @@ class SampleMWOViewSet(viewsets.ModelViewSet):
     ).order_by('-created_at')
     serializer_class = SampleMWOSerializer
     permission_classes = [AllowAny]  # TODO: Change to IsAuthenticated in production
+    query_budgets = {'list': 5, 'retrieve': 5}
 
     def get_queryset(self):
         """Filter by sample_request if provided"""
@@ -1458,6 +1469,7 @@ class SampleViewSet(viewsets.ModelViewSet):
     ).prefetch_related('attachments').order_by('-created_at')
     serializer_class = SampleSerializer
     permission_classes = [AllowAny]  # TODO: Change to IsAuthenticated in production
+    query_budgets = {'list': 5, 'retrieve': 5}
 
     def get_queryset(self):
         """Filter by sample_request if provided"""
@@ -1470,6 +1482,7 @@ class SampleViewSet(viewsets.ModelViewSet):
 
 # ==================== P0-2: Kanban View API ====================
 
+@query_budget(5)
 @api_view(['GET'])
 @perm_classes([AllowAny])
 def kanban_counts(request):
@@ -1580,6 +1593,7 @@ def kanban_counts(request):
     })
 
 
+@query_budget(5)
 @api_view(['GET'])
 @perm_classes([AllowAny])
 def kanban_runs(request):
@@ -1598,6 +1612,10 @@ def kanban_runs(request):
     - run_type: Filter by run type (proto/fit/sales/photo)
     - search: General search (style_number or brand)
     - limit: Max items per status (default: 50)
+    - cursor: Lane cursor from meta.lanes[status].next_cursor (returns that lane only)
+
+    Single query: ROW_NUMBER() OVER (PARTITION BY status) keeps exactly `limit`
+    cards per lane; cards are built from a .values() projection.
     """
     today = timezone.now().date()
     week_later = today + timedelta(days=7)
@@ -1606,12 +1624,7 @@ def kanban_runs(request):
     org = _get_user_organization(request)
 
     # Base queryset with tenant awareness
-    queryset = SampleRun.objects.select_related(
-        'sample_request',
-        'sample_request__revision',
-        'sample_request__revision__style',
-        'organization',
-    ).exclude(
+    queryset = SampleRun.objects.exclude(
         status=SampleRunStatus.CANCELLED
     )
 
@@ -1668,84 +1681,136 @@ def kanban_runs(request):
     # General search (style_number or brand)
     search = request.query_params.get('search')
     if search:
-        queryset = queryset.filter(
-            Q(sample_request__brand_name__icontains=search) |
-            Q(sample_request__revision__style__style_number__icontains=search) |
-            Q(sample_request__revision__style__style_name__icontains=search)
-        )
+        queryset = queryset.filter(search_q(SEARCH_TARGETS['run'].fields, search))
 
-    # Limit per status
+    # Limit per status (exact, enforced by ROW_NUMBER per lane)
     limit = int(request.query_params.get('limit', 50))
 
-    # Annotate with overdue flag
+    # Per-lane "load more": cursor 只在指定 lane 內往後翻
+    offset = 0
+    cursor = request.query_params.get('cursor')
+    if cursor:
+        try:
+            lane_status, offset = _decode_lane_cursor(cursor)
+        except ValueError:
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        queryset = queryset.filter(status=lane_status)
+
+    lane_order = [
+        F('is_overdue').desc(),
+        F('target_due_date').asc(nulls_last=True),
+        F('created_at').desc(),
+        F('id').asc(),
+    ]
+
+    # Window: 每個 status 分區內編號 + lane 總數；停留天數在 SQL 計算
+    # （run_transitions 每次轉換都同時寫入 status_updated_at 與 status_timestamps[status]）
     queryset = queryset.annotate(
         is_overdue=Case(
             When(target_due_date__lt=today, then=Value(1)),
             default=Value(0),
             output_field=IntegerField()
-        )
-    ).order_by('status', '-is_overdue', 'target_due_date', '-created_at')
+        ),
+        time_in_status=ExpressionWrapper(Now() - F('status_updated_at'), output_field=DurationField()),
+    ).annotate(
+        lane_row=Window(RowNumber(), partition_by=[F('status')], order_by=lane_order),
+        lane_total=Window(Count('id'), partition_by=[F('status')]),
+    ).filter(
+        lane_row__gt=offset,
+        lane_row__lte=offset + limit,
+    ).order_by('status', 'lane_row')
+
+    rows = queryset.values(
+        'id', 'run_no', 'status', 'run_type', 'quantity', 'target_due_date',
+        'status_timestamps', 'time_in_status', 'lane_row', 'lane_total',
+        'sample_request_id',
+        'sample_request__request_type',
+        'sample_request__priority',
+        'sample_request__brand_name',
+        'sample_request__revision_id',
+        'sample_request__revision__revision_label',
+        'sample_request__revision__style_id',
+        'sample_request__revision__style__style_number',
+        'sample_request__revision__style__style_name',
+    )
+
+    status_labels = dict(SampleRunStatus.CHOICES)
+    run_type_labels = dict(SampleRunType.CHOICES)
 
     # Build response
     runs = []
-    for run in queryset[:limit * 15]:  # Rough limit
-        request_obj = run.sample_request
-        revision = request_obj.revision
-        style = revision.style if revision else None
-
-        # TRACK-PROGRESS: 計算停留天數
-        timestamps = run.status_timestamps or {}
-        current_ts = timestamps.get(run.status)
-        if current_ts:
-            try:
-                from datetime import datetime as dt
-                entered = dt.fromisoformat(current_ts.replace('Z', '+00:00'))
-                days_in_status = (timezone.now() - entered).days
-            except (ValueError, TypeError):
-                days_in_status = None
-        else:
-            # fallback: 用 status_updated_at
-            days_in_status = (timezone.now() - run.status_updated_at).days if run.status_updated_at else None
+    lanes = {}
+    for row in rows:
+        due = row['target_due_date']
+        time_in_status = row['time_in_status']
+        revision_id = row['sample_request__revision_id']
+        style_id = row['sample_request__revision__style_id']
 
         runs.append({
-            'id': str(run.id),
-            'run_no': run.run_no,
-            'status': run.status,
-            'status_label': run.get_status_display(),
-            'run_type': run.run_type,
-            'run_type_label': run.get_run_type_display(),
-            'quantity': run.quantity,
-            'target_due_date': run.target_due_date.isoformat() if run.target_due_date else None,
-            'is_overdue': run.target_due_date and run.target_due_date < today,
-            'days_until_due': (run.target_due_date - today).days if run.target_due_date else None,
-            'days_in_status': days_in_status,
-            'status_timestamps': timestamps,
+            'id': str(row['id']),
+            'run_no': row['run_no'],
+            'status': row['status'],
+            'status_label': status_labels.get(row['status'], row['status']),
+            'run_type': row['run_type'],
+            'run_type_label': run_type_labels.get(row['run_type'], row['run_type']),
+            'quantity': row['quantity'],
+            'target_due_date': due.isoformat() if due else None,
+            'is_overdue': bool(due and due < today),
+            'days_until_due': (due - today).days if due else None,
+            'days_in_status': time_in_status.days if time_in_status is not None else None,
+            'status_timestamps': row['status_timestamps'] or {},
             'sample_request': {
-                'id': str(request_obj.id),
-                'request_type': request_obj.request_type,
-                'priority': request_obj.priority,
-                'brand_name': request_obj.brand_name,
+                'id': str(row['sample_request_id']),
+                'request_type': row['sample_request__request_type'],
+                'priority': row['sample_request__priority'],
+                'brand_name': row['sample_request__brand_name'],
             },
             'style': {
-                'id': str(style.id) if style else None,
-                'style_number': style.style_number if style else None,
-                'style_name': style.style_name if style else None,
-            } if style else None,
+                'id': str(style_id),
+                'style_number': row['sample_request__revision__style__style_number'],
+                'style_name': row['sample_request__revision__style__style_name'],
+            } if style_id else None,
             'revision': {
-                'id': str(revision.id) if revision else None,
-                'revision_label': revision.revision_label if revision else None,
-            } if revision else None,
+                'id': str(revision_id),
+                'revision_label': row['sample_request__revision__revision_label'],
+            } if revision_id else None,
         })
 
+        lane = lanes.setdefault(row['status'], {'total': row['lane_total'], 'returned': 0, 'last_row': 0})
+        lane['returned'] += 1
+        lane['last_row'] = row['lane_row']
+
+    for lane_status, lane in lanes.items():
+        last_row = lane.pop('last_row')
+        lane['next_cursor'] = (
+            _encode_lane_cursor(lane_status, last_row) if last_row < lane['total'] else None
+        )
+
     return Response({
         'runs': runs,
         'meta': {
             'count': len(runs),
+            'limit': limit,
+            'lanes': lanes,
             'as_of': timezone.now().isoformat(),
         }
     })
 
 
+def _encode_lane_cursor(lane_status: str, position: int) -> str:
+    """Kanban lane cursor: base64("status:position")"""
+    return base64.urlsafe_b64encode(f"{lane_status}:{position}".encode()).decode()
+
+
+def _decode_lane_cursor(cursor: str):
+    """Returns (status, position); raises ValueError on malformed cursor"""
+    try:
+        lane_status, position = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit(':', 1)
+        return lane_status, max(0, int(position))
+    except (ValueError, UnicodeDecodeError, binascii.Error) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
 # ==================== P1: Batch Operations API ====================
 
 @api_view(['POST'])
@@ -1759,7 +1824,8 @@ def batch_transition(request):
     Request body:
     {
         "run_ids": ["uuid1", "uuid2", ...],
-        "action": "start_materials_planning"
+        "action": "start_materials_planning",
+        "all_or_nothing": false  // optional: apply to all runs or none
     }
 
     Response:
@@ -1778,7 +1844,7 @@ def batch_transition(request):
 
     Notes:
     - All runs must be in the same status
-    - Partial success is allowed (some may fail, others succeed)
+    - Partial success is allowed (some may fail, others succeed) unless all_or_nothing
     - Returns detailed results for each run
     """
     # Extract request data
@@ -1823,6 +1889,7 @@ def batch_transition(request):
             'notes': request.data.get('notes', ''),
         },
         organization=org,
+        all_or_nothing=bool(request.data.get('all_or_nothing', False)),
     )
 
     # Return appropriate status code
@@ -1857,7 +1924,8 @@ def batch_transition_smart(request):
 
     Request body:
     {
-        "run_ids": ["uuid1", "uuid2", ...]
+        "run_ids": ["uuid1", "uuid2", ...],
+        "all_or_nothing": false  // optional
     }
 
     Response:
@@ -1909,6 +1977,7 @@ def batch_transition_smart(request):
         run_ids=run_ids,
         organization=org,
         actor=request.user if request.user.is_authenticated else None,
+        all_or_nothing=bool(request.data.get('all_or_nothing', False)),
     )
 
     # Return appropriate status code
@@ -1930,6 +1999,7 @@ def batch_transition_smart(request):
 
 # ==================== P1: Alerts API ====================
 
+@query_budget(5)
 @api_view(['GET'])
 @perm_classes([AllowAny])  # TODO: Change to IsAuthenticated in production
 def get_alerts(request):
@@ -1938,26 +2008,32 @@ def get_alerts(request):
 
     GET /api/v2/alerts/
 
+    Alerts are precomputed by the Celery beat job (services/alerts.py);
+    this endpoint only reads the Alert table.
+
     Query params:
     - include_overdue: Include overdue alerts (default: true)
     - include_due_soon: Include due soon alerts (default: true)
     - include_stale: Include stale alerts (default: true)
-    - due_soon_days: Days threshold for "due soon" (default: 3)
-    - stale_days: Days threshold for "stale" (default: 7)
-    - limit: Max alerts per category (default: 20)
+    - severity: Filter by severity (comma-separated: high,medium,low)
+    - state: active (default) | resolved | all
+    - limit: Page size (default: 20, max: 100)
+    - cursor: meta.next_cursor from the previous page
 
     Response:
     {
         "alerts": [
             {
-                "id": "uuid",
+                "id": "123",
                 "type": "overdue",
                 "severity": "high",
                 "title": "Overdue: Style ABC123",
                 "message": "Run #1 was due on Jan 1, 2026",
                 "run_id": "uuid",
                 "style_number": "ABC123",
-                "days_overdue": 5
+                "days_overdue": 5,
+                "first_seen_at": "...",
+                "resolved_at": null
             },
             ...
         ],
@@ -1966,31 +2042,30 @@ def get_alerts(request):
             "due_soon": 5,
             "stale": 2,
             "total": 10
-        }
+        },
+        "meta": {"next_cursor": "...", ...}
     }
     """
-    today = timezone.now().date()
+    from .models import Alert, AlertType
+    from .services.alerts import apply_alert_cursor, encode_alert_cursor, format_alert, get_thresholds
+
+    due_soon_days, stale_days = get_thresholds()
 
     # Parse query params
-    include_overdue = request.query_params.get('include_overdue', 'true').lower() == 'true'
-    include_due_soon = request.query_params.get('include_due_soon', 'true').lower() == 'true'
-    include_stale = request.query_params.get('include_stale', 'true').lower() == 'true'
-    due_soon_days = int(request.query_params.get('due_soon_days', 3))
-    stale_days = int(request.query_params.get('stale_days', 7))
-    limit = int(request.query_params.get('limit', 20))
+    include = {
+        AlertType.OVERDUE: request.query_params.get('include_overdue', 'true').lower() == 'true',
+        AlertType.DUE_SOON: request.query_params.get('include_due_soon', 'true').lower() == 'true',
+        AlertType.STALE: request.query_params.get('include_stale', 'true').lower() == 'true',
+    }
+    severity = request.query_params.get('severity')
+    state = request.query_params.get('state', 'active')
+    limit = min(int(request.query_params.get('limit', 20)), 100)
 
     # SaaS-Ready: Tenant filtering
     org = _get_user_organization(request)
 
-    # Base queryset - exclude completed/cancelled
-    base_qs = SampleRun.objects.select_related(
-        'sample_request',
-        'sample_request__revision',
-        'sample_request__revision__style',
-    ).exclude(
-        status__in=[SampleRunStatus.CANCELLED, SampleRunStatus.ACCEPTED]
-    )
-
+    empty_summary = {'overdue': 0, 'due_soon': 0, 'stale': 0, 'total': 0}
+    base_qs = Alert.objects.all()
     if org is not None:
         base_qs = base_qs.filter(organization=org)
     else:
@@ -1998,101 +2073,43 @@ def get_alerts(request):
         if not settings.DEBUG:
             return Response({
                 'alerts': [],
-                'summary': {'overdue': 0, 'due_soon': 0, 'stale': 0, 'total': 0}
+                'summary': empty_summary,
             })
 
-    alerts = []
-    summary = {'overdue': 0, 'due_soon': 0, 'stale': 0, 'total': 0}
-
-    # 1. Overdue alerts (target_due_date < today)
-    if include_overdue:
-        overdue_runs = base_qs.filter(
-            target_due_date__lt=today
-        ).order_by('target_due_date')[:limit]
-
-        for run in overdue_runs:
-            days_overdue = (today - run.target_due_date).days
-            style = run.sample_request.revision.style if run.sample_request.revision else None
-            alerts.append({
-                'id': str(run.id),
-                'type': 'overdue',
-                'severity': 'high',
-                'title': f"Overdue: {style.style_number if style else 'Unknown'}",
-                'message': f"Run #{run.run_no} was due on {run.target_due_date.strftime('%b %d, %Y')} ({days_overdue} days ago)",
-                'run_id': str(run.id),
-                'request_id': str(run.sample_request.id),
-                'style_number': style.style_number if style else None,
-                'status': run.status,
-                'days_overdue': days_overdue,
-                'target_due_date': run.target_due_date.isoformat(),
-            })
-            summary['overdue'] += 1
+    # Summary: active alerts by type（單一 grouped query）
+    summary = dict(empty_summary)
+    for row in base_qs.filter(resolved_at__isnull=True).order_by().values('alert_type').annotate(n=Count('id')):
+        summary[row['alert_type']] = row['n']
+    summary['total'] = summary['overdue'] + summary['due_soon'] + summary['stale']
 
-    # 2. Due Soon alerts (today <= target_due_date <= today + due_soon_days)
-    if include_due_soon:
-        due_soon_cutoff = today + timedelta(days=due_soon_days)
-        due_soon_runs = base_qs.filter(
-            target_due_date__gte=today,
-            target_due_date__lte=due_soon_cutoff
-        ).order_by('target_due_date')[:limit]
-
-        for run in due_soon_runs:
-            days_until = (run.target_due_date - today).days
-            style = run.sample_request.revision.style if run.sample_request.revision else None
-            alerts.append({
-                'id': str(run.id),
-                'type': 'due_soon',
-                'severity': 'medium',
-                'title': f"Due Soon: {style.style_number if style else 'Unknown'}",
-                'message': f"Run #{run.run_no} is due in {days_until} day{'s' if days_until != 1 else ''}",
-                'run_id': str(run.id),
-                'request_id': str(run.sample_request.id),
-                'style_number': style.style_number if style else None,
-                'status': run.status,
-                'days_until_due': days_until,
-                'target_due_date': run.target_due_date.isoformat(),
-            })
-            summary['due_soon'] += 1
-
-    # 3. Stale alerts (draft status for > stale_days)
-    if include_stale:
-        stale_cutoff = timezone.now() - timedelta(days=stale_days)
-        stale_runs = base_qs.filter(
-            status=SampleRunStatus.DRAFT,
-            created_at__lt=stale_cutoff
-        ).order_by('created_at')[:limit]
-
-        for run in stale_runs:
-            days_stale = (timezone.now() - run.created_at).days
-            style = run.sample_request.revision.style if run.sample_request.revision else None
-            alerts.append({
-                'id': str(run.id),
-                'type': 'stale',
-                'severity': 'low',
-                'title': f"Stale: {style.style_number if style else 'Unknown'}",
-                'message': f"Run #{run.run_no} has been in draft for {days_stale} days",
-                'run_id': str(run.id),
-                'request_id': str(run.sample_request.id),
-                'style_number': style.style_number if style else None,
-                'status': run.status,
-                'days_stale': days_stale,
-                'created_at': run.created_at.isoformat(),
-            })
-            summary['stale'] += 1
+    queryset = base_qs.filter(alert_type__in=[t for t, enabled in include.items() if enabled])
+    if state == 'active':
+        queryset = queryset.filter(resolved_at__isnull=True)
+    elif state == 'resolved':
+        queryset = queryset.filter(resolved_at__isnull=False)
+    if severity:
+        queryset = queryset.filter(severity__in=[s.strip() for s in severity.split(',')])
 
-    summary['total'] = summary['overdue'] + summary['due_soon'] + summary['stale']
+    cursor = request.query_params.get('cursor')
+    if cursor:
+        try:
+            queryset = apply_alert_cursor(queryset, cursor)
+        except ValueError:
+            return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Sort alerts by severity (high > medium > low)
-    severity_order = {'high': 0, 'medium': 1, 'low': 2}
-    alerts.sort(key=lambda x: severity_order.get(x['severity'], 3))
+    page = list(queryset.order_by('severity_rank', 'reference_date', 'id')[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
 
+    today = timezone.localdate()
     return Response({
-        'alerts': alerts,
+        'alerts': [format_alert(alert, today) for alert in page],
         'summary': summary,
         'meta': {
             'as_of': timezone.now().isoformat(),
             'due_soon_days': due_soon_days,
             'stale_days': stale_days,
+            'next_cursor': encode_alert_cursor(page[-1]) if has_more else None,
         }
     })
 
@@ -2143,6 +2160,42 @@ def batch_export(request):
     )
 
 
+@api_view(['GET'])
+@perm_classes([AllowAny])  # TODO: Change to IsAuthenticated in production
+def export_range(request):
+    """
+    Export all SampleRuns / T2 POs created in a date range to one workbook
+    GET /api/v2/sample-runs/export-range/?start=2026-01-01&end=2026-01-31&include=runs,pos
+
+    Uses openpyxl write-only mode and streams the xlsx file to the client.
+    """
+    start = request.query_params.get('start')
+    end = request.query_params.get('end')
+    include = request.query_params.get('include', 'runs,pos').split(',')
+
+    if not start or not end:
+        return Response({'detail': 'start and end are required (YYYY-MM-DD)'}, status=400)
+
+    try:
+        start_date = datetime.strptime(start, '%Y-%m-%d').date()
+        end_date = datetime.strptime(end, '%Y-%m-%d').date()
+    except ValueError:
+        return Response({'detail': 'Invalid date format, use YYYY-MM-DD'}, status=400)
+
+    if start_date > end_date:
+        return Response({'detail': 'start must be before end'}, status=400)
+
+    include = [i.strip() for i in include if i.strip() in ('runs', 'pos')]
+    if not include:
+        return Response({'detail': 'include must contain "runs" and/or "pos"'}, status=400)
+
+    # 使用租戶過濾
+    organization = _get_user_organization(request)
+
+    exporter = DateRangeExcelExporter()
+    return exporter.export(organization, start_date, end_date, include=include)
+
+
 # ==================== P9: Scheduler/Gantt API ====================
 
 # Status progress mapping (percentage through workflow)
@@ -2180,6 +2233,7 @@ STATUS_COLORS = {
 }
 
 
+@query_budget(8)
 @api_view(['GET'])
 @perm_classes([AllowAny])
 def scheduler_data(request):
@@ -2197,6 +2251,11 @@ def scheduler_data(request):
     - page: Page number (default 1)
     - page_size: Items per page (10/25/50, default 25)
 
+    Caching:
+    - Responses are cached per (organization, filters, page, scheduler version).
+      The version is bumped whenever a SampleRun status/due date changes.
+    - ETag is returned; send If-None-Match to get 304 Not Modified.
+
     Response for view=style:
     {
         "styles": [
@@ -2301,10 +2360,7 @@ def scheduler_data(request):
 
     # Apply search filter
     if search:
-        queryset = queryset.filter(
-            Q(sample_request__revision__style__style_number__icontains=search) |
-            Q(sample_request__revision__style__style_name__icontains=search)
-        )
+        queryset = queryset.filter(search_q(SEARCH_TARGETS['run'].fields[:2], search))
 
     # Apply status filter
     if status_filter:
@@ -2317,15 +2373,42 @@ def scheduler_data(request):
         'run_no'
     )
 
-    if view_type == 'style':
-        return _build_style_view(queryset, today, start_date, end_date, page, page_size)
+    # Cache by (org, filters, page, version)；版本號在 SampleRun 日期/狀態變更時 bump
+    organization_id = org.id if org is not None else None
+    params = {
+        'view': view_type,
+        'start_date': start_date,
+        'end_date': end_date,
+        'search': search,
+        'status': status_filter,
+        'page': page,
+        'page_size': page_size,
+    }
+    version = get_scheduler_version(organization_id)
+    cache_key = build_cache_key(organization_id, params, version, today)
+    etag = etag_for(cache_key)
+
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
     else:
-        return _build_run_view(queryset, today, start_date, end_date, page, page_size)
+        data = get_cached_response(cache_key)
+        if data is None:
+            if view_type == 'style':
+                data = _build_style_view(queryset, today, start_date, end_date, page, page_size)
+            else:
+                data = _build_run_view(queryset, today, start_date, end_date, page, page_size)
+            data['meta']['version'] = version
+            set_cached_response(cache_key, data)
+        response = Response(data)
+
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
 
 
 def _build_style_view(queryset, today, start_date, end_date, page, page_size):
     """
-    Build Style-grouped view for Scheduler
+    Build Style-grouped view for Scheduler (response dict)
 
     Optimized for 300+ styles:
     1. First get distinct style IDs with pagination at DB level
@@ -2349,7 +2432,7 @@ def _build_style_view(queryset, today, start_date, end_date, page, page_size):
     paginated_style_ids = unique_style_ids[start_idx:end_idx]
 
     if not paginated_style_ids:
-        return Response({
+        return {
             'styles': [],
             'pagination': {
                 'page': page,
@@ -2366,7 +2449,7 @@ def _build_style_view(queryset, today, start_date, end_date, page, page_size):
                 'as_of': timezone.now().isoformat(),
                 'view': 'style',
             }
-        })
+        }
 
     # Step 3: Fetch styles and runs only for paginated subset
     styles_map = {
@@ -2468,7 +2551,7 @@ def _build_style_view(queryset, today, start_date, end_date, page, page_size):
             'runs': runs,
         })
 
-    return Response({
+    return {
         'styles': styles_list,
         'pagination': {
             'page': page,
@@ -2485,11 +2568,11 @@ def _build_style_view(queryset, today, start_date, end_date, page, page_size):
             'as_of': timezone.now().isoformat(),
             'view': 'style',
         }
-    })
+    }
 
 
 def _build_run_view(queryset, today, start_date, end_date, page, page_size):
-    """Build flat Run view for Scheduler"""
+    """Build flat Run view for Scheduler (response dict)"""
     runs_list = []
 
     for run in queryset:
@@ -2532,7 +2615,7 @@ def _build_run_view(queryset, today, start_date, end_date, page, page_size):
     end_idx = start_idx + page_size
     paginated_runs = runs_list[start_idx:end_idx]
 
-    return Response({
+    return {
         'runs': paginated_runs,
         'pagination': {
             'page': page,
@@ -2549,13 +2632,14 @@ def _build_run_view(queryset, today, start_date, end_date, page, page_size):
             'as_of': timezone.now().isoformat(),
             'view': 'run',
         }
-    })
+    }
 
 
 # ========================================
 # P18: Unified Progress Dashboard API
 # ========================================
 
+@query_budget(20)
 @api_view(['GET'])
 @perm_classes([AllowAny])
 def progress_dashboard(request):
@@ -2575,162 +2659,99 @@ def progress_dashboard(request):
     - style_id: Filter by specific style
     - days_ahead: Days to look ahead for due dates (default: 14)
     """
-    from apps.costing.models import CostSheetVersion
-    from apps.procurement.models import PurchaseOrder, POLine
+    from apps.procurement.models import PurchaseOrder
     from apps.orders.models import ProductionOrder, MaterialRequirement
+    from .services.dashboard_aggregates import get_dashboard_sections, DEFAULT_DAYS_AHEAD
 
-    today = timezone.now().date()
-    days_ahead = int(request.query_params.get('days_ahead', 14))
+    days_ahead = int(request.query_params.get('days_ahead', DEFAULT_DAYS_AHEAD))
     style_id = request.query_params.get('style_id')
 
     # SaaS-Ready: Tenant filtering
     org = _get_user_organization(request)
 
+    # 預設查詢讀取 per-organization 快照；style_id / days_ahead 即時計算
+    sections, computed_at = get_dashboard_sections(
+        organization_id=org.id if org else None,
+        style_id=style_id,
+        days_ahead=days_ahead,
+    )
+    sample = sections['sample']
+    quotation = sections['quotation']
+    procurement = sections['procurement']
+    production = sections['production']
+    material = sections['material']
+
+    def with_labels(counts, choices):
+        return {
+            value: {'count': counts[value], 'label': label}
+            for value, label in choices
+            if counts.get(value)
+        }
+
     # ========================================
     # 1. Sample Progress
     # ========================================
-    sample_runs = SampleRun.objects.exclude(status=SampleRunStatus.CANCELLED)
-    if org:
-        sample_runs = sample_runs.for_tenant(org)
-    if style_id:
-        sample_runs = sample_runs.filter(sample_request__revision__style_id=style_id)
-
-    sample_by_status = {}
-    for status_choice in SampleRunStatus.CHOICES:
-        status_value = status_choice[0]
-        count = sample_runs.filter(status=status_value).count()
-        if count > 0:
-            sample_by_status[status_value] = {
-                'count': count,
-                'label': status_choice[1],
-                'progress': STATUS_PROGRESS.get(status_value, 0),
-                'color': STATUS_COLORS.get(status_value, '#94a3b8'),
-            }
-
-    # Overdue samples
-    overdue_samples = sample_runs.filter(
-        target_due_date__lt=today
-    ).exclude(status__in=['accepted', 'sample_done']).count()
-
-    # Due soon samples (within days_ahead)
-    due_soon_samples = sample_runs.filter(
-        target_due_date__gte=today,
-        target_due_date__lte=today + timedelta(days=days_ahead)
-    ).exclude(status__in=['accepted', 'sample_done']).count()
+    sample_by_status = {
+        value: {
+            'count': sample['by_status'][value],
+            'label': label,
+            'progress': STATUS_PROGRESS.get(value, 0),
+            'color': STATUS_COLORS.get(value, '#94a3b8'),
+        }
+        for value, label in SampleRunStatus.CHOICES
+        if sample['by_status'].get(value)
+    }
+    overdue_samples = sample['overdue']
+    due_soon_samples = sample['due_soon']
 
     # ========================================
     # 2. Quotation Progress
     # ========================================
-    cost_sheets = CostSheetVersion.objects.all()
-    if style_id:
-        cost_sheets = cost_sheets.filter(cost_sheet_group__style_id=style_id)
-
-    quote_by_status = {}
-    quote_by_type = {'sample': 0, 'bulk': 0}
-    for cs in cost_sheets:
-        status = cs.status
-        if status not in quote_by_status:
-            quote_by_status[status] = {'count': 0, 'label': status.title()}
-        quote_by_status[status]['count'] += 1
-
-        costing_type = cs.costing_type
-        if costing_type in quote_by_type:
-            quote_by_type[costing_type] += 1
+    quote_by_status = {
+        value: {'count': count, 'label': value.title()}
+        for value, count in quotation['by_status'].items()
+    }
+    quote_by_type = {
+        costing_type: quotation['by_type'].get(costing_type, 0)
+        for costing_type in ('sample', 'bulk')
+    }
 
     # Pending quotes (draft or submitted)
-    pending_quotes = cost_sheets.filter(status__in=['draft', 'submitted']).count()
+    pending_quotes = sum(quotation['by_status'].get(s, 0) for s in ('draft', 'submitted'))
 
     # ========================================
     # 3. Procurement Progress
     # ========================================
-    purchase_orders = PurchaseOrder.objects.all()
-    if org:
-        purchase_orders = purchase_orders.for_tenant(org)
-
-    po_by_status = {}
-    for status_choice in PurchaseOrder.STATUS_CHOICES:
-        status_value = status_choice[0]
-        count = purchase_orders.filter(status=status_value).count()
-        if count > 0:
-            po_by_status[status_value] = {
-                'count': count,
-                'label': status_choice[1],
-            }
-
-    # Overdue deliveries
-    overdue_deliveries = POLine.objects.filter(
-        delivery_status__in=['pending', 'shipped', 'partial'],
-        expected_delivery__lt=today
-    ).count()
-
-    # Due soon deliveries
-    due_soon_deliveries = POLine.objects.filter(
-        delivery_status__in=['pending', 'shipped'],
-        expected_delivery__gte=today,
-        expected_delivery__lte=today + timedelta(days=days_ahead)
-    ).count()
+    po_by_status = with_labels(procurement['by_status'], PurchaseOrder.STATUS_CHOICES)
+    overdue_deliveries = procurement['overdue_deliveries']
+    due_soon_deliveries = procurement['due_soon_deliveries']
 
     # ========================================
     # 4. Production Order Progress
     # ========================================
-    production_orders = ProductionOrder.objects.all()
-    if org:
-        production_orders = production_orders.for_tenant(org)
-    if style_id:
-        production_orders = production_orders.filter(style_revision__style_id=style_id)
-
-    prod_by_status = {}
-    for status_choice in ProductionOrder.STATUS_CHOICES:
-        status_value = status_choice[0]
-        count = production_orders.filter(status=status_value).count()
-        if count > 0:
-            prod_by_status[status_value] = {
-                'count': count,
-                'label': status_choice[1],
-            }
-
-    # Overdue production orders
-    overdue_prod = production_orders.filter(
-        delivery_date__lt=today
-    ).exclude(status__in=['completed', 'cancelled']).count()
+    prod_by_status = with_labels(production['by_status'], ProductionOrder.STATUS_CHOICES)
+    overdue_prod = production['overdue']
 
     # ========================================
     # 5. Material Requirements Progress
     # ========================================
-    material_reqs = MaterialRequirement.objects.all()
-    if style_id:
-        material_reqs = material_reqs.filter(
-            production_order__style_revision__style_id=style_id
-        )
-
-    mat_req_by_status = {}
-    for status_choice in MaterialRequirement.STATUS_CHOICES:
-        status_value = status_choice[0]
-        count = material_reqs.filter(status=status_value).count()
-        if count > 0:
-            mat_req_by_status[status_value] = {
-                'count': count,
-                'label': status_choice[1],
-            }
+    mat_req_by_status = with_labels(material['by_status'], MaterialRequirement.STATUS_CHOICES)
 
     # ========================================
-    # 6. Summary Statistics
+    # 6. Summary Statistics（由各狀態數量推導，不再查詢）
     # ========================================
+    def total(counts, exclude=()):
+        return sum(n for s, n in counts.items() if s not in exclude)
+
     summary = {
-        'total_samples': sample_runs.count(),
-        'active_samples': sample_runs.exclude(
-            status__in=['accepted', 'sample_done', 'cancelled']
-        ).count(),
-        'total_quotes': cost_sheets.count(),
+        'total_samples': total(sample['by_status']),
+        'active_samples': total(sample['by_status'], exclude=('accepted', 'sample_done', 'cancelled')),
+        'total_quotes': total(quotation['by_status']),
         'pending_quotes': pending_quotes,
-        'total_po': purchase_orders.count(),
-        'active_po': purchase_orders.exclude(
-            status__in=['received', 'cancelled']
-        ).count(),
-        'total_prod_orders': production_orders.count(),
-        'active_prod_orders': production_orders.exclude(
-            status__in=['completed', 'cancelled']
-        ).count(),
+        'total_po': total(procurement['by_status']),
+        'active_po': total(procurement['by_status'], exclude=('received', 'cancelled')),
+        'total_prod_orders': total(production['by_status']),
+        'active_prod_orders': total(production['by_status'], exclude=('completed', 'cancelled')),
     }
 
     # ========================================
@@ -2804,7 +2825,7 @@ def progress_dashboard(request):
         'summary': summary,
         'alerts': alerts,
         'meta': {
-            'as_of': timezone.now().isoformat(),
+            'as_of': computed_at.isoformat(),
             'days_ahead': days_ahead,
             'style_filter': style_id,
         }
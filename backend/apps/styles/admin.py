@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Style, StyleRevision, BOMItem, Measurement, ConstructionStep
+from .models import Style, StyleRevision, BOMItem, Measurement, ConstructionStep, StyleStatus
 
 
 class BOMItemInline(admin.TabularInline):
@@ -50,3 +50,11 @@ class ConstructionStepAdmin(admin.ModelAdmin):
     list_display = ('revision', 'step_number', 'description', 'is_verified')
     list_filter = ('is_verified',)
     search_fields = ('description',)
+
+
+@admin.register(StyleStatus)
+class StyleStatusAdmin(admin.ModelAdmin):
+    list_display = ('style', 'stage', 'risk_level', 'overall_readiness', 'computed_at')
+    list_filter = ('stage', 'risk_level')
+    search_fields = ('style__style_number', 'style__style_name')
+    readonly_fields = [f.name for f in StyleStatus._meta.fields]
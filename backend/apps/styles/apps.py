@@ -5,3 +5,8 @@ class StylesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.styles'
     verbose_name = 'Styles'
+
+    def ready(self):
+        from .signals import connect_revision_data_signals, connect_style_status_signals
+        connect_revision_data_signals()
+        connect_style_status_signals()
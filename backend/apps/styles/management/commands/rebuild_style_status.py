@@ -0,0 +1,43 @@
+"""Rebuild / check the StyleStatus read model"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.models import Organization
+from apps.styles.style_status import check_style_status_drift, rebuild_style_statuses
+
+
+class Command(BaseCommand):
+    help = 'Rebuild StyleStatus rows, or report (and optionally fix) drift with --check'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organization', help='Organization UUID (default: all)')
+        parser.add_argument('--check', action='store_true', help='只比對，不全量重建')
+        parser.add_argument('--fix', action='store_true', help='搭配 --check：重算有差異的 styles')
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        organization = None
+        if options['organization']:
+            organization = Organization.objects.filter(pk=options['organization']).first()
+            if organization is None:
+                raise CommandError(f"Organization {options['organization']} not found")
+
+        if not options['check']:
+            count = rebuild_style_statuses(organization, batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'✅ Rebuilt {count} style statuses'))
+            return
+
+        drifts = check_style_status_drift(organization, fix=options['fix'], batch_size=options['batch_size'])
+        for drift in drifts:
+            if drift['missing']:
+                self.stdout.write(f"  {drift['style_id']}: missing")
+                continue
+            for name, values in drift['fields'].items():
+                self.stdout.write(f"  {drift['style_id']}.{name}: {values['stored']!r} → {values['expected']!r}")
+
+        if not drifts:
+            self.stdout.write(self.style.SUCCESS('✅ No drift'))
+        elif options['fix']:
+            self.stdout.write(self.style.WARNING(f'⚠️  Fixed {len(drifts)} drifted styles'))
+        else:
+            self.stdout.write(self.style.WARNING(f'⚠️  {len(drifts)} drifted styles (run with --fix to repair)'))
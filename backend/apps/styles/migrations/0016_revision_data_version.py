@@ -0,0 +1,38 @@
+# Generated by Django 4.2.8 on 2026-10-19 02:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("styles", "0015_add_brand_model"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="stylerevision",
+            name="data_version",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Incremented whenever BOM items or construction steps change",
+            ),
+        ),
+        migrations.AddField(
+            model_name="stylerevision",
+            name="source_hash",
+            field=models.CharField(
+                blank=True,
+                help_text="Cached SHA256 of verified BOM + construction (see samples generate_source_hash)",
+                max_length=64,
+            ),
+        ),
+        migrations.AddField(
+            model_name="stylerevision",
+            name="source_hash_version",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="data_version at which source_hash was computed",
+                null=True,
+            ),
+        ),
+    ]
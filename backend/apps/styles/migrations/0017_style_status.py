@@ -0,0 +1,103 @@
+# Generated by Django 4.2.8 on 2026-10-19 02:21
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0003_document_sequences"),
+        ("styles", "0016_revision_data_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StyleStatus",
+            fields=[
+                (
+                    "style",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="style_status",
+                        serialize=False,
+                        to="styles.style",
+                    ),
+                ),
+                (
+                    "stage",
+                    models.CharField(
+                        help_text="intake / parsing / bom_ready / costing_draft / costing_submitted",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "risk_level",
+                    models.CharField(
+                        help_text="red / yellow / green (target_due_date based)",
+                        max_length=10,
+                    ),
+                ),
+                ("target_due_date", models.DateField(blank=True, null=True)),
+                (
+                    "parse_status",
+                    models.CharField(default="not_started", max_length=20),
+                ),
+                ("bom_total", models.PositiveIntegerField(default=0)),
+                ("bom_verified", models.PositiveIntegerField(default=0)),
+                ("bom_verified_ratio", models.FloatField(default=0.0)),
+                ("spec_total", models.PositiveIntegerField(default=0)),
+                ("spec_verified", models.PositiveIntegerField(default=0)),
+                ("has_tech_pack", models.BooleanField(default=False)),
+                ("translation_progress", models.PositiveSmallIntegerField(default=0)),
+                ("has_sample_request", models.BooleanField(default=False)),
+                ("mwo_status", models.CharField(blank=True, max_length=16)),
+                ("overall_readiness", models.PositiveSmallIntegerField(default=0)),
+                (
+                    "readiness",
+                    models.JSONField(
+                        default=dict,
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        help_text="load_style_readiness(detail=True) payload",
+                    ),
+                ),
+                (
+                    "costing",
+                    models.JSONField(
+                        default=dict,
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        help_text="Latest sample/bulk cost sheet versions",
+                    ),
+                ),
+                ("computed_at", models.DateTimeField()),
+                (
+                    "organization",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="style_statuses",
+                        to="core.organization",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Style Status",
+                "verbose_name_plural": "Style Statuses",
+                "db_table": "style_statuses",
+                "indexes": [
+                    models.Index(
+                        fields=["organization", "stage"],
+                        name="style_statu_organiz_f0b065_idx",
+                    ),
+                    models.Index(
+                        fields=["organization", "risk_level"],
+                        name="style_statu_organiz_f2dc37_idx",
+                    ),
+                    models.Index(
+                        fields=["organization", "overall_readiness"],
+                        name="style_statu_organiz_261651_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
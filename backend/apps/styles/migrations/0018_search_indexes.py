@@ -0,0 +1,31 @@
+"""
+Trigram search indexes (PostgreSQL only; see apps.core.search_indexes)
+"""
+
+from django.db import migrations
+
+from apps.core.search_indexes import search_index_operation
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("styles", "0017_style_status"),
+    ]
+
+    operations = [
+        search_index_operation(
+            trigram=[
+                ("styles_style_number_trgm", "styles", "style_number"),
+                ("styles_style_name_trgm", "styles", "style_name"),
+                ("styles_customer_trgm", "styles", "customer"),
+                ("brands_name_trgm", "brands", "name"),
+            ],
+            # short-term prefix matches (istartswith)
+            prefix=[
+                ("styles_style_number_prefix", "styles", "style_number"),
+            ],
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.8 on 2026-10-19 02:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("styles", "0018_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="bomitem",
+            index=models.Index(
+                fields=["revision", "is_verified"], name="bom_items_revisio_0a637c_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="style",
+            index=models.Index(
+                fields=["organization", "created_at"], name="styles_organiz_aa6361_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.8 on 2026-10-19 02:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("styles", "0019_hot_query_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="bomitem",
+            index=models.Index(
+                fields=["organization", "supplier_article_no"],
+                name="bom_items_organiz_116c7d_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="bomitem",
+            index=models.Index(
+                fields=["organization", "material_name"],
+                name="bom_items_organiz_436e44_idx",
+            ),
+        ),
+    ]
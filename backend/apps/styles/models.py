@@ -4,6 +4,7 @@ Style-centric design: Style → StyleRevision → BOMItem/Measurement/Constructi
 Added: Brand model with BOM format configuration
 """
 
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 import uuid
 
@@ -158,6 +159,9 @@ class Style(models.Model):
         verbose_name_plural = 'Styles'
         unique_together = [['organization', 'style_number']]
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['organization', 'created_at']),  # keyset 列表
+        ]
 
     # SaaS-Ready: Tenant-aware manager
     objects = TenantManager()
@@ -243,6 +247,23 @@ class StyleRevision(models.Model):
         related_name='next_revisions'
     )
 
+    # Verified data change tracking（styles.signals 維護）
+    # BOMItem / ConstructionStep 任何內容變更時 +1；比較版本號即可判斷來源是否變更
+    data_version = models.PositiveIntegerField(
+        default=0,
+        help_text="Incremented whenever BOM items or construction steps change"
+    )
+    source_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="Cached SHA256 of verified BOM + construction (see samples generate_source_hash)"
+    )
+    source_hash_version = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="data_version at which source_hash was computed"
+    )
+
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -481,6 +502,11 @@ class BOMItem(models.Model):
         verbose_name = 'BOM Item'
         verbose_name_plural = 'BOM Items'
         ordering = ['item_number']
+        indexes = [
+            models.Index(fields=['revision', 'is_verified']),  # 驗證數量 / submit gate
+            models.Index(fields=['organization', 'supplier_article_no']),  # repricing
+            models.Index(fields=['organization', 'material_name']),  # repricing
+        ]
 
     def __str__(self):
         return f"{self.revision} - {self.item_number}. {self.material_name}"
@@ -779,3 +805,69 @@ class ConstructionStep(models.Model):
 
     def __str__(self):
         return f"{self.revision} - Step {self.step_number}"
+
+
+class StyleStatus(models.Model):
+    """
+    Style 衍生狀態 read model（每個 Style 一列）
+
+    stage / risk / parse status / BOM、Spec 驗證 / 翻譯進度 / Sample、MWO 狀態
+    由 apps.styles.style_status 在相關資料變更時重算（signals + service hooks），
+    列表、Portfolio Kanban 與 readiness endpoint 直接讀取。
+    """
+    style = models.OneToOneField(
+        Style,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='style_status'
+    )
+    organization = models.ForeignKey(
+        'core.Organization',
+        on_delete=models.CASCADE,
+        related_name='style_statuses'
+    )
+
+    # Portfolio Kanban
+    stage = models.CharField(max_length=20, help_text="intake / parsing / bom_ready / costing_draft / costing_submitted")
+    risk_level = models.CharField(max_length=10, help_text="red / yellow / green (target_due_date based)")
+    target_due_date = models.DateField(null=True, blank=True)
+    parse_status = models.CharField(max_length=20, default='not_started')
+
+    # Readiness
+    bom_total = models.PositiveIntegerField(default=0)
+    bom_verified = models.PositiveIntegerField(default=0)
+    bom_verified_ratio = models.FloatField(default=0.0)
+    spec_total = models.PositiveIntegerField(default=0)
+    spec_verified = models.PositiveIntegerField(default=0)
+    has_tech_pack = models.BooleanField(default=False)
+    translation_progress = models.PositiveSmallIntegerField(default=0)
+    has_sample_request = models.BooleanField(default=False)
+    mwo_status = models.CharField(max_length=16, blank=True)
+    overall_readiness = models.PositiveSmallIntegerField(default=0)
+
+    # 完整資料（readiness endpoint / kanban card）
+    readiness = models.JSONField(
+        default=dict,
+        encoder=DjangoJSONEncoder,
+        help_text="load_style_readiness(detail=True) payload"
+    )
+    costing = models.JSONField(
+        default=dict,
+        encoder=DjangoJSONEncoder,
+        help_text="Latest sample/bulk cost sheet versions"
+    )
+
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'style_statuses'
+        verbose_name = 'Style Status'
+        verbose_name_plural = 'Style Statuses'
+        indexes = [
+            models.Index(fields=['organization', 'stage']),
+            models.Index(fields=['organization', 'risk_level']),
+            models.Index(fields=['organization', 'overall_readiness']),
+        ]
+
+    def __str__(self):
+        return f"{self.style_id} [{self.stage}/{self.risk_level}]"
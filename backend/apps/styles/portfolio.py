@@ -8,10 +8,14 @@ Phase 2-3 決策實現：stage 推導 + risk 計算
 - 處理 parse_status None/null（修正 A）
 - BOM Ready 只在 parse completed 後判斷（修正 B）
 - verified_ratio 防止除以 0（修正 C）
+- stage 在 SQL 計算（annotate_stage：Exists + Case/When），可直接在資料庫過濾 stage
 """
 
 from datetime import date
-from django.db.models import Count, Q
+from django.db.models import (
+    Case, CharField, Count, Exists, FloatField, IntegerField, OuterRef, Q, Subquery, Value, When,
+)
+from django.db.models.functions import Cast, Coalesce, NullIf
 from django.utils import timezone
 from typing import Tuple, Dict, Optional
 
@@ -20,15 +24,27 @@ BOM_VERIFIED_THRESHOLD = 0.9
 RISK_DUE_DAYS_YELLOW = 7
 SUBMITTED_LIKE = ("submitted", "accepted", "rejected")  # accepted/rejected 也算 submitted stage
 
+KANBAN_COLUMNS = [
+    ("intake", "Intake"),
+    ("parsing", "Parsing"),
+    ("bom_ready", "BOM Ready"),
+    ("costing_draft", "Costing Draft"),
+    ("costing_submitted", "Costing Submitted"),
+]
+STAGE_KEYS = [key for key, _ in KANBAN_COLUMNS]
+
 
 def safe_parse_status(style) -> str:
     """
     修正 A：parse_status None/null
-    從 ExtractionRun 推導（吃 prefetch，不再 order_by 觸發 N+1）
+    從 ExtractionRun 推導（優先用 annotate_stage 的 latest_parse_status，否則吃 prefetch）
     """
-    rev = getattr(style, "current_revision", None)
-    if not rev:
+    if not getattr(style, "current_revision_id", None):
         return "not_started"
+    if hasattr(style, "latest_parse_status"):
+        return style.latest_parse_status or "not_started"
+
+    rev = style.current_revision
 
     runs = list(rev.extraction_runs.all())  # ✅ 會使用 prefetch
     if not runs:
@@ -48,11 +64,15 @@ def bom_counts(style) -> Tuple[int, int, float]:
     verified = getattr(style, "bom_verified_count", None)
 
     if total is None or verified is None:
+        # 單一 style（submit gate）：一次 aggregate
         rev = getattr(style, "current_revision", None)
         if not rev:
             return 0, 0, 0.0
-        total = rev.bom_items.count()
-        verified = rev.bom_items.filter(is_verified=True).count()
+        counts = rev.bom_items.aggregate(
+            total=Count("pk"),
+            verified=Count("pk", filter=Q(is_verified=True)),
+        )
+        total, verified = counts["total"], counts["verified"]
 
     # 修正 C：防止除以 0
     ratio = (verified / total) if total else 0.0
@@ -63,8 +83,13 @@ def has_any_costing_with_status(style, statuses) -> bool:
     """
     ✅ 不再用 first()，跨所有 cost_sheet_groups 查詢
     避免多 group 情況下判斷錯誤
+    ✅ 吃 prefetch（cost_sheet_groups__versions），不再每個 style 各 exists() 一次
     """
-    return style.cost_sheet_groups.filter(versions__status__in=statuses).exists()
+    return any(
+        version.status in statuses
+        for group in style.cost_sheet_groups.all()
+        for version in group.versions.all()
+    )
 
 
 def derive_stage(style) -> str:
@@ -74,7 +99,12 @@ def derive_stage(style) -> str:
 
     修正 B：BOM Ready 只在 parse completed 後才判斷
     決策 2：Costing Draft 寬鬆准入（允許 BOM 不完整）
+
+    annotate_stage() 過的 style 直接使用 SQL 算出的 stage_key（規則相同）
     """
+    if hasattr(style, "stage_key"):
+        return style.stage_key
+
     # 1. Costing Submitted（最高優先級）
     if has_any_costing_with_status(style, SUBMITTED_LIKE):
         return "costing_submitted"
@@ -127,31 +157,97 @@ def calculate_risk(style, today: Optional[date] = None) -> str:
     return "green"
 
 
-def build_kanban_queryset(organization):
+def _count_subquery(queryset):
+    """OuterRef 過濾後的 COUNT(*) subquery（無資料時為 0）"""
+    return Coalesce(
+        Subquery(
+            queryset.order_by().values(group=Value(1)).annotate(c=Count("pk")).values("c")[:1],
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def annotate_stage(qs):
     """
-    構建 Portfolio Kanban 的優化查詢
-    ✅ annotate counts；prefetch related；避免 N+1
+    在 SQL 計算 Kanban stage（與 derive_stage 規則相同）
+
+    Annotations:
+        has_submitted_costing / has_draft_costing: Exists(CostSheetVersion)
+        latest_parse_status: current_revision 最新 ExtractionRun 的 status
+        bom_items_count / bom_verified_count: current_revision 的 BOM 數量
+        stage_key: Case/When，可直接 .filter(stage_key=...)
     """
-    from .models import Style  # Import here to avoid circular import
+    from apps.costing.models import CostSheetVersion
+    from apps.parsing.models import ExtractionRun
+    from .models import BOMItem
 
-    qs = (
-        Style.objects
-        .filter(organization=organization)
-        .select_related("current_revision", "created_by")
+    versions = CostSheetVersion.objects.filter(cost_sheet_group__style=OuterRef("pk"))
+    bom_items = BOMItem.objects.filter(revision=OuterRef("current_revision"))
+
+    return (
+        qs
         .annotate(
-            bom_items_count=Count("current_revision__bom_items", distinct=True),
-            bom_verified_count=Count(
-                "current_revision__bom_items",
-                filter=Q(current_revision__bom_items__is_verified=True),
-                distinct=True,
+            has_submitted_costing=Exists(versions.filter(status__in=SUBMITTED_LIKE)),
+            has_draft_costing=Exists(versions.filter(status="draft")),
+            latest_parse_status=Subquery(
+                ExtractionRun.objects.filter(
+                    style_revision=OuterRef("current_revision")
+                ).order_by("-started_at").values("status")[:1]
             ),
+            bom_items_count=_count_subquery(bom_items),
+            bom_verified_count=_count_subquery(bom_items.filter(is_verified=True)),
         )
-        .prefetch_related(
-            "cost_sheet_groups__versions",
-            "current_revision__extraction_runs",
+        .alias(
+            # 與 bom_counts 相同的浮點除法（避免 verified >= total * 0.9 的捨入差異）
+            bom_verified_ratio=Cast("bom_verified_count", FloatField()) / NullIf(
+                Cast("bom_items_count", FloatField()), Value(0.0)
+            ),
+        )
+        .annotate(
+            stage_key=Case(
+                When(has_submitted_costing=True, then=Value("costing_submitted")),
+                When(has_draft_costing=True, then=Value("costing_draft")),
+                When(current_revision__isnull=True, then=Value("intake")),
+                When(
+                    Q(latest_parse_status__isnull=True) | ~Q(latest_parse_status="completed"),
+                    then=Value("parsing"),
+                ),
+                When(
+                    bom_items_count__gt=0,
+                    bom_verified_ratio__gte=BOM_VERIFIED_THRESHOLD,
+                    then=Value("bom_ready"),
+                ),
+                default=Value("intake"),
+                output_field=CharField(),
+            ),
         )
     )
-    return qs
+
+
+def build_kanban_queryset(organization=None, style_ids=None, stage=None):
+    """
+    構建 Portfolio Kanban 的優化查詢
+    ✅ stage / parse status / BOM counts 由 annotate_stage 在 SQL 計算；
+       costing versions prefetch 給 get_costing_info；查詢數與 style 數量無關
+
+    Args:
+        organization: 組織（None 時不過濾）
+        style_ids: 只取指定 styles（StyleStatus 重算用）
+        stage: 只取該 stage 的 styles（資料庫過濾）
+    """
+    from .models import Style  # Import here to avoid circular import
+
+    qs = Style.objects.all()
+    if organization is not None:
+        qs = qs.filter(organization=organization)
+    if style_ids is not None:
+        qs = qs.filter(pk__in=style_ids)
+
+    qs = annotate_stage(qs.select_related("current_revision", "created_by"))
+    if stage:
+        qs = qs.filter(stage_key=stage)
+    return qs.prefetch_related("cost_sheet_groups__versions")
 
 
 def get_costing_info(style) -> Dict:
@@ -188,19 +284,35 @@ def get_costing_info(style) -> Dict:
     }
 
 
-def build_kanban_data(organization) -> Dict:
+def build_kanban_data(organization, stage: Optional[str] = None) -> Dict:
     """
     生成完整的 Kanban 數據（columns + cards）
+    讀取 StyleStatus read model（stage / risk / BOM / costing 已預先計算）
+
+    Args:
+        stage: 只回傳該 stage 的 cards（資料庫過濾）；columns 的 count 仍為全部
     """
-    from .models import Style  # Import here to avoid circular import
+    from .models import StyleStatus
+    from .style_status import ensure_organization_statuses
 
-    styles = build_kanban_queryset(organization)
+    ensure_organization_statuses(organization)
+    org_statuses = StyleStatus.objects.filter(organization=organization)
+    counts = dict(
+        org_statuses.order_by().values_list("stage").annotate(n=Count("pk")).values_list("stage", "n")
+    )
+
+    statuses = org_statuses
+    if stage:
+        statuses = statuses.filter(stage=stage)
+    statuses = (
+        statuses
+        .select_related("style__current_revision", "style__created_by")
+        .order_by("-style__created_at")
+    )
 
     cards = []
-    for style in styles:
-        stage_key = derive_stage(style)
-        risk_level = calculate_risk(style)
-        total, verified, ratio = bom_counts(style)
+    for status in statuses:
+        style = status.style
 
         # ✅ 處理 customer FK/物件序列化
         customer_name = None
@@ -215,25 +327,25 @@ def build_kanban_data(organization) -> Dict:
             "target_due_date": style.target_due_date.isoformat() if getattr(style, "target_due_date", None) else None,
 
             # 推導欄位
-            "stage_key": stage_key,
-            "risk_level": risk_level,
+            "stage_key": status.stage,
+            "risk_level": status.risk_level,
 
             # Revision 資訊
             "active_revision": {
                 "id": str(style.current_revision.id) if style.current_revision else None,
                 "label": getattr(style.current_revision, "revision_label", None) if style.current_revision else None,
-                "parse_status": safe_parse_status(style) if style.current_revision else "not_started",
+                "parse_status": status.parse_status,
             },
 
             # BOM 資訊
             "bom": {
-                "items_count": total,
-                "verified_count": verified,
-                "verified_ratio": round(ratio, 4),  # 保留 4 位小數，前端顯示再格式化
+                "items_count": status.bom_total,
+                "verified_count": status.bom_verified,
+                "verified_ratio": status.bom_verified_ratio,  # 保留 4 位小數，前端顯示再格式化
             },
 
             # Costing 資訊
-            "costing": get_costing_info(style),
+            "costing": status.costing,
 
             # Owner
             "owner": {
@@ -242,17 +354,9 @@ def build_kanban_data(organization) -> Dict:
             },
         })
 
-    # 統計各欄數量
-    counts = {}
-    for c in cards:
-        counts[c["stage_key"]] = counts.get(c["stage_key"], 0) + 1
-
     columns = [
-        {"key": "intake", "name": "Intake", "count": counts.get("intake", 0)},
-        {"key": "parsing", "name": "Parsing", "count": counts.get("parsing", 0)},
-        {"key": "bom_ready", "name": "BOM Ready", "count": counts.get("bom_ready", 0)},
-        {"key": "costing_draft", "name": "Costing Draft", "count": counts.get("costing_draft", 0)},
-        {"key": "costing_submitted", "name": "Costing Submitted", "count": counts.get("costing_submitted", 0)},
+        {"key": key, "name": name, "count": counts.get(key, 0)}
+        for key, name in KANBAN_COLUMNS
     ]
 
     return {"columns": columns, "cards": cards}
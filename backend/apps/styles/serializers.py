@@ -25,7 +25,9 @@ class BrandSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'styles_count']
 
     def get_styles_count(self, obj):
-        return obj.styles.count()
+        # BrandViewSet 的 queryset 已 annotate（避免每個 brand 一次 COUNT）
+        annotated = getattr(obj, 'num_styles', None)
+        return annotated if annotated is not None else obj.styles.count()
 
 
 # ========== Verified Data Serializers (DB Objects) ==========
@@ -205,6 +207,9 @@ class StyleListSerializer(serializers.ModelSerializer):
         ]
 
     def get_revision_count(self, obj):
+        # build_styles_queryset_with_risk() 已 annotate
+        if hasattr(obj, 'revision_count'):
+            return obj.revision_count
         return obj.revisions.count()
 
     def get_risk(self, obj):
@@ -213,71 +218,19 @@ class StyleListSerializer(serializers.ModelSerializer):
         return compute_risk_badges(obj)
 
     def get_readiness(self, obj):
-        """Lightweight readiness summary for list view"""
-        from apps.parsing.models import UploadedDocument
-        from apps.parsing.models_blocks import DraftBlock
-        from apps.samples.models import SampleRequest, SampleRun, SampleMWO
-
-        revision = obj.current_revision
-
-        # Tech Pack
-        has_tech_pack = UploadedDocument.objects.filter(
-            style_revision__style=obj,
-            tech_pack_revision__isnull=False,
-        ).exists()
-
-        # Translation progress
-        tech_pack_progress = 0
-        if has_tech_pack:
-            tp_rev_ids = UploadedDocument.objects.filter(
-                style_revision__style=obj,
-                tech_pack_revision__isnull=False,
-            ).values_list('tech_pack_revision_id', flat=True)
-            from django.db.models import Count, Q
-            stats = DraftBlock.objects.filter(
-                page__revision_id__in=list(tp_rev_ids)
-            ).aggregate(
-                total=Count('id'),
-                done=Count('id', filter=Q(translation_status='done')),
-                skipped=Count('id', filter=Q(translation_status='skipped')),
-            )
-            total = stats['total'] or 0
-            completed = (stats['done'] or 0) + (stats['skipped'] or 0)
-            tech_pack_progress = round(completed / total * 100) if total > 0 else 0
-
-        # BOM / Spec
-        bom_total = 0
-        bom_verified = 0
-        spec_total = 0
-        spec_verified = 0
-        if revision:
-            bom_total = revision.bom_items.count()
-            bom_verified = revision.bom_items.filter(is_verified=True).count()
-            spec_total = revision.measurements.count()
-            spec_verified = revision.measurements.filter(is_verified=True).count()
-
-        # Sample / MWO
-        has_sample_request = False
-        mwo_status = None
-        if revision:
-            sr = SampleRequest.objects.filter(revision=revision).first()
-            if sr:
-                has_sample_request = True
-                run = SampleRun.objects.filter(sample_request=sr).order_by('-run_no').first()
-                if run:
-                    mwo = SampleMWO.objects.filter(sample_run=run, is_latest=True).first()
-                    mwo_status = mwo.status if mwo else None
-
-        return {
-            'has_tech_pack': has_tech_pack,
-            'tech_pack_progress': tech_pack_progress,
-            'bom_total': bom_total,
-            'bom_verified': bom_verified,
-            'spec_total': spec_total,
-            'spec_verified': spec_verified,
-            'has_sample_request': has_sample_request,
-            'mwo_status': mwo_status,
-        }
+        """
+        Lightweight readiness summary for list view
+
+        讀 StyleStatus read model；列表由 view 整頁讀取後放在 context['style_status']，
+        未提供時才單筆讀取（尚未建立時即時補算）。
+        """
+        from .services import summarize_style_readiness
+        from .style_status import get_style_statuses
+
+        statuses = self.context.get('style_status')
+        if statuses is None or obj.id not in statuses:
+            statuses = get_style_statuses([obj])
+        return summarize_style_readiness(statuses[obj.id].readiness)
 
 
 # ========== Intake Serializers ==========
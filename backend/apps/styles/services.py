@@ -6,8 +6,10 @@ Business logic for styles, revisions, and intake
 from dataclasses import dataclass
 from typing import Any, Dict, List
 from django.db import transaction
-from django.db.models import Count, Q, Exists, OuterRef
+from django.db.models import Case, Count, Exists, F, IntegerField, OuterRef, Q, Value, When
+from apps.core.search import search_q
 from .models import Style, StyleRevision
+from .portfolio import STAGE_KEYS
 
 
 # ========== Intake Bulk Create ==========
@@ -164,12 +166,40 @@ RISK_MISSING = "missing"
 RISK_LOW_CONFLICT = "low_conflict"
 RISK_GATING_BLOCK = "gating_block"
 
+# ?search= 欄位（apps.core.search：trigram 索引）
+STYLE_SEARCH_FIELDS = ("style_number", "style_name", "customer")
+
+# 列表排序（?ordering=stage / -risk / readiness / due）
+STAGE_ORDER = STAGE_KEYS
+RISK_ORDER = ["red", "yellow", "green"]
+STATUS_ORDERING = {
+    "stage": Case(
+        *[When(style_status__stage=key, then=Value(i)) for i, key in enumerate(STAGE_ORDER)],
+        output_field=IntegerField(),
+    ),
+    "risk": Case(
+        *[When(style_status__risk_level=key, then=Value(i)) for i, key in enumerate(RISK_ORDER)],
+        output_field=IntegerField(),
+    ),
+    "readiness": F("style_status__overall_readiness"),
+    "due": F("target_due_date"),
+}
+
 
 def build_styles_queryset_with_risk(organization, params):
     """
     Build styles queryset with counts and risk flags
     Optimized to avoid N+1 queries
     """
+    return annotate_styles_risk(filter_styles_queryset(organization, params))
+
+
+def filter_styles_queryset(organization, params):
+    """
+    列表的過濾與排序（不含 annotations）
+
+    分頁（count / 取本頁 ids）在這個 queryset 上做，annotations 只算本頁的列
+    """
     qs = Style.objects.filter(organization=organization)
 
     # Filters
@@ -184,12 +214,32 @@ def build_styles_queryset_with_risk(organization, params):
         qs = qs.filter(customer=customer)
 
     if search:
-        qs = qs.filter(
-            Q(style_number__icontains=search) |
-            Q(style_name__icontains=search) |
-            Q(customer__icontains=search)
+        qs = qs.filter(search_q(STYLE_SEARCH_FIELDS, search))
+
+    # StyleStatus read model（indexed）
+    stage = params.get("stage")
+    risk = params.get("risk")
+    ordering = params.get("ordering")
+    if stage or risk or (ordering and ordering.lstrip('-') in STATUS_ORDERING):
+        # 尚無 StyleStatus 的 styles 先補算，否則 JOIN 後被過濾掉 / 排在最後
+        from .style_status import ensure_organization_statuses
+        ensure_organization_statuses(organization)
+    if stage:
+        qs = qs.filter(style_status__stage=stage)
+    if risk:
+        qs = qs.filter(style_status__risk_level=risk)
+
+    if ordering and ordering.lstrip('-') in STATUS_ORDERING:
+        expression = STATUS_ORDERING[ordering.lstrip('-')]
+        qs = qs.order_by(
+            expression.desc(nulls_last=True) if ordering.startswith('-') else expression.asc(nulls_last=True),
+            '-created_at',
         )
+    return qs
+
 
+def annotate_styles_risk(qs):
+    """列表的 counts / risk flags annotations"""
     # Annotate counts
     qs = qs.annotate(
         revision_count=Count('revisions', distinct=True),
@@ -222,7 +272,7 @@ def build_styles_queryset_with_risk(organization, params):
     )
 
     # Select related for efficiency
-    qs = qs.select_related('current_revision')
+    qs = qs.select_related('current_revision', 'brand')
 
     return qs
 
@@ -247,3 +297,202 @@ def compute_risk_badges(style_obj) -> List[str]:
         risks.append(RISK_GATING_BLOCK)
 
     return risks
+
+
+# ========== Revision Data Version ==========
+
+def bump_revision_data_version(revision_ids) -> int:
+    """
+    StyleRevision.data_version +1（單一 UPDATE）
+
+    signals 自動處理 save()/delete()；queryset.update() 等繞過 signals 的
+    批次寫入需自行呼叫。
+    """
+    revision_ids = [rid for rid in set(revision_ids) if rid]
+    if not revision_ids:
+        return 0
+    return StyleRevision.objects.filter(pk__in=revision_ids).update(
+        data_version=F('data_version') + 1
+    )
+
+
+# ========== Readiness Loader ==========
+
+def _first_by(rows, key):
+    """依 rows 的排序，每個 key 取第一筆"""
+    first = {}
+    for row in rows:
+        first.setdefault(row[key], row)
+    return first
+
+
+def load_style_readiness(styles, detail: bool = False) -> Dict[Any, Dict[str, Any]]:
+    """
+    批次計算一頁 styles 的 readiness（查詢數固定，與 style 數量無關）
+
+    每個維度一個 grouped 查詢：documents、DraftBlock 翻譯統計、BOM、Measurement、
+    最新 SampleRequest → 最新 SampleRun → latest MWO。
+
+    Args:
+        styles: Style instances（current_revision 已 select_related 較佳）
+        detail: True 時包含 documents 清單與 translated 計數（detail endpoint 用）
+
+    Returns:
+        {style_id: {'documents', 'tech_pack_revision_ids', 'translation', 'bom',
+                    'spec', 'sample_request', 'sample_run'}}
+    """
+    from apps.parsing.models import UploadedDocument
+    from apps.parsing.models_blocks import DraftBlock
+    from apps.samples.models import SampleMWO, SampleRequest, SampleRun
+    from .models import BOMItem, Measurement
+
+    styles = list(styles)
+    if not styles:
+        return {}
+
+    style_ids = [style.id for style in styles]
+    revision_by_style = {style.id: style.current_revision_id for style in styles}
+    revision_ids = [rid for rid in revision_by_style.values() if rid]
+
+    # --- Documents ---
+    doc_fields = ['id', 'style_revision__style_id', 'tech_pack_revision_id']
+    if detail:
+        doc_fields += ['filename', 'status', 'classification_result']
+    documents = {style_id: [] for style_id in style_ids}
+    tech_pack_ids = {style_id: [] for style_id in style_ids}
+    for doc in UploadedDocument.objects.filter(style_revision__style_id__in=style_ids).values(*doc_fields):
+        style_id = doc['style_revision__style_id']
+        documents[style_id].append(doc)
+        if doc['tech_pack_revision_id'] and doc['tech_pack_revision_id'] not in tech_pack_ids[style_id]:
+            tech_pack_ids[style_id].append(doc['tech_pack_revision_id'])
+
+    # --- Translation progress（per tech pack revision，再加總到 style） ---
+    all_tech_pack_ids = {tp_id for ids in tech_pack_ids.values() for tp_id in ids}
+    block_stats = {}
+    if all_tech_pack_ids:
+        block_stats = {
+            row['page__revision_id']: row
+            for row in DraftBlock.objects.filter(
+                page__revision_id__in=all_tech_pack_ids
+            ).values('page__revision_id').annotate(
+                total=Count('id'),
+                done=Count('id', filter=Q(translation_status='done')),
+                pending=Count('id', filter=Q(translation_status='pending')),
+                failed=Count('id', filter=Q(translation_status='failed')),
+                skipped=Count('id', filter=Q(translation_status='skipped')),
+            ).order_by()
+        }
+
+    # --- BOM / Spec（current revision） ---
+    def _verification_counts(model):
+        if not revision_ids:
+            return {}
+        rows = model.objects.filter(revision_id__in=revision_ids).values('revision_id').annotate(
+            total=Count('id'),
+            verified=Count('id', filter=Q(is_verified=True)),
+            translated=Count('id', filter=Q(translation_status='confirmed')),
+        ).order_by()
+        return {row['revision_id']: row for row in rows}
+
+    bom_counts = _verification_counts(BOMItem)
+    spec_counts = _verification_counts(Measurement)
+
+    # --- Sample Request → Run → MWO（各取最新一筆） ---
+    requests = _first_by(
+        SampleRequest.objects.filter(revision_id__in=revision_ids).order_by(
+            'revision_id', '-created_at'
+        ).values('id', 'revision_id', 'status', 'request_type'),
+        'revision_id',
+    ) if revision_ids else {}
+    runs = _first_by(
+        SampleRun.objects.filter(
+            sample_request_id__in=[sr['id'] for sr in requests.values()]
+        ).order_by('sample_request_id', '-run_no').values('id', 'sample_request_id', 'run_no', 'status'),
+        'sample_request_id',
+    ) if requests else {}
+    mwos = _first_by(
+        SampleMWO.objects.filter(
+            sample_run_id__in=[run['id'] for run in runs.values()], is_latest=True
+        ).order_by('sample_run_id', '-created_at').values('id', 'sample_run_id', 'status'),
+        'sample_run_id',
+    ) if runs else {}
+
+    empty_counts = {'total': 0, 'verified': 0, 'translated': 0}
+    result = {}
+    for style_id in style_ids:
+        revision_id = revision_by_style[style_id]
+
+        totals = {'total': 0, 'done': 0, 'pending': 0, 'failed': 0, 'skipped': 0}
+        for tp_id in tech_pack_ids[style_id]:
+            stats = block_stats.get(tp_id)
+            if stats:
+                for name in totals:
+                    totals[name] += stats[name]
+        completed = totals['done'] + totals['skipped']
+        translation = {
+            **totals,
+            'progress': round(completed / totals['total'] * 100) if totals['total'] > 0 else 0,
+        }
+
+        bom = bom_counts.get(revision_id, empty_counts)
+        spec = spec_counts.get(revision_id, empty_counts)
+
+        sample_request = requests.get(revision_id)
+        sample_run = runs.get(sample_request['id']) if sample_request else None
+        mwo = mwos.get(sample_run['id']) if sample_run else None
+
+        result[style_id] = {
+            'documents': [
+                {
+                    'id': str(doc['id']),
+                    'filename': doc['filename'],
+                    'file_type': (doc.get('classification_result') or {}).get('file_type', 'unknown'),
+                    'status': doc['status'],
+                }
+                for doc in documents[style_id]
+            ] if detail else [],
+            'tech_pack_revision_ids': tech_pack_ids[style_id],
+            'translation': translation,
+            'bom': {name: bom[name] for name in empty_counts},
+            'spec': {name: spec[name] for name in empty_counts},
+            'sample_request': {
+                'id': str(sample_request['id']),
+                'status': sample_request['status'],
+                'request_type': sample_request['request_type'],
+            } if sample_request else None,
+            'sample_run': {
+                'id': str(sample_run['id']),
+                'run_no': sample_run['run_no'],
+                'status': sample_run['status'],
+                'mwo_status': mwo['status'] if mwo else None,
+                'mwo_id': str(mwo['id']) if mwo else None,
+            } if sample_run else None,
+        }
+    return result
+
+
+def summarize_style_readiness(readiness: Dict[str, Any]) -> Dict[str, Any]:
+    """load_style_readiness() 結果 → 列表用的精簡格式"""
+    sample_run = readiness['sample_run']
+    return {
+        'has_tech_pack': bool(readiness['tech_pack_revision_ids']),
+        'tech_pack_progress': readiness['translation']['progress'],
+        'bom_total': readiness['bom']['total'],
+        'bom_verified': readiness['bom']['verified'],
+        'spec_total': readiness['spec']['total'],
+        'spec_verified': readiness['spec']['verified'],
+        'has_sample_request': readiness['sample_request'] is not None,
+        'mwo_status': sample_run['mwo_status'] if sample_run else None,
+    }
+
+
+def compute_overall_readiness(readiness: Dict[str, Any]) -> int:
+    """documents / 翻譯 / BOM / Spec 完成度平均（0-100）"""
+    score_parts = [1.0 if readiness['documents'] else 0.0]
+    if readiness['translation']['total'] > 0:
+        score_parts.append(readiness['translation']['progress'] / 100.0)
+    if readiness['bom']['total'] > 0:
+        score_parts.append(readiness['bom']['verified'] / readiness['bom']['total'])
+    if readiness['spec']['total'] > 0:
+        score_parts.append(readiness['spec']['verified'] / readiness['spec']['total'])
+    return round(sum(score_parts) / len(score_parts) * 100)
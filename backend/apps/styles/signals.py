@@ -0,0 +1,86 @@
+"""
+Revision data version signals
+BOMItem / ConstructionStep 變更時 bump StyleRevision.data_version
+"""
+
+from django.db.models.signals import post_delete, post_save
+
+from .services import bump_revision_data_version
+
+# 只更新翻譯欄位的 save(update_fields=...) 不算來源資料變更
+TRANSLATION_FIELDS = {'translation_status', 'translated_at', 'translated_by'}
+
+
+def _is_translation_only(update_fields) -> bool:
+    if update_fields is None:
+        return False
+    return all(name in TRANSLATION_FIELDS or name.endswith('_zh') for name in update_fields)
+
+
+def _revision_data_saved(sender, instance, update_fields=None, **kwargs):
+    if not _is_translation_only(update_fields):
+        bump_revision_data_version([instance.revision_id])
+
+
+def _revision_data_deleted(sender, instance, **kwargs):
+    bump_revision_data_version([instance.revision_id])
+
+
+def connect_revision_data_signals():
+    from .models import BOMItem, ConstructionStep
+
+    for model in (BOMItem, ConstructionStep):
+        uid = f'revision_data_version_{model.__name__}'
+        post_save.connect(_revision_data_saved, sender=model, dispatch_uid=uid)
+        post_delete.connect(_revision_data_deleted, sender=model, dispatch_uid=uid)
+
+
+# ========== StyleStatus read model ==========
+
+def _touches(update_fields, fields) -> bool:
+    """save(update_fields=...) 未涉及衍生欄位時略過"""
+    return update_fields is None or bool(set(update_fields) & fields)
+
+
+def _style_status_handlers(kind, attr, fields):
+    from .style_status import schedule_style_status_refresh
+
+    def saved(sender, instance, update_fields=None, **kwargs):
+        if _touches(update_fields, fields):
+            schedule_style_status_refresh(kind, [getattr(instance, attr)])
+
+    def deleted(sender, instance, **kwargs):
+        schedule_style_status_refresh(kind, [getattr(instance, attr)])
+
+    return saved, deleted
+
+
+def connect_style_status_signals():
+    from apps.costing.models import CostSheetVersion
+    from apps.parsing.models import ExtractionRun, UploadedDocument
+    from apps.parsing.models_blocks import DraftBlock
+    from apps.samples.models import SampleMWO, SampleRequest, SampleRun
+    from .models import BOMItem, Measurement, Style, StyleRevision
+
+    # (model, 來源種類, instance 屬性, 影響衍生狀態的欄位, 是否處理 delete)
+    sources = [
+        (Style, 'style', 'id', {'current_revision', 'target_due_date', 'organization'}, False),
+        (StyleRevision, 'style', 'style_id', set(), True),
+        (BOMItem, 'revision', 'revision_id', {'revision', 'is_verified', 'translation_status'}, True),
+        (Measurement, 'revision', 'revision_id', {'revision', 'is_verified', 'translation_status'}, True),
+        (ExtractionRun, 'revision', 'style_revision_id', {'status', 'started_at'}, True),
+        (UploadedDocument, 'revision', 'style_revision_id',
+         {'status', 'style_revision', 'tech_pack_revision', 'classification_result', 'filename'}, True),
+        (DraftBlock, 'page', 'page_id', {'translation_status'}, True),
+        (SampleRequest, 'revision', 'revision_id', {'revision', 'status', 'request_type'}, True),
+        (SampleRun, 'sample_request', 'sample_request_id', {'status', 'run_no'}, True),
+        (SampleMWO, 'sample_run', 'sample_run_id', {'status', 'is_latest'}, True),
+        (CostSheetVersion, 'cost_sheet_group', 'cost_sheet_group_id',
+         {'status', 'costing_type', 'version_no', 'unit_price', 'submitted_at'}, True),
+    ]
+    for model, kind, attr, fields, handle_delete in sources:
+        saved, deleted = _style_status_handlers(kind, attr, fields)
+        uid = f'style_status_{model.__name__}'
+        post_save.connect(saved, sender=model, dispatch_uid=uid, weak=False)
+        if handle_delete:
+            post_delete.connect(deleted, sender=model, dispatch_uid=uid, weak=False)
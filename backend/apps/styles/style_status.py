@@ -0,0 +1,250 @@
+"""
+StyleStatus Read Model
+Style 衍生狀態（stage / risk / readiness）的 denormalized 表
+
+- 寫入：相關資料變更時 schedule_style_status_refresh()（signals / service hooks），
+  同一 transaction 內的變更合併，commit 後批次重算
+- 讀取：列表、Portfolio Kanban、readiness endpoint 直接讀 StyleStatus；
+  尚未建立的列於讀取時補算
+- 維運：rebuild_style_statuses()（management command / 每日排程）、
+  check_style_status_drift() 比對儲存值與重算值
+
+risk_level 依日期變化，由每日排程重算。
+"""
+
+import json
+import logging
+from typing import Any, Dict, Iterable, List
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from apps.core.on_commit import OnCommitCoalescer
+
+from .models import Style, StyleRevision, StyleStatus
+from .portfolio import bom_counts, build_kanban_queryset, calculate_risk, derive_stage, get_costing_info, safe_parse_status
+from .services import compute_overall_readiness, load_style_readiness, summarize_style_readiness
+
+logger = logging.getLogger(__name__)
+
+REBUILD_BATCH_SIZE = 200
+
+# 比對 drift 的欄位（computed_at 除外）
+STATUS_FIELDS = [
+    'organization_id', 'stage', 'risk_level', 'target_due_date', 'parse_status',
+    'bom_total', 'bom_verified', 'bom_verified_ratio', 'spec_total', 'spec_verified',
+    'has_tech_pack', 'translation_progress', 'has_sample_request', 'mwo_status',
+    'overall_readiness', 'readiness', 'costing',
+]
+
+
+# ========================================
+# Compute
+# ========================================
+
+def _json_safe(value):
+    """與 JSONField 讀回的值一致（UUID / date → str）"""
+    return json.loads(json.dumps(value, cls=DjangoJSONEncoder))
+
+
+def compute_style_statuses(style_ids: Iterable) -> Dict[Any, Dict[str, Any]]:
+    """
+    重算 styles 的衍生狀態（不寫入）
+
+    Returns:
+        {style_id: {StyleStatus field: value}}
+    """
+    styles = list(build_kanban_queryset(style_ids=list(style_ids)))
+    readiness_by_style = load_style_readiness(styles, detail=True)
+    today = timezone.localdate()
+
+    result = {}
+    for style in styles:
+        readiness = _json_safe(readiness_by_style[style.id])
+        summary = summarize_style_readiness(readiness)
+        _, _, ratio = bom_counts(style)
+        result[style.id] = {
+            'organization_id': style.organization_id,
+            'stage': derive_stage(style),
+            'risk_level': calculate_risk(style, today),
+            'target_due_date': style.target_due_date,
+            'parse_status': safe_parse_status(style) if style.current_revision_id else 'not_started',
+            'bom_total': summary['bom_total'],
+            'bom_verified': summary['bom_verified'],
+            'bom_verified_ratio': round(ratio, 4),
+            'spec_total': summary['spec_total'],
+            'spec_verified': summary['spec_verified'],
+            'has_tech_pack': summary['has_tech_pack'],
+            'translation_progress': summary['tech_pack_progress'],
+            'has_sample_request': summary['has_sample_request'],
+            'mwo_status': summary['mwo_status'] or '',
+            'overall_readiness': compute_overall_readiness(readiness),
+            'readiness': readiness,
+            'costing': _json_safe(get_costing_info(style)),
+        }
+    return result
+
+
+def refresh_style_statuses(style_ids: Iterable) -> int:
+    """重算並 upsert StyleStatus（已刪除的 style 略過）"""
+    style_ids = list(set(style_ids))
+    if not style_ids:
+        return 0
+
+    now = timezone.now()
+    computed = compute_style_statuses(style_ids)
+    StyleStatus.objects.bulk_create(
+        [StyleStatus(style_id=style_id, computed_at=now, **values) for style_id, values in computed.items()],
+        update_conflicts=True,
+        unique_fields=['style'],
+        update_fields=STATUS_FIELDS + ['computed_at'],
+        batch_size=REBUILD_BATCH_SIZE,
+    )
+    return len(computed)
+
+
+def rebuild_style_statuses(organization=None, batch_size: int = REBUILD_BATCH_SIZE) -> int:
+    """全量重算（management command / 每日排程）"""
+    style_ids = Style.objects.all()
+    if organization is not None:
+        style_ids = style_ids.filter(organization=organization)
+    style_ids = list(style_ids.order_by('pk').values_list('pk', flat=True))
+
+    count = 0
+    for start in range(0, len(style_ids), batch_size):
+        count += refresh_style_statuses(style_ids[start:start + batch_size])
+    return count
+
+
+def check_style_status_drift(organization=None, fix: bool = False,
+                             batch_size: int = REBUILD_BATCH_SIZE) -> List[Dict[str, Any]]:
+    """
+    比對 StyleStatus 與重算結果
+
+    Returns:
+        [{'style_id': str, 'missing': bool, 'fields': {field: {'stored': ..., 'expected': ...}}}]
+    """
+    style_ids = Style.objects.all()
+    if organization is not None:
+        style_ids = style_ids.filter(organization=organization)
+    style_ids = list(style_ids.order_by('pk').values_list('pk', flat=True))
+
+    drifts = []
+    for start in range(0, len(style_ids), batch_size):
+        batch = style_ids[start:start + batch_size]
+        expected = compute_style_statuses(batch)
+        stored = StyleStatus.objects.in_bulk(batch)
+
+        drifted_ids = []
+        for style_id, values in expected.items():
+            row = stored.get(style_id)
+            if row is None:
+                drifts.append({'style_id': str(style_id), 'missing': True, 'fields': {}})
+                drifted_ids.append(style_id)
+                continue
+            fields = {
+                name: {'stored': getattr(row, name), 'expected': value}
+                for name, value in values.items()
+                if getattr(row, name) != value
+            }
+            if fields:
+                drifts.append({'style_id': str(style_id), 'missing': False, 'fields': fields})
+                drifted_ids.append(style_id)
+
+        if fix and drifted_ids:
+            refresh_style_statuses(drifted_ids)
+    return drifts
+
+
+# ========================================
+# Read
+# ========================================
+
+def get_style_statuses(styles) -> Dict[Any, StyleStatus]:
+    """
+    {style_id: StyleStatus}；尚未建立的列即時補算
+    """
+    style_ids = [style.id for style in styles]
+    statuses = StyleStatus.objects.in_bulk(style_ids)
+    missing = [style_id for style_id in style_ids if style_id not in statuses]
+    if missing:
+        refresh_style_statuses(missing)
+        statuses.update(StyleStatus.objects.in_bulk(missing))
+    return statuses
+
+
+def ensure_organization_statuses(organization) -> int:
+    """組織內尚無 StyleStatus 的 styles 補算（kanban 讀取前）"""
+    missing = list(
+        Style.objects.filter(organization=organization, style_status__isnull=True).values_list('pk', flat=True)
+    )
+    return refresh_style_statuses(missing) if missing else 0
+
+
+# ========================================
+# Incremental refresh (signals / service hooks)
+# ========================================
+
+def _resolve_style_ids(pending: Dict[str, set]) -> set:
+    """各種來源 id → style ids（每種來源一個查詢）"""
+    from apps.parsing.models import UploadedDocument
+
+    style_ids = set(pending.get('style', ()))
+    if pending.get('revision'):
+        style_ids.update(
+            StyleRevision.objects.filter(pk__in=pending['revision']).values_list('style_id', flat=True)
+        )
+    if pending.get('tech_pack_revision'):
+        style_ids.update(
+            UploadedDocument.objects.filter(
+                tech_pack_revision_id__in=pending['tech_pack_revision'], style_revision__isnull=False,
+            ).values_list('style_revision__style_id', flat=True)
+        )
+    if pending.get('page'):
+        style_ids.update(
+            UploadedDocument.objects.filter(
+                tech_pack_revision__pages__id__in=pending['page'], style_revision__isnull=False,
+            ).values_list('style_revision__style_id', flat=True)
+        )
+    if pending.get('sample_request'):
+        from apps.samples.models import SampleRequest
+        style_ids.update(
+            SampleRequest.objects.filter(pk__in=pending['sample_request']).values_list('revision__style_id', flat=True)
+        )
+    if pending.get('sample_run'):
+        from apps.samples.models import SampleRun
+        style_ids.update(
+            SampleRun.objects.filter(pk__in=pending['sample_run']).values_list(
+                'sample_request__revision__style_id', flat=True
+            )
+        )
+    if pending.get('cost_sheet_group'):
+        from apps.costing.models import CostSheetGroup
+        style_ids.update(
+            CostSheetGroup.objects.filter(pk__in=pending['cost_sheet_group']).values_list('style_id', flat=True)
+        )
+    style_ids.discard(None)
+    return style_ids
+
+
+def _refresh_pending(pending: Dict[str, set]):
+    refresh_style_statuses(_resolve_style_ids(pending))
+
+
+style_status_refresh = OnCommitCoalescer(
+    'style_status', _refresh_pending, task='apps.styles.tasks.refresh_style_statuses_task',
+)
+
+
+def schedule_style_status_refresh(kind: str, ids: Iterable):
+    """
+    排程 StyleStatus 重算（同一 transaction 內合併，commit 後執行）
+
+    READ_MODEL_REFRESH_ASYNC 開啟時交給 Celery（countdown 內合併）。
+
+    Args:
+        kind: 'style' | 'revision' | 'tech_pack_revision' | 'page' | 'sample_request' | 'sample_run' |
+              'cost_sheet_group'
+        ids: 該來源的 ids
+    """
+    style_status_refresh.add(kind, ids)
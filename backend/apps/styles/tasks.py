@@ -0,0 +1,49 @@
+"""
+Styles Tasks
+Celery tasks for the StyleStatus read model
+"""
+
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def rebuild_style_statuses_task() -> dict:
+    """
+    Periodic task: Recompute every StyleStatus row
+
+    risk_level depends on today's date, and this also repairs any drift
+    from writes that bypassed the signal / service hooks.
+
+    Returns:
+        dict: {'status': 'success', 'rebuilt': int}
+    """
+    from .style_status import rebuild_style_statuses
+
+    rebuilt = rebuild_style_statuses()
+    logger.info(f"Rebuilt {rebuilt} style statuses")
+    return {'status': 'success', 'rebuilt': rebuilt}
+
+
+@shared_task
+def refresh_style_statuses_task(pending: dict) -> dict:
+    """
+    Recompute StyleStatus rows for a coalesced batch of source changes
+
+    Queued on commit by schedule_style_status_refresh() when
+    READ_MODEL_REFRESH_ASYNC is on; changes to the same ids within the
+    countdown are folded into one run.
+
+    Args:
+        pending: {kind: [id, ...]} (see schedule_style_status_refresh)
+
+    Returns:
+        dict: {'status': 'success'}
+    """
+    from .style_status import style_status_refresh
+
+    style_status_refresh.run(pending)
+    return {'status': 'success'}
@@ -62,3 +62,345 @@ class StyleModelTest(TestCase):
         )
         self.assertEqual(bom_item.material_name, "Nulu Fabric")
         self.assertEqual(bom_item.consumption_maturity, "confirmed")
+
+
+class StyleReadinessLoaderTest(TestCase):
+    def setUp(self):
+        from rest_framework.test import APIClient
+
+        self.org = Organization.objects.create(name="Readiness Org")
+        user = User.objects.create_user(username="readiness", password="testpass123", organization=self.org)
+        self.client = APIClient()
+        self.client.force_authenticate(user=user)
+
+    def _create_style(self, index):
+        from apps.samples.models import SampleRequest, SampleRun
+
+        style = Style.objects.create(
+            organization=self.org, style_number=f"RD{index:03d}", style_name="Readiness Style"
+        )
+        revision = StyleRevision.objects.create(organization=self.org, style=style, revision_label="Rev A")
+        style.current_revision = revision
+        style.save(update_fields=['current_revision'])
+        for item_number, verified in [(1, True), (2, False)]:
+            BOMItem.objects.create(
+                revision=revision, item_number=item_number, category="fabric",
+                material_name="Nulu", is_verified=verified,
+            )
+        request = SampleRequest.objects.create(organization=self.org, revision=revision)
+        SampleRun.objects.create(organization=self.org, sample_request=request, run_no=1)
+        return style
+
+    def _list_queries(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/v2/styles/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['data'], len(ctx.captured_queries)
+
+    def test_list_queries_do_not_grow_with_page_size(self):
+        self._create_style(1)
+        data, one_style_queries = self._list_queries()
+        self.assertEqual(data[0]['readiness'], {
+            'has_tech_pack': False,
+            'tech_pack_progress': 0,
+            'bom_total': 2,
+            'bom_verified': 1,
+            'spec_total': 0,
+            'spec_verified': 0,
+            'has_sample_request': True,
+            'mwo_status': None,
+        })
+
+        for index in range(2, 7):
+            self._create_style(index)
+        data, six_style_queries = self._list_queries()
+        self.assertEqual(len(data), 6)
+        self.assertEqual(six_style_queries, one_style_queries)
+
+    def test_list_cursor_pagination(self):
+        for index in range(3):
+            self._create_style(index)
+
+        response = self.client.get('/api/v2/styles/', {'cursor': '', 'page_size': 2})
+        first = response.json()
+        self.assertEqual(len(first['data']), 2)
+        self.assertEqual(first['meta']['pagination']['total'], 3)
+        self.assertFalse(first['meta']['pagination']['total_is_estimate'])
+
+        cursor = first['meta']['pagination']['next_cursor']
+        second = self.client.get('/api/v2/styles/', {'cursor': cursor, 'page_size': 2}).json()
+        self.assertIsNone(second['meta']['pagination']['next_cursor'])
+        self.assertEqual(
+            {item['id'] for item in first['data'] + second['data']},
+            {str(style.id) for style in Style.objects.all()},
+        )
+        self.assertEqual(second['data'][0]['revision_count'], 1)
+        self.assertEqual(self.client.get('/api/v2/styles/', {'cursor': 'bad'}).status_code, 400)
+
+    def test_detail_readiness(self):
+        style = self._create_style(1)
+
+        response = self.client.get(f'/api/v2/styles/{style.id}/readiness/')
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()['data']
+        self.assertEqual(data['bom'], {'total': 2, 'verified': 1, 'translated': 0})
+        self.assertEqual(data['sample_run']['run_no'], 1)
+        self.assertEqual(data['documents'], [])
+
+
+class StyleStatusReadModelTest(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name="Status Org")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.style = Style.objects.create(
+                organization=self.org, style_number="SS001", style_name="Status Style"
+            )
+            self.revision = StyleRevision.objects.create(
+                organization=self.org, style=self.style, revision_label="Rev A"
+            )
+            self.style.current_revision = self.revision
+            self.style.save(update_fields=['current_revision'])
+
+    def _status(self):
+        from .models import StyleStatus
+        return StyleStatus.objects.get(style=self.style)
+
+    def test_signals_keep_status_current(self):
+        self.assertEqual(self._status().stage, 'parsing')
+        self.assertEqual(self._status().bom_total, 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BOMItem.objects.create(
+                revision=self.revision, item_number=1, category="fabric",
+                material_name="Nulu", is_verified=True,
+            )
+
+        status = self._status()
+        self.assertEqual((status.bom_total, status.bom_verified, status.bom_verified_ratio), (1, 1, 1.0))
+        self.assertEqual(status.readiness['bom'], {'total': 1, 'verified': 1, 'translated': 0})
+
+    def test_drift_checker_reports_and_fixes(self):
+        from .models import StyleStatus
+        from .style_status import check_style_status_drift
+
+        self.assertEqual(check_style_status_drift(self.org), [])
+
+        StyleStatus.objects.filter(style=self.style).update(stage='bom_ready')
+        drifts = check_style_status_drift(self.org, fix=True)
+
+        self.assertEqual(drifts[0]['fields']['stage'], {'stored': 'bom_ready', 'expected': 'parsing'})
+        self.assertEqual(self._status().stage, 'parsing')
+        self.assertEqual(check_style_status_drift(self.org), [])
+
+    def test_rebuild_command_creates_missing_rows(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from .models import StyleStatus
+
+        StyleStatus.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_style_status', organization=str(self.org.id), stdout=out)
+
+        self.assertIn('Rebuilt 1', out.getvalue())
+        self.assertEqual(self._status().stage, 'parsing')
+
+    def test_kanban_and_list_read_status(self):
+        from rest_framework.test import APIClient
+        from .models import StyleStatus
+
+        # 直接改 read model：讀取端不重算
+        StyleStatus.objects.filter(style=self.style).update(stage='costing_draft', risk_level='red')
+        user = User.objects.create_user(username="status", password="testpass123", organization=self.org)
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        kanban = client.get('/api/v2/portfolio/kanban/').json()['data']
+        self.assertEqual(kanban['cards'][0]['stage_key'], 'costing_draft')
+        self.assertEqual(kanban['cards'][0]['risk_level'], 'red')
+
+        listed = client.get('/api/v2/styles/', {'stage': 'costing_draft'}).json()['data']
+        self.assertEqual([item['id'] for item in listed], [str(self.style.id)])
+        self.assertEqual(client.get('/api/v2/styles/', {'stage': 'intake'}).json()['data'], [])
+
+    def test_list_filters_fill_missing_status_rows(self):
+        from rest_framework.test import APIClient
+        from .models import StyleStatus
+
+        # migration 未回填、每日排程尚未執行
+        StyleStatus.objects.all().delete()
+        user = User.objects.create_user(username="status", password="testpass123", organization=self.org)
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        listed = client.get('/api/v2/styles/', {'stage': 'parsing'}).json()['data']
+        self.assertEqual([item['id'] for item in listed], [str(self.style.id)])
+        self.assertEqual(self._status().stage, 'parsing')
+
+
+class PortfolioStageQueryTest(TestCase):
+    def setUp(self):
+        self.org = Organization.objects.create(name="Kanban Org")
+
+    def _create_style(self, number, runs=(), bom=(0, 0), costing=None):
+        from apps.costing.models import CostSheetGroup, CostSheetVersion, UsageScenario
+        from apps.documents.models import Document
+        from apps.parsing.models import ExtractionRun
+
+        style = Style.objects.create(organization=self.org, style_number=number, style_name="Kanban Style")
+        if runs is None:
+            return style
+        revision = StyleRevision.objects.create(organization=self.org, style=style, revision_label="Rev A")
+        style.current_revision = revision
+        style.save(update_fields=['current_revision'])
+
+        for run_status in runs:
+            document = Document.objects.create(
+                organization=self.org, doc_type='tech_pack', file_kind='pdf', filename=f"{number}.pdf",
+                file_size=1, file_hash=number, storage_key=number,
+            )
+            ExtractionRun.objects.create(document=document, style_revision=revision, status=run_status)
+
+        total, verified = bom
+        for item_number in range(total):
+            BOMItem.objects.create(
+                revision=revision, item_number=item_number + 1, category="fabric",
+                material_name="Nulu", is_verified=item_number < verified,
+            )
+
+        if costing:
+            scenario = UsageScenario.objects.create(revision=revision, purpose="sample_quote")
+            CostSheetVersion.objects.create(
+                cost_sheet_group=CostSheetGroup.objects.create(style=style),
+                version_no=1, costing_type="sample", techpack_revision=revision,
+                usage_scenario=scenario, status=costing,
+            )
+        return style
+
+    def _create_scenarios(self):
+        return {
+            'intake': self._create_style("K000", runs=None),
+            'parsing': self._create_style("K001"),
+            'parsing_latest_failed': self._create_style("K002", runs=('completed', 'failed'), bom=(10, 10)),
+            'bom_ready': self._create_style("K003", runs=('completed',), bom=(10, 9)),
+            'intake_low_bom': self._create_style("K004", runs=('completed',), bom=(10, 8)),
+            'costing_draft': self._create_style("K005", bom=(1, 0), costing='draft'),
+            'costing_submitted': self._create_style("K006", costing='accepted'),
+        }
+
+    def test_sql_stage_matches_python_derivation(self):
+        from .portfolio import build_kanban_queryset, derive_stage
+
+        styles = self._create_scenarios()
+        expected = {style.id: name.split('_latest')[0].split('_low')[0] for name, style in styles.items()}
+
+        annotated = {style.id: style.stage_key for style in build_kanban_queryset(self.org)}
+        prefetched = {
+            style.id: derive_stage(style)
+            for style in Style.objects.filter(organization=self.org).prefetch_related(
+                'cost_sheet_groups__versions', 'current_revision__extraction_runs'
+            )
+        }
+        self.assertEqual(annotated, expected)
+        self.assertEqual(prefetched, expected)
+
+        bom_ready = build_kanban_queryset(self.org, stage='bom_ready')
+        self.assertEqual([style.id for style in bom_ready], [styles['bom_ready'].id])
+
+    def test_stage_queries_do_not_grow_with_styles(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .style_status import compute_style_statuses
+
+        styles = self._create_scenarios()
+
+        with CaptureQueriesContext(connection) as ctx:
+            compute_style_statuses([styles['costing_draft'].id])
+        one_style_queries = len(ctx.captured_queries)
+
+        with CaptureQueriesContext(connection) as ctx:
+            computed = compute_style_statuses([style.id for style in styles.values()])
+        self.assertEqual(len(computed), len(styles))
+        self.assertEqual(len(ctx.captured_queries), one_style_queries)
+
+    def test_kanban_stage_filter(self):
+        from rest_framework.test import APIClient
+
+        with self.captureOnCommitCallbacks(execute=True):
+            styles = self._create_scenarios()
+        user = User.objects.create_user(username="kanban", password="testpass123", organization=self.org)
+        client = APIClient()
+        client.force_authenticate(user=user)
+
+        data = client.get('/api/v2/portfolio/kanban/', {'stage': 'parsing'}).json()['data']
+        self.assertEqual(
+            {card['style_id'] for card in data['cards']},
+            {str(styles['parsing'].id), str(styles['parsing_latest_failed'].id)},
+        )
+        self.assertEqual(
+            {column['key']: column['count'] for column in data['columns']},
+            {'intake': 2, 'parsing': 2, 'bom_ready': 1, 'costing_draft': 1, 'costing_submitted': 1},
+        )
+        self.assertEqual(client.get('/api/v2/portfolio/kanban/', {'stage': 'done'}).status_code, 400)
+
+
+class StyleEndpointQueryBudgetTest(TestCase):
+    """styles endpoints 在宣告的 query budget 內，且 list 查詢數不隨筆數成長"""
+
+    def setUp(self):
+        from rest_framework.test import APIClient
+
+        self.org = Organization.objects.create(name="Budget Org")
+        user = User.objects.create_user(username="budget", password="testpass123", organization=self.org)
+        self.client = APIClient()
+        self.client.force_authenticate(user=user)
+
+    def _populate(self, styles, prefix):
+        from apps.core.seeding import seed_dataset
+        from .models import Brand, Measurement
+
+        seed_dataset(self.org, styles=styles, bom_items_per_style=3, runs_per_style=1, blocks_per_style=0, prefix=prefix)
+        brand = Brand.objects.create(organization=self.org, code=prefix, name=f"{prefix} Brand")
+        Style.objects.filter(style_number__startswith=prefix).update(brand=brand)
+        for revision in StyleRevision.objects.filter(style__style_number__startswith=prefix):
+            for point in ('Chest', 'Waist'):
+                Measurement.objects.create(revision=revision, point_name=point, values={'S': 40, 'M': 42})
+
+    def _urls(self):
+        style = Style.objects.filter(organization=self.org).order_by('style_number').first()
+        revision_id = style.current_revision_id
+        return [
+            '/api/v2/brands/',
+            '/api/v2/styles/',
+            '/api/v2/styles/?cursor=',
+            '/api/v2/style-revisions/',
+            '/api/v2/portfolio/kanban/',
+            f'/api/v2/styles/{style.id}/',
+            f'/api/v2/styles/{style.id}/readiness/',
+            f'/api/v2/style-revisions/{revision_id}/',
+            f'/api/v2/style-revisions/{revision_id}/bom/',
+            f'/api/v2/style-revisions/{revision_id}/measurements/',
+        ]
+
+    def test_endpoints_within_budget(self):
+        from apps.core.instrumentation import assert_within_budget
+
+        self._populate(5, 'QA')
+        for url in self._urls():
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            assert_within_budget(response)
+
+    def test_list_queries_do_not_grow_with_rows(self):
+        from apps.core.instrumentation import request_metrics
+
+        self._populate(2, 'QA')
+        urls = self._urls()
+        before = {url: request_metrics(self.client.get(url)).queries for url in urls}
+
+        self._populate(8, 'QB')
+        after = {url: request_metrics(self.client.get(url)).queries for url in urls}
+        self.assertEqual(after, before)
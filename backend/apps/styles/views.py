@@ -13,7 +13,8 @@ from django.conf import settings
 from django.utils import timezone
 
 from django.db import models
-from apps.core.api_utils import api_success, api_error, paginated_response, ErrorCodes
+from apps.core.api_utils import api_success, api_error, cursor_paginated_response, paginated_response, ErrorCodes
+from apps.core.pagination import estimated_count, fetch_in_order, keyset_page_ids
 from .models import Style, StyleRevision, BOMItem, Measurement, Brand
 from .serializers import (
     StyleSerializer,
@@ -24,7 +25,13 @@ from .serializers import (
     IntakeBulkCreateRequestSerializer,
     BrandSerializer,
 )
-from .services import bulk_create_styles_and_revisions, build_styles_queryset_with_risk
+from .services import (
+    bulk_create_styles_and_revisions,
+    annotate_styles_risk,
+    filter_styles_queryset,
+    bump_revision_data_version,
+)
+from .style_status import get_style_statuses, schedule_style_status_refresh
 
 
 class BrandViewSet(viewsets.ModelViewSet):
@@ -34,6 +41,7 @@ class BrandViewSet(viewsets.ModelViewSet):
     """
     serializer_class = BrandSerializer
     permission_classes = []  # TODO: Enable authentication in production
+    query_budgets = {'list': 5, 'retrieve': 5}
 
     def _get_organization(self, request):
         """Get organization from request user (SaaS-Ready)."""
@@ -51,7 +59,7 @@ class BrandViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter brands by organization"""
         org = self._get_organization(self.request)
-        queryset = Brand.objects.all()
+        queryset = Brand.objects.annotate(num_styles=models.Count('styles'))
         if org is not None:
             queryset = queryset.filter(organization=org)
         return queryset.order_by('name')
@@ -69,6 +77,7 @@ class BOMItemViewSet(viewsets.ModelViewSet):
     """
     serializer_class = BOMItemSerializer
     permission_classes = []  # TODO: Enable authentication in production
+    query_budgets = {'list': 5, 'retrieve': 5}
 
     def _get_organization(self, request):
         """Get organization from request user (SaaS-Ready)."""
@@ -376,6 +385,10 @@ class BOMItemViewSet(viewsets.ModelViewSet):
             verified_at=timezone.now(),
             verified_by=request.user if request.user.is_authenticated else None,
         )
+        # queryset.update() 不觸發 signals
+        if updated:
+            bump_revision_data_version([revision_pk])
+            schedule_style_status_refresh('revision', [revision_pk])
 
         return Response({
             'verified_count': updated,
@@ -443,6 +456,7 @@ class MeasurementViewSet(viewsets.ModelViewSet):
     """
     serializer_class = MeasurementSerializer
     permission_classes = []  # TODO: Enable authentication in production
+    query_budgets = {'list': 5, 'retrieve': 5}
 
     def _get_organization(self, request):
         """Get organization from request user (SaaS-Ready)."""
@@ -533,6 +547,9 @@ class MeasurementViewSet(viewsets.ModelViewSet):
             verified_at=timezone.now(),
             verified_by=request.user if request.user.is_authenticated else None,
         )
+        # queryset.update() 不觸發 signals
+        if updated:
+            schedule_style_status_refresh('revision', [revision_pk])
 
         return Response({
             'verified_count': updated,
@@ -547,6 +564,7 @@ class StyleViewSet(viewsets.ViewSet):
     # TODO: Enable authentication in production
     # permission_classes = [IsAuthenticated]
     permission_classes = []
+    query_budgets = {'list': 15, 'retrieve': 10, 'readiness': 15}
 
     def _get_organization(self, request):
         """
@@ -578,12 +596,38 @@ class StyleViewSet(viewsets.ViewSet):
                 status_code=status.HTTP_403_FORBIDDEN
             )
 
-        # Build queryset with risk annotations
-        qs = build_styles_queryset_with_risk(org, request.query_params)
+        # 過濾 / 排序（annotations 只對本頁 ids 計算）
+        qs = filter_styles_queryset(org, request.query_params)
+        page_size = int(request.query_params.get('page_size', 50))
+
+        # Keyset 分頁：?cursor=（第一頁傳空值），依 (created_at, id) 排序
+        if 'cursor' in request.query_params:
+            if request.query_params.get('ordering'):
+                return api_error(
+                    code=ErrorCodes.VALIDATION_ERROR,
+                    message="ordering is not supported with cursor pagination",
+                    status_code=status.HTTP_400_BAD_REQUEST
+                )
+            try:
+                ids, next_cursor = keyset_page_ids(qs, request.query_params.get('cursor'), page_size)
+            except ValueError:
+                return api_error(
+                    code=ErrorCodes.VALIDATION_ERROR,
+                    message="Invalid cursor",
+                    status_code=status.HTTP_400_BAD_REQUEST
+                )
+            total, total_is_estimate = estimated_count(qs)
+            items = fetch_in_order(annotate_styles_risk(qs), ids)
+            return cursor_paginated_response(
+                data=self._serialize_list(items),
+                page_size=page_size,
+                next_cursor=next_cursor,
+                total=total,
+                total_is_estimate=total_is_estimate,
+            )
 
         # Pagination
         page = int(request.query_params.get('page', 1))
-        page_size = int(request.query_params.get('page_size', 50))
 
         # Calculate pagination
         total = qs.count()
@@ -591,18 +635,22 @@ class StyleViewSet(viewsets.ViewSet):
         end = start + page_size
 
         # Get page data
-        items = list(qs[start:end])
-
-        # Serialize
-        serializer = StyleListSerializer(items, many=True)
+        ids = list(qs.values_list('pk', flat=True)[start:end])
+        items = fetch_in_order(annotate_styles_risk(qs), ids)
 
         return paginated_response(
-            data=serializer.data,
+            data=self._serialize_list(items),
             page=page,
             page_size=page_size,
             total=total
         )
 
+    def _serialize_list(self, items):
+        # Serialize (readiness 讀 StyleStatus read model)
+        return StyleListSerializer(
+            items, many=True, context={'style_status': get_style_statuses(items)}
+        ).data
+
     def retrieve(self, request, pk=None):
         """
         GET /api/v2/styles/{id}
@@ -699,6 +747,7 @@ class StyleRevisionViewSet(viewsets.ViewSet):
     # TODO: Enable authentication in production
     # permission_classes = [IsAuthenticated]
     permission_classes = []
+    query_budgets = {'list': 5, 'retrieve': 8}
 
     def _get_organization(self, request):
         """
@@ -1018,120 +1067,14 @@ class StyleRevisionViewSet(viewsets.ViewSet):
 def _compute_style_readiness(style):
     """
     Compute aggregated readiness data for a Style.
-    Used by both the detail readiness endpoint and the list serializer.
+    讀 StyleStatus read model（與列表、Kanban 相同來源）。
     """
-    from apps.parsing.models import UploadedDocument
-    from apps.parsing.models_blocks import Revision as TechPackRevision, DraftBlock
-    from apps.samples.models import SampleRequest, SampleRun, SampleMWO
-
     revision = style.current_revision
     revision_id = str(revision.id) if revision else None
 
-    # --- Documents ---
-    docs_qs = UploadedDocument.objects.filter(
-        style_revision__style=style
-    ).values('id', 'filename', 'status', 'classification_result', 'tech_pack_revision_id')
-    documents = []
-    for doc in docs_qs:
-        cr = doc.get('classification_result') or {}
-        documents.append({
-            'id': str(doc['id']),
-            'filename': doc['filename'],
-            'file_type': cr.get('file_type', 'unknown'),
-            'status': doc['status'],
-        })
-
-    # --- Translation progress ---
-    # Find tech_pack_revision(s) linked to this style's uploaded documents
-    tp_rev_ids = UploadedDocument.objects.filter(
-        style_revision__style=style,
-        tech_pack_revision__isnull=False,
-    ).values_list('tech_pack_revision_id', flat=True)
-
-    translation = {'total': 0, 'done': 0, 'pending': 0, 'failed': 0, 'skipped': 0, 'progress': 0}
-    tech_pack_revision_id = None
-    if tp_rev_ids:
-        tech_pack_revision_id = str(tp_rev_ids[0])
-        # Aggregate across all related tech pack revisions
-        from django.db.models import Count, Q
-        stats = DraftBlock.objects.filter(
-            page__revision_id__in=list(tp_rev_ids)
-        ).aggregate(
-            total=Count('id'),
-            done=Count('id', filter=Q(translation_status='done')),
-            pending=Count('id', filter=Q(translation_status='pending')),
-            failed=Count('id', filter=Q(translation_status='failed')),
-            skipped=Count('id', filter=Q(translation_status='skipped')),
-        )
-        total = stats['total'] or 0
-        done = stats['done'] or 0
-        skipped = stats['skipped'] or 0
-        completed = done + skipped
-        translation = {
-            'total': total,
-            'done': done,
-            'pending': stats['pending'] or 0,
-            'failed': stats['failed'] or 0,
-            'skipped': skipped,
-            'progress': round(completed / total * 100) if total > 0 else 0,
-        }
-
-    # --- BOM ---
-    bom_total = 0
-    bom_verified = 0
-    bom_translated = 0
-    if revision:
-        bom_items = revision.bom_items.all()
-        bom_total = bom_items.count()
-        bom_verified = bom_items.filter(is_verified=True).count()
-        bom_translated = bom_items.filter(translation_status='confirmed').count()
-
-    # --- Spec ---
-    spec_total = 0
-    spec_verified = 0
-    spec_translated = 0
-    if revision:
-        measurements = revision.measurements.all()
-        spec_total = measurements.count()
-        spec_verified = measurements.filter(is_verified=True).count()
-        spec_translated = measurements.filter(translation_status='confirmed').count()
-
-    # --- Sample Request & Run ---
-    sample_request_data = None
-    sample_run_data = None
-    if revision:
-        sr = SampleRequest.objects.filter(revision=revision).order_by('-created_at').first()
-        if sr:
-            sample_request_data = {
-                'id': str(sr.id),
-                'status': sr.status,
-                'request_type': sr.request_type,
-            }
-            run = SampleRun.objects.filter(sample_request=sr).order_by('-run_no').first()
-            if run:
-                mwo = SampleMWO.objects.filter(sample_run=run, is_latest=True).first()
-                sample_run_data = {
-                    'id': str(run.id),
-                    'run_no': run.run_no,
-                    'status': run.status,
-                    'mwo_status': mwo.status if mwo else None,
-                    'mwo_id': str(mwo.id) if mwo else None,
-                }
-
-    # --- Overall readiness ---
-    score_parts = []
-    if documents:
-        score_parts.append(1.0)  # has documents
-    else:
-        score_parts.append(0.0)
-    if translation['total'] > 0:
-        score_parts.append(translation['progress'] / 100.0)
-    if bom_total > 0:
-        score_parts.append(bom_verified / bom_total)
-    if spec_total > 0:
-        score_parts.append(spec_verified / spec_total)
-
-    overall = round(sum(score_parts) / max(len(score_parts), 1) * 100)
+    status_row = get_style_statuses([style])[style.id]
+    readiness = status_row.readiness
+    tech_pack_ids = readiness['tech_pack_revision_ids']
 
     return {
         'style_id': str(style.id),
@@ -1142,14 +1085,14 @@ def _compute_style_readiness(style):
         'revision_id': revision_id,
         'revision_label': revision.revision_label if revision else None,
         'revision_status': revision.status if revision else None,
-        'tech_pack_revision_id': tech_pack_revision_id,
-        'documents': documents,
-        'translation': translation,
-        'bom': {'total': bom_total, 'verified': bom_verified, 'translated': bom_translated},
-        'spec': {'total': spec_total, 'verified': spec_verified, 'translated': spec_translated},
-        'sample_request': sample_request_data,
-        'sample_run': sample_run_data,
-        'overall_readiness': overall,
+        'tech_pack_revision_id': str(tech_pack_ids[0]) if tech_pack_ids else None,
+        'documents': readiness['documents'],
+        'translation': readiness['translation'],
+        'bom': readiness['bom'],
+        'spec': readiness['spec'],
+        'sample_request': readiness['sample_request'],
+        'sample_run': readiness['sample_run'],
+        'overall_readiness': status_row.overall_readiness,
     }
 
 
@@ -1159,15 +1102,24 @@ class PortfolioViewSet(viewsets.ViewSet):
     Phase 2-3: Stage 推導 + Risk 計算
     """
     permission_classes = []  # TODO: Enable authentication in production
+    query_budgets = {'kanban': 6}
 
     @action(detail=False, methods=['get'], url_path='kanban')
     def kanban(self, request):
         """
-        GET /api/v2/portfolio/kanban/?organization_id={id}
-        返回 5 欄 Kanban 數據（columns + cards）
+        GET /api/v2/portfolio/kanban/?organization_id={id}&stage={stage}
+        返回 5 欄 Kanban 數據（columns + cards）；stage 只過濾 cards
         """
         from apps.core.models import Organization
-        from .portfolio import build_kanban_data
+        from .portfolio import STAGE_KEYS, build_kanban_data
+
+        stage = request.query_params.get('stage')
+        if stage and stage not in STAGE_KEYS:
+            return api_error(
+                message=f'Invalid stage: {stage}',
+                code=ErrorCodes.VALIDATION_ERROR,
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
 
         # ✅ 安全的 Organization 取得方式
         org_id = request.query_params.get('organization_id')
@@ -1197,7 +1149,7 @@ class PortfolioViewSet(viewsets.ViewSet):
             )
 
         try:
-            data = build_kanban_data(organization)
+            data = build_kanban_data(organization, stage=stage)
             return api_success(data=data)
         except Exception as e:
             return api_error(
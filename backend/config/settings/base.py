@@ -48,6 +48,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "apps.core.instrumentation.RequestMetricsMiddleware",  # Query count / Server-Timing
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -152,6 +153,43 @@ CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes max per task
 
+# Celery Beat (periodic tasks)
+CELERY_BEAT_SCHEDULE = {
+    # P18: Progress dashboard snapshots (overdue / due-soon counts are date-based)
+    "refresh-progress-dashboards": {
+        "task": "apps.samples.tasks.refresh_progress_dashboards_task",
+        "schedule": 15 * 60,
+    },
+    # P1: SampleRun alerts (overdue / due soon / stale)
+    "evaluate-alerts": {
+        "task": "apps.samples.tasks.evaluate_alerts_task",
+        "schedule": 10 * 60,
+    },
+    # StyleStatus read model (risk_level is date-based; also repairs drift)
+    "rebuild-style-statuses": {
+        "task": "apps.styles.tasks.rebuild_style_statuses_task",
+        "schedule": 24 * 60 * 60,
+    },
+}
+
+# P1: Alert rule thresholds (days)
+ALERT_DUE_SOON_DAYS = int(os.getenv("ALERT_DUE_SOON_DAYS", "3"))
+ALERT_STALE_DAYS = int(os.getenv("ALERT_STALE_DAYS", "7"))
+
+# P1: Batch transition side-effect worker pool size (T2PO/MWO generation)
+SAMPLE_RUN_BATCH_WORKERS = int(os.getenv("SAMPLE_RUN_BATCH_WORKERS", "4"))
+
+# Read models (StyleStatus / progress dashboard): refresh in Celery after commit instead of inline;
+# changes within the countdown (seconds) are coalesced into one task
+READ_MODEL_REFRESH_ASYNC = os.getenv("READ_MODEL_REFRESH_ASYNC", "False").lower() in ("1", "true")
+READ_MODEL_REFRESH_COUNTDOWN = int(os.getenv("READ_MODEL_REFRESH_COUNTDOWN", "5"))
+
+# P9: Scheduler/Gantt response cache TTL (seconds)
+SCHEDULER_CACHE_TIMEOUT = int(os.getenv("SCHEDULER_CACHE_TIMEOUT", str(10 * 60)))
+
+# Per-request query budgets: raise instead of logging when an endpoint exceeds its budget (CI)
+QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "False").lower() in ("1", "true")
+
 # OpenAI Configuration
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 OPENAI_ORG_ID = os.getenv("OPENAI_ORG_ID", "")
@@ -173,6 +211,16 @@ if os.getenv("AWS_STORAGE_BUCKET_NAME"):
 else:
     DEFAULT_FILE_STORAGE = "django.core.files.storage.FileSystemStorage"
 
+# PDF Export Fonts
+# PDF_FONT_PATHS: 額外字體路徑（以 os.pathsep 分隔），優先於系統字體
+# PDF_FONT_DIR: 部署時隨附的字體資料夾（backend/fonts/，見其中 README）
+# Pillow 匯出器（Tech Pack 雙語 / MWO 完整版）必須有 CJK 字體，否則拋出 FontNotConfigured
+PDF_FONT_PATHS = [p for p in os.getenv("PDF_FONT_PATHS", "").split(os.pathsep) if p]
+PDF_FONT_DIR = os.getenv("PDF_FONT_DIR", str(BASE_DIR / "fonts"))
+
+# Tech Pack page pre-rendering (webp / png)
+PAGE_RENDER_FORMAT = os.getenv("PAGE_RENDER_FORMAT", "webp")
+
 # API Documentation
 SPECTACULAR_SETTINGS = {
     "TITLE": "Fashion Production System API",
@@ -38,6 +38,7 @@ CORS_ALLOW_CREDENTIALS = True
 # Remove XFrameOptionsMiddleware to allow PDF iframe embedding
 # Frontend (localhost:3000) needs to embed PDF from backend (localhost:8000)
 MIDDLEWARE = [
+    "apps.core.instrumentation.RequestMetricsMiddleware",  # Query count / Server-Timing
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -105,6 +105,9 @@ CACHES = {
     }
 }
 
+# Read models: refresh StyleStatus / dashboard snapshots in Celery (coalesced) instead of on every save
+READ_MODEL_REFRESH_ASYNC = os.getenv("READ_MODEL_REFRESH_ASYNC", "True").lower() in ("1", "true")
+
 # Logging — console only (Railway 收集 stdout logs)
 LOGGING = {
     "version": 1,
@@ -39,6 +39,7 @@ urlpatterns = [
     path("api/v2/", include("apps.procurement.urls")),  # P14: Suppliers & POs
     path("api/v2/", include("apps.orders.urls")),  # P17: Production Orders
     path("api/v2/assistant/", include("apps.assistant.urls")),  # Assistant feature
+    path("api/v2/search/", include("apps.core.search_urls")),  # Unified search
 
     # API Documentation (TODO: Uncomment when drf_spectacular is added)
     # path("api/v2/schema/", SpectacularAPIView.as_view(), name="schema"),
@@ -69,10 +69,13 @@ export function SendPOButton({
     try {
       const response = await sendPO(poId, customEmail || undefined);
 
-      if (response.status === "sent") {
+      if (response.status === "sent" || response.status === "queued") {
         setResult({
           success: true,
-          message: `PO sent successfully to ${response.sent_to}`,
+          message:
+            response.status === "queued"
+              ? `PO queued for delivery to ${response.sent_to}`
+              : `PO sent successfully to ${response.sent_to}`,
         });
         // Close dialog after 2 seconds on success
         setTimeout(() => {
@@ -100,6 +100,7 @@ export async function sendPO(
   sent_to?: string;
   sent_at?: string;
   sent_count?: number;
+  task_id?: string;
   error?: string;
 }> {
   return apiClient<{
@@ -108,6 +109,7 @@ export async function sendPO(
     sent_to?: string;
     sent_at?: string;
     sent_count?: number;
+    task_id?: string;
   }>(`/purchase-orders/${id}/send/`, {
     method: 'POST',
     headers: email ? { 'Content-Type': 'application/json' } : undefined,
@@ -650,10 +650,18 @@ export interface KanbanRunItem {
   } | null;
 }
 
+export interface KanbanLaneMeta {
+  total: number;
+  returned: number;
+  next_cursor: string | null;
+}
+
 export interface KanbanRunsResponse {
   runs: KanbanRunItem[];
   meta: {
     count: number;
+    limit?: number;
+    lanes?: Record<string, KanbanLaneMeta>;
     as_of: string;
   };
 }
@@ -685,6 +693,7 @@ export interface KanbanFilters {
   run_type?: string;
   search?: string;
   limit?: number;
+  cursor?: string; // per-lane "load more" (meta.lanes[status].next_cursor)
 }
 
 /**
@@ -720,6 +729,9 @@ export async function fetchKanbanRuns(params?: KanbanFilters): Promise<KanbanRun
   if (params?.limit) {
     searchParams.set('limit', String(params.limit));
   }
+  if (params?.cursor) {
+    searchParams.set('cursor', params.cursor);
+  }
   const queryString = searchParams.toString();
   const url = `/kanban/runs/${queryString ? `?${queryString}` : ''}`;
   return apiClient<KanbanRunsResponse>(url);
@@ -819,6 +831,8 @@ export interface Alert {
   days_stale?: number;
   target_due_date?: string;
   created_at?: string;
+  first_seen_at: string;
+  resolved_at: string | null;
 }
 
 export interface AlertsResponse {
@@ -833,6 +847,7 @@ export interface AlertsResponse {
     as_of: string;
     due_soon_days: number;
     stale_days: number;
+    next_cursor: string | null;
   };
 }
 
@@ -840,9 +855,10 @@ export interface AlertsParams {
   include_overdue?: boolean;
   include_due_soon?: boolean;
   include_stale?: boolean;
-  due_soon_days?: number;
-  stale_days?: number;
+  severity?: string;
+  state?: 'active' | 'resolved' | 'all';
   limit?: number;
+  cursor?: string;
 }
 
 /**
@@ -860,15 +876,18 @@ export async function fetchAlerts(params?: AlertsParams): Promise<AlertsResponse
   if (params?.include_stale !== undefined) {
     searchParams.set('include_stale', String(params.include_stale));
   }
-  if (params?.due_soon_days) {
-    searchParams.set('due_soon_days', String(params.due_soon_days));
+  if (params?.severity) {
+    searchParams.set('severity', params.severity);
   }
-  if (params?.stale_days) {
-    searchParams.set('stale_days', String(params.stale_days));
+  if (params?.state) {
+    searchParams.set('state', params.state);
   }
   if (params?.limit) {
     searchParams.set('limit', String(params.limit));
   }
+  if (params?.cursor) {
+    searchParams.set('cursor', params.cursor);
+  }
   const queryString = searchParams.toString();
   const url = `/alerts/${queryString ? `?${queryString}` : ''}`;
   return apiClient<AlertsResponse>(url);